@@ -1,12 +1,16 @@
 from __future__ import annotations
 
-from typing import Any
+from typing import Any, Dict, List, Tuple
 
 from agent_registry.v0_models import AgentRegistryV0, AgentSpec
 
 
 class CapabilitiesLookup:
-    """Consolidated agent filtering by intent and mode."""
+    """Consolidated agent filtering by intent and mode.
+
+    The index is built once in ``__init__`` (once per registry snapshot, see
+    ``agent_registry.snapshot``); lookups are dictionary reads.
+    """
 
     def __init__(
         self,
@@ -15,25 +19,72 @@ class CapabilitiesLookup:
     ):
         self._registry = registry
         self._catalog = catalog or {}
+        self._by_intent_mode: Dict[Tuple[str, str], Tuple[AgentSpec, ...]] = {}
+        self._by_capability: Dict[str, Tuple[AgentSpec, ...]] = {}
+        self._single_capability: Dict[Tuple[str, str, str], Tuple[AgentSpec, ...]] = {}
+        self._single_capability_any_intent: Dict[Tuple[str, str], Tuple[AgentSpec, ...]] = {}
+        self.allowed_intents: Dict[Tuple[str, str], frozenset[str]] = {}
+        self._build_index()
 
     def find_agents(self, intent: str, mode: str) -> list[AgentSpec]:
         """Return enabled agents matching both intent and mode."""
-        result: list[AgentSpec] = []
-        for agent in self._registry.agents:
-            if not agent.enabled:
-                continue
-            if agent.mode != mode:
-                continue
-            for cap in agent.capabilities:
-                if intent in cap.allowed_intents:
-                    result.append(agent)
-                    break
-        return result
+        return list(self._by_intent_mode.get((intent, mode), ()))
 
     def has_capability(self, intent: str, mode: str) -> bool:
         """Check if any enabled agent can handle intent in given mode."""
-        return len(self.find_agents(intent, mode)) > 0
+        return (intent, mode) in self._by_intent_mode
+
+    def agents_for_capability(self, capability_id: str) -> list[AgentSpec]:
+        """Return all agents (enabled or not) declaring ``capability_id``."""
+        return list(self._by_capability.get(capability_id, ()))
+
+    def find_single_capability_agents(self, capability_id: str, mode: str, intent: str | None) -> list[AgentSpec]:
+        """Enabled agents in ``mode`` whose only capability is ``capability_id`` and allows ``intent``.
+
+        A capability with no allowed intents accepts any intent.
+        """
+        if not intent:
+            return []
+        matched = self._single_capability.get((capability_id, mode, intent))
+        if matched is None:
+            matched = self._single_capability_any_intent.get((capability_id, mode), ())
+        return list(matched)
 
     def list_capabilities(self) -> list[str]:
         """Return all capability IDs from the catalog."""
         return list(self._catalog.keys())
+
+    def _build_index(self) -> None:
+        by_intent_mode: Dict[Tuple[str, str], List[AgentSpec]] = {}
+        by_capability: Dict[str, List[AgentSpec]] = {}
+        single: List[Tuple[AgentSpec, str, frozenset[str]]] = []
+        known_intents: set[str] = set()
+
+        for agent in self._registry.agents:
+            matched_intents: set[str] = set()
+            for cap in agent.capabilities:
+                intents = frozenset(cap.allowed_intents)
+                self.allowed_intents[(agent.agent_id, cap.capability_id)] = intents
+                known_intents |= intents
+                by_capability.setdefault(cap.capability_id, []).append(agent)
+                if agent.enabled:
+                    for intent in intents - matched_intents:
+                        by_intent_mode.setdefault((intent, agent.mode), []).append(agent)
+                    matched_intents |= intents
+            if agent.enabled and len(agent.capabilities) == 1:
+                cap = agent.capabilities[0]
+                single.append((agent, cap.capability_id, frozenset(cap.allowed_intents)))
+
+        single_any: Dict[Tuple[str, str], List[AgentSpec]] = {}
+        single_by_intent: Dict[Tuple[str, str, str], List[AgentSpec]] = {}
+        for agent, capability_id, intents in single:
+            if not intents:
+                single_any.setdefault((capability_id, agent.mode), []).append(agent)
+            for intent in known_intents:
+                if not intents or intent in intents:
+                    single_by_intent.setdefault((capability_id, agent.mode, intent), []).append(agent)
+
+        self._by_intent_mode = {key: tuple(agents) for key, agents in by_intent_mode.items()}
+        self._by_capability = {key: tuple(agents) for key, agents in by_capability.items()}
+        self._single_capability = {key: tuple(agents) for key, agents in single_by_intent.items()}
+        self._single_capability_any_intent = {key: tuple(agents) for key, agents in single_any.items()}
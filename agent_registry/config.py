@@ -13,3 +13,12 @@ def get_agent_registry_path() -> str | None:
 
 def is_agent_registry_core_enabled() -> bool:
     return os.getenv("AGENT_REGISTRY_CORE_ENABLED", "false").lower() in {"1", "true", "yes"}
+
+
+def agent_registry_reload_interval_ms() -> int:
+    """Minimum time between registry file change checks (0 = check on every access)."""
+    value = os.getenv("AGENT_REGISTRY_RELOAD_INTERVAL_MS", "1000").strip()
+    try:
+        return max(int(value), 0)
+    except ValueError:
+        return 1000
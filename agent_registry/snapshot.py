@@ -0,0 +1,181 @@
+"""Cached, hot-reloadable snapshots of the v0 agent registry and capability catalog.
+
+Parsing the registry and catalog YAML is comparatively expensive, so call
+sites read an immutable ``RegistrySnapshot`` instead of calling the loader
+per request. Each snapshot carries a ``CapabilitiesLookup`` index built once
+with it, so lookups never rescan the agent list. A snapshot is rebuilt when
+a source file's mtime/size changes and its content hash differs; the new
+snapshot replaces the old one in a single assignment, so a request holding a
+snapshot always sees one consistent registry + catalog + index triple.
+
+A failed reload keeps serving the last good snapshot. With no good snapshot
+the error is raised, and retried as soon as the files change again.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Generic, Sequence, Tuple, TypeVar
+
+from agent_registry import capabilities_lookup, v0_loader
+from agent_registry.config import agent_registry_reload_interval_ms
+from agent_registry.v0_models import AgentRegistryV0
+
+_LOGGER = logging.getLogger(__name__)
+
+T = TypeVar("T")
+_Fingerprint = Tuple[Tuple[str, int, int], ...]
+
+
+@dataclass(frozen=True)
+class RegistrySnapshot:
+    registry: AgentRegistryV0
+    catalog: Dict[str, Dict[str, Any]]
+    version: str
+    registry_path: str
+    catalog_path: str
+    lookup: capabilities_lookup.CapabilitiesLookup
+
+
+class _WatchedSource(Generic[T]):
+    """Value built from a set of files, rebuilt when their content changes."""
+
+    def __init__(self, paths: Sequence[Path], build: Callable[[str], T]) -> None:
+        self._paths = tuple(paths)
+        self._build = build
+        self._lock = threading.Lock()
+        self._value: T | None = None
+        self._digest: str | None = None
+        self._fingerprint: _Fingerprint | None = None
+        self._error: Exception | None = None
+        self._checked_at = 0.0
+
+    def get(self) -> T:
+        value = self._value
+        interval_s = agent_registry_reload_interval_ms() / 1000
+        if value is not None and time.monotonic() - self._checked_at < interval_s:
+            return value
+        with self._lock:
+            self._refresh()
+            if self._value is None:
+                assert self._error is not None
+                raise self._error
+            return self._value
+
+    def _refresh(self) -> None:
+        self._checked_at = time.monotonic()
+        try:
+            fingerprint = self._stat()
+        except OSError as exc:
+            self._fail(None, ValueError(f"agent registry source unavailable: {exc}"))
+            return
+        if fingerprint == self._fingerprint:
+            return
+        try:
+            digest = self._hash()
+        except OSError as exc:
+            self._fail(fingerprint, ValueError(f"agent registry source unavailable: {exc}"))
+            return
+        self._fingerprint = fingerprint
+        if digest == self._digest and self._value is not None:
+            return
+        try:
+            value = self._build(digest)
+        except Exception as exc:
+            self._fail(fingerprint, exc)
+            self._digest = digest
+            return
+        self._value = value
+        self._digest = digest
+        self._error = None
+
+    def _fail(self, fingerprint: _Fingerprint | None, exc: Exception) -> None:
+        self._fingerprint = fingerprint
+        self._error = exc
+        if self._value is not None:
+            _LOGGER.warning("agent registry reload failed, keeping previous snapshot: %s", exc)
+
+    def _stat(self) -> _Fingerprint:
+        fingerprint = []
+        for path in self._paths:
+            stat = path.stat()
+            fingerprint.append((str(path), stat.st_mtime_ns, stat.st_size))
+        return tuple(fingerprint)
+
+    def _hash(self) -> str:
+        digest = hashlib.sha256()
+        for path in self._paths:
+            digest.update(path.read_bytes())
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+
+_SOURCES_LOCK = threading.Lock()
+_SNAPSHOT_SOURCES: Dict[Tuple[Path, Path], _WatchedSource[RegistrySnapshot]] = {}
+_CATALOG_SOURCES: Dict[Path, _WatchedSource[Dict[str, Dict[str, Any]]]] = {}
+
+
+def get_registry_snapshot(
+    registry_path: str | None = None,
+    catalog_path: str | None = None,
+) -> RegistrySnapshot:
+    """Return the current registry + catalog snapshot (raises if none can be loaded)."""
+    key = (_registry_path(registry_path), _catalog_path(catalog_path))
+    source = _SNAPSHOT_SOURCES.get(key)
+    if source is None:
+        with _SOURCES_LOCK:
+            source = _SNAPSHOT_SOURCES.get(key)
+            if source is None:
+                source = _WatchedSource(key, lambda digest: _build_snapshot(key, digest))
+                _SNAPSHOT_SOURCES[key] = source
+    return source.get()
+
+
+def get_capability_catalog(catalog_path: str | None = None) -> Dict[str, Dict[str, Any]]:
+    """Return the cached capability catalog (independent of registry validity)."""
+    key = _catalog_path(catalog_path)
+    source = _CATALOG_SOURCES.get(key)
+    if source is None:
+        with _SOURCES_LOCK:
+            source = _CATALOG_SOURCES.get(key)
+            if source is None:
+                source = _WatchedSource([key], lambda _digest: v0_loader.load_capability_catalog(str(key)))
+                _CATALOG_SOURCES[key] = source
+    return source.get()
+
+
+def reset_registry_snapshots() -> None:
+    """Forget every cached snapshot (the next call reloads from disk)."""
+    with _SOURCES_LOCK:
+        _SNAPSHOT_SOURCES.clear()
+        _CATALOG_SOURCES.clear()
+
+
+def _build_snapshot(key: Tuple[Path, Path], digest: str) -> RegistrySnapshot:
+    registry_path, catalog_path = key
+    registry = v0_loader.AgentRegistryV0Loader.load(
+        str(registry_path),
+        catalog_path_override=str(catalog_path),
+    )
+    catalog = v0_loader.load_capability_catalog(str(catalog_path))
+    return RegistrySnapshot(
+        registry=registry,
+        catalog=catalog,
+        version=f"{registry.registry_version}+{digest[:12]}",
+        registry_path=str(registry_path),
+        catalog_path=str(catalog_path),
+        lookup=capabilities_lookup.CapabilitiesLookup(registry, catalog),
+    )
+
+
+def _registry_path(override: str | None) -> Path:
+    return Path(override) if override else v0_loader._default_registry_path()
+
+
+def _catalog_path(override: str | None) -> Path:
+    return Path(override) if override else v0_loader._default_catalog_path()
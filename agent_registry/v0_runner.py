@@ -8,7 +8,7 @@ from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 from dataclasses import dataclass
 from typing import Any, Dict, Mapping
 
-from agent_registry.v0_loader import load_capability_catalog
+from agent_registry.snapshot import get_capability_catalog as load_capability_catalog
 from agent_registry.v0_models import AgentSpec
 from agent_registry.v0_reason_codes import (
     REASON_CAPABILITY_NOT_ALLOWED,
@@ -22,6 +22,8 @@ from agent_registry.v0_reason_codes import (
 )
 from agent_registry.validation import validate_agent_input, validate_agent_output_payload
 from app.logging.agent_run_log import log_agent_run
+from app.metrics import counter, histogram
+from app.tracing import propagate, record_span
 from llm_policy.config import (
     get_llm_policy_allow_placeholders,
     get_llm_policy_path,
@@ -30,6 +32,7 @@ from llm_policy.config import (
 )
 from llm_policy.loader import LlmPolicyLoader
 from llm_policy.runtime import run_task_with_policy
+from llm_policy.scheduler import with_llm_priority
 
 
 STATUS_OK = "ok"
@@ -39,6 +42,9 @@ STATUS_ERROR = "error"
 
 _EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="agent-runner")
 
+AGENT_RUN_MS = histogram("agent_run_ms", "Agent run latency (ms)", ("agent_id",))
+AGENT_RUNS = counter("agent_runs_total", "Agent runs by status", ("agent_id", "status"))
+
 
 @dataclass(frozen=True)
 class AgentOutput:
@@ -216,7 +222,7 @@ def _run_llm_policy_task(
 
 def _policy_route_available(task_id: str, profile_id: str) -> bool:
     try:
-        policy = LlmPolicyLoader.load(
+        policy = LlmPolicyLoader.load_cached(
             enabled=True,
             path_override=get_llm_policy_path(),
             allow_placeholders=get_llm_policy_allow_placeholders(),
@@ -261,7 +267,7 @@ def _resolve_timeout_ms(agent_spec: AgentSpec) -> int | None:
 def _run_with_timeout(func, timeout_ms: int | None):
     if timeout_ms is None or timeout_ms <= 0:
         return func()
-    future = _EXECUTOR.submit(func)
+    future = _EXECUTOR.submit(propagate(with_llm_priority(func)))
     return future.result(timeout=timeout_ms / 1000.0)
 
 
@@ -305,6 +311,18 @@ def _log_run_event(
     model_meta: Dict[str, Any] | None = None,
     payload: Dict[str, Any] | None = None,
 ) -> None:
+    if output.latency_ms is not None:
+        AGENT_RUN_MS.labels(agent_spec.agent_id).observe(output.latency_ms)
+    AGENT_RUNS.labels(agent_spec.agent_id, output.status).inc()
+    record_span(
+        "agent.run",
+        output.latency_ms,
+        error_type=(output.reason_code or "agent_error") if output.status == STATUS_ERROR else None,
+        agent_id=agent_spec.agent_id,
+        capability_id=capability_id,
+        status=output.status,
+        reason_code=output.reason_code or None,
+    )
     entry = catalog.get(capability_id) if catalog and capability_id else None
     contains_sensitive = bool(entry.get("contains_sensitive_text")) if entry else False
     payload_summary = summarize_payload(payload or {}, contains_sensitive) if entry else {"keys_present": []}
@@ -18,6 +18,21 @@ from agent_runner.envelope import (
 )
 from agent_runner.shopping_agent import extract_shopping_items
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised in environments without orjson
+    orjson = None
+
+
+def _dumps_bytes(payload: Dict[str, Any]) -> bytes:
+    # The runner ships on its own, so it does not import ``app.serialization``.
+    if orjson is not None:
+        try:
+            return orjson.dumps(payload)
+        except TypeError:
+            pass
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
 
 class AgentRunnerHandler(BaseHTTPRequestHandler):
     def do_POST(self) -> None:
@@ -62,7 +77,7 @@ class AgentRunnerHandler(BaseHTTPRequestHandler):
         return
 
     def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
-        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        body = _dumps_bytes(payload)
         self.send_response(status)
         self.send_header("Content-Type", "application/json")
         self.send_header("Content-Length", str(len(body)))
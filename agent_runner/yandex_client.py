@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import threading
 import time
 from typing import Any, Dict, Tuple
 
@@ -9,6 +10,20 @@ import httpx
 
 from agent_runner.llm_client import LLMClientError, parse_json_strict, validate_json_output
 
+# Keep-alive clients reused across completions, one per (base_url, timeout).
+# The runner is a separate process and does not share ``llm_policy.http_pool``.
+_CLIENTS: Dict[Tuple[str, float], httpx.Client] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+def _http_client(base_url: str, timeout_s: float) -> httpx.Client:
+    key = (base_url, float(timeout_s))
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(key)
+        if client is None:
+            client = _CLIENTS[key] = httpx.Client(timeout=timeout_s)
+        return client
+
 
 class YandexAIStudioClient:
     def __init__(
@@ -80,10 +95,9 @@ class YandexAIStudioClient:
             raise LLMClientError("invalid_output", "Не удалось извлечь content.") from exc
 
     def _post(self, url: str, headers: Dict[str, str], json_payload: Dict[str, Any]) -> httpx.Response:
-        with httpx.Client(timeout=self._timeout_s) as client:
-            response = client.post(url, headers=headers, json=json_payload)
-            response.raise_for_status()
-            return response
+        response = _http_client(self._base_url, self._timeout_s).post(url, headers=headers, json=json_payload)
+        response.raise_for_status()
+        return response
 
     @staticmethod
     def _repair_prompt(content: str, schema: Dict[str, Any]) -> str:
@@ -10,6 +10,7 @@ from urllib import request as urlrequest
 from uuid import uuid4
 
 from app.logging.llm_runner_log import append_llm_runner_log
+from app.serialization import dumps_bytes
 
 
 AGENT_ID = "shopping-list-llm-extractor"
@@ -58,7 +59,7 @@ def invoke_runner(
         "constraints": {},
     }
 
-    data = json.dumps(envelope, ensure_ascii=False).encode("utf-8")
+    data = dumps_bytes(envelope)
     headers = {"Content-Type": "application/json"}
     req = urlrequest.Request(f"{url}/a2a/v1/invoke", data=data, headers=headers)
     started = time.perf_counter()
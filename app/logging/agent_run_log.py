@@ -2,18 +2,15 @@
 
 from __future__ import annotations
 
-import json
 import os
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict
 
-
-DEFAULT_LOG_PATH = Path("logs/agent_run.jsonl")
+from app.logging.sink import append_jsonl
 
 
-def _ensure_parent(path: Path) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
+DEFAULT_LOG_PATH = Path("logs/agent_run.jsonl")
 
 
 def _enabled() -> bool:
@@ -29,10 +26,8 @@ def log_agent_run(event: Dict[str, Any]) -> None:
         return
     try:
         path = resolve_log_path()
-        _ensure_parent(path)
         record = dict(event)
         record.setdefault("timestamp", datetime.now(timezone.utc).isoformat())
-        with path.open("a", encoding="utf-8") as handle:
-            handle.write(f"{json.dumps(record, ensure_ascii=False)}\n")
+        append_jsonl(path, record)
     except Exception:
         return
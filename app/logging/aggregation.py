@@ -0,0 +1,316 @@
+"""Constant-memory building blocks for the offline log analyzers.
+
+- ``QuantileSketch``: DDSketch-style quantiles with bounded relative error.
+  It stays exact (plain sorted values) until ``exact_limit`` samples, so
+  small logs and tests see exactly the numbers the old sort-based
+  ``_percentile`` helpers produced. After that, values fold into
+  logarithmic buckets: at most ``max_buckets`` of them, whatever the log size.
+- ``DistinctCounter``: exact distinct count up to ``exact_limit`` keys, then
+  a HyperLogLog estimate (about 1% error) in fixed memory.
+- ``iter_jsonl_records``: one-pass generator over a log and its rotated
+  segments (see ``app/logging/segments.py``) yielding ``(record, ok)``.
+
+Sketches and distinct counters merge (``merge``) and round-trip through
+``to_dict`` / ``from_dict``, so partial results from shards or processes can
+be combined. Plain counts use ``collections.Counter``, which merges with
+``update``.
+
+Stdlib only, like the analyzers that import it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+from bisect import insort
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.logging.segments import iter_segment_records, log_segments
+
+DEFAULT_RELATIVE_ACCURACY = 0.01
+DEFAULT_EXACT_LIMIT = 4096
+DEFAULT_MAX_BUCKETS = 2048
+
+_HLL_PRECISION = 14
+_HLL_REGISTERS = 1 << _HLL_PRECISION
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch; exact below ``exact_limit`` samples."""
+
+    def __init__(
+        self,
+        relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY,
+        exact_limit: int = DEFAULT_EXACT_LIMIT,
+        max_buckets: int = DEFAULT_MAX_BUCKETS,
+    ) -> None:
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be in (0, 1)")
+        self.relative_accuracy = relative_accuracy
+        self.exact_limit = exact_limit
+        self.max_buckets = max_buckets
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._values: Optional[List[float]] = []
+        self._buckets: Dict[int, int] = {}
+        self._zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def exact(self) -> bool:
+        return self._values is not None
+
+    def add(self, value: float) -> None:
+        value = float(value)
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None or value < self.min else self.min
+        self.max = value if self.max is None or value > self.max else self.max
+        if self._values is not None:
+            insort(self._values, value)
+            if len(self._values) > self.exact_limit:
+                self._fold_values()
+            return
+        self._add_to_bucket(value, 1)
+
+    def add_many(self, values: Iterable[float]) -> None:
+        """Add a batch of values (e.g. a decoded column); same result as ``add`` per value."""
+        batch = [float(value) for value in values]
+        if not batch:
+            return
+        self.count += len(batch)
+        self.sum += sum(batch)
+        low, high = min(batch), max(batch)
+        self.min = low if self.min is None or low < self.min else self.min
+        self.max = high if self.max is None or high > self.max else self.max
+        if self._values is not None:
+            self._values.extend(batch)
+            self._values.sort()
+            if len(self._values) > self.exact_limit:
+                self._fold_values()
+            return
+        self._add_batch_to_buckets(batch)
+
+    def merge(self, other: "QuantileSketch") -> None:
+        if other.count == 0:
+            return
+        if other._gamma != self._gamma:
+            raise ValueError("cannot merge sketches with different relative accuracy")
+        self.count += other.count
+        self.sum += other.sum
+        self.min = other.min if self.min is None or (other.min is not None and other.min < self.min) else self.min
+        self.max = other.max if self.max is None or (other.max is not None and other.max > self.max) else self.max
+        if self._values is not None and other._values is not None:
+            for value in other._values:
+                insort(self._values, value)
+            if len(self._values) > self.exact_limit:
+                self._fold_values()
+            return
+        if self._values is not None:
+            self._fold_values()
+        if other._values is not None:
+            for value in other._values:
+                self._add_to_bucket(value, 1)
+        else:
+            self._zero_count += other._zero_count
+            for index, bucket_count in other._buckets.items():
+                self._buckets[index] = self._buckets.get(index, 0) + bucket_count
+            self._collapse()
+
+    def quantile(self, q: float, *, interpolate: bool = False) -> Optional[float]:
+        """Value at quantile ``q`` (0..1); None when empty.
+
+        Without ``interpolate`` this is the element at index ``int((n-1)*q)``
+        of the sorted values; with it, linear interpolation between the two
+        neighbouring ranks. Once the sketch has folded, values are accurate to
+        ``relative_accuracy``.
+        """
+        if self.count == 0:
+            return None
+        position = (self.count - 1) * q
+        lower_rank = int(position)
+        if not interpolate:
+            return self._value_at(lower_rank)
+        upper_rank = min(lower_rank + 1, self.count - 1)
+        lower = self._value_at(lower_rank)
+        upper = self._value_at(upper_rank)
+        return lower + (position - lower_rank) * (upper - lower)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "exact_limit": self.exact_limit,
+            "max_buckets": self.max_buckets,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min,
+            "max": self.max,
+            "values": self._values,
+            "zero_count": self._zero_count,
+            "buckets": {str(index): bucket_count for index, bucket_count in self._buckets.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, Any]) -> "QuantileSketch":
+        sketch = cls(payload["relative_accuracy"], payload["exact_limit"], payload["max_buckets"])
+        sketch.count = payload["count"]
+        sketch.sum = payload["sum"]
+        sketch.min = payload["min"]
+        sketch.max = payload["max"]
+        sketch._values = list(payload["values"]) if payload["values"] is not None else None
+        sketch._zero_count = payload["zero_count"]
+        sketch._buckets = {int(index): bucket_count for index, bucket_count in payload["buckets"].items()}
+        return sketch
+
+    def _value_at(self, rank: int) -> float:
+        if self._values is not None:
+            return self._values[rank]
+        if rank < self._zero_count:
+            return 0.0
+        seen = self._zero_count
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if seen > rank:
+                value = 2 * self._gamma**index / (self._gamma + 1)
+                return min(max(value, self.min), self.max)  # type: ignore[type-var]
+        return float(self.max)  # type: ignore[arg-type]
+
+    def _fold_values(self) -> None:
+        values, self._values = self._values or [], None
+        self._add_batch_to_buckets(values)
+
+    def _add_batch_to_buckets(self, values: List[float]) -> None:
+        log_gamma = self._log_gamma
+        positive = [value for value in values if value > 1e-9]
+        self._zero_count += len(values) - len(positive)
+        buckets = self._buckets
+        for index, bucket_count in Counter(math.ceil(math.log(value) / log_gamma) for value in positive).items():
+            buckets[index] = buckets.get(index, 0) + bucket_count
+        self._collapse()
+
+    def _add_to_bucket(self, value: float, weight: int) -> None:
+        # Latencies and counts are non-negative; anything below the smallest
+        # representable magnitude shares the zero bucket.
+        if value <= 1e-9:
+            self._zero_count += weight
+            return
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self._buckets[index] = self._buckets.get(index, 0) + weight
+        if len(self._buckets) > self.max_buckets:
+            self._collapse()
+
+    def _collapse(self) -> None:
+        """Merge the lowest buckets so the upper quantiles keep their accuracy."""
+        if len(self._buckets) <= self.max_buckets:
+            return
+        ordered = sorted(self._buckets)
+        excess = ordered[: len(ordered) - self.max_buckets + 1]
+        target = excess[-1]
+        self._buckets[target] = sum(self._buckets.pop(index) for index in excess[:-1]) + self._buckets[target]
+
+
+class DistinctCounter:
+    """Count distinct string keys; exact below ``exact_limit``, HyperLogLog above."""
+
+    def __init__(self, exact_limit: int = 100_000) -> None:
+        self.exact_limit = exact_limit
+        self._keys: Optional[set[str]] = set()
+        self._registers: Optional[bytearray] = None
+
+    def add(self, key: str) -> None:
+        if self._keys is not None:
+            self._keys.add(key)
+            if len(self._keys) > self.exact_limit:
+                self._fold_keys()
+            return
+        self._add_hll(key)
+
+    def __len__(self) -> int:
+        if self._keys is not None:
+            return len(self._keys)
+        return self._estimate()
+
+    def merge(self, other: "DistinctCounter") -> None:
+        if self._keys is not None and other._keys is not None:
+            self._keys |= other._keys
+            if len(self._keys) > self.exact_limit:
+                self._fold_keys()
+            return
+        if self._keys is not None:
+            self._fold_keys()
+        if other._keys is not None:
+            for key in other._keys:
+                self._add_hll(key)
+            return
+        assert self._registers is not None and other._registers is not None
+        for index, rank in enumerate(other._registers):
+            if rank > self._registers[index]:
+                self._registers[index] = rank
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "exact_limit": self.exact_limit,
+            "keys": sorted(self._keys) if self._keys is not None else None,
+            "registers": self._registers.hex() if self._registers is not None else None,
+        }
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, Any]) -> "DistinctCounter":
+        counter = cls(payload["exact_limit"])
+        if payload["keys"] is None:
+            counter._keys = None
+            counter._registers = bytearray.fromhex(payload["registers"])
+        else:
+            counter._keys = set(payload["keys"])
+        return counter
+
+    def _fold_keys(self) -> None:
+        keys, self._keys = self._keys or set(), None
+        self._registers = bytearray(_HLL_REGISTERS)
+        for key in keys:
+            self._add_hll(key)
+
+    def _add_hll(self, key: str) -> None:
+        assert self._registers is not None
+        hashed = int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+        index = hashed >> (64 - _HLL_PRECISION)
+        remainder = hashed & ((1 << (64 - _HLL_PRECISION)) - 1)
+        rank = (64 - _HLL_PRECISION) - remainder.bit_length() + 1
+        if rank > self._registers[index]:
+            self._registers[index] = rank
+
+    def _estimate(self) -> int:
+        assert self._registers is not None
+        m = _HLL_REGISTERS
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / sum(2.0 ** -rank for rank in self._registers)
+        zeros = self._registers.count(0)
+        if raw <= 2.5 * m and zeros:
+            return round(m * math.log(m / zeros))
+        return round(raw)
+
+
+def iter_jsonl_records(
+    path: Path,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    columns: Optional[Iterable[str]] = None,
+) -> Iterator[Tuple[Any, bool]]:
+    """Yield ``(record, True)`` per JSON line, ``({}, False)`` per unparsable line.
+
+    Reads rotated and compacted segments too; blank lines are skipped.
+    ``columns`` restricts columnar segments to the keys a caller needs.
+    Nothing is buffered beyond the current line (or column set).
+    """
+    for segment in log_segments(path, since, until):
+        yield from iter_segment_records(segment, columns)
+
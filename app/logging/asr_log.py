@@ -2,12 +2,13 @@
 
 from __future__ import annotations
 
-import json
 import os
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict
 
+from app.logging.sink import append_jsonl
+
 DEFAULT_LOG_PATH = Path("logs/asr_transcriptions.jsonl")
 ALLOWED_LOG_FIELDS = {
     "request_id",
@@ -22,10 +23,6 @@ ALLOWED_LOG_FIELDS = {
 }
 
 
-def _ensure_parent(path: Path) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-
-
 def is_asr_log_enabled() -> bool:
     return os.getenv("ASR_LOG_ENABLED", "true").lower() in {"1", "true", "yes"}
 
@@ -53,13 +50,11 @@ def append_asr_log(payload: Dict[str, Any]) -> Path | None:
         return None
 
     path = resolve_asr_log_path()
-    _ensure_parent(path)
     record = {
         key: value
         for key, value in payload.items()
         if key in ALLOWED_LOG_FIELDS
     }
     record.setdefault("timestamp", datetime.now(timezone.utc).isoformat())
-    with path.open("a", encoding="utf-8") as handle:
-        handle.write(f"{json.dumps(record, ensure_ascii=False)}\n")
+    append_jsonl(path, record)
     return path
@@ -0,0 +1,578 @@
+"""Typed, columnar storage for closed log segments (``.cols`` files).
+
+Offline analyses re-parse the same JSONL text over and over. A ``.cols`` file
+stores one segment column by column with a fixed schema per log type
+(``LOG_SCHEMAS``), so a reader decodes only the columns it asks for and
+never runs ``json.loads`` on a whole record:
+
+- ``int`` / ``float`` / ``timestamp`` columns are packed machine arrays
+  (timestamps as UTC epoch microseconds);
+- ``bool`` columns are one byte per value;
+- ``str`` and ``json`` columns are dictionary-encoded: each distinct value
+  is stored once and rows hold small integer codes, which suits enums such as
+  ``status``, ``error_type``, ``suggested_intent`` or ``model_meta.profile``.
+
+Every column also keeps one state byte per row (absent / null / value), and
+keys that are not in the schema, or whose value does not survive the typed
+round trip (an ``int`` column holding a string, a non-UTC timestamp), go to
+the ``_extra`` JSON column. ``iter_records`` therefore rebuilds records that
+compare equal to the originals.
+
+File layout: ``MAGIC``, a little-endian u32 header length, the JSON header
+(schema, row count, timestamp range, per-row-group column byte ranges), then
+one zlib-compressed block per column and row group of ``ROW_GROUP_ROWS``
+rows. ``read_row`` decodes only the blocks of the row group it needs. Readers
+trust the header, not ``LOG_SCHEMAS``, so files written under an older schema
+version (or format version 1, a single row group) stay readable. Stdlib only.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import struct
+import sys
+import zlib
+from array import array
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+MAGIC = b"VRCOLS1\n"
+FORMAT_VERSION = 2
+READABLE_VERSIONS = {1, 2}
+ROW_GROUP_ROWS = 8192
+COLUMNAR_SUFFIX = ".cols"
+EXTRA_COLUMN = "_extra"
+
+COLUMN_TYPES = {"int", "float", "bool", "str", "json", "timestamp"}
+
+# Per-row state byte.
+_ABSENT = 0
+_NULL = 1
+_VALUE = 2
+_INT_VALUE = 3  # ``float`` column holding a Python int (kept distinct so 5 stays 5)
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_HEADER_LENGTH = struct.Struct("<I")
+
+
+@dataclass(frozen=True)
+class LogSchema:
+    """Stable column layout of one log type; bump ``version`` on any change."""
+
+    name: str
+    version: int
+    columns: Tuple[Tuple[str, str], ...]
+
+
+def _schema(name: str, version: int, *columns: Tuple[str, str]) -> LogSchema:
+    for _column, kind in columns:
+        if kind not in COLUMN_TYPES:
+            raise ValueError(f"unknown column type {kind!r}")
+    return LogSchema(name, version, tuple(columns))
+
+
+_TRACE = (("timestamp", "timestamp"), ("trace_id", "str"), ("command_id", "str"))
+
+# Keyed by log file stem (``logs/<stem>.jsonl``).
+LOG_SCHEMAS: Dict[str, LogSchema] = {
+    schema.name: schema
+    for schema in (
+        _schema(
+            "decisions",
+            1,
+            ("created_at", "timestamp"),
+            ("decision_id", "str"),
+            ("command_id", "str"),
+            ("trace_id", "str"),
+            ("status", "str"),
+            ("action", "str"),
+            ("decision_outcome", "str"),
+            ("confidence", "float"),
+            ("payload", "json"),
+            ("explanation", "str"),
+            ("schema_version", "str"),
+            ("decision_version", "str"),
+        ),
+        _schema(
+            "pipeline_latency",
+            1,
+            *_TRACE,
+            ("total_ms", "float"),
+            ("steps", "json"),
+            ("llm_enabled", "bool"),
+        ),
+        _schema(
+            "fallback_metrics",
+            1,
+            *_TRACE,
+            ("intent", "str"),
+            ("decision_action", "str"),
+            ("llm_outcome", "str"),
+            ("fallback_reason", "str"),
+            ("deterministic_used", "bool"),
+            ("llm_latency_ms", "float"),
+            ("components", "json"),
+        ),
+        _schema(
+            "assist",
+            2,
+            *_TRACE,
+            ("step", "str"),
+            ("status", "str"),
+            ("accepted", "bool"),
+            ("error_type", "str"),
+            ("latency_ms", "int"),
+            ("entities_summary", "json"),
+            ("missing_fields_count", "int"),
+            ("clarify_used", "bool"),
+            ("assist_version", "str"),
+            ("agent_hint_status", "str"),
+            ("agent_hint_latency_ms", "int"),
+            ("agent_hint_items_count", "int"),
+            ("agent_hint_applied", "bool"),
+            ("agent_hint_candidates_count", "int"),
+            ("agent_hint_selected_agent_id", "str"),
+            ("agent_hint_selected_status", "str"),
+            ("agent_hint_selection_reason", "str"),
+            ("sample_weight", "float"),
+        ),
+        _schema(
+            "agent_run",
+            1,
+            *_TRACE,
+            ("agent_id", "str"),
+            ("capability_id", "str"),
+            ("mode", "str"),
+            ("status", "str"),
+            ("reason_code", "str"),
+            ("latency_ms", "int"),
+            ("runner_kind", "str"),
+            ("model_meta", "json"),
+            ("payload_summary", "json"),
+            ("privacy", "json"),
+        ),
+        _schema(
+            "shadow_agent_diff",
+            2,
+            *_TRACE,
+            ("agent_id", "str"),
+            ("capability_id", "str"),
+            ("status", "str"),
+            ("reason_code", "str"),
+            ("baseline_summary", "json"),
+            ("agent_summary", "json"),
+            ("diff_summary", "json"),
+            ("privacy", "json"),
+            ("sample_weight", "float"),
+        ),
+        _schema(
+            "shadow_router",
+            2,
+            *_TRACE,
+            ("router_version", "str"),
+            ("router_strategy", "str"),
+            ("status", "str"),
+            ("latency_ms", "int"),
+            ("error_type", "str"),
+            ("suggested_intent", "str"),
+            ("missing_fields", "json"),
+            ("clarify_question", "str"),
+            ("entities_summary", "json"),
+            ("confidence", "float"),
+            ("model_meta", "json"),
+            ("baseline_intent", "str"),
+            ("baseline_action", "str"),
+            ("baseline_job_type", "str"),
+            ("sample_weight", "float"),
+        ),
+        _schema(
+            "partial_trust_risk",
+            1,
+            *_TRACE,
+            ("corridor_intent", "str"),
+            ("sample_rate", "float"),
+            ("sampled", "bool"),
+            ("status", "str"),
+            ("reason_code", "str"),
+            ("latency_ms", "int"),
+            ("model_meta", "json"),
+            ("baseline_summary", "json"),
+            ("llm_summary", "json"),
+            ("diff_summary", "json"),
+        ),
+    )
+}
+
+# Logs without a dedicated schema keep their common fields typed, the rest in ``_extra``.
+GENERIC_SCHEMA = _schema("generic", 1, *_TRACE, ("status", "str"), ("error_type", "str"))
+
+
+def schema_for(log_name: str) -> LogSchema:
+    """Schema for a log file name or stem (``shadow_router.jsonl`` -> ``shadow_router``)."""
+    stem = log_name.split(".", 1)[0]
+    return LOG_SCHEMAS.get(stem, GENERIC_SCHEMA)
+
+
+def is_columnar(path: Path) -> bool:
+    return path.name.endswith(COLUMNAR_SUFFIX)
+
+
+# --------------------------------------------------------------------------- writing
+
+
+class _ColumnWriter:
+    def __init__(self, name: str, kind: str) -> None:
+        self.name = name
+        self.kind = kind
+        self.states = bytearray()
+        if kind == "float":
+            self.values: Any = array("d")
+        elif kind in {"int", "timestamp"}:
+            self.values = array("q")
+        elif kind == "bool":
+            self.values = bytearray()
+        else:
+            self.values = array("I")
+            self.dictionary: Dict[str, int] = {}
+
+    def append(self, present: bool, value: Any) -> bool:
+        """Store one row; False when ``value`` does not fit the column type."""
+        if not present:
+            self.states.append(_ABSENT)
+            return True
+        if value is None:
+            self.states.append(_NULL)
+            return True
+        encoded = _encode(self.kind, value)
+        if encoded is None:
+            self.states.append(_ABSENT)
+            return False
+        state, stored = encoded
+        if self.kind in {"str", "json"}:
+            code = self.dictionary.get(stored)
+            if code is None:
+                code = self.dictionary[stored] = len(self.dictionary)
+            stored = code
+        self.states.append(state)
+        self.values.append(stored)
+        return True
+
+    def block(self) -> Tuple[bytes, Dict[str, Any]]:
+        parts = [bytes(self.states)]
+        meta: Dict[str, Any] = {"name": self.name, "type": self.kind, "distinct": None}
+        if self.kind in {"str", "json"}:
+            dictionary = list(self.dictionary)
+            typecode = "B" if len(dictionary) <= 0xFF else "H" if len(dictionary) <= 0xFFFF else "I"
+            codes = array(typecode, self.values)
+            parts.append(json.dumps(dictionary, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+            parts.append(codes.tobytes())
+            meta["codes"] = typecode
+            meta["distinct"] = len(dictionary)
+        else:
+            parts.append(self.values.tobytes() if isinstance(self.values, array) else bytes(self.values))
+        meta["parts"] = [len(part) for part in parts]
+        return zlib.compress(b"".join(parts), 6), meta
+
+
+def _encode(kind: str, value: Any) -> Optional[Tuple[int, Any]]:
+    if kind == "int":
+        if isinstance(value, int) and not isinstance(value, bool) and -(2**63) <= value < 2**63:
+            return _VALUE, value
+        return None
+    if kind == "float":
+        if isinstance(value, bool):
+            return None
+        if isinstance(value, float):
+            return _VALUE, value
+        if isinstance(value, int) and float(value) == value and abs(value) < 2**53:
+            return _INT_VALUE, float(value)
+        return None
+    if kind == "bool":
+        return (_VALUE, int(value)) if isinstance(value, bool) else None
+    if kind == "str":
+        return (_VALUE, value) if isinstance(value, str) else None
+    if kind == "timestamp":
+        return _encode_timestamp(value)
+    text = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+    if json.loads(text) != value:
+        return None
+    return _VALUE, text
+
+
+def _encode_timestamp(value: Any) -> Optional[Tuple[int, int]]:
+    if not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None or parsed.utcoffset() != timedelta(0):
+        return None
+    micros = (parsed - _EPOCH) // timedelta(microseconds=1)
+    if _decode_timestamp(micros) != value:
+        return None
+    return _VALUE, micros
+
+
+def _parse_utc(value: Any) -> Optional[datetime]:
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    return parsed.replace(tzinfo=timezone.utc) if parsed.tzinfo is None else parsed
+
+
+def _decode_timestamp(micros: int) -> str:
+    return (_EPOCH + timedelta(microseconds=micros)).isoformat()
+
+
+def write_table(
+    path: Path,
+    records: Iterable[Mapping[str, Any]],
+    schema: LogSchema,
+    *,
+    source: Optional[str] = None,
+    row_group_rows: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Write ``records`` to ``path`` (atomically) and return the header."""
+    row_group_rows = row_group_rows or ROW_GROUP_ROWS
+    kinds = [*schema.columns, (EXTRA_COLUMN, "json")]
+    names = {name for name, _kind in schema.columns}
+    distinct: Dict[str, set] = {name: set() for name, kind in kinds if kind in {"str", "json"}}
+    blocks: List[bytes] = []
+    groups: List[Dict[str, Any]] = []
+    offset = 0
+
+    def flush(writers: List[_ColumnWriter], group_rows: int) -> None:
+        nonlocal offset
+        columns: List[Dict[str, Any]] = []
+        for writer in writers:
+            block, meta = writer.block()
+            if writer.name in distinct:
+                distinct[writer.name].update(writer.dictionary)
+            meta["offset"] = offset
+            meta["length"] = len(block)
+            offset += len(block)
+            blocks.append(block)
+            columns.append(meta)
+        groups.append({"rows": group_rows, "columns": columns})
+
+    writers = [_ColumnWriter(name, kind) for name, kind in kinds]
+    *_, extra = writers
+    rows = 0
+    group_rows = 0
+    first_ts: Optional[datetime] = None
+    last_ts: Optional[datetime] = None
+    for record in records:
+        if group_rows == row_group_rows:
+            flush(writers, group_rows)
+            writers = [_ColumnWriter(name, kind) for name, kind in kinds]
+            *_, extra = writers
+            group_rows = 0
+        rows += 1
+        group_rows += 1
+        leftovers = {key: value for key, value in record.items() if key not in names}
+        for writer in writers[:-1]:
+            present = writer.name in record
+            value = record.get(writer.name)
+            if not writer.append(present, value):
+                leftovers[writer.name] = value
+        extra.append(bool(leftovers), leftovers or None)
+        ts = _parse_utc(record.get("timestamp", record.get("created_at")))
+        if ts is not None:
+            first_ts = ts if first_ts is None or ts < first_ts else first_ts
+            last_ts = ts if last_ts is None or ts > last_ts else last_ts
+    if group_rows or not groups:
+        flush(writers, group_rows)
+
+    header = {
+        "format_version": FORMAT_VERSION,
+        "schema": schema.name,
+        "schema_version": schema.version,
+        "rows": rows,
+        "byteorder": sys.byteorder,
+        "first_ts": first_ts.isoformat() if first_ts else None,
+        "last_ts": last_ts.isoformat() if last_ts else None,
+        "source": source,
+        "row_group_rows": row_group_rows,
+        "columns": [
+            {"name": name, "type": kind, "distinct": len(distinct[name]) if name in distinct else None}
+            for name, kind in kinds
+        ],
+        "row_groups": groups,
+    }
+    header_bytes = json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with tmp.open("wb") as handle:
+        handle.write(MAGIC)
+        handle.write(_HEADER_LENGTH.pack(len(header_bytes)))
+        handle.write(header_bytes)
+        for block in blocks:
+            handle.write(block)
+    os.replace(tmp, path)
+    return header
+
+
+# --------------------------------------------------------------------------- reading
+
+
+def read_header(path: Path) -> Dict[str, Any]:
+    with path.open("rb") as handle:
+        return _read_header(handle)[0]
+
+
+def _read_header(handle) -> Tuple[Dict[str, Any], int]:
+    if handle.read(len(MAGIC)) != MAGIC:
+        raise ValueError(f"{getattr(handle, 'name', 'file')} is not a columnar log file")
+    (length,) = _HEADER_LENGTH.unpack(handle.read(_HEADER_LENGTH.size))
+    header = json.loads(handle.read(length).decode("utf-8"))
+    if header.get("format_version") not in READABLE_VERSIONS:
+        raise ValueError(f"unsupported columnar format version {header.get('format_version')}")
+    return header, len(MAGIC) + _HEADER_LENGTH.size + length
+
+
+def row_groups(header: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """``[{"rows": n, "columns": [block meta, ...]}, ...]`` (version 1: one group)."""
+    if "row_groups" in header:
+        return header["row_groups"]
+    return [{"rows": header["rows"], "columns": header["columns"]}]
+
+
+def _decode_column(meta: Dict[str, Any], raw: bytes, rows: int, byteorder: str) -> List[Any]:
+    data = zlib.decompress(raw)
+    sizes = meta["parts"]
+    states = data[: sizes[0]]
+    payload = data[sizes[0] :]
+    kind = meta["type"]
+    if kind in {"str", "json"}:
+        dictionary = json.loads(payload[: sizes[1]].decode("utf-8"))
+        if kind == "json":
+            dictionary = [json.loads(item) for item in dictionary]
+        values: Sequence[Any] = _array(meta["codes"], payload[sizes[1] :], byteorder)
+        lookup = dictionary.__getitem__
+    elif kind == "bool":
+        values = payload
+        lookup = bool
+    else:
+        values = _array("d" if kind == "float" else "q", payload, byteorder)
+        lookup = _decode_timestamp if kind == "timestamp" else None
+
+    if states.count(_ABSENT) == rows:
+        return [_MISSING] * rows
+    decoded = list(values) if lookup is None else list(map(lookup, values))
+    if states.count(_VALUE) == rows:
+        return decoded
+    # Mixed states: hand out decoded values in order to the rows that hold one.
+    pending = iter(decoded)
+    column = [next(pending) if state >= _VALUE else _MISSING if state == _ABSENT else None for state in states]
+    if _INT_VALUE in states:
+        column = [int(value) if state == _INT_VALUE else value for value, state in zip(column, states)]
+    return column
+
+
+def _array(typecode: str, payload: bytes, byteorder: str) -> array:
+    values = array(typecode)
+    values.frombytes(payload)
+    if byteorder != sys.byteorder:
+        values.byteswap()
+    return values
+
+
+class _Missing:
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "<absent>"
+
+
+_MISSING: Any = _Missing()
+
+
+def _load_group(
+    handle, data_start: int, header: Dict[str, Any], group: Dict[str, Any], wanted: Optional[Iterable[str]]
+) -> Dict[str, List[Any]]:
+    metas = {meta["name"]: meta for meta in group["columns"]}
+    names = list(metas) if wanted is None else [name for name in wanted if name in metas]
+    if EXTRA_COLUMN in metas and EXTRA_COLUMN not in names:
+        names.append(EXTRA_COLUMN)
+    columns: Dict[str, List[Any]] = {}
+    for name in names:
+        meta = metas[name]
+        handle.seek(data_start + meta["offset"])
+        columns[name] = _decode_column(meta, handle.read(meta["length"]), group["rows"], header["byteorder"])
+    return columns
+
+
+def _load_columns(path: Path, wanted: Optional[Iterable[str]]) -> Tuple[Dict[str, Any], Dict[str, List[Any]]]:
+    with path.open("rb") as handle:
+        header, data_start = _read_header(handle)
+        columns: Dict[str, List[Any]] = {}
+        for group in row_groups(header):
+            for name, values in _load_group(handle, data_start, header, group, wanted).items():
+                columns.setdefault(name, []).extend(values)
+    return header, columns
+
+
+def read_columns(path: Path, columns: Optional[Iterable[str]] = None) -> Dict[str, List[Any]]:
+    """Decode ``columns`` (default: all) into lists of ``rows`` values.
+
+    Absent keys and nulls both read as None; values kept in ``_extra`` are
+    folded back into their column. Decoded ``json`` values are shared between
+    rows with equal values: treat them as read-only.
+    """
+    wanted = list(columns) if columns is not None else None
+    header, decoded = _load_columns(path, wanted)
+    extras = decoded.pop(EXTRA_COLUMN, None)
+    result: Dict[str, List[Any]] = {}
+    for name in wanted if wanted is not None else list(decoded):
+        values = decoded.get(name) or [_MISSING] * header["rows"]
+        if extras is not None:
+            values = [
+                extra[name] if value is _MISSING and isinstance(extra, dict) and name in extra else value
+                for value, extra in zip(values, extras)
+            ]
+        result[name] = [None if value is _MISSING else value for value in values]
+    return result
+
+
+def iter_records(path: Path, columns: Optional[Iterable[str]] = None) -> Iterator[Dict[str, Any]]:
+    """Rebuild the records of ``path``; with ``columns`` only those keys are filled.
+
+    Records compare equal to the JSON records they were written from (key
+    order follows the schema). ``json`` values are shared between rows:
+    treat them as read-only.
+    """
+    wanted = list(columns) if columns is not None else None
+    header, decoded = _load_columns(path, wanted)
+    extras = decoded.pop(EXTRA_COLUMN, [_MISSING] * header["rows"])
+    names = list(decoded)
+    for values, extra in zip(zip(*(decoded[name] for name in names)), extras):
+        yield _record(names, values, extra, wanted)
+
+
+def read_row(path: Path, group: int, row: int) -> Optional[Dict[str, Any]]:
+    """Record ``row`` of row group ``group``, decoding only that group's blocks."""
+    with path.open("rb") as handle:
+        header, data_start = _read_header(handle)
+        groups = row_groups(header)
+        if not 0 <= group < len(groups) or not 0 <= row < groups[group]["rows"]:
+            return None
+        decoded = _load_group(handle, data_start, header, groups[group], None)
+    extra = decoded.pop(EXTRA_COLUMN, [_MISSING] * groups[group]["rows"])[row]
+    names = list(decoded)
+    return _record(names, [decoded[name][row] for name in names], extra, None)
+
+
+def _record(names: List[str], values: Iterable[Any], extra: Any, wanted: Optional[List[str]]) -> Dict[str, Any]:
+    record = {name: value for name, value in zip(names, values) if value is not _MISSING}
+    if extra is not _MISSING and extra:
+        if wanted is None:
+            record.update(extra)
+        else:
+            record.update((key, value) for key, value in extra.items() if key in wanted)
+    return record
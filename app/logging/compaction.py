@@ -0,0 +1,118 @@
+"""Compact closed log segments into the columnar format.
+
+``compact_log`` converts every closed segment of a log (plain, gzip or zstd
+JSONL, see ``app/logging/segments.py``) into ``<stem>.<stamp>.cols`` using
+the log type's schema (``app/logging/columnar.py``), verifies the row count,
+swaps the manifest entry and removes the JSONL source. The active file is
+never touched. Segments with unparsable lines are left as JSONL so that no
+line is dropped; readers already handle both formats side by side.
+
+Run it from cron or by hand: ``python scripts/compact_logs.py``.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from app.logging.columnar import COLUMNAR_SUFFIX, LogSchema, is_columnar, read_header, schema_for, write_table
+from app.logging.rotation import append_manifest_entry, notify_segment_closed
+from app.logging.segments import iter_segment_lines, log_segments
+
+# Logs with a dedicated schema under their default names.
+DEFAULT_LOGS = (
+    "decisions.jsonl",
+    "pipeline_latency.jsonl",
+    "fallback_metrics.jsonl",
+    "assist.jsonl",
+    "agent_run.jsonl",
+    "shadow_agent_diff.jsonl",
+    "shadow_router.jsonl",
+    "partial_trust_risk.jsonl",
+)
+
+
+class _UnparsableSegment(Exception):
+    pass
+
+
+@dataclass
+class CompactionResult:
+    compacted: List[Path] = field(default_factory=list)
+    skipped: List[Path] = field(default_factory=list)
+    source_bytes: int = 0
+    columnar_bytes: int = 0
+
+
+def compact_log(
+    path: Path,
+    *,
+    schema: Optional[LogSchema] = None,
+    keep_source: bool = False,
+) -> CompactionResult:
+    """Compact the closed segments of ``path``; see the module docstring."""
+    schema = schema or schema_for(path.name)
+    result = CompactionResult()
+    for segment in log_segments(path):
+        if segment == path or is_columnar(segment):
+            continue
+        target = _columnar_path(path, segment)
+        try:
+            header = write_table(target, _records(segment), schema, source=segment.name)
+        except _UnparsableSegment:
+            result.skipped.append(segment)
+            continue
+        if read_header(target)["rows"] != header["rows"]:  # pragma: no cover - defensive
+            target.unlink()
+            result.skipped.append(segment)
+            continue
+        source_bytes = segment.stat().st_size
+        columnar_bytes = target.stat().st_size
+        append_manifest_entry(
+            path.parent,
+            {
+                "log": path.name,
+                "file": target.name,
+                "first_ts": header["first_ts"],
+                "last_ts": header["last_ts"],
+                "records": header["rows"],
+                "bytes": columnar_bytes,
+                "compression": "zlib",
+                "format": "columnar",
+                "schema": schema.name,
+                "schema_version": schema.version,
+                "source": segment.name,
+                "compacted_at": datetime.now(timezone.utc).isoformat(),
+            },
+            replaces=segment.name,
+        )
+        notify_segment_closed(path, target, segment.name)
+        if not keep_source:
+            segment.unlink()
+        result.compacted.append(target)
+        result.source_bytes += source_bytes
+        result.columnar_bytes += columnar_bytes
+    return result
+
+
+def _columnar_path(path: Path, segment: Path) -> Path:
+    stem = path.name[: -len(".jsonl")] if path.name.endswith(".jsonl") else path.stem
+    stamp = segment.name[len(stem) + 1 :].split(".", 1)[0]
+    return path.with_name(f"{stem}.{stamp}{COLUMNAR_SUFFIX}")
+
+
+def _records(segment: Path) -> Iterator[Dict[str, Any]]:
+    for line in iter_segment_lines(segment):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            raise _UnparsableSegment(segment) from None
+        if not isinstance(record, dict):
+            raise _UnparsableSegment(segment)
+        yield record
@@ -0,0 +1,592 @@
+"""Sidecar index of the decision log: trace_id / command_id -> record location.
+
+Two files sit next to ``decisions.jsonl``:
+
+- ``decisions.jsonl.index``: sorted, fixed-width binary entries (``MAGIC``,
+  u32 header length, JSON header with the segment table, then
+  ``_ENTRY`` records). A lookup binary-searches it with O(log n) small reads;
+- ``decisions.jsonl.index-journal``: entries for the active file, appended
+  by the sink's write listener through one open handle as decisions are
+  written. The journal is also kept in memory as a hash -> locations map
+  (loaded once per process), so lookups never re-read it. Once it holds ``JOURNAL_FOLD_ENTRIES`` entries a
+  background thread merges it into the index, off the sink's I/O lock.
+
+Each entry stores the key hash (blake2b of ``field:value``), a segment,
+and a location. Fetching a record is then one read:
+
+- plain JSONL (active file, uncompressed segments): byte offset and length
+  of the line;
+- gzip segments: offset and length of the gzip member holding the line plus
+  the line's offset inside it (rotation writes small line-aligned members);
+- zstd segments: uncompressed offset (the stream is decompressed up to it);
+- columnar segments: row group and row inside it (only that group's blocks
+  are decoded).
+
+When rotation renames the active file (under the sink's I/O lock), the
+journal is moved aside in memory as the locations of that uncompressed
+segment and a fresh journal starts. Once rotation has compressed the segment,
+or compaction turns a segment into ``.cols``, ``register_segment_listener``
+hooks re-scan the new segment and swap its entries in. ``rebuild_decision_index`` recreates both files
+from the segments at any time. Every hit is checked against the record it
+points to, so a stale index can miss a decision but never return a wrong one.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import heapq
+import json
+import os
+import logging
+import struct
+import threading
+import zlib
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, IO, Iterable, Iterator, List, Optional, Tuple
+
+from app import serialization
+from app.logging.columnar import is_columnar, iter_records, read_header, read_row, row_groups
+from app.logging.rotation import register_segment_listener
+from app.logging.segments import log_segments
+from app.logging.sink import add_write_listener
+
+_LOGGER = logging.getLogger(__name__)
+
+MAGIC = b"VRIDX1\n"
+INDEX_SUFFIX = ".index"
+JOURNAL_SUFFIX = ".index-journal"
+INDEXED_FIELDS = ("trace_id", "command_id")
+JOURNAL_FOLD_ENTRIES = 65536
+
+KIND_PLAIN = 0
+KIND_GZIP = 1
+KIND_STREAM = 2
+KIND_COLUMNAR = 3
+
+# key hash, kind, segment id, offset (columnar: row group), length, offset inside a
+# gzip member (columnar: row inside the group)
+_ENTRY = struct.Struct(">16sBIQII")
+_HEADER_LEN = struct.Struct(">I")
+_READ_CHUNK = 1 << 20
+
+# (key, kind, segment name, offset, length, inner)
+Entry = Tuple[bytes, int, str, int, int, int]
+# key hash -> [(offset, length), ...] in the active file
+Journal = Dict[bytes, List[Tuple[int, int]]]
+
+
+def decision_index_enabled() -> bool:
+    return os.getenv("DECISION_LOG_INDEX_ENABLED", "true").strip().lower() in {"1", "true", "yes"}
+
+
+def index_path(log_path: Path) -> Path:
+    return log_path.with_name(log_path.name + INDEX_SUFFIX)
+
+
+def journal_path(log_path: Path) -> Path:
+    return log_path.with_name(log_path.name + JOURNAL_SUFFIX)
+
+
+def key_hash(field_name: str, value: str) -> bytes:
+    return hashlib.blake2b(f"{field_name}:{value}".encode("utf-8"), digest_size=16).digest()
+
+
+class DecisionIndex:
+    """Index of one decision log; maintained by sink and rotation callbacks."""
+
+    def __init__(self, log_path: Path) -> None:
+        self.log_path = log_path
+        self._lock = threading.Lock()  # journal state
+        self._merge_lock = threading.Lock()  # index file rewrites
+        self._journal: Optional[Journal] = None
+        self._journal_entries = 0
+        self._folding: Journal = {}
+        self._fold_thread: Optional[threading.Thread] = None
+        self._journal_handle: Optional[IO[bytes]] = None
+        # renamed active files not yet scanned into the index: segment name -> journal
+        self._closing: Dict[str, Journal] = {}
+        # index entries for the active file predate its last rename
+        self._active_stale = False
+
+    # -- maintenance -------------------------------------------------------
+
+    def on_write(self, _path: Path, offset: int, data: str) -> None:
+        located = []
+        position = offset
+        for line in data.encode("utf-8").splitlines(keepends=True):
+            for key in _line_keys(line):
+                located.append((key, position, len(line)))
+            position += len(line)
+        if not located:
+            return
+        with self._lock:
+            journal = self._load_journal()
+            if self._journal_handle is None:
+                self._journal_handle = journal_path(self.log_path).open("ab")
+            self._journal_handle.write(
+                "".join(f"{key.hex()} {pos} {length}\n" for key, pos, length in located).encode("ascii")
+            )
+            self._journal_handle.flush()
+            for key, pos, length in located:
+                journal.setdefault(key, []).append((pos, length))
+            self._journal_entries += len(located)
+            if self._journal_entries >= JOURNAL_FOLD_ENTRIES and self._fold_thread is None:
+                self._fold_thread = threading.Thread(
+                    target=self._fold_journal, name="decision-index-fold", daemon=True
+                )
+                self._fold_thread.start()
+
+    def on_segment(self, segment: Path, replaces: str) -> None:
+        if replaces == self.log_path.name:
+            self._on_rotated(segment)
+            return
+        entries = sorted(scan_segment(segment), key=_sort_key)
+        with self._merge_lock:
+            drop = {replaces, segment.name}
+            stale = self._take_active_stale()
+            if stale:
+                drop.add(self.log_path.name)
+            try:
+                _merge_into_index(index_path(self.log_path), entries, drop=drop)
+            except Exception:
+                self._active_stale = self._active_stale or stale
+                raise
+            with self._lock:
+                self._closing.pop(replaces, None)
+
+    def rebuild(self) -> int:
+        """Re-scan every segment of the log; returns the number of entries."""
+        self._take_active_stale()
+        active_size = _file_size(self.log_path)
+        entries: List[Entry] = []
+        for segment in log_segments(self.log_path):
+            limit = active_size if segment == self.log_path else None
+            entries.extend(scan_segment(segment, limit=limit))
+        entries.sort(key=_sort_key)
+        with self._merge_lock:
+            _write_index(index_path(self.log_path), entries)
+            with self._lock:
+                # Keep journal entries for writes that landed while scanning.
+                later: Journal = {}
+                for key, locations in self._load_journal().items():
+                    kept = [location for location in locations if location[0] >= active_size]
+                    if kept:
+                        later[key] = kept
+                self._close_journal_handle()
+                _rewrite_journal(journal_path(self.log_path), self._journal_list(later))
+                self._journal = later
+                self._journal_entries = sum(len(locations) for locations in later.values())
+        return len(entries)
+
+    # -- lookup ------------------------------------------------------------
+
+    def find(self, field_name: str, value: str) -> List[Dict[str, Any]]:
+        key = key_hash(field_name, value)
+        # Memory first: a fold finishing in between moves entries into the
+        # index file, which is searched afterwards.
+        with self._lock:
+            locations = self._load_journal().get(key, []) + self._folding.get(key, [])
+            closing = [(name, journal[key]) for name, journal in self._closing.items() if key in journal]
+        candidates = _search_index(index_path(self.log_path), key)
+        candidates.extend(
+            (key, KIND_PLAIN, name, offset, length, 0) for name, found in closing for offset, length in found
+        )
+        candidates.extend((key, KIND_PLAIN, self.log_path.name, offset, length, 0) for offset, length in locations)
+        records: List[Dict[str, Any]] = []
+        seen = set()
+        for entry in candidates:
+            location = entry[1:]
+            if location in seen:
+                continue
+            seen.add(location)
+            record = _fetch(self.log_path.parent / entry[2], entry)
+            if isinstance(record, dict) and record.get(field_name) == value:
+                records.append(record)
+        return records
+
+    # -- internals ---------------------------------------------------------
+
+    def _on_rotated(self, segment: Path) -> None:
+        """The active file was renamed to ``segment``; runs under the sink's I/O lock."""
+        with self._lock:
+            closing = self._load_journal()
+            for key, locations in self._folding.items():
+                closing.setdefault(key, []).extend(locations)
+            self._closing[segment.name] = closing
+            self._journal = {}
+            self._journal_entries = 0
+            self._active_stale = True
+            self._close_journal_handle()
+            _truncate(journal_path(self.log_path))
+
+    def _take_active_stale(self) -> bool:
+        with self._lock:
+            stale, self._active_stale = self._active_stale, False
+            return stale
+
+    def _fold_journal(self) -> None:
+        """Merge the journal into the index (fold thread); new writes go to a fresh journal."""
+        folding: Journal = {}
+        stale = False
+        try:
+            with self._merge_lock:
+                with self._lock:
+                    folding = self._folding = self._load_journal()
+                    self._journal = {}
+                    self._journal_entries = 0
+                    stale, self._active_stale = self._active_stale, False
+                entries = sorted(self._journal_list(folding), key=_sort_key)
+                drop = {self.log_path.name} if stale else set()
+                _merge_into_index(index_path(self.log_path), entries, drop=drop)
+                with self._lock:
+                    self._folding = {}
+                    self._close_journal_handle()
+                    _rewrite_journal(journal_path(self.log_path), self._journal_list(self._journal or {}))
+        except Exception:
+            _LOGGER.warning("decision index fold failed for %s", self.log_path, exc_info=True)
+            with self._lock:
+                self._active_stale = self._active_stale or stale
+                journal = self._load_journal()
+                for key, locations in folding.items():
+                    journal.setdefault(key, []).extend(locations)
+                self._journal_entries += sum(len(locations) for locations in folding.values())
+                self._folding = {}
+        finally:
+            with self._lock:
+                self._fold_thread = None
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_journal_handle()
+
+    def _close_journal_handle(self) -> None:
+        """Drop the append handle before the journal file is replaced (caller holds ``_lock``)."""
+        if self._journal_handle is not None:
+            self._journal_handle.close()
+            self._journal_handle = None
+
+    def _load_journal(self) -> Journal:
+        """The in-memory journal, read from disk on first use (caller holds ``_lock``)."""
+        if self._journal is not None:
+            return self._journal
+        journal: Journal = {}
+        count = 0
+        try:
+            handle = journal_path(self.log_path).open("r", encoding="utf-8")
+        except OSError:
+            handle = None
+        if handle is not None:
+            with handle:
+                for line in handle:
+                    parts = line.split()
+                    if len(parts) != 3:
+                        continue
+                    journal.setdefault(bytes.fromhex(parts[0]), []).append((int(parts[1]), int(parts[2])))
+                    count += 1
+        self._journal = journal
+        self._journal_entries = count
+        return journal
+
+    def _journal_list(self, journal: Journal) -> List[Entry]:
+        name = self.log_path.name
+        return [
+            (key, KIND_PLAIN, name, offset, length, 0)
+            for key, locations in journal.items()
+            for offset, length in locations
+        ]
+
+
+_INDEXES: Dict[Path, DecisionIndex] = {}
+_INDEXES_LOCK = threading.Lock()
+
+
+def get_decision_index(log_path: Path) -> DecisionIndex:
+    with _INDEXES_LOCK:
+        index = _INDEXES.get(log_path)
+        if index is None:
+            index = _INDEXES[log_path] = DecisionIndex(log_path)
+        return index
+
+
+def watch_decision_log(log_path: Path) -> None:
+    """Keep the index of ``log_path`` current as the sink writes to it."""
+    if log_path in _INDEXES:
+        return
+    index = get_decision_index(log_path)
+    add_write_listener(log_path, index.on_write)
+
+
+def find_decisions(
+    log_path: Path,
+    *,
+    trace_id: Optional[str] = None,
+    command_id: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Decision records with the given ``trace_id`` and/or ``command_id``."""
+    index = get_decision_index(log_path)
+    if trace_id is not None:
+        records = index.find("trace_id", trace_id)
+        if command_id is not None:
+            records = [record for record in records if record.get("command_id") == command_id]
+        return records
+    if command_id is not None:
+        return index.find("command_id", command_id)
+    raise ValueError("trace_id or command_id is required")
+
+
+def rebuild_decision_index(log_path: Path) -> int:
+    return get_decision_index(log_path).rebuild()
+
+
+def scan_segment(segment: Path, limit: Optional[int] = None) -> Iterator[Entry]:
+    """Index entries for every record of one segment (``limit``: bytes of a plain file)."""
+    name = segment.name
+    if is_columnar(segment):
+        positions = (
+            (group, row)
+            for group, meta in enumerate(row_groups(read_header(segment)))
+            for row in range(meta["rows"])
+        )
+        for (group, row), record in zip(positions, iter_records(segment, INDEXED_FIELDS)):
+            for key in _record_keys(record):
+                yield key, KIND_COLUMNAR, name, group, 0, row
+        return
+    if name.endswith(".gz"):
+        for member_offset, member_length, lines in _gzip_members(segment):
+            for inner, line in lines:
+                for key in _line_keys(line):
+                    yield key, KIND_GZIP, name, member_offset, member_length, inner
+        return
+    kind = KIND_STREAM if name.endswith(".zst") else KIND_PLAIN
+    with _open_binary(segment) as handle:
+        position = 0
+        for line in handle:
+            if limit is not None and position + len(line) > limit:
+                return
+            for key in _line_keys(line):
+                yield key, kind, name, position, len(line), 0
+            position += len(line)
+
+
+def _on_segment_closed(log_path: Path, segment: Path, replaces: str) -> None:
+    if log_path in _INDEXES or index_path(log_path).exists():
+        get_decision_index(log_path).on_segment(segment, replaces)
+
+
+register_segment_listener(_on_segment_closed)
+
+
+def _line_keys(line: bytes) -> List[bytes]:
+    line = line.strip()
+    if not line:
+        return []
+    try:
+        record = serialization.loads(line)
+    except ValueError:
+        return []
+    return _record_keys(record) if isinstance(record, dict) else []
+
+
+def _record_keys(record: Dict[str, Any]) -> List[bytes]:
+    return [
+        key_hash(field_name, value)
+        for field_name in INDEXED_FIELDS
+        if isinstance(value := record.get(field_name), str) and value
+    ]
+
+
+def _sort_key(entry: Entry) -> Tuple[bytes, str, int]:
+    return entry[0], entry[2], entry[3]
+
+
+def _gzip_members(path: Path) -> Iterator[Tuple[int, int, List[Tuple[int, bytes]]]]:
+    """``(offset, length, [(inner offset, line), ...])`` per gzip member of ``path``."""
+    with path.open("rb") as handle:
+        pending = b""
+        offset = 0
+        while True:
+            data = pending or handle.read(_READ_CHUNK)
+            if not data:
+                return
+            decompressor = zlib.decompressobj(wbits=31)
+            consumed = 0
+            buffer = b""
+            lines: List[Tuple[int, bytes]] = []
+            inner = 0
+            while True:
+                buffer += decompressor.decompress(data)
+                *complete, buffer = buffer.split(b"\n")
+                for line in complete:
+                    lines.append((inner, line + b"\n"))
+                    inner += len(line) + 1
+                if decompressor.eof:
+                    consumed += len(data) - len(decompressor.unused_data)
+                    pending = decompressor.unused_data
+                    break
+                consumed += len(data)
+                data = handle.read(_READ_CHUNK)
+                if not data:
+                    pending = b""
+                    break
+            if buffer:
+                lines.append((inner, buffer))
+            yield offset, consumed, lines
+            offset += consumed
+            if not decompressor.eof:
+                return
+
+
+def _fetch(segment: Path, entry: Entry) -> Any:
+    _key, kind, _name, offset, length, inner = entry
+    try:
+        if kind == KIND_COLUMNAR:
+            return read_row(segment, offset, inner)
+        if kind == KIND_STREAM:
+            with _open_binary(segment) as handle:
+                _skip(handle, offset)
+                line = handle.readline()
+        else:
+            with segment.open("rb") as handle:
+                handle.seek(offset)
+                block = handle.read(length)
+            if kind == KIND_GZIP:
+                block = zlib.decompressobj(wbits=31).decompress(block)
+                end = block.find(b"\n", inner)
+                line = block[inner:] if end < 0 else block[inner : end + 1]
+            else:
+                line = block
+        return serialization.loads(line)
+    except (OSError, ValueError, zlib.error):
+        return None
+
+
+def _skip(handle: IO[bytes], count: int) -> None:
+    while count > 0:
+        chunk = handle.read(min(count, _READ_CHUNK))
+        if not chunk:
+            return
+        count -= len(chunk)
+
+
+def _open_binary(path: Path) -> IO[bytes]:
+    if path.name.endswith(".zst"):
+        import zstandard  # optional; only needed when zstd segments exist
+
+        return zstandard.ZstdDecompressor().stream_reader(path.open("rb"), closefd=True)
+    return path.open("rb")
+
+
+# -- index file --------------------------------------------------------------
+
+
+def _read_index_header(handle: IO[bytes]) -> Tuple[List[str], int]:
+    if handle.read(len(MAGIC)) != MAGIC:
+        raise ValueError("not a decision index")
+    (header_len,) = _HEADER_LEN.unpack(handle.read(_HEADER_LEN.size))
+    header = json.loads(handle.read(header_len))
+    return list(header["segments"]), len(MAGIC) + _HEADER_LEN.size + header_len
+
+
+def _search_index(path: Path, key: bytes) -> List[Entry]:
+    try:
+        handle = path.open("rb")
+    except OSError:
+        return []
+    with handle:
+        try:
+            segments, data_start = _read_index_header(handle)
+        except (ValueError, KeyError, struct.error):
+            return []
+        count = (os.fstat(handle.fileno()).st_size - data_start) // _ENTRY.size
+        low, high = 0, count
+        while low < high:
+            middle = (low + high) // 2
+            handle.seek(data_start + middle * _ENTRY.size)
+            if handle.read(16) < key:
+                low = middle + 1
+            else:
+                high = middle
+        matches: List[Entry] = []
+        handle.seek(data_start + low * _ENTRY.size)
+        while low < count:
+            entry_key, kind, segment_id, offset, length, inner = _ENTRY.unpack(handle.read(_ENTRY.size))
+            if entry_key != key:
+                break
+            matches.append((entry_key, kind, segments[segment_id], offset, length, inner))
+            low += 1
+        return matches
+
+
+def _iter_index(path: Path) -> Iterator[Entry]:
+    try:
+        handle = path.open("rb")
+    except OSError:
+        return
+    with handle:
+        try:
+            segments, _data_start = _read_index_header(handle)
+        except (ValueError, KeyError, struct.error):
+            return
+        while True:
+            chunk = handle.read(_ENTRY.size * 4096)
+            if not chunk:
+                return
+            for entry_key, kind, segment_id, offset, length, inner in _ENTRY.iter_unpack(chunk):
+                yield entry_key, kind, segments[segment_id], offset, length, inner
+
+
+def _merge_into_index(path: Path, entries: List[Entry], drop: set) -> None:
+    kept = (entry for entry in _iter_index(path) if entry[2] not in drop)
+    _write_index(path, heapq.merge(kept, entries, key=_sort_key))
+
+
+def _write_index(path: Path, entries: Iterable[Entry]) -> None:
+    """Write sorted ``entries`` atomically; the segment table is built on the way."""
+    body = path.with_name(f".{path.name}.{os.getpid()}.body")
+    segment_ids: Dict[str, int] = {}
+    with body.open("wb") as handle:
+        batch = []
+        for entry_key, kind, segment, offset, length, inner in entries:
+            segment_id = segment_ids.setdefault(segment, len(segment_ids))
+            batch.append(_ENTRY.pack(entry_key, kind, segment_id, offset, length, inner))
+            if len(batch) >= 4096:
+                handle.write(b"".join(batch))
+                batch.clear()
+        handle.write(b"".join(batch))
+    header = json.dumps(
+        {"log": path.name[: -len(INDEX_SUFFIX)], "segments": list(segment_ids), "built_at": _now()},
+        ensure_ascii=False,
+    ).encode("utf-8")
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with tmp.open("wb") as handle, body.open("rb") as source:
+        handle.write(MAGIC + _HEADER_LEN.pack(len(header)) + header)
+        while chunk := source.read(_READ_CHUNK):
+            handle.write(chunk)
+    body.unlink()
+    os.replace(tmp, path)
+
+
+def _rewrite_journal(path: Path, entries: List[Entry]) -> None:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text("".join(f"{entry[0].hex()} {entry[3]} {entry[4]}\n" for entry in entries), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _truncate(path: Path) -> None:
+    try:
+        with path.open("w", encoding="utf-8"):
+            pass
+    except OSError:
+        return
+
+
+def _file_size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except OSError:
+        return 0
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
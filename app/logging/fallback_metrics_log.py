@@ -2,18 +2,15 @@
 
 from __future__ import annotations
 
-import json
 import os
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict
 
-
-DEFAULT_LOG_PATH = Path("logs/fallback_metrics.jsonl")
+from app.logging.sink import append_jsonl
 
 
-def _ensure_parent(path: Path) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
+DEFAULT_LOG_PATH = Path("logs/fallback_metrics.jsonl")
 
 
 def is_fallback_metrics_log_enabled() -> bool:
@@ -33,9 +30,7 @@ def resolve_log_path() -> Path:
 def append_fallback_metrics_log(payload: Dict[str, Any]) -> Path:
     # NO RAW USER OR LLM TEXT — PRIVACY GUARANTEE.
     path = resolve_log_path()
-    _ensure_parent(path)
     record = dict(payload)
     record.setdefault("timestamp", datetime.now(timezone.utc).isoformat())
-    with path.open("a", encoding="utf-8") as handle:
-        handle.write(f"{json.dumps(record, ensure_ascii=False)}\n")
+    append_jsonl(path, record)
     return path
@@ -2,20 +2,22 @@
 
 from __future__ import annotations
 
-import json
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict
 
+from app.logging.sampling import should_log
+from app.logging.sink import append_jsonl
+
 
 DEFAULT_LOG_PATH = Path("logs/llm_runner.jsonl")
 
 
 def append_llm_runner_log(payload: Dict[str, Any]) -> Path:
     path = DEFAULT_LOG_PATH
-    path.parent.mkdir(parents=True, exist_ok=True)
     record = dict(payload)
+    if not should_log("llm_runner", record):
+        return path
     record.setdefault("timestamp", datetime.now(timezone.utc).isoformat())
-    with path.open("a", encoding="utf-8") as handle:
-        handle.write(f"{json.dumps(record, ensure_ascii=False)}\n")
+    append_jsonl(path, record)
     return path
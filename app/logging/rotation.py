@@ -0,0 +1,307 @@
+"""Size / hourly rotation of JSONL sink files.
+
+The shared sink (``app/logging/sink.py``) asks ``rotation_due`` before each
+write. When a file is due, ``rotate_log`` renames it to a timestamped segment,
+compresses the closed segment (gzip by default, zstd when the optional
+``zstandard`` package is installed) and appends an entry to the directory's
+``manifest.json`` with the segment's timestamp range and record count.
+The sink calls ``rotate_log_in_background`` instead: only the rename happens
+on the writing thread, and one ``log-rotation`` worker does the rest
+(``wait_for_rotations`` waits for it). Readers live in
+``app/logging/segments.py``.
+
+gzip segments are written as a series of line-aligned members of about
+``GZIP_MEMBER_BYTES`` each. That is still one valid gzip file, and a reader
+that knows a member's offset can decompress a single record's block
+(``app/logging/decision_index.py``). Listeners registered with
+``register_segment_listener`` hear about every closed or replaced segment:
+first the renamed, uncompressed segment (``replaces`` is the active log), then
+the compressed one (``replaces`` is the uncompressed segment).
+
+Rotation is off unless LOG_ROTATE_MAX_BYTES or LOG_ROTATE_INTERVAL is set.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+import os
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import wait as wait_futures
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from app.logging.segments import MANIFEST_NAME, MANIFEST_VERSION, parse_timestamp, read_manifest
+
+ROTATE_INTERVALS = {"none", "hour"}
+COMPRESSIONS = {"gzip", "zstd", "none"}
+GZIP_MEMBER_BYTES = 256 * 1024
+
+# listener(log_path, segment, replaces): ``segment`` now holds the records
+# that were in the file named ``replaces`` (the active log, or a segment).
+SegmentListener = Callable[[Path, Path, str], None]
+
+_LOGGER = logging.getLogger(__name__)
+# Same fields as the columnar writer: ``timestamp``, or ``created_at`` (decision log).
+_TIMESTAMP_FIELD = re.compile(r'"(?:timestamp|created_at)":\s*"([^"]+)"')
+_ZSTD_WARNED = False
+_SEGMENT_LISTENERS: List[SegmentListener] = []
+# One worker keeps manifest updates of background rotations in order.
+_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="log-rotation")
+_PENDING: Set[Future] = set()
+_PENDING_LOCK = threading.Lock()
+
+
+def log_rotate_max_bytes() -> int:
+    raw = os.getenv("LOG_ROTATE_MAX_BYTES", "0")
+    try:
+        return max(0, int(raw))
+    except ValueError:
+        return 0
+
+
+def log_rotate_interval() -> str:
+    interval = os.getenv("LOG_ROTATE_INTERVAL", "none").strip().lower()
+    return interval if interval in ROTATE_INTERVALS else "none"
+
+
+def log_rotate_compression() -> str:
+    compression = os.getenv("LOG_ROTATE_COMPRESSION", "gzip").strip().lower()
+    return compression if compression in COMPRESSIONS else "gzip"
+
+
+def rotation_enabled() -> bool:
+    return log_rotate_max_bytes() > 0 or log_rotate_interval() != "none"
+
+
+def current_bucket(now: Optional[datetime] = None) -> str:
+    """Rotation bucket of ``now`` ("" when hourly rotation is off)."""
+    if log_rotate_interval() != "hour":
+        return ""
+    moment = now or datetime.now(timezone.utc)
+    return moment.astimezone(timezone.utc).strftime("%Y%m%dT%H")
+
+
+def file_bucket(path: Path) -> str:
+    """Bucket an existing active file belongs to, judged by its mtime."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return current_bucket()
+    if stat.st_size == 0:
+        return current_bucket()
+    return current_bucket(datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc))
+
+
+def rotation_due(size: int, incoming: int, bucket: str) -> bool:
+    """True when appending ``incoming`` bytes to a file of ``size`` must start a new segment."""
+    if size <= 0:
+        return False
+    max_bytes = log_rotate_max_bytes()
+    if max_bytes and size + incoming > max_bytes:
+        return True
+    return bucket != current_bucket()
+
+
+def rotate_log(path: Path) -> Optional[Path]:
+    """Close ``path`` into a compressed segment and record it in the manifest.
+
+    The caller must have closed its handle to ``path``. Returns the segment
+    path, or None when there was nothing to rotate.
+    """
+    closed = _close_active(path)
+    if closed is None:
+        return None
+    return _finish_segment(path, *closed)
+
+
+def rotate_log_in_background(path: Path) -> Optional[Path]:
+    """Rename ``path`` to a segment now; compress it and update the manifest on the worker.
+
+    Returns the uncompressed segment path, or None when there was nothing to rotate.
+    """
+    closed = _close_active(path)
+    if closed is None:
+        return None
+    future = _EXECUTOR.submit(_finish_in_background, path, *closed)
+    with _PENDING_LOCK:
+        _PENDING.add(future)
+    future.add_done_callback(_forget)
+    return closed[0]
+
+
+def wait_for_rotations(timeout: Optional[float] = None) -> bool:
+    """Wait for background rotations started so far; False on timeout."""
+    with _PENDING_LOCK:
+        pending = set(_PENDING)
+    if not pending:
+        return True
+    return not wait_futures(pending, timeout).not_done
+
+
+def _forget(future: Future) -> None:
+    with _PENDING_LOCK:
+        _PENDING.discard(future)
+
+
+def _close_active(path: Path) -> Optional[Tuple[Path, datetime]]:
+    try:
+        if os.stat(path).st_size == 0:
+            return None
+    except OSError:
+        return None
+    rotated_at = datetime.now(timezone.utc)
+    closed = _unique_segment_path(path, rotated_at)
+    os.replace(path, closed)
+    notify_segment_closed(path, closed, path.name)
+    return closed, rotated_at
+
+
+def _finish_in_background(path: Path, closed: Path, rotated_at: datetime) -> None:
+    try:
+        _finish_segment(path, closed, rotated_at)
+    except Exception:
+        _LOGGER.warning("background rotation failed for %s", closed, exc_info=True)
+
+
+def _finish_segment(path: Path, closed: Path, rotated_at: datetime) -> Path:
+    summary = _summarize(closed)
+    segment = _compress(closed)
+    append_manifest_entry(
+        path.parent,
+        {
+            "log": path.name,
+            "file": segment.name,
+            "first_ts": summary["first_ts"],
+            "last_ts": summary["last_ts"],
+            "records": summary["records"],
+            "bytes": segment.stat().st_size,
+            "compression": _compression_of(segment),
+            "rotated_at": rotated_at.isoformat(),
+        },
+    )
+    notify_segment_closed(path, segment, closed.name)
+    if segment != closed:
+        closed.unlink()
+    return segment
+
+
+def register_segment_listener(listener: SegmentListener) -> None:
+    if listener not in _SEGMENT_LISTENERS:
+        _SEGMENT_LISTENERS.append(listener)
+
+
+def notify_segment_closed(path: Path, segment: Path, replaces: str) -> None:
+    for listener in list(_SEGMENT_LISTENERS):
+        try:
+            listener(path, segment, replaces)
+        except Exception:
+            _LOGGER.warning("segment listener failed for %s", segment, exc_info=True)
+
+
+def _unique_segment_path(path: Path, rotated_at: datetime) -> Path:
+    stem = path.name[: -len(".jsonl")] if path.name.endswith(".jsonl") else path.stem
+    stamp = rotated_at.strftime("%Y%m%dT%H%M%SZ")
+    counter = 0
+    while True:
+        suffix = stamp if counter == 0 else f"{stamp}-{counter}"
+        candidate = path.with_name(f"{stem}.{suffix}.jsonl")
+        taken = any(
+            candidate.with_name(candidate.name + ext).exists() for ext in ("", ".gz", ".zst")
+        ) or candidate.with_name(f"{stem}.{suffix}.cols").exists()
+        if not taken:
+            return candidate
+        counter += 1
+
+
+def _summarize(path: Path) -> Dict[str, Any]:
+    """Record count and min/max ``timestamp``/``created_at`` of a closed segment (no full JSON parse)."""
+    records = 0
+    first: Optional[datetime] = None
+    last: Optional[datetime] = None
+    with path.open("r", encoding="utf-8", errors="replace") as handle:
+        for line in handle:
+            if not line.strip():
+                continue
+            records += 1
+            match = _TIMESTAMP_FIELD.search(line)
+            parsed = parse_timestamp(match.group(1)) if match else None
+            if parsed is None:
+                continue
+            first = parsed if first is None or parsed < first else first
+            last = parsed if last is None or parsed > last else last
+    return {
+        "records": records,
+        "first_ts": first.isoformat() if first else None,
+        "last_ts": last.isoformat() if last else None,
+    }
+
+
+def _compress(path: Path) -> Path:
+    """Compressed copy of ``path``; the caller removes ``path`` once listeners know."""
+    compression = _effective_compression()
+    if compression == "none":
+        return path
+    target = path.with_name(path.name + (".zst" if compression == "zstd" else ".gz"))
+    # Readers never see a half-written segment: build it under a hidden name.
+    tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    with path.open("rb") as src, tmp.open("wb") as dst:
+        if compression == "zstd":
+            import zstandard
+
+            zstandard.ZstdCompressor().copy_stream(src, dst)
+        else:
+            _write_gzip_members(src, dst)
+    os.replace(tmp, target)
+    return target
+
+
+def _write_gzip_members(src: Any, dst: Any) -> None:
+    """gzip ``src`` into ``dst`` as one member per ~GZIP_MEMBER_BYTES of whole lines."""
+    while True:
+        block = src.read(GZIP_MEMBER_BYTES)
+        if not block:
+            return
+        if not block.endswith(b"\n"):
+            block += src.readline()
+        dst.write(gzip.compress(block, mtime=0))
+
+
+def _effective_compression() -> str:
+    global _ZSTD_WARNED
+    compression = log_rotate_compression()
+    if compression != "zstd":
+        return compression
+    try:
+        import zstandard  # noqa: F401
+    except ImportError:
+        if not _ZSTD_WARNED:
+            _LOGGER.warning("LOG_ROTATE_COMPRESSION=zstd but zstandard is not installed; using gzip")
+            _ZSTD_WARNED = True
+        return "gzip"
+    return "zstd"
+
+
+def _compression_of(segment: Path) -> str:
+    if segment.name.endswith(".gz"):
+        return "gzip"
+    if segment.name.endswith(".zst"):
+        return "zstd"
+    return "none"
+
+
+def append_manifest_entry(directory: Path, entry: Dict[str, Any], replaces: Optional[str] = None) -> None:
+    """Add ``entry`` to the manifest, dropping entries for the same file or for ``replaces``."""
+    manifest = read_manifest(directory)
+    dropped = {entry["file"], replaces}
+    segments = [item for item in manifest.get("segments", []) if item.get("file") not in dropped]
+    segments.append(entry)
+    payload = {"version": MANIFEST_VERSION, "segments": segments}
+    target = directory / MANIFEST_NAME
+    tmp = target.with_name(f".{MANIFEST_NAME}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(payload, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    os.replace(tmp, target)
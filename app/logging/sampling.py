@@ -0,0 +1,190 @@
+"""Per-sink sampling and rate caps for high-volume diagnostic logs.
+
+Each sampled sink (``SAMPLED_SINKS``) has two knobs, read on every record:
+
+- ``<SINK>_LOG_SAMPLE_RATE`` (0..1, default 1): deterministic sampling keyed
+  by the record's ``command_id`` (else ``trace_id``, else the key set with
+  ``sampling_key``). Every sink hashes the same key, so one command is kept
+  or dropped in all of them. The hash is salted, so this choice does not
+  line up with the partial-trust or agent-hint samplers;
+- ``<SINK>_LOG_MAX_PER_S`` (default 0 = no cap): token bucket with one
+  second of burst, applied to the records sampling kept.
+
+Errors and timeouts (``status`` error/timeout, ``ok: false``, or an
+``error_type`` / ``reason_code`` mentioning a timeout) are always written
+and never consume tokens.
+
+While a sink samples or is capped, each written record carries
+``sample_weight``: how many records it stands for. That is 1 for always-kept
+records and ``(1 + rate-limited since the last kept record) / rate``
+otherwise. Offline analyzers sum weights instead of counting records.
+A missing weight means 1. Per-sink outcome counts are in
+``log_sampling_stats`` (exported on /metrics).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, MutableMapping, Optional
+
+SAMPLED_SINKS = ("shadow_router", "shadow_agent_diff", "assist", "llm_runner")
+SAMPLE_WEIGHT_FIELD = "sample_weight"
+
+_SALT = "log-sampling:"
+_ERROR_STATUSES = {"error", "timeout"}
+
+_KEY: ContextVar[Optional[str]] = ContextVar("log_sampling_key", default=None)
+
+
+def log_sample_rate(sink: str) -> float:
+    raw = os.getenv(f"{sink.upper()}_LOG_SAMPLE_RATE", "1")
+    try:
+        value = float(raw)
+    except ValueError:
+        return 1.0
+    return min(max(value, 0.0), 1.0)
+
+
+def log_max_per_s(sink: str) -> float:
+    raw = os.getenv(f"{sink.upper()}_LOG_MAX_PER_S", "0")
+    try:
+        value = float(raw)
+    except ValueError:
+        return 0.0
+    return value if value > 0 else 0.0
+
+
+def stable_fraction(key: str) -> float:
+    """Deterministic value in [0, 1) for ``key`` (same hashing as ``stable_sample``)."""
+    digest = hashlib.sha256(f"{_SALT}{key}".encode("utf-8")).hexdigest()
+    return int(digest[:16], 16) / 16**16
+
+
+def always_keep(record: MutableMapping[str, Any]) -> bool:
+    if record.get("status") in _ERROR_STATUSES or record.get("ok") is False:
+        return True
+    for field_name in ("error_type", "reason_code"):
+        value = record.get(field_name)
+        if isinstance(value, str) and "timeout" in value:
+            return True
+    return False
+
+
+@contextmanager
+def sampling_key(key: Optional[str]) -> Iterator[None]:
+    """Sampling key for records logged in this block that carry no id of their own."""
+    token = _KEY.set(None if key is None else str(key))
+    try:
+        yield
+    finally:
+        _KEY.reset(token)
+
+
+@dataclass
+class SamplingStats:
+    kept: int = 0
+    forced: int = 0
+    sampled_out: int = 0
+    rate_limited: int = 0
+
+
+class _SinkSampler:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._tokens: Optional[float] = None
+        self._refilled_at = 0.0
+        self._limited_since_kept = 0
+        self.stats = SamplingStats()
+
+    def admit(self, record: MutableMapping[str, Any], rate: float, max_per_s: float) -> bool:
+        if always_keep(record):
+            with self._lock:
+                self.stats.forced += 1
+            record[SAMPLE_WEIGHT_FIELD] = 1.0
+            return True
+        if not _sampled(record, rate):
+            with self._lock:
+                self.stats.sampled_out += 1
+            return False
+        with self._lock:
+            if max_per_s and not self._take_token(max_per_s):
+                self.stats.rate_limited += 1
+                self._limited_since_kept += 1
+                return False
+            self.stats.kept += 1
+            represented = 1 + self._limited_since_kept
+            self._limited_since_kept = 0
+        record[SAMPLE_WEIGHT_FIELD] = round(represented / rate, 6)
+        return True
+
+    def count_kept(self) -> None:
+        with self._lock:
+            self.stats.kept += 1
+
+    def _take_token(self, max_per_s: float) -> bool:
+        now = time.monotonic()
+        burst = max(max_per_s, 1.0)
+        if self._tokens is None:
+            self._tokens = burst
+        else:
+            self._tokens = min(burst, self._tokens + (now - self._refilled_at) * max_per_s)
+        self._refilled_at = now
+        if self._tokens < 1.0:
+            return False
+        self._tokens -= 1.0
+        return True
+
+
+_SAMPLERS: Dict[str, _SinkSampler] = {}
+_SAMPLERS_LOCK = threading.Lock()
+
+
+def should_log(sink: str, record: MutableMapping[str, Any]) -> bool:
+    """Apply ``sink``'s sampling policy to ``record``; False means do not write it.
+
+    Adds ``sample_weight`` to ``record`` when the sink samples or is capped.
+    """
+    rate = log_sample_rate(sink)
+    max_per_s = log_max_per_s(sink)
+    sampler = _sampler(sink)
+    if rate >= 1.0 and not max_per_s:
+        sampler.count_kept()
+        return True
+    return sampler.admit(record, rate, max_per_s)
+
+
+def log_sampling_stats() -> Dict[str, Dict[str, int]]:
+    """Per-sink kept / forced / sampled_out / rate_limited counters."""
+    with _SAMPLERS_LOCK:
+        samplers = dict(_SAMPLERS)
+    result = {}
+    for sink, sampler in samplers.items():
+        with sampler._lock:
+            result[sink] = dict(vars(sampler.stats))
+    return result
+
+
+def reset_log_sampling() -> None:
+    with _SAMPLERS_LOCK:
+        _SAMPLERS.clear()
+
+
+def _sampler(sink: str) -> _SinkSampler:
+    sampler = _SAMPLERS.get(sink)
+    if sampler is None:
+        with _SAMPLERS_LOCK:
+            sampler = _SAMPLERS.setdefault(sink, _SinkSampler())
+    return sampler
+
+
+def _sampled(record: MutableMapping[str, Any], rate: float) -> bool:
+    key = record.get("command_id") or record.get("trace_id") or _KEY.get()
+    value = stable_fraction(str(key)) if key else random.random()
+    return value < rate
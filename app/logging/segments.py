@@ -0,0 +1,196 @@
+"""Read a JSONL log together with its rotated, compressed segments.
+
+``app/logging/rotation.py`` closes ``<dir>/<stem>.jsonl`` into segments named
+``<stem>.<YYYYmmddTHHMMSSZ>[-n].jsonl[.gz|.zst]`` and records each segment in
+``<dir>/manifest.json`` with its timestamp range and record count. Readers use
+the manifest to skip whole segments that cannot overlap a ``since``/``until``
+window; segments missing from the manifest (e.g. a crash between rename and
+manifest update) are still read, so nothing is silently lost.
+
+Segments compacted into the columnar format (``<stem>.<stamp>.cols``, see
+``app/logging/columnar.py``) take the place of their JSONL source.
+``iter_segment_records`` reads them without JSON parsing and can restrict
+decoding to the columns a reader needs; ``iter_log_lines`` re-encodes their
+records as JSON lines for line-oriented readers.
+
+Stdlib only; ``.zst`` segments need the optional ``zstandard`` package.
+"""
+
+from __future__ import annotations
+
+import gzip
+import io
+import json
+import re
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, IO, Iterable, Iterator, List, Optional, Tuple
+
+from app.logging.columnar import is_columnar, iter_records
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+_SEGMENT_SUFFIXES = (".jsonl", ".jsonl.gz", ".jsonl.zst", ".cols")
+_SEGMENT_STAMP = re.compile(r"^\d{8}T\d{6}Z(?:-\d+)?$")
+
+
+def read_manifest(directory: Path) -> Dict[str, Any]:
+    """Return the manifest of ``directory`` (empty when missing or unreadable)."""
+    path = directory / MANIFEST_NAME
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {"version": MANIFEST_VERSION, "segments": []}
+    if not isinstance(payload, dict) or not isinstance(payload.get("segments"), list):
+        return {"version": MANIFEST_VERSION, "segments": []}
+    return payload
+
+
+def log_segments(
+    path: Path,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> List[Path]:
+    """Files holding records of ``path``: closed segments oldest first, then the active file.
+
+    Manifest segments whose ``[first_ts, last_ts]`` range lies entirely outside
+    ``[since, until]`` are skipped. The active file is always included because
+    its range is not known until it is closed.
+    """
+    directory = path.parent
+    since_utc = as_utc(since)
+    until_utc = as_utc(until)
+    listed: Dict[str, Dict[str, Any]] = {}
+    for entry in read_manifest(directory).get("segments", []):
+        if isinstance(entry, dict) and entry.get("log") == path.name and isinstance(entry.get("file"), str):
+            listed[entry["file"]] = entry
+
+    selected: Dict[str, Path] = {}
+    for candidate in _segment_files(path):
+        entry = listed.get(candidate.name)
+        if entry is not None and not _overlaps(entry, since_utc, until_utc):
+            continue
+        stamp = _segment_stamp(path, candidate)
+        # A compacted copy supersedes a JSONL source that was kept around.
+        if stamp not in selected or is_columnar(candidate):
+            selected[stamp] = candidate
+    segments = [selected[stamp] for stamp in sorted(selected)]
+    if path.is_file():
+        segments.append(path)
+    return segments
+
+
+def iter_log_lines(
+    path: Path,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> Iterator[str]:
+    """Yield raw lines from every segment of ``path`` (see ``log_segments``)."""
+    for segment in log_segments(path, since, until):
+        yield from iter_segment_lines(segment)
+
+
+def iter_segment_lines(segment: Path) -> Iterator[str]:
+    """Lines of one segment; columnar segments are re-encoded as JSON lines."""
+    if is_columnar(segment):
+        for record in iter_records(segment):
+            yield json.dumps(record, ensure_ascii=False) + "\n"
+        return
+    with open_segment(segment) as handle:
+        yield from handle
+
+
+def iter_segment_records(
+    segment: Path,
+    columns: Optional[Iterable[str]] = None,
+) -> Iterator[Tuple[Any, bool]]:
+    """``(record, True)`` per record of one segment, ``({}, False)`` per unparsable line.
+
+    Columnar segments skip JSON parsing entirely; ``columns`` limits them to
+    the named keys (JSONL records are returned whole).
+    """
+    if is_columnar(segment):
+        for record in iter_records(segment, columns):
+            yield record, True
+        return
+    with open_segment(segment) as handle:
+        yield from parse_lines(handle)
+
+
+def parse_lines(lines: Iterable[str]) -> Iterator[Tuple[Any, bool]]:
+    """Parse JSONL lines into ``(record, ok)``; blank lines are skipped."""
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line), True
+        except ValueError:
+            yield {}, False
+
+
+def open_segment(path: Path) -> IO[str]:
+    """Open a plain, gzip or zstd segment for text reading."""
+    if path.name.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    if path.name.endswith(".zst"):
+        import zstandard  # optional; only needed when zstd segments exist
+
+        raw = path.open("rb")
+        reader = zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+        return io.TextIOWrapper(reader, encoding="utf-8")
+    return path.open("r", encoding="utf-8")
+
+
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    """Parse an ISO timestamp; naive values are taken as UTC."""
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        return as_utc(datetime.fromisoformat(value))
+    except ValueError:
+        return None
+
+
+def as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Make ``value`` timezone-aware, treating naive datetimes as UTC."""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _segment_files(path: Path) -> List[Path]:
+    directory = path.parent
+    if not directory.is_dir():
+        return []
+    stem = path.name[: -len(".jsonl")] if path.name.endswith(".jsonl") else path.stem
+    found = []
+    for candidate in directory.glob(f"{stem}.*"):
+        if candidate == path or not candidate.is_file():
+            continue
+        if _segment_stamp(path, candidate):
+            found.append(candidate)
+    return found
+
+
+def _segment_stamp(path: Path, candidate: Path) -> str:
+    stem = path.name[: -len(".jsonl")] if path.name.endswith(".jsonl") else path.stem
+    name = candidate.name
+    for suffix in _SEGMENT_SUFFIXES[::-1]:
+        if name.endswith(suffix):
+            stamp = name[len(stem) + 1 : -len(suffix)]
+            return stamp if _SEGMENT_STAMP.match(stamp) else ""
+    return ""
+
+
+def _overlaps(entry: Dict[str, Any], since: Optional[datetime], until: Optional[datetime]) -> bool:
+    first = parse_timestamp(entry.get("first_ts"))
+    last = parse_timestamp(entry.get("last_ts"))
+    if since is not None and last is not None and last < since:
+        return False
+    if until is not None and first is not None and first > until:
+        return False
+    return True
@@ -2,12 +2,14 @@
 
 from __future__ import annotations
 
-import json
 import os
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict
 
+from app.logging.sampling import should_log
+from app.logging.sink import append_jsonl
+
 
 DEFAULT_LOG_PATH = Path("logs/shadow_agent_diff.jsonl")
 
@@ -25,11 +27,11 @@ def log_shadow_agent_diff(event: Dict[str, Any]) -> None:
         return
     try:
         path = resolve_log_path()
-        path.parent.mkdir(parents=True, exist_ok=True)
         record = dict(event)
+        if not should_log("shadow_agent_diff", record):
+            return
         record.setdefault("timestamp", datetime.now(timezone.utc).isoformat())
-        with path.open("a", encoding="utf-8") as handle:
-            handle.write(f"{json.dumps(record, ensure_ascii=False)}\n")
+        append_jsonl(path, record)
     except Exception:
         return
 
@@ -0,0 +1,120 @@
+"""Split JSONL logs into byte-range shards and analyze them in a process pool.
+
+A log (``log_segments``: rotated segments plus the active file) is cut into
+``Shard`` ranges of roughly equal size. Range boundaries are arbitrary byte
+offsets; ``iter_shard_lines`` aligns them on newlines, so every line belongs
+to exactly one shard: the one in which it starts. Compressed segments cannot
+be seeked and always form a single whole-file shard, as do columnar
+(``.cols``) segments, which ``iter_shard_records`` decodes without JSON
+parsing.
+
+Workers return mergeable partial aggregates (``Counter``, ``QuantileSketch``,
+``DistinctCounter`` from ``app/logging/aggregation.py``, plain ints); the
+caller reduces them in shard order, so first-seen key order in dict-valued
+counts matches a sequential pass.
+
+Stdlib only, like the analyzers that import it.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple, TypeVar
+
+from app.logging.segments import iter_segment_lines, iter_segment_records, log_segments, parse_lines
+
+# Smaller ranges cost more in process round trips than they save.
+MIN_SHARD_BYTES = 4 * 1024 * 1024
+# Shards per worker: a few more than one evens out uneven record costs.
+SHARDS_PER_WORKER = 4
+
+T = TypeVar("T")
+
+
+class Shard(NamedTuple):
+    """Bytes ``[start, end)`` of ``path``; ``end=None`` means the whole file."""
+
+    path: Path
+    start: int = 0
+    end: Optional[int] = None
+
+
+def plan_shards(
+    path: Path,
+    workers: int,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    min_shard_bytes: Optional[int] = None,
+) -> List[Shard]:
+    """Shards covering every segment of ``path`` in log order."""
+    if min_shard_bytes is None:
+        min_shard_bytes = MIN_SHARD_BYTES
+    files = log_segments(path, since, until)
+    plain_bytes = sum(_size(file) for file in files if not _compressed(file))
+    target = max(min_shard_bytes, plain_bytes // max(1, workers * SHARDS_PER_WORKER) + 1)
+    shards: List[Shard] = []
+    for file in files:
+        size = _size(file)
+        if _compressed(file) or workers <= 1 or size <= target:
+            shards.append(Shard(file))
+            continue
+        for start in range(0, size, target):
+            shards.append(Shard(file, start, min(start + target, size)))
+    return shards
+
+
+def iter_shard_lines(shard: Shard) -> Iterator[str]:
+    """Yield the lines that start inside ``shard`` (decoded, newline kept)."""
+    if shard.end is None:
+        yield from iter_segment_lines(shard.path)
+        return
+    with shard.path.open("rb") as handle:
+        position = shard.start
+        if position > 0:
+            # The line straddling ``start`` belongs to the previous shard.
+            handle.seek(position - 1)
+            if handle.read(1) != b"\n":
+                position += len(handle.readline())
+        while position < shard.end:
+            line = handle.readline()
+            if not line:
+                break
+            position += len(line)
+            yield line.decode("utf-8")
+
+
+def iter_shard_records(shard: Shard, columns: Optional[Iterable[str]] = None) -> Iterator[Tuple[Any, bool]]:
+    """``(record, ok)`` for the records of ``shard`` (see ``iter_segment_records``)."""
+    if shard.end is None:
+        return iter_segment_records(shard.path, columns)
+    return parse_lines(iter_shard_lines(shard))
+
+
+def map_shards(func: Callable[[Shard], T], shards: Sequence[Shard], workers: int) -> List[T]:
+    """``func`` over ``shards`` (in a process pool when ``workers > 1``), results in shard order.
+
+    ``func`` must be picklable, i.e. a module-level function or a
+    ``functools.partial`` of one.
+    """
+    if workers <= 1 or len(shards) <= 1:
+        return [func(shard) for shard in shards]
+    with ProcessPoolExecutor(max_workers=min(workers, len(shards))) as pool:
+        return list(pool.map(func, shards))
+
+
+def iter_lines(shards: Iterable[Shard]) -> Iterator[str]:
+    for shard in shards:
+        yield from iter_shard_lines(shard)
+
+
+def _compressed(path: Path) -> bool:
+    return path.name.endswith((".gz", ".zst", ".cols"))
+
+
+def _size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except OSError:
+        return 0
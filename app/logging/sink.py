@@ -0,0 +1,349 @@
+"""Shared JSONL sink used by every ``app/logging`` module.
+
+Records are serialized on the calling thread and handed to one background
+writer through a bounded queue. The writer batches lines per file, writes
+them through long-lived append handles (parent directories are created once,
+when a handle is opened) and flushes each batch. When the queue is full a
+record is either dropped (counted per path) or the caller blocks, depending
+on LOG_SINK_FULL_POLICY. ``flush_log_sinks`` / ``shutdown_log_sinks`` drain
+the queue; shutdown also runs at interpreter exit.
+
+LOG_SINK_MODE=sync writes on the calling thread through the same handle
+cache, which keeps records visible immediately (tests, one-shot scripts).
+
+Size / hourly rotation of the files written here is handled by
+``app/logging/rotation.py`` right before the write that would cross a limit:
+the file is renamed under the sink's I/O lock and compressed by the rotation
+worker, which ``flush_log_sinks`` / ``shutdown_log_sinks`` also wait for.
+``add_write_listener`` reports the byte offset of every write to a path
+(used by the decision log index).
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, IO, List, Mapping, Optional, Tuple
+
+from app import serialization
+from app.logging import rotation
+
+DEFAULT_QUEUE_SIZE = 10000
+DEFAULT_BATCH_SIZE = 256
+DEFAULT_FLUSH_INTERVAL_MS = 100
+DEFAULT_MAX_OPEN_FILES = 64
+
+SINK_MODES = {"buffered", "sync"}
+FULL_POLICIES = {"drop", "block"}
+FSYNC_POLICIES = {"never", "batch"}
+
+_LOGGER = logging.getLogger(__name__)
+
+WriteListener = Callable[[Path, int, str], None]
+
+
+def log_sink_mode() -> str:
+    mode = os.getenv("LOG_SINK_MODE", "buffered").strip().lower()
+    return mode if mode in SINK_MODES else "buffered"
+
+
+def log_sink_queue_size() -> int:
+    return _positive_int("LOG_SINK_QUEUE_SIZE", DEFAULT_QUEUE_SIZE)
+
+
+def log_sink_batch_size() -> int:
+    return _positive_int("LOG_SINK_BATCH_SIZE", DEFAULT_BATCH_SIZE)
+
+
+def log_sink_flush_interval_ms() -> int:
+    raw = os.getenv("LOG_SINK_FLUSH_INTERVAL_MS", str(DEFAULT_FLUSH_INTERVAL_MS))
+    try:
+        return max(0, int(raw))
+    except ValueError:
+        return DEFAULT_FLUSH_INTERVAL_MS
+
+
+def log_sink_full_policy() -> str:
+    policy = os.getenv("LOG_SINK_FULL_POLICY", "drop").strip().lower()
+    return policy if policy in FULL_POLICIES else "drop"
+
+
+def log_sink_fsync_policy() -> str:
+    policy = os.getenv("LOG_SINK_FSYNC", "never").strip().lower()
+    return policy if policy in FSYNC_POLICIES else "never"
+
+
+def log_sink_max_open_files() -> int:
+    return _positive_int("LOG_SINK_MAX_OPEN_FILES", DEFAULT_MAX_OPEN_FILES)
+
+
+def _positive_int(name: str, default: int) -> int:
+    raw = os.getenv(name, str(default))
+    try:
+        value = int(raw)
+    except ValueError:
+        return default
+    return value if value > 0 else default
+
+
+@dataclass
+class SinkStats:
+    written: int = 0
+    dropped: int = 0
+    errors: int = 0
+
+
+class _HandleCache:
+    """LRU of open append handles; reopens a file that was moved or deleted.
+
+    Each entry remembers the rotation bucket the file was opened in so hourly
+    rotation needs no stat call; size rotation uses the open handle's size.
+    """
+
+    def __init__(self) -> None:
+        self._handles: "OrderedDict[Path, Tuple[IO[str], int, str]]" = OrderedDict()
+
+    def write(self, path: Path, data: str, *, fsync: bool) -> int:
+        """Append ``data`` to ``path``; returns the byte offset it was written at."""
+        handle = self._handle(path)
+        if rotation.rotation_enabled():
+            bucket = self._handles[path][2]
+            size = os.fstat(handle.fileno()).st_size
+            if rotation.rotation_due(size, len(data.encode("utf-8")), bucket):
+                self._close(path)
+                try:
+                    rotation.rotate_log_in_background(path)
+                except Exception:
+                    _LOGGER.warning("jsonl sink rotation failed for %s", path, exc_info=True)
+                handle = self._handle(path)
+        offset = handle.tell()
+        handle.write(data)
+        handle.flush()
+        if fsync:
+            os.fsync(handle.fileno())
+        return offset
+
+    def close_all(self) -> None:
+        while self._handles:
+            _path, (handle, _inode, _bucket) = self._handles.popitem(last=False)
+            _close_quietly(handle)
+
+    def _close(self, path: Path) -> None:
+        cached = self._handles.pop(path, None)
+        if cached is not None:
+            _close_quietly(cached[0])
+
+    def _handle(self, path: Path) -> IO[str]:
+        cached = self._handles.get(path)
+        if cached is not None:
+            handle, inode, _bucket = cached
+            if _current_inode(path) == inode:
+                self._handles.move_to_end(path)
+                return handle
+            del self._handles[path]
+            _close_quietly(handle)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        bucket = rotation.file_bucket(path)
+        handle = path.open("a", encoding="utf-8")
+        self._handles[path] = (handle, os.fstat(handle.fileno()).st_ino, bucket)
+        while len(self._handles) > log_sink_max_open_files():
+            _old_path, (old_handle, _old_inode, _old_bucket) = self._handles.popitem(last=False)
+            _close_quietly(old_handle)
+        return handle
+
+
+class _Flush:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+
+
+class JsonlSinkWriter:
+    """Background writer shared by every sink path."""
+
+    def __init__(self) -> None:
+        self._queue: "queue.Queue[Any] | None" = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._handles = _HandleCache()
+        self._stats: Dict[str, SinkStats] = {}
+        self._listeners: Dict[Path, WriteListener] = {}
+
+    def add_write_listener(self, path: Path, listener: WriteListener) -> None:
+        self._listeners[path] = listener
+
+    def write(self, path: Path, line: str) -> None:
+        if log_sink_mode() == "sync":
+            with self._io_lock:
+                offset = self._handles.write(path, line, fsync=log_sink_fsync_policy() == "batch")
+                self._notify(path, offset, line)
+            with self._lock:
+                self._stat(path).written += 1
+            return
+        work = self._ensure_started()
+        if log_sink_full_policy() == "block":
+            work.put((path, line))
+            return
+        try:
+            work.put_nowait((path, line))
+        except queue.Full:
+            with self._lock:
+                self._stat(path).dropped += 1
+
+    def flush(self, timeout: float | None = 5.0) -> bool:
+        """Wait until every record queued so far is written (and rotated); False on timeout."""
+        work = self._queue
+        thread = self._thread
+        if work is not None and thread is not None and thread.is_alive():
+            marker = _Flush()
+            work.put(marker)
+            if not marker.done.wait(timeout):
+                return False
+        return rotation.wait_for_rotations(timeout)
+
+    def shutdown(self, timeout: float | None = 5.0) -> None:
+        with self._lock:
+            work, thread = self._queue, self._thread
+            self._queue, self._thread = None, None
+        if work is not None and thread is not None and thread.is_alive():
+            work.put(None)
+            thread.join(timeout)
+        rotation.wait_for_rotations(timeout)
+        with self._io_lock:
+            self._handles.close_all()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {path: dict(vars(stats)) for path, stats in self._stats.items()}
+
+    def _ensure_started(self) -> "queue.Queue[Any]":
+        work = self._queue
+        if work is not None:
+            return work
+        with self._lock:
+            if self._queue is None:
+                self._queue = queue.Queue(maxsize=log_sink_queue_size())
+                self._thread = threading.Thread(
+                    target=self._run, args=(self._queue,), name="jsonl-sink-writer", daemon=True
+                )
+                self._thread.start()
+            return self._queue
+
+    def _run(self, work: "queue.Queue[Any]") -> None:
+        while True:
+            item = work.get()
+            batch: List[Tuple[Path, str]] = []
+            markers: List[_Flush] = []
+            stop = False
+            deadline = time.monotonic() + log_sink_flush_interval_ms() / 1000
+            batch_size = log_sink_batch_size()
+            while True:
+                if item is None:
+                    stop = True
+                elif isinstance(item, _Flush):
+                    markers.append(item)
+                else:
+                    batch.append(item)
+                if stop or markers or len(batch) >= batch_size:
+                    break
+                remaining = deadline - time.monotonic()
+                try:
+                    item = work.get(timeout=remaining) if remaining > 0 else work.get_nowait()
+                except queue.Empty:
+                    break
+            self._write_batch(batch)
+            for marker in markers:
+                marker.done.set()
+            if stop:
+                return
+
+    def _write_batch(self, batch: List[Tuple[Path, str]]) -> None:
+        if not batch:
+            return
+        grouped: Dict[Path, List[str]] = {}
+        for path, line in batch:
+            grouped.setdefault(path, []).append(line)
+        fsync = log_sink_fsync_policy() == "batch"
+        for path, lines in grouped.items():
+            data = "".join(lines)
+            try:
+                with self._io_lock:
+                    offset = self._handles.write(path, data, fsync=fsync)
+                    self._notify(path, offset, data)
+            except Exception:
+                _LOGGER.warning("jsonl sink write failed for %s", path, exc_info=True)
+                with self._lock:
+                    self._stat(path).errors += len(lines)
+                continue
+            with self._lock:
+                self._stat(path).written += len(lines)
+
+    def _notify(self, path: Path, offset: int, data: str) -> None:
+        listener = self._listeners.get(path)
+        if listener is None:
+            return
+        try:
+            listener(path, offset, data)
+        except Exception:
+            _LOGGER.warning("jsonl sink write listener failed for %s", path, exc_info=True)
+
+    def _stat(self, path: Path) -> SinkStats:
+        key = str(path)
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = SinkStats()
+        return stats
+
+
+_WRITER = JsonlSinkWriter()
+
+
+def append_jsonl(path: Path, record: Mapping[str, Any]) -> None:
+    """Serialize ``record`` now and append it to ``path`` through the shared sink."""
+    _WRITER.write(path, serialization.dumps(record) + "\n")
+
+
+def add_write_listener(path: Path, listener: WriteListener) -> None:
+    """Call ``listener(path, offset, data)`` after each write to ``path``.
+
+    Runs on the writing thread while the sink's I/O lock is held, so it sees
+    writes and rotations of ``path`` in order. Keep it cheap.
+    """
+    _WRITER.add_write_listener(path, listener)
+
+
+def flush_log_sinks(timeout: float | None = 5.0) -> bool:
+    return _WRITER.flush(timeout)
+
+
+def shutdown_log_sinks(timeout: float | None = 5.0) -> None:
+    _WRITER.shutdown(timeout)
+
+
+def log_sink_stats() -> Dict[str, Dict[str, int]]:
+    """Per-path written / dropped / errors counters."""
+    return _WRITER.stats()
+
+
+def _current_inode(path: Path) -> int | None:
+    try:
+        return os.stat(path).st_ino
+    except OSError:
+        return None
+
+
+def _close_quietly(handle: IO[str]) -> None:
+    try:
+        handle.close()
+    except Exception:
+        pass
+
+
+atexit.register(shutdown_log_sinks)
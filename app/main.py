@@ -2,13 +2,23 @@
 
 from __future__ import annotations
 
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import FastAPI, Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
 
 from app.routes.asr import router as asr_router
+from app.routes.debug import router as debug_router
 from app.routes.decide import router as decide_router
+from app.logging.sink import shutdown_log_sinks
 from app.routes.health import router as health_router
+from app.routes.metrics import router as metrics_router
+from app.services.decision_pool import shutdown_decision_pool
+from contracts.registry import warm_up as warm_up_contracts
 from llm_policy.bootstrap import bootstrap_llm_caller
+from llm_policy.http_pool import aclose_async_http_clients, close_http_clients
+from llm_policy.runtime import shutdown_hedge_executor
 
 
 class APIVersionMiddleware(BaseHTTPMiddleware):
@@ -21,14 +31,27 @@ class APIVersionMiddleware(BaseHTTPMiddleware):
         return response
 
 
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    yield
+    shutdown_decision_pool()
+    shutdown_hedge_executor()
+    close_http_clients()
+    await aclose_async_http_clients()
+    shutdown_log_sinks()
+
+
 def create_app() -> FastAPI:
     bootstrap_llm_caller()
-    app = FastAPI(title="HomeTask Decision API")
+    warm_up_contracts()
+    app = FastAPI(title="HomeTask Decision API", lifespan=lifespan)
     app.add_middleware(APIVersionMiddleware)
     app.include_router(asr_router, prefix="/v1")
     app.include_router(decide_router, prefix="/v1")
     app.include_router(decide_router)
     app.include_router(health_router)
+    app.include_router(metrics_router)
+    app.include_router(debug_router)
     return app
 
 
@@ -0,0 +1,300 @@
+"""In-process metrics registry rendered in the Prometheus text format.
+
+Counters and fixed-bucket histograms are created once at import time by the
+modules that record them and looked up by label values on use::
+
+    STAGE_MS = histogram("pipeline_stage_ms", "Decision pipeline stage latency", ("stage",))
+    STAGE_MS.labels("validate_command").observe(0.42)
+    RUNS = counter("agent_runs_total", "Agent runs", ("agent_id", "status"))
+    RUNS.labels("agent-x", "ok").inc()
+
+``labels`` caches one child per label tuple, so the hot path after the first
+sample for a label set is a dict lookup, a thread-local shard fetch, a
+``bisect`` over a bucket tuple and two in-place list additions (no lock, no
+new containers). Callers with fixed labels may keep the child to skip the
+lookup.
+
+Scrape-time values that already live elsewhere (pool and sink stats) are
+exported through ``register_collector`` callbacks instead of being mirrored.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+# Milliseconds; covers sub-millisecond pipeline stages up to slow LLM calls.
+DEFAULT_MS_BUCKETS: Tuple[float, ...] = (
+    0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000,
+)
+
+Sample = Tuple[str, Dict[str, str], float]
+Collector = Callable[[], Iterable[Tuple[str, str, str, Sequence[Sample]]]]
+
+
+class _Sharded:
+    """Per-thread value slots: writers touch only their own list, without a lock.
+
+    Readers sum every shard; a scrape may miss an increment that is in flight,
+    but no increment is ever lost. Shards of finished threads are kept so their
+    counts survive.
+    """
+
+    __slots__ = ("_local", "_shards", "_lock", "_width")
+
+    def __init__(self, width: int) -> None:
+        self._local = threading.local()
+        self._shards: List[list] = []
+        self._lock = threading.Lock()
+        self._width = width
+
+    def _new_shard(self) -> list:
+        shard = [0] * (self._width - 1) + [0.0]
+        with self._lock:
+            self._shards.append(shard)
+        self._local.shard = shard
+        return shard
+
+    def clear(self) -> None:
+        with self._lock:
+            for shard in self._shards:
+                shard[:] = [0] * (self._width - 1) + [0.0]
+
+    def _totals(self) -> list:
+        totals = [0] * (self._width - 1) + [0.0]
+        with self._lock:
+            shards = list(self._shards)
+        for shard in shards:
+            for index, value in enumerate(shard):
+                totals[index] += value
+        return totals
+
+
+class CounterChild(_Sharded):
+    __slots__ = ()
+
+    def __init__(self) -> None:
+        super().__init__(1)
+
+    def inc(self, amount: float = 1.0) -> None:
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._new_shard()
+        shard[0] += amount
+
+    @property
+    def value(self) -> float:
+        return self._totals()[0]
+
+
+class HistogramChild(_Sharded):
+    # Shard layout: one count per finite bound, the +Inf overflow count, then the sum.
+    __slots__ = ("_bounds",)
+
+    def __init__(self, bounds: Tuple[float, ...]) -> None:
+        super().__init__(len(bounds) + 2)
+        self._bounds = bounds
+
+    def observe(self, value: float) -> None:
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._new_shard()
+        shard[bisect_left(self._bounds, value)] += 1
+        shard[-1] += value
+
+    def snapshot(self) -> Tuple[List[int], float, int]:
+        """Per-bucket (non-cumulative) counts, sum and count across all threads."""
+        totals = self._totals()
+        counts = [int(value) for value in totals[:-1]]
+        return counts, totals[-1], sum(counts)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str]) -> None:
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _child(self, values: Tuple[str, ...]):
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = self._children[values] = self._new_child()
+        return child
+
+    def _new_child(self):  # pragma: no cover - overridden
+        raise NotImplementedError
+
+    def children(self) -> List[Tuple[Tuple[str, ...], object]]:
+        with self._lock:
+            return list(self._children.items())
+
+    def reset(self) -> None:
+        # Zero in place: callers may hold children returned by ``labels``.
+        for _values, child in self.children():
+            child.clear()
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def labels(self, *values: str) -> CounterChild:
+        return self._child(values)
+
+    def _new_child(self) -> CounterChild:
+        return CounterChild()
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str], buckets: Sequence[float]) -> None:
+        super().__init__(name, help_text, labelnames)
+        bounds = tuple(sorted(float(bound) for bound in buckets if not math.isinf(bound)))
+        if not bounds:
+            raise ValueError(f"{name} needs at least one finite bucket")
+        self.buckets = bounds
+
+    def labels(self, *values: str) -> HistogramChild:
+        return self._child(values)
+
+    def _new_child(self) -> HistogramChild:
+        return HistogramChild(self.buckets)
+
+
+class MetricsRegistry:
+    """Named metrics plus scrape-time collectors; renders the text exposition format."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: Dict[str, Collector] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_MS_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def register_collector(self, name: str, collector: Collector) -> None:
+        """Add (or replace) a callback yielding ``(name, kind, help, samples)`` at scrape time."""
+        with self._lock:
+            self._collectors[name] = collector
+
+    def reset(self) -> None:
+        """Zero every recorded sample (metric definitions and children stay registered)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.reset()
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(_render_metric(metric))
+        for collector in collectors:
+            for name, kind, help_text, samples in collector():
+                lines.append(f"# HELP {name} {_escape_help(help_text)}")
+                lines.append(f"# TYPE {name} {kind}")
+                for sample_name, labels, value in samples:
+                    lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"metric {metric.name} already registered with a different shape")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+
+def _render_metric(metric: _Metric) -> List[str]:
+    lines = [f"# HELP {metric.name} {_escape_help(metric.help)}", f"# TYPE {metric.name} {metric.kind}"]
+    for values, child in sorted(metric.children(), key=lambda item: item[0]):
+        labels = dict(zip(metric.labelnames, values))
+        if isinstance(child, CounterChild):
+            lines.append(f"{metric.name}{_format_labels(labels)} {_format_value(child.value)}")
+            continue
+        counts, total, count = child.snapshot()
+        cumulative = 0
+        for bound, bucket_count in zip(metric.buckets, counts):
+            cumulative += bucket_count
+            bucket_labels = {**labels, "le": _format_value(bound)}
+            lines.append(f"{metric.name}_bucket{_format_labels(bucket_labels)} {cumulative}")
+        lines.append(f"{metric.name}_bucket{_format_labels({**labels, 'le': '+Inf'})} {count}")
+        lines.append(f"{metric.name}_sum{_format_labels(labels)} {_format_value(total)}")
+        lines.append(f"{metric.name}_count{_format_labels(labels)} {count}")
+    return lines
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    body = ",".join(f'{key}="{_escape_label(str(value))}"' for key, value in labels.items())
+    return "{" + body + "}"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _escape_help(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+REGISTRY = MetricsRegistry()
+
+
+def counter(name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+    return REGISTRY.counter(name, help_text, labelnames)
+
+
+def histogram(
+    name: str,
+    help_text: str,
+    labelnames: Sequence[str] = (),
+    buckets: Sequence[float] = DEFAULT_MS_BUCKETS,
+) -> Histogram:
+    return REGISTRY.histogram(name, help_text, labelnames, buckets)
+
+
+def register_collector(name: str, collector: Collector) -> None:
+    REGISTRY.register_collector(name, collector)
+
+
+def render_metrics() -> str:
+    return REGISTRY.render()
+
+
+def reset_metrics() -> None:
+    REGISTRY.reset()
@@ -13,10 +13,14 @@ from app.asr.config import DEFAULT_MODEL, DEFAULT_PROVIDER, AsrConfig, load_asr_
 from app.asr.errors import AsrError, FileTooLargeError
 from app.asr.multipart import AsrAudioFile, parse_single_audio_file
 from app.logging.asr_log import append_asr_log, file_size_bucket
+from app.metrics import counter, histogram
 from app.models.asr_models import AsrTranscriptionResponse
 
 MULTIPART_OVERHEAD_BYTES = 64 * 1024
 
+ASR_REQUEST_MS = histogram("asr_request_ms", "ASR transcription request latency (ms)", ("provider",))
+ASR_REQUESTS = counter("asr_requests_total", "ASR transcription requests", ("provider", "status"))
+
 router = APIRouter()
 
 
@@ -38,11 +42,13 @@ async def transcribe_asr(request: Request):
         )
         result = CloudRuAsrClient(config).transcribe(audio)
     except AsrError as exc:
+        provider = config.provider if config else DEFAULT_PROVIDER
+        _record_asr(provider, exc.error_type, started)
         append_asr_log(
             {
                 "request_id": trace_id,
                 "trace_id": trace_id,
-                "provider": config.provider if config else DEFAULT_PROVIDER,
+                "provider": provider,
                 "model": config.model if config else DEFAULT_MODEL,
                 "status": "error",
                 "latency_ms": int((time.monotonic() - started) * 1000),
@@ -61,6 +67,7 @@ async def transcribe_asr(request: Request):
             },
         )
 
+    _record_asr(result.provider, "ok", started)
     append_asr_log(
         {
             "request_id": trace_id,
@@ -93,3 +100,8 @@ def _reject_large_content_length(request: Request, max_file_size_bytes: int) ->
         return
     if content_length > max_file_size_bytes + MULTIPART_OVERHEAD_BYTES:
         raise FileTooLargeError("Audio file exceeds ASR_MAX_FILE_SIZE_MB.")
+
+
+def _record_asr(provider: str, status: str, started: float) -> None:
+    ASR_REQUEST_MS.labels(provider).observe((time.monotonic() - started) * 1000)
+    ASR_REQUESTS.labels(provider, status).inc()
@@ -0,0 +1,32 @@
+"""Internal debug endpoints; 404 unless DEBUG_ROUTES_ENABLED is set."""
+
+from __future__ import annotations
+
+import os
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, HTTPException, status
+
+from app.logging.decision_index import find_decisions
+from app.logging.decision_log import resolve_log_path
+
+
+def debug_routes_enabled() -> bool:
+    return os.getenv("DEBUG_ROUTES_ENABLED", "false").strip().lower() in {"1", "true", "yes"}
+
+
+router = APIRouter(prefix="/debug")
+
+
+@router.get("/decisions")
+def decisions(trace_id: Optional[str] = None, command_id: Optional[str] = None) -> Dict[str, Any]:
+    if not debug_routes_enabled():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not trace_id and not command_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="trace_id or command_id is required",
+        )
+    # Plain ``def``: FastAPI runs the index search and segment reads in its threadpool.
+    records = find_decisions(resolve_log_path(), trace_id=trace_id or None, command_id=command_id or None)
+    return {"decisions": records}
@@ -2,24 +2,73 @@
 
 from __future__ import annotations
 
+from typing import Any, Dict
 from uuid import uuid4
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Response, status
 
 from app.models.api_models import CommandRequest, DecisionResponse
+from app.serialization import dumps_bytes
+from app.services.decision_pool import (
+    DecisionPoolSaturatedError,
+    decide_execution_mode,
+    get_decision_pool,
+)
 from app.services.decision_service import (
     CommandValidationError,
     decide,
+    decide_async,
 )
+from routers.config import get_strategy_name
 
 
 router = APIRouter()
 
+_DECISION_FIELDS = tuple(DecisionResponse.model_fields)
+
+
+class DecisionJSONResponse(Response):
+    """Decision already validated against decision.schema.json, serialized once.
+
+    Mirrors ``DecisionResponse`` with ``exclude_none`` (field order, top-level
+    None dropped, float confidence) without building the Pydantic model again.
+    """
+
+    media_type = "application/json"
 
-@router.post("/decide", response_model=DecisionResponse, response_model_exclude_none=True)
-async def decide_route(command: CommandRequest) -> DecisionResponse:
+    def render(self, content: Dict[str, Any]) -> bytes:
+        body = {key: content[key] for key in _DECISION_FIELDS if content.get(key) is not None}
+        if "confidence" in body:
+            body["confidence"] = float(body["confidence"])
+        return dumps_bytes(body)
+
+
+@router.post(
+    "/decide",
+    response_model=DecisionResponse,
+    response_model_exclude_none=True,
+    response_class=DecisionJSONResponse,
+)
+async def decide_route(command: CommandRequest) -> Response:
+    payload = command.model_dump(exclude_none=True)
     try:
-        decision = decide(command.model_dump(exclude_none=True))
+        if get_strategy_name() == "v2_async":
+            # LLM stages already run off the loop; no pool thread (or helper
+            # event loop) per request.
+            if decide_execution_mode() == "inline":
+                decision = await decide_async(payload)
+            else:
+                decision = await get_decision_pool().run_async(decide_async, payload)
+        elif decide_execution_mode() == "inline":
+            decision = decide(payload)
+        else:
+            decision = await get_decision_pool().run(decide, payload)
+    except DecisionPoolSaturatedError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={"error": "Decision pipeline is saturated, retry later."},
+            headers={"Retry-After": str(exc.retry_after_s)},
+        )
     except CommandValidationError:
         # Safety net: Pydantic already validates input, but jsonschema
         # inside decide() may catch edge cases. Re-raise as 400.
@@ -34,4 +83,6 @@ async def decide_route(command: CommandRequest) -> DecisionResponse:
             detail={"error": "Internal error.", "trace_id": trace_id},
         )
 
-    return DecisionResponse.model_validate(decision)
+    # decide() validated the decision with jsonschema; the response model
+    # above only documents the shape in OpenAPI.
+    return DecisionJSONResponse(decision)
@@ -0,0 +1,90 @@
+"""Prometheus scrape endpoint for the in-process metrics registry."""
+
+from __future__ import annotations
+
+from typing import Iterable, List, Sequence, Tuple
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.logging.sampling import log_sampling_stats
+from app.logging.sink import log_sink_stats
+from app.metrics import Sample, register_collector, render_metrics
+from llm_policy.breaker import STATE_VALUES, breaker_stats
+from llm_policy.http_pool import http_pool_stats
+from llm_policy.scheduler import scheduler_stats
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+router = APIRouter()
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    return PlainTextResponse(render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+def _http_pool_metrics() -> Iterable[Tuple[str, str, str, Sequence[Sample]]]:
+    pools = http_pool_stats()
+    fields = (
+        ("llm_http_pool_requests_total", "counter", "requests", "Requests admitted to a pooled LLM client"),
+        ("llm_http_pool_waited_total", "counter", "waited", "Requests that waited for a free connection"),
+        ("llm_http_pool_wait_ms_total", "counter", "wait_ms_total", "Time spent waiting for a connection (ms)"),
+        ("llm_http_pool_wait_ms_max", "gauge", "wait_ms_max", "Longest connection wait (ms)"),
+        ("llm_http_pool_timeouts_total", "counter", "pool_timeouts", "Requests that timed out waiting"),
+    )
+    for name, kind, key, help_text in fields:
+        samples: List[Sample] = [(name, {"pool": pool}, stats[key]) for pool, stats in sorted(pools.items())]
+        yield name, kind, help_text, samples
+
+
+def _log_sink_metrics() -> Iterable[Tuple[str, str, str, Sequence[Sample]]]:
+    samples: List[Sample] = []
+    for path, stats in sorted(log_sink_stats().items()):
+        for outcome in ("written", "dropped", "errors"):
+            samples.append(("log_sink_records_total", {"path": path, "outcome": outcome}, stats[outcome]))
+    yield "log_sink_records_total", "counter", "JSONL sink records by outcome", samples
+
+
+def _log_sampling_metrics() -> Iterable[Tuple[str, str, str, Sequence[Sample]]]:
+    samples: List[Sample] = []
+    for sink, stats in sorted(log_sampling_stats().items()):
+        for outcome in ("kept", "forced", "sampled_out", "rate_limited"):
+            samples.append(("log_sampling_records_total", {"sink": sink, "outcome": outcome}, stats[outcome]))
+    yield "log_sampling_records_total", "counter", "Diagnostic log records by sampling outcome", samples
+
+
+def _llm_circuit_metrics() -> Iterable[Tuple[str, str, str, Sequence[Sample]]]:
+    breakers = []
+    for (provider, model, profile), stats in sorted(breaker_stats().items()):
+        labels = {"provider": provider, "model": model, "profile": profile}
+        breakers.append((labels, {**stats, "state": STATE_VALUES[stats["state"]]}))
+    fields = (
+        ("llm_circuit_state", "gauge", "state", "LLM circuit state (0 closed, 1 half-open, 2 open)"),
+        ("llm_circuit_opened_total", "counter", "opened", "Times the LLM circuit opened"),
+        ("llm_circuit_rejected_total", "counter", "rejected", "LLM calls failed fast by an open circuit"),
+        ("llm_adaptive_timeout_ms", "gauge", "timeout_ms", "Current adaptive LLM call timeout (ms)"),
+    )
+    for name, kind, key, help_text in fields:
+        samples: List[Sample] = [(name, labels, stats[key]) for labels, stats in breakers if stats[key] is not None]
+        yield name, kind, help_text, samples
+
+
+def _llm_scheduler_metrics() -> Iterable[Tuple[str, str, str, Sequence[Sample]]]:
+    stats = scheduler_stats()
+    fields = (
+        ("llm_scheduler_in_flight", "in_flight", "LLM calls holding a scheduler slot"),
+        ("llm_scheduler_queued", "queued", "LLM calls waiting for a scheduler slot"),
+    )
+    for name, key, help_text in fields:
+        samples: List[Sample] = [
+            (name, {"priority": priority}, value) for priority, value in stats.get(key, {}).items()
+        ]
+        yield name, "gauge", help_text, samples
+
+
+register_collector("llm_http_pool", _http_pool_metrics)
+register_collector("llm_circuit", _llm_circuit_metrics)
+register_collector("llm_scheduler", _llm_scheduler_metrics)
+register_collector("log_sink", _log_sink_metrics)
+register_collector("log_sampling", _log_sampling_metrics)
@@ -0,0 +1,66 @@
+"""JSON serialization backend shared by log sinks and HTTP responses.
+
+Uses ``orjson`` when it is installed (``pip install .[perf]``) and the stdlib
+``json`` module otherwise; JSON_BACKEND=stdlib forces the fallback. Both
+backends emit compact UTF-8 JSON without ASCII escaping. Values orjson
+rejects (integers wider than 64 bits, for example) are retried through the
+stdlib encoder, so switching backends never turns a serializable record into
+an error.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from functools import lru_cache
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised in environments without orjson
+    orjson = None
+
+JSON_BACKENDS = {"auto", "orjson", "stdlib"}
+
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+
+
+@lru_cache(maxsize=1)
+def json_backend() -> str:
+    """Resolved backend name: "orjson" or "stdlib" (read once; see ``cache_clear``)."""
+    requested = os.getenv("JSON_BACKEND", "auto").strip().lower()
+    if requested not in JSON_BACKENDS:
+        requested = "auto"
+    if requested != "stdlib" and orjson is not None:
+        return "orjson"
+    return "stdlib"
+
+
+def dumps_bytes(value: Any) -> bytes:
+    """Serialize ``value`` to compact UTF-8 JSON bytes."""
+    if json_backend() == "orjson":
+        try:
+            return orjson.dumps(value, option=_ORJSON_OPTIONS)
+        except TypeError:
+            pass
+    return _stdlib_dumps(value).encode("utf-8")
+
+
+def dumps(value: Any) -> str:
+    """Serialize ``value`` to a compact JSON string."""
+    if json_backend() == "orjson":
+        try:
+            return orjson.dumps(value, option=_ORJSON_OPTIONS).decode("utf-8")
+        except TypeError:
+            pass
+    return _stdlib_dumps(value)
+
+
+def loads(data: str | bytes) -> Any:
+    if json_backend() == "orjson":
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _stdlib_dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
@@ -0,0 +1,145 @@
+"""Bounded worker pool for the synchronous decision pipeline.
+
+``decision_service.decide`` blocks on file I/O, schema validation and LLM
+calls. In ``pool`` mode the /decide route runs it on a dedicated thread pool
+so the event loop keeps serving other requests. The async pipeline
+(``decision_service.decide_async``) is awaited on the loop instead and only
+takes an admission slot (``run_async``). Admission is bounded by
+``max_workers + queue_depth``; once every slot is taken new requests are
+rejected immediately (503 + Retry-After) instead of queueing without limit.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, TypeVar
+
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_QUEUE_DEPTH = 16
+DEFAULT_RETRY_AFTER_S = 1
+
+EXECUTION_MODES = {"pool", "inline"}
+
+T = TypeVar("T")
+
+
+def decide_execution_mode() -> str:
+    mode = os.getenv("DECIDE_EXECUTION_MODE", "pool").strip().lower()
+    return mode if mode in EXECUTION_MODES else "pool"
+
+
+def decide_pool_max_workers() -> int:
+    return _positive_int("DECIDE_POOL_MAX_WORKERS", DEFAULT_MAX_WORKERS)
+
+
+def decide_pool_queue_depth() -> int:
+    raw = os.getenv("DECIDE_POOL_QUEUE_DEPTH", str(DEFAULT_QUEUE_DEPTH))
+    try:
+        return max(0, int(raw))
+    except ValueError:
+        return DEFAULT_QUEUE_DEPTH
+
+
+def decide_retry_after_s() -> int:
+    return _positive_int("DECIDE_RETRY_AFTER_S", DEFAULT_RETRY_AFTER_S)
+
+
+def _positive_int(name: str, default: int) -> int:
+    raw = os.getenv(name, str(default))
+    try:
+        value = int(raw)
+    except ValueError:
+        return default
+    return value if value > 0 else default
+
+
+class DecisionPoolSaturatedError(RuntimeError):
+    def __init__(self, retry_after_s: int) -> None:
+        super().__init__("decision pool saturated")
+        self.retry_after_s = retry_after_s
+
+
+class DecisionPool:
+    """Thread pool with a hard cap on running plus queued calls."""
+
+    def __init__(self, max_workers: int, queue_depth: int, retry_after_s: int = DEFAULT_RETRY_AFTER_S) -> None:
+        self.max_workers = max_workers
+        self.queue_depth = queue_depth
+        self.retry_after_s = retry_after_s
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="decide")
+        self._slots = threading.BoundedSemaphore(max_workers + queue_depth)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run ``fn(*args)`` on the pool; raise ``DecisionPoolSaturatedError`` if full.
+
+        A cancelled caller does not cancel the running call; its slot is
+        released only when the call actually finishes.
+        """
+        if not self._slots.acquire(blocking=False):
+            raise DecisionPoolSaturatedError(self.retry_after_s)
+        with self._lock:
+            self._in_flight += 1
+        context = contextvars.copy_context()
+        try:
+            future = self._executor.submit(context.run, fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(lambda _future: self._release())
+        return await asyncio.wrap_future(future)
+
+    async def run_async(self, fn: Callable[..., Awaitable[T]], *args: Any) -> T:
+        """Await ``fn(*args)`` on the event loop under the same admission limit as ``run``."""
+        if not self._slots.acquire(blocking=False):
+            raise DecisionPoolSaturatedError(self.retry_after_s)
+        with self._lock:
+            self._in_flight += 1
+        try:
+            return await fn(*args)
+        finally:
+            self._release()
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+    def _release(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+
+_POOL: DecisionPool | None = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_decision_pool() -> DecisionPool:
+    global _POOL
+    pool = _POOL
+    if pool is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                _POOL = DecisionPool(
+                    max_workers=decide_pool_max_workers(),
+                    queue_depth=decide_pool_queue_depth(),
+                    retry_after_s=decide_retry_after_s(),
+                )
+            pool = _POOL
+    return pool
+
+
+def shutdown_decision_pool(wait: bool = True) -> None:
+    global _POOL
+    with _POOL_LOCK:
+        pool, _POOL = _POOL, None
+    if pool is not None:
+        pool.shutdown(wait=wait)
@@ -2,23 +2,15 @@
 
 from __future__ import annotations
 
-import json
-from pathlib import Path
 from typing import Any, Dict
 
-from jsonschema import ValidationError, validate
+from jsonschema import ValidationError
 
 from app.logging.decision_log import append_decision_log, append_decision_text
+from app.tracing import span
+from contracts import registry as contract_registry
 from routers.factory import decide as router_decide
-
-BASE_DIR = Path(__file__).resolve().parents[2]
-SCHEMA_DIR = BASE_DIR / "contracts" / "schemas"
-COMMAND_SCHEMA_PATH = SCHEMA_DIR / "command.schema.json"
-DECISION_SCHEMA_PATH = SCHEMA_DIR / "decision.schema.json"
-
-
-def _load_schema(path: Path) -> Dict[str, Any]:
-    return json.loads(path.read_text(encoding="utf-8"))
+from routers.factory import decide_async as router_decide_async
 
 
 class CommandValidationError(Exception):
@@ -28,25 +20,38 @@ class CommandValidationError(Exception):
 
 
 def validate_command(command: Dict[str, Any]) -> None:
-    schema = _load_schema(COMMAND_SCHEMA_PATH)
     try:
-        validate(instance=command, schema=schema)
+        contract_registry.validate(contract_registry.COMMAND_SCHEMA, command)
     except ValidationError as exc:
         raise CommandValidationError(exc) from exc
 
 
 def validate_decision(decision: Dict[str, Any]) -> None:
-    schema = _load_schema(DECISION_SCHEMA_PATH)
-    validate(instance=decision, schema=schema)
+    contract_registry.validate(contract_registry.DECISION_SCHEMA, decision)
 
 
 def decide(command: Dict[str, Any]) -> Dict[str, Any]:
-    validate_command(command)
-    decision = router_decide(command)
+    with span("decision", command_id=command.get("command_id")) as decision_span:
+        validate_command(command)
+        decision = router_decide(command)
+        _finish_decision(command, decision, decision_span)
+    return decision
+
+
+async def decide_async(command: Dict[str, Any]) -> Dict[str, Any]:
+    """``decide`` for async routers (DECISION_ROUTER_STRATEGY=v2_async)."""
+    with span("decision", command_id=command.get("command_id")) as decision_span:
+        validate_command(command)
+        decision = await router_decide_async(command)
+        _finish_decision(command, decision, decision_span)
+    return decision
+
+
+def _finish_decision(command: Dict[str, Any], decision: Dict[str, Any], decision_span: Any) -> None:
     validate_decision(decision)
+    decision_span.set_attribute("status", decision.get("status"))
     append_decision_log(decision)
     append_decision_text(command, decision.get("trace_id"))
-    return decision
 
 
 def format_validation_error(error: ValidationError) -> Dict[str, Any]:
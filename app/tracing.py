@@ -0,0 +1,309 @@
+"""Per-request trace spans correlated by trace_id across threads.
+
+Usage::
+
+    with span("router.decide", strategy="v2"):
+        ...                                  # nested spans become children
+    record_span("llm.attempt", latency_ms, profile="cheap")   # already-timed work
+    executor.submit(propagate(func), *args)  # worker spans keep their parent
+
+The current span lives in a ``contextvars.ContextVar``. ``propagate`` copies
+the submitting context into executor threads, so spans opened in a worker
+get the submitter's trace_id and parent span. Root spans take an explicit
+``trace_id`` or generate one; ``current_trace_id`` exposes it so decisions
+and logs can carry the same id.
+
+TRACE_MODE selects the exporter:
+
+- ``off`` (default): ``span`` returns a shared no-op object and
+  ``propagate`` returns the callable unchanged, so call sites cost one cached
+  lookup;
+- ``jsonl``: one flat JSON record per finished span;
+- ``otlp``: one OTLP/JSON ``ExportTraceServiceRequest`` per finished span,
+  the line format of the OpenTelemetry collector file exporter/receiver.
+
+Spans are written through the shared log sink (``app/logging/sink.py``) to
+TRACE_PATH (default ``logs/traces.jsonl``). Attributes must be ids, counts,
+statuses and timings only; never pass user text.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import functools
+import hashlib
+import os
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, TypeVar
+from uuid import uuid4
+
+from app.logging.sink import append_jsonl
+
+TRACE_MODES = {"off", "jsonl", "otlp"}
+DEFAULT_TRACE_PATH = Path("logs/traces.jsonl")
+TRACE_ID_PREFIX = "trace-"
+
+_SPAN_KIND_INTERNAL = 1
+_STATUS_OK = 1
+_STATUS_ERROR = 2
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_CURRENT: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+
+@lru_cache(maxsize=1)
+def trace_mode() -> str:
+    """Resolved TRACE_MODE (read once; ``reset_tracing`` re-reads it)."""
+    mode = os.getenv("TRACE_MODE", "off").strip().lower()
+    return mode if mode in TRACE_MODES else "off"
+
+
+def tracing_enabled() -> bool:
+    return trace_mode() != "off"
+
+
+def resolve_trace_path() -> Path:
+    return Path(os.getenv("TRACE_PATH", str(DEFAULT_TRACE_PATH)))
+
+
+def reset_tracing() -> None:
+    trace_mode.cache_clear()
+
+
+class Span:
+    __slots__ = (
+        "name",
+        "trace_id",
+        "span_id",
+        "parent_span_id",
+        "attributes",
+        "start_ns",
+        "end_ns",
+        "thread",
+        "status",
+        "error_type",
+        "_token",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_span_id: Optional[str],
+        attributes: Dict[str, Any],
+        start_ns: Optional[int] = None,
+    ) -> None:
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid4().hex[:16]
+        self.parent_span_id = parent_span_id
+        self.attributes = attributes
+        self.start_ns = time.time_ns() if start_ns is None else start_ns
+        self.end_ns: Optional[int] = None
+        self.thread = threading.current_thread().name
+        self.status = "ok"
+        self.error_type: Optional[str] = None
+        self._token: Optional[contextvars.Token] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_error(self, error_type: str) -> None:
+        self.status = "error"
+        self.error_type = error_type
+
+    def __enter__(self) -> "Span":
+        self._token = _CURRENT.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            self.set_error(exc_type.__name__)
+        if self._token is not None:
+            _CURRENT.reset(self._token)
+            self._token = None
+        self.finish()
+
+    def finish(self, end_ns: Optional[int] = None) -> None:
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns() if end_ns is None else end_ns
+        _export(self)
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end - self.start_ns) / 1e6
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    trace_id = None
+    span_id = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        return None
+
+    def set_error(self, error_type: str) -> None:
+        return None
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        return None
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def span(name: str, *, trace_id: Optional[str] = None, **attributes: Any) -> Any:
+    """Context manager for a span; child of the current span, or a new root.
+
+    ``trace_id`` only applies to root spans (a child always joins its
+    parent's trace).
+    """
+    if trace_mode() == "off":
+        return NOOP_SPAN
+    parent = _CURRENT.get()
+    if parent is not None:
+        return Span(name, parent.trace_id, parent.span_id, attributes)
+    return Span(name, trace_id or new_trace_id(), None, attributes)
+
+
+def record_span(
+    name: str,
+    duration_ms: Optional[float],
+    *,
+    error_type: Optional[str] = None,
+    **attributes: Any,
+) -> None:
+    """Record an already-finished child span that ended now and lasted ``duration_ms``.
+
+    For work timed elsewhere (generator-driven LLM attempts, agent runs) where
+    a ``with`` block cannot wrap the call. An ``error_type`` marks the span as
+    failed. No-op without a current span.
+    """
+    if trace_mode() == "off":
+        return
+    parent = _CURRENT.get()
+    if parent is None:
+        return
+    end_ns = time.time_ns()
+    start_ns = end_ns - int((duration_ms or 0) * 1e6)
+    child = Span(name, parent.trace_id, parent.span_id, attributes, start_ns=start_ns)
+    if error_type:
+        child.set_error(error_type)
+    child.finish(end_ns)
+
+
+def annotate_span(*, error_type: Optional[str] = None, **attributes: Any) -> None:
+    """Set attributes (and an error) on the current span, if any."""
+    if trace_mode() == "off":
+        return
+    current = _CURRENT.get()
+    if current is None:
+        return
+    current.attributes.update(attributes)
+    if error_type:
+        current.set_error(error_type)
+
+
+def current_span() -> Optional[Span]:
+    return _CURRENT.get()
+
+
+def current_trace_id() -> Optional[str]:
+    current = _CURRENT.get()
+    return current.trace_id if current is not None else None
+
+
+def new_trace_id() -> str:
+    return f"{TRACE_ID_PREFIX}{uuid4().hex}"
+
+
+def propagate(func: F) -> F:
+    """Bind ``func`` to a copy of the current context (for ``executor.submit``)."""
+    if trace_mode() == "off":
+        return func
+    return functools.partial(contextvars.copy_context().run, func)  # type: ignore[return-value]
+
+
+def _export(finished: Span) -> None:
+    mode = trace_mode()
+    if mode == "off":
+        return
+    record = to_otlp(finished) if mode == "otlp" else to_record(finished)
+    try:
+        append_jsonl(resolve_trace_path(), record)
+    except Exception:
+        return
+
+
+def to_record(finished: Span) -> Dict[str, Any]:
+    return {
+        "trace_id": finished.trace_id,
+        "span_id": finished.span_id,
+        "parent_span_id": finished.parent_span_id,
+        "name": finished.name,
+        "start_unix_ns": finished.start_ns,
+        "end_unix_ns": finished.end_ns,
+        "duration_ms": round(finished.duration_ms, 3),
+        "thread": finished.thread,
+        "status": finished.status,
+        "error_type": finished.error_type,
+        "attributes": finished.attributes,
+    }
+
+
+def to_otlp(finished: Span) -> Dict[str, Any]:
+    status: Dict[str, Any] = {"code": _STATUS_OK if finished.status == "ok" else _STATUS_ERROR}
+    if finished.error_type:
+        status["message"] = finished.error_type
+    attributes = dict(finished.attributes, **{"thread.name": finished.thread, "trace.id": finished.trace_id})
+    otlp_span = {
+        "traceId": _otlp_trace_id(finished.trace_id),
+        "spanId": finished.span_id,
+        "parentSpanId": finished.parent_span_id or "",
+        "name": finished.name,
+        "kind": _SPAN_KIND_INTERNAL,
+        "startTimeUnixNano": str(finished.start_ns),
+        "endTimeUnixNano": str(finished.end_ns),
+        "attributes": [_otlp_attribute(key, value) for key, value in attributes.items()],
+        "status": status,
+    }
+    return {
+        "resourceSpans": [
+            {
+                "resource": {"attributes": [_otlp_attribute("service.name", _service_name())]},
+                "scopeSpans": [{"scope": {"name": __name__}, "spans": [otlp_span]}],
+            }
+        ]
+    }
+
+
+def _otlp_trace_id(trace_id: str) -> str:
+    """32 hex chars: ``trace-<uuid hex>`` ids map directly, others are hashed."""
+    raw = trace_id[len(TRACE_ID_PREFIX) :] if trace_id.startswith(TRACE_ID_PREFIX) else trace_id
+    if len(raw) == 32 and all(char in "0123456789abcdef" for char in raw):
+        return raw
+    return hashlib.blake2b(trace_id.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": "" if value is None else str(value)}}
+
+
+def _service_name() -> str:
+    return os.getenv("OTEL_SERVICE_NAME", "vr_ai_platform")
@@ -0,0 +1,295 @@
+"""Compile contract JSON schemas into specialised Python validation functions.
+
+Only the keyword subset used by ``contracts/schemas`` is supported; any other
+keyword raises ``UnsupportedSchemaError`` so callers can keep using the
+generic jsonschema validator for that schema.
+
+The generated function answers "is this instance valid?" and nothing else.
+Error reporting stays with jsonschema (``best_match``), which keeps error
+path and message identical to ``format_validation_error`` output.
+
+Usage (inspect generated code):
+    python -m contracts.codegen command
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import numbers
+import re
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping
+
+FastValidator = Callable[[Any], bool]
+
+_ANNOTATION_KEYWORDS = {
+    "$schema",
+    "$id",
+    "$comment",
+    "title",
+    "description",
+    "definitions",
+    "$defs",
+    "default",
+    "examples",
+    # Not asserted by jsonschema without a format_checker.
+    "format",
+}
+_SUPPORTED_KEYWORDS = _ANNOTATION_KEYWORDS | {
+    "$ref",
+    "type",
+    "enum",
+    "const",
+    "required",
+    "properties",
+    "additionalProperties",
+    "items",
+    "minItems",
+    "maxItems",
+    "minLength",
+    "maxLength",
+    "pattern",
+    "minimum",
+    "maximum",
+    "exclusiveMinimum",
+    "exclusiveMaximum",
+    "allOf",
+    "anyOf",
+    "oneOf",
+    "not",
+}
+_TYPE_CHECKS = {
+    "object": "isinstance(x, dict)",
+    "array": "isinstance(x, list)",
+    "string": "isinstance(x, str)",
+    "boolean": "isinstance(x, bool)",
+    "null": "x is None",
+    "number": "(isinstance(x, _Number) and not isinstance(x, bool))",
+    "integer": (
+        "((isinstance(x, int) and not isinstance(x, bool))"
+        " or (isinstance(x, float) and x.is_integer()))"
+    ),
+}
+_NUMBER_GUARD = "isinstance(x, _Number) and not isinstance(x, bool)"
+
+
+class UnsupportedSchemaError(ValueError):
+    pass
+
+
+def generate_source(schema: Mapping[str, Any], *, entrypoint: str = "validate") -> str:
+    """Return Python source defining ``entrypoint(instance) -> bool``."""
+    return _Compiler(schema).generate(entrypoint)
+
+
+def compile_schema(schema: Mapping[str, Any]) -> FastValidator:
+    """Generate, compile and return a fast validity check for ``schema``."""
+    compiler = _Compiler(schema)
+    source = compiler.generate("validate")
+    namespace: Dict[str, Any] = {
+        "_Number": numbers.Number,
+        "_json_equal": _json_equal,
+        "_re": re,
+    }
+    namespace.update(compiler.constants)
+    exec(compile(source, f"<contract-fastpath:{schema.get('$id', 'schema')}>", "exec"), namespace)
+    return namespace["validate"]
+
+
+class _Compiler:
+    def __init__(self, root: Mapping[str, Any]) -> None:
+        self._root = root
+        self._names: Dict[int, str] = {}
+        self._functions: List[tuple[str, List[str]]] = []
+        self.constants: Dict[str, Any] = {}
+
+    def generate(self, entrypoint: str) -> str:
+        root_name = self._function_for(self._root)
+        chunks = []
+        for name, body in self._functions:
+            chunks.append(f"def {name}(x):\n" + "\n".join(f"    {line}" for line in body))
+        chunks.append(f"{entrypoint} = {root_name}")
+        return "\n\n\n".join(chunks) + "\n"
+
+    def _function_for(self, schema: Any) -> str:
+        key = id(schema)
+        name = self._names.get(key)
+        if name is not None:
+            return name
+        name = f"_v{len(self._names)}"
+        self._names[key] = name
+        slot = len(self._functions)
+        self._functions.append((name, []))
+        self._functions[slot] = (name, self._body(schema))
+        return name
+
+    def _constant(self, prefix: str, value: Any) -> str:
+        name = f"_{prefix}{len(self.constants)}"
+        self.constants[name] = value
+        return name
+
+    def _body(self, schema: Any) -> List[str]:
+        if schema is True:
+            return ["return True"]
+        if schema is False:
+            return ["return False"]
+        if not isinstance(schema, Mapping):
+            raise UnsupportedSchemaError(f"schema must be an object or boolean, got {type(schema).__name__}")
+        unknown = set(schema) - _SUPPORTED_KEYWORDS
+        if unknown:
+            raise UnsupportedSchemaError(f"unsupported keywords: {', '.join(sorted(unknown))}")
+
+        lines: List[str] = []
+        if "$ref" in schema:
+            target = self._function_for(self._resolve_ref(schema["$ref"]))
+            lines.append(f"if not {target}(x): return False")
+        if "type" in schema:
+            lines.append(f"if not {self._type_condition(schema['type'])}: return False")
+        if "enum" in schema:
+            lines.append(self._enum_check(list(schema["enum"])))
+        if "const" in schema:
+            lines.append(self._enum_check([schema["const"]]))
+
+        declared = schema.get("type")
+        lines.extend(self._guarded("object", declared, "isinstance(x, dict)", self._object_checks(schema)))
+        lines.extend(self._guarded("array", declared, "isinstance(x, list)", self._array_checks(schema)))
+        lines.extend(self._guarded("string", declared, "isinstance(x, str)", self._string_checks(schema)))
+        lines.extend(self._guarded("number", declared, _NUMBER_GUARD, self._number_checks(schema)))
+
+        for subschema in schema.get("allOf", []):
+            lines.append(f"if not {self._function_for(subschema)}(x): return False")
+        if "anyOf" in schema:
+            calls = " or ".join(f"{self._function_for(sub)}(x)" for sub in schema["anyOf"])
+            lines.append(f"if not ({calls}): return False")
+        if "oneOf" in schema:
+            calls = ", ".join(f"{self._function_for(sub)}(x)" for sub in schema["oneOf"])
+            lines.append(f"if ({calls},).count(True) != 1: return False")
+        if "not" in schema:
+            lines.append(f"if {self._function_for(schema['not'])}(x): return False")
+        lines.append("return True")
+        return lines
+
+    @staticmethod
+    def _guarded(family: str, declared: Any, condition: str, checks: List[str]) -> List[str]:
+        if not checks:
+            return []
+        if declared == family:
+            # The type check above already returned False for other types.
+            return checks
+        return [f"if {condition}:"] + [f"    {line}" for line in checks]
+
+    def _object_checks(self, schema: Mapping[str, Any]) -> List[str]:
+        checks: List[str] = []
+        for key in schema.get("required", []):
+            checks.append(f"if {key!r} not in x: return False")
+        properties = schema.get("properties", {})
+        for key, subschema in properties.items():
+            if subschema is True or subschema == {}:
+                continue
+            name = self._function_for(subschema)
+            checks.append(f"if {key!r} in x and not {name}(x[{key!r}]): return False")
+        additional = schema.get("additionalProperties", True)
+        if additional is False:
+            known = self._constant("P", frozenset(properties))
+            checks.append("for k in x:")
+            checks.append(f"    if k not in {known}: return False")
+        elif additional is not True and additional != {}:
+            known = self._constant("P", frozenset(properties))
+            name = self._function_for(additional)
+            checks.append("for k, v in x.items():")
+            checks.append(f"    if k not in {known} and not {name}(v): return False")
+        return checks
+
+    def _array_checks(self, schema: Mapping[str, Any]) -> List[str]:
+        checks: List[str] = []
+        if "minItems" in schema:
+            checks.append(f"if len(x) < {int(schema['minItems'])}: return False")
+        if "maxItems" in schema:
+            checks.append(f"if len(x) > {int(schema['maxItems'])}: return False")
+        items = schema.get("items", True)
+        if isinstance(items, list):
+            raise UnsupportedSchemaError("tuple-form items is not supported")
+        if items is not True and items != {}:
+            name = self._function_for(items)
+            checks.append("for item in x:")
+            checks.append(f"    if not {name}(item): return False")
+        return checks
+
+    def _string_checks(self, schema: Mapping[str, Any]) -> List[str]:
+        checks: List[str] = []
+        if "minLength" in schema:
+            checks.append(f"if len(x) < {int(schema['minLength'])}: return False")
+        if "maxLength" in schema:
+            checks.append(f"if len(x) > {int(schema['maxLength'])}: return False")
+        if "pattern" in schema:
+            pattern = self._constant("R", re.compile(schema["pattern"]))
+            checks.append(f"if {pattern}.search(x) is None: return False")
+        return checks
+
+    def _number_checks(self, schema: Mapping[str, Any]) -> List[str]:
+        checks: List[str] = []
+        bounds = (
+            ("minimum", "<"),
+            ("maximum", ">"),
+            ("exclusiveMinimum", "<="),
+            ("exclusiveMaximum", ">="),
+        )
+        for keyword, operator in bounds:
+            if keyword in schema:
+                checks.append(f"if x {operator} {schema[keyword]!r}: return False")
+        return checks
+
+    def _type_condition(self, declared: Any) -> str:
+        types = declared if isinstance(declared, list) else [declared]
+        try:
+            conditions = [_TYPE_CHECKS[item] for item in types]
+        except KeyError as exc:
+            raise UnsupportedSchemaError(f"unknown type: {exc.args[0]}") from None
+        return "(" + " or ".join(conditions) + ")"
+
+    def _enum_check(self, values: List[Any]) -> str:
+        if values and all(isinstance(value, str) for value in values):
+            allowed = self._constant("E", frozenset(values))
+            return f"if not (isinstance(x, str) and x in {allowed}): return False"
+        allowed = self._constant("E", tuple(values))
+        return f"if not any(_json_equal(x, value) for value in {allowed}): return False"
+
+    def _resolve_ref(self, ref: str) -> Any:
+        if not ref.startswith("#"):
+            raise UnsupportedSchemaError(f"only local $ref is supported: {ref}")
+        node: Any = self._root
+        for token in ref[1:].split("/")[1:] if ref != "#" else []:
+            token = token.replace("~1", "/").replace("~0", "~")
+            try:
+                node = node[int(token)] if isinstance(node, list) else node[token]
+            except (KeyError, IndexError, ValueError) as exc:
+                raise UnsupportedSchemaError(f"unresolvable $ref: {ref}") from exc
+        return node
+
+
+def _json_equal(left: Any, right: Any) -> bool:
+    if isinstance(left, bool) or isinstance(right, bool):
+        return type(left) is type(right) and left == right
+    if isinstance(left, dict) and isinstance(right, dict):
+        return left.keys() == right.keys() and all(_json_equal(left[key], right[key]) for key in left)
+    if isinstance(left, list) and isinstance(right, list):
+        return len(left) == len(right) and all(_json_equal(a, b) for a, b in zip(left, right))
+    return left == right
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Print generated fast-path validator source for a contract schema.")
+    parser.add_argument("schema", help="Schema name (command, decision) or path to a schema file.")
+    args = parser.parse_args()
+
+    path = Path(args.schema)
+    if not path.exists():
+        path = Path(__file__).resolve().parent / "schemas" / f"{args.schema}.schema.json"
+    schema = json.loads(path.read_text(encoding="utf-8"))
+    print(generate_source(schema))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
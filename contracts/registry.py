@@ -0,0 +1,169 @@
+"""Process-wide registry of compiled contract schema validators.
+
+Schemas under ``contracts/schemas`` are read once per contracts version and
+compiled into ``Draft202012Validator`` instances; the metaschema check runs
+once at compile time instead of on every ``jsonschema.validate`` call.
+
+On first use each schema is additionally compiled into a generated fast-path
+check (see ``contracts.codegen``). Valid instances are accepted by the fast
+path alone; invalid ones are re-checked by jsonschema so callers get the same
+``ValidationError`` path and message as before. With
+``CONTRACTS_FASTPATH_DIFFERENTIAL=true`` both paths run on every call and
+disagreements are logged (jsonschema stays authoritative).
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Mapping, Tuple
+
+from jsonschema import Draft202012Validator
+from jsonschema.exceptions import ValidationError, best_match
+
+from contracts.codegen import FastValidator, UnsupportedSchemaError, compile_schema
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+SCHEMA_DIR = BASE_DIR / "contracts" / "schemas"
+VERSION_PATH = BASE_DIR / "contracts" / "VERSION"
+
+COMMAND_SCHEMA = "command"
+DECISION_SCHEMA = "decision"
+
+_LOCK = threading.Lock()
+_VERSION: str | None = None
+_SCHEMAS: Dict[Tuple[str, str], Dict[str, Any]] = {}
+_VALIDATORS: Dict[Tuple[str, str], Draft202012Validator] = {}
+_FAST_VALIDATORS: Dict[Tuple[str, str], FastValidator | None] = {}
+_LOGGER = logging.getLogger(__name__)
+
+
+def fastpath_differential_enabled() -> bool:
+    return os.getenv("CONTRACTS_FASTPATH_DIFFERENTIAL", "false").strip().lower() in {"1", "true", "yes"}
+
+
+def contracts_version() -> str:
+    """Return the contracts version from ``contracts/VERSION`` (read once)."""
+    global _VERSION
+    version = _VERSION
+    if version is None:
+        with _LOCK:
+            if _VERSION is None:
+                _VERSION = VERSION_PATH.read_text(encoding="utf-8").strip()
+            version = _VERSION
+    return version
+
+
+def schema_path(name: str) -> Path:
+    return SCHEMA_DIR / f"{name}.schema.json"
+
+
+def get_schema(name: str) -> Mapping[str, Any]:
+    """Return the parsed schema ``name`` for the current contracts version."""
+    key = (name, contracts_version())
+    schema = _SCHEMAS.get(key)
+    if schema is None:
+        _compile(key)
+        schema = _SCHEMAS[key]
+    return schema
+
+
+def get_validator(name: str) -> Draft202012Validator:
+    """Return the compiled validator for schema ``name``."""
+    key = (name, contracts_version())
+    validator = _VALIDATORS.get(key)
+    if validator is None:
+        validator = _compile(key)
+    return validator
+
+
+def get_fast_validator(name: str) -> FastValidator | None:
+    """Return the generated fast-path check for ``name`` (None if unsupported)."""
+    key = (name, contracts_version())
+    if key in _FAST_VALIDATORS:
+        return _FAST_VALIDATORS[key]
+    get_validator(name)
+    return _FAST_VALIDATORS[key]
+
+
+def validate(name: str, instance: Any) -> None:
+    """Validate ``instance`` against schema ``name``.
+
+    Raises the same ``ValidationError`` as ``jsonschema.validate`` would
+    (the best match among all errors).
+    """
+    fast = get_fast_validator(name)
+    differential = fastpath_differential_enabled()
+    if fast is not None and not differential and fast(instance):
+        return
+    error = best_match(get_validator(name).iter_errors(instance))
+    if fast is not None and differential:
+        _check_differential(name, fast(instance), error is None)
+    if error is not None:
+        raise error
+
+
+def is_valid(name: str, instance: Any) -> bool:
+    fast = get_fast_validator(name)
+    if fast is None:
+        return get_validator(name).is_valid(instance)
+    if fastpath_differential_enabled():
+        valid = get_validator(name).is_valid(instance)
+        _check_differential(name, fast(instance), valid)
+        return valid
+    return fast(instance)
+
+
+def iter_errors(name: str, instance: Any) -> list[ValidationError]:
+    """Return all validation errors sorted by instance path."""
+    return sorted(get_validator(name).iter_errors(instance), key=lambda err: list(err.path))
+
+
+def warm_up() -> None:
+    """Compile the command and decision validators ahead of the first request."""
+    get_validator(COMMAND_SCHEMA)
+    get_validator(DECISION_SCHEMA)
+
+
+def reset_registry() -> None:
+    """Drop cached version, schemas and validators (used after schema bumps and in tests)."""
+    global _VERSION
+    with _LOCK:
+        _VERSION = None
+        _SCHEMAS.clear()
+        _VALIDATORS.clear()
+        _FAST_VALIDATORS.clear()
+
+
+def _compile(key: Tuple[str, str]) -> Draft202012Validator:
+    with _LOCK:
+        validator = _VALIDATORS.get(key)
+        if validator is not None:
+            return validator
+        name, _version = key
+        schema = json.loads(schema_path(name).read_text(encoding="utf-8"))
+        Draft202012Validator.check_schema(schema)
+        validator = Draft202012Validator(schema)
+        try:
+            fast: FastValidator | None = compile_schema(schema)
+        except UnsupportedSchemaError as exc:
+            _LOGGER.warning("contract fast path unavailable for %s: %s", name, exc)
+            fast = None
+        _SCHEMAS[key] = schema
+        _FAST_VALIDATORS[key] = fast
+        _VALIDATORS[key] = validator
+        return validator
+
+
+def _check_differential(name: str, fast_valid: bool, jsonschema_valid: bool) -> None:
+    if fast_valid == jsonschema_valid:
+        return
+    _LOGGER.warning(
+        "contract fast path mismatch schema=%s fast_valid=%s jsonschema_valid=%s",
+        name,
+        fast_valid,
+        jsonschema_valid,
+    )
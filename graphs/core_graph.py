@@ -5,26 +5,25 @@ from __future__ import annotations
 import json
 import re as _re
 from datetime import datetime, timezone
-from pathlib import Path
 from typing import Any, Dict, List, Optional
 from uuid import uuid4
 
 import time
-from jsonschema import validate
 import logging
 
-_logger = logging.getLogger(__name__)
-
-BASE_DIR = Path(__file__).resolve().parents[1]
-SCHEMA_DIR = BASE_DIR / "contracts" / "schemas"
-CONTRACTS_VERSION_PATH = BASE_DIR / "contracts" / "VERSION"
-
-COMMAND_SCHEMA_PATH = SCHEMA_DIR / "command.schema.json"
-DECISION_SCHEMA_PATH = SCHEMA_DIR / "decision.schema.json"
+from app.metrics import histogram
+from app.tracing import current_trace_id, record_span
+from contracts import registry as contract_registry
 
+_logger = logging.getLogger(__name__)
 
-def load_schema(path: Path) -> Dict[str, Any]:
-    return json.loads(path.read_text(encoding="utf-8"))
+PIPELINE_STAGE_MS = histogram("pipeline_stage_ms", "Decision pipeline stage latency (ms)", ("stage",))
+_STAGE_VALIDATE_COMMAND = PIPELINE_STAGE_MS.labels("validate_command")
+_STAGE_DETECT_INTENT = PIPELINE_STAGE_MS.labels("detect_intent")
+_STAGE_REGISTRY = PIPELINE_STAGE_MS.labels("registry")
+_STAGE_CORE_LOGIC = PIPELINE_STAGE_MS.labels("core_logic")
+_STAGE_VALIDATE_DECISION = PIPELINE_STAGE_MS.labels("validate_decision")
+_STAGE_TOTAL = PIPELINE_STAGE_MS.labels("total")
 
 
 def sample_command() -> Dict[str, Any]:
@@ -312,7 +311,7 @@ def build_clarify_decision(
     missing_fields: Optional[List[str]] = None,
     explanation: str = "Нужны уточнения для выполнения запроса.",
 ) -> Dict[str, Any]:
-    schema_version = CONTRACTS_VERSION_PATH.read_text(encoding="utf-8").strip()
+    schema_version = contract_registry.contracts_version()
     payload: Dict[str, Any] = {"question": question}
     if missing_fields:
         payload["missing_fields"] = missing_fields
@@ -324,7 +323,7 @@ def build_clarify_decision(
         "confidence": 0.35,
         "payload": payload,
         "explanation": explanation,
-        "trace_id": f"trace-{uuid4().hex}",
+        "trace_id": current_trace_id() or f"trace-{uuid4().hex}",
         "schema_version": schema_version,
         "decision_version": "mvp1-graph-0.1",
         "created_at": datetime.now(timezone.utc).isoformat(),
@@ -340,7 +339,7 @@ def build_reject_decision(
     details: Optional[Dict[str, Any]] = None,
     explanation: str = "Unsupported command is rejected without proposed mutation.",
 ) -> Dict[str, Any]:
-    schema_version = CONTRACTS_VERSION_PATH.read_text(encoding="utf-8").strip()
+    schema_version = contract_registry.contracts_version()
     payload: Dict[str, Any] = {
         "code": code,
         "reason": reason,
@@ -357,7 +356,7 @@ def build_reject_decision(
         "confidence": 0.2,
         "payload": payload,
         "explanation": explanation,
-        "trace_id": f"trace-{uuid4().hex}",
+        "trace_id": current_trace_id() or f"trace-{uuid4().hex}",
         "schema_version": schema_version,
         "decision_version": "mvp1-graph-0.1",
         "created_at": datetime.now(timezone.utc).isoformat(),
@@ -387,7 +386,7 @@ def build_start_job_decision(
     proposed_actions: Optional[List[Dict[str, Any]]] = None,
     explanation: str = "Запрос принят, запускаю выполнение.",
 ) -> Dict[str, Any]:
-    schema_version = CONTRACTS_VERSION_PATH.read_text(encoding="utf-8").strip()
+    schema_version = contract_registry.contracts_version()
     payload: Dict[str, Any] = {
         "job_id": f"job-{uuid4().hex}",
         "job_type": job_type,
@@ -403,7 +402,7 @@ def build_start_job_decision(
         "confidence": 0.78,
         "payload": payload,
         "explanation": explanation,
-        "trace_id": f"trace-{uuid4().hex}",
+        "trace_id": current_trace_id() or f"trace-{uuid4().hex}",
         "schema_version": schema_version,
         "decision_version": "mvp1-graph-0.1",
         "created_at": datetime.now(timezone.utc).isoformat(),
@@ -421,12 +420,10 @@ def _annotate_registry_capabilities(intent: str) -> Dict[str, Any]:
         if not is_agent_registry_core_enabled():
             return {}
 
-        from agent_registry.v0_loader import AgentRegistryV0Loader, load_capability_catalog
-        from agent_registry.capabilities_lookup import CapabilitiesLookup
+        from agent_registry.snapshot import get_registry_snapshot
 
-        registry = AgentRegistryV0Loader.load()
-        catalog = load_capability_catalog()
-        lookup = CapabilitiesLookup(registry, catalog)
+        registry_snapshot = get_registry_snapshot()
+        lookup = registry_snapshot.lookup
 
         agents_shadow = lookup.find_agents(intent, "shadow")
         agents_assist = lookup.find_agents(intent, "assist")
@@ -439,6 +436,7 @@ def _annotate_registry_capabilities(intent: str) -> Dict[str, Any]:
                 for a in all_agents
             ],
             "any_enabled": len(all_agents) > 0,
+            "registry_version": registry_snapshot.version,
         }
 
         _logger.info("registry_snapshot: %s", snapshot)
@@ -466,8 +464,7 @@ def process_command(command: Dict[str, Any]) -> Dict[str, Any]:
 
     # Step 1: validate command
     t0 = time.monotonic()
-    command_schema = load_schema(COMMAND_SCHEMA_PATH)
-    validate(instance=command, schema=command_schema)
+    contract_registry.validate(contract_registry.COMMAND_SCHEMA, command)
     validate_command_ms = (time.monotonic() - t0) * 1000
 
     # Step 2: detect intent
@@ -605,12 +602,29 @@ def process_command(command: Dict[str, Any]) -> Dict[str, Any]:
 
     # Step 5: validate decision
     t0 = time.monotonic()
-    decision_schema = load_schema(DECISION_SCHEMA_PATH)
-    validate(instance=decision, schema=decision_schema)
+    contract_registry.validate(contract_registry.DECISION_SCHEMA, decision)
     validate_decision_ms = (time.monotonic() - t0) * 1000
 
     total_ms = (time.monotonic() - t_start) * 1000
 
+    _STAGE_VALIDATE_COMMAND.observe(validate_command_ms)
+    _STAGE_DETECT_INTENT.observe(detect_intent_ms)
+    _STAGE_REGISTRY.observe(registry_ms)
+    _STAGE_CORE_LOGIC.observe(core_logic_ms)
+    _STAGE_VALIDATE_DECISION.observe(validate_decision_ms)
+    _STAGE_TOTAL.observe(total_ms)
+    record_span(
+        "core_graph.process_command",
+        total_ms,
+        intent=intent,
+        action=decision.get("action"),
+        validate_command_ms=round(validate_command_ms, 3),
+        detect_intent_ms=round(detect_intent_ms, 3),
+        registry_ms=round(registry_ms, 3),
+        core_logic_ms=round(core_logic_ms, 3),
+        validate_decision_ms=round(validate_decision_ms, 3),
+    )
+
     llm_on = is_llm_policy_enabled()
 
     # Emit latency record
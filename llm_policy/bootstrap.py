@@ -37,9 +37,10 @@ def bootstrap_llm_caller() -> None:
         _LOGGER.warning("LLM_API_KEY not set, LLM caller not registered")
         return
 
-    from llm_policy.http_caller import create_http_caller
-    from llm_policy.runtime import set_llm_caller
+    from llm_policy.http_caller import create_async_http_caller, create_http_caller
+    from llm_policy.runtime import set_async_llm_caller, set_llm_caller
 
     caller = create_http_caller(api_key=api_key)
     set_llm_caller(caller)
+    set_async_llm_caller(create_async_http_caller(api_key=api_key))
     _LOGGER.info("LLM caller registered successfully")
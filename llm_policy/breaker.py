@@ -0,0 +1,189 @@
+"""Circuit breakers and adaptive timeouts per (provider, model, profile).
+
+Each breaker is fed the attempt outcomes classified in
+``runtime._log_attempt``. Timeouts, ``llm_unavailable`` and ``llm_error``
+count as failures. Any answer, even malformed JSON, counts as a success,
+because the provider responded.
+
+- closed: calls pass. Once the last LLM_BREAKER_WINDOW outcomes hold at
+  least LLM_BREAKER_MIN_CALLS calls and the failure share reaches
+  LLM_BREAKER_FAILURE_RATE, the breaker opens.
+- open: calls fail fast with ``llm_unavailable`` and no upstream request,
+  for LLM_BREAKER_OPEN_MS.
+- half-open: a single probe call goes through. If it succeeds the breaker
+  closes, if it fails it opens again.
+
+The same object tracks recent latencies. Once it has
+LLM_ADAPTIVE_TIMEOUT_MIN_SAMPLES of them, a call's timeout becomes
+quantile x multiplier, rounded up to LLM_ADAPTIVE_TIMEOUT_STEP_MS (which
+keeps the number of pooled HTTP clients small) and clamped to
+[LLM_ADAPTIVE_TIMEOUT_MIN_MS, the policy's timeout_ms]. A timed-out call
+enters the window at its full timeout, so timeouts that turn out too tight
+widen again.
+
+Both are opt-in (LLM_BREAKER_ENABLED, LLM_ADAPTIVE_TIMEOUT_ENABLED).
+Latencies are recorded either way, because hedging reads them.
+
+``breaker_stats`` feeds the ``llm_circuit_*`` metrics on /metrics.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import deque
+from dataclasses import replace
+from typing import Any, Deque, Dict, Tuple
+
+from llm_policy.config import (
+    get_llm_adaptive_timeout_min_ms,
+    get_llm_adaptive_timeout_min_samples,
+    get_llm_adaptive_timeout_multiplier,
+    get_llm_adaptive_timeout_quantile,
+    get_llm_adaptive_timeout_step_ms,
+    get_llm_breaker_failure_rate,
+    get_llm_breaker_min_calls,
+    get_llm_breaker_open_ms,
+    get_llm_breaker_window,
+    is_llm_adaptive_timeout_enabled,
+    is_llm_breaker_enabled,
+)
+from llm_policy.models import CallSpec
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+FAILURE_TYPES = frozenset({"timeout", "llm_unavailable", "llm_error"})
+
+_LATENCY_WINDOW = 200
+
+BreakerKey = Tuple[str, str, str]
+
+
+class CircuitBreaker:
+    def __init__(self, key: BreakerKey) -> None:
+        self.key = key
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._outcomes: Deque[bool] = deque(maxlen=get_llm_breaker_window())
+        self._latencies: Deque[float] = deque(maxlen=_LATENCY_WINDOW)
+        self._opened_at = 0.0
+        self._probe_started: float | None = None
+        self._timeout_ms: int | None = None
+        self.opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def allow(self) -> bool:
+        """Admit a call? Open breakers reject; half-open ones admit one probe."""
+        if not is_llm_breaker_enabled():
+            return True
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            now = time.monotonic()
+            open_s = get_llm_breaker_open_ms() / 1000
+            if self._state == OPEN and now - self._opened_at < open_s:
+                self.rejected += 1
+                return False
+            # A probe that never reported back (abandoned call) frees its slot after open_s.
+            if self._state == HALF_OPEN and self._probe_started is not None and now - self._probe_started < open_s:
+                self.rejected += 1
+                return False
+            self._state = HALF_OPEN
+            self._probe_started = now
+            return True
+
+    def record(self, *, error_type: str | None, latency_ms: float | None) -> None:
+        failed = error_type in FAILURE_TYPES
+        with self._lock:
+            if latency_ms is not None:
+                self._latencies.append(latency_ms)
+            if self._state == HALF_OPEN:
+                if failed:
+                    self._open()
+                else:
+                    self._state = CLOSED
+                    self._outcomes.clear()
+                    self._probe_started = None
+                return
+            if self._state == OPEN:
+                return  # late result of a call admitted before the breaker opened
+            self._outcomes.append(failed)
+            if len(self._outcomes) >= get_llm_breaker_min_calls():
+                if sum(self._outcomes) / len(self._outcomes) >= get_llm_breaker_failure_rate():
+                    self._open()
+
+    def adapt(self, spec: CallSpec) -> CallSpec:
+        """``spec`` with its timeout tightened from recent latencies (never loosened)."""
+        timeout_ms = self.timeout_ms(spec.timeout_ms)
+        if timeout_ms == spec.timeout_ms:
+            return spec
+        return replace(spec, timeout_ms=timeout_ms)
+
+    def timeout_ms(self, configured: int | None) -> int | None:
+        if configured is None or not is_llm_adaptive_timeout_enabled():
+            return configured
+        observed = self.latency_quantile(get_llm_adaptive_timeout_quantile())
+        if observed is None:
+            return configured
+        target = max(observed * get_llm_adaptive_timeout_multiplier(), get_llm_adaptive_timeout_min_ms())
+        step = get_llm_adaptive_timeout_step_ms()
+        adapted = min(configured, int(math.ceil(target / step) * step))
+        with self._lock:
+            self._timeout_ms = adapted
+        return adapted
+
+    def latency_quantile(self, quantile: float) -> float | None:
+        """Recent latency quantile (ms); ``None`` until MIN_SAMPLES calls were seen."""
+        with self._lock:
+            samples = sorted(self._latencies)
+        if len(samples) < get_llm_adaptive_timeout_min_samples():
+            return None
+        return samples[min(len(samples) - 1, max(math.ceil(quantile * len(samples)) - 1, 0))]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self._state,
+                "opened": self.opened,
+                "rejected": self.rejected,
+                "timeout_ms": self._timeout_ms,
+            }
+
+    def _open(self) -> None:
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._probe_started = None
+        self._outcomes.clear()
+        self.opened += 1
+
+
+_BREAKERS: Dict[BreakerKey, CircuitBreaker] = {}
+_BREAKERS_LOCK = threading.Lock()
+
+
+def get_breaker(spec: CallSpec, profile: str) -> CircuitBreaker:
+    key = (spec.provider, spec.model, profile)
+    breaker = _BREAKERS.get(key)
+    if breaker is None:
+        with _BREAKERS_LOCK:
+            breaker = _BREAKERS.setdefault(key, CircuitBreaker(key))
+    return breaker
+
+
+def breaker_stats() -> Dict[BreakerKey, Dict[str, Any]]:
+    with _BREAKERS_LOCK:
+        breakers = dict(_BREAKERS)
+    return {key: breaker.stats() for key, breaker in breakers.items()}
+
+
+def reset_breakers() -> None:
+    with _BREAKERS_LOCK:
+        _BREAKERS.clear()
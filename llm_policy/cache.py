@@ -0,0 +1,243 @@
+"""Result cache for ``run_task_with_policy``.
+
+Household commands repeat a lot ("добавь молоко"), and so do the prompts
+built from them. A schema-valid task result is cached under
+(task_id, profile, prompt hash, schema hash, policy version), so a new policy
+file, schema or prompt template never serves an old answer. Only ``ok``
+results are stored, and errors always go back to the provider.
+
+- In memory: LRU of LLM_TASK_CACHE_MAX_ENTRIES entries, each valid for
+  LLM_TASK_CACHE_TTL_S seconds.
+- On disk (optional): LLM_TASK_CACHE_DIR holds one small JSON file per key,
+  which is shared by worker processes and survives restarts. Disk hits are
+  copied into memory.
+
+Before the prompt is hashed it goes through a normalizer. The default one
+casefolds the prompt, drops punctuation and collapses whitespace (disable
+with LLM_TASK_CACHE_NORMALIZE=false, or install a different one with
+``set_prompt_normalizer``). So "Купи молоко." and "купи  молоко" share an
+entry. The cached answer is the one given for the first of them.
+
+The cache is off unless LLM_TASK_CACHE_ENABLED is set. Lookups are counted in
+``llm_task_cache_total`` by task and outcome (``hit_memory``, ``hit_disk``,
+``miss``, ``store``).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Mapping, Tuple
+
+from app import serialization
+from app.metrics import counter
+from llm_policy.config import (
+    get_llm_task_cache_dir,
+    get_llm_task_cache_max_entries,
+    get_llm_task_cache_normalize,
+    get_llm_task_cache_ttl_s,
+    is_llm_task_cache_enabled,
+)
+from llm_policy.models import TaskRunResult
+
+_LOGGER = logging.getLogger("llm_policy.cache")
+_WHITESPACE = re.compile(r"\s+")
+
+PromptNormalizer = Callable[[str], str]
+
+LLM_TASK_CACHE = counter("llm_task_cache_total", "LLM task result cache lookups and stores", ("task_id", "outcome"))
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Casefold, drop punctuation, collapse whitespace."""
+    text = "".join(
+        " " if unicodedata.category(char).startswith("P") else char for char in prompt.casefold()
+    )
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+_NORMALIZER: PromptNormalizer = normalize_prompt
+
+
+def set_prompt_normalizer(normalizer: PromptNormalizer | None) -> None:
+    """Replace the cache-key normalizer; ``None`` restores ``normalize_prompt``."""
+    global _NORMALIZER
+    _NORMALIZER = normalizer or normalize_prompt
+
+
+def task_cache_key(
+    *,
+    task_id: str,
+    profile: str,
+    prompt: str,
+    schema: Mapping[str, object],
+    policy_version: str,
+) -> str:
+    if get_llm_task_cache_normalize():
+        prompt = _NORMALIZER(prompt)
+    digest = hashlib.blake2b(digest_size=16)
+    for part in (
+        task_id,
+        profile,
+        policy_version,
+        json.dumps(schema, sort_keys=True, ensure_ascii=False),
+        prompt,
+    ):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+@dataclass(frozen=True)
+class _Entry:
+    payload: str
+    expires_at: float
+
+
+class TaskResultCache:
+    """LRU + TTL map of cache key -> ok ``TaskRunResult``, with an optional disk tier."""
+
+    def __init__(self, *, max_entries: int, ttl_s: float, directory: Path | None) -> None:
+        self._max_entries = max_entries
+        self._ttl_s = ttl_s
+        self._directory = directory
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+
+    def get(self, task_id: str, key: str) -> TaskRunResult | None:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.expires_at > now:
+                    self._entries.move_to_end(key)
+                else:
+                    del self._entries[key]
+                    entry = None
+        if entry is not None:
+            LLM_TASK_CACHE.labels(task_id, "hit_memory").inc()
+            return _decode(entry.payload)
+        entry = self._read_disk(key, now)
+        if entry is not None:
+            self._remember(key, entry)
+            LLM_TASK_CACHE.labels(task_id, "hit_disk").inc()
+            return _decode(entry.payload)
+        LLM_TASK_CACHE.labels(task_id, "miss").inc()
+        return None
+
+    def put(self, task_id: str, key: str, result: TaskRunResult) -> None:
+        if result.status != "ok" or result.data is None:
+            return
+        payload = serialization.dumps(
+            {"data": result.data, "profile": result.profile, "escalated": result.escalated}
+        )
+        entry = _Entry(payload=payload, expires_at=time.time() + self._ttl_s)
+        self._remember(key, entry)
+        self._write_disk(key, entry)
+        LLM_TASK_CACHE.labels(task_id, "store").inc()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _remember(self, key: str, entry: _Entry) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def _disk_path(self, key: str) -> Path | None:
+        if self._directory is None:
+            return None
+        return self._directory / key[:2] / f"{key}.json"
+
+    def _read_disk(self, key: str, now: float) -> _Entry | None:
+        path = self._disk_path(key)
+        if path is None:
+            return None
+        try:
+            stored = serialization.loads(path.read_bytes())
+            entry = _Entry(payload=stored["payload"], expires_at=float(stored["expires_at"]))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError):
+            _LOGGER.warning("llm task cache: unreadable entry %s", path, exc_info=True)
+            return None
+        if entry.expires_at <= now:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+            return None
+        return entry
+
+    def _write_disk(self, key: str, entry: _Entry) -> None:
+        path = self._disk_path(key)
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(serialization.dumps_bytes({"payload": entry.payload, "expires_at": entry.expires_at}))
+            os.replace(tmp, path)
+        except OSError:
+            _LOGGER.warning("llm task cache: cannot write %s", path, exc_info=True)
+
+
+def _decode(payload: str) -> TaskRunResult:
+    # Decoded per hit so callers never share (and mutate) one cached dict.
+    stored = serialization.loads(payload)
+    return TaskRunResult(
+        status="ok",
+        data=stored["data"],
+        error_type=None,
+        attempts=0,
+        profile=stored["profile"],
+        escalated=stored["escalated"],
+        cached=True,
+    )
+
+
+_CACHE: TaskResultCache | None = None
+_CACHE_CONFIG: Tuple[int, int, str | None] | None = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_task_cache() -> TaskResultCache | None:
+    """The process-wide cache, or ``None`` while LLM_TASK_CACHE_ENABLED is off."""
+    global _CACHE, _CACHE_CONFIG
+    if not is_llm_task_cache_enabled():
+        return None
+    config = (get_llm_task_cache_max_entries(), get_llm_task_cache_ttl_s(), get_llm_task_cache_dir())
+    cache = _CACHE
+    if cache is not None and _CACHE_CONFIG == config:
+        return cache
+    with _CACHE_LOCK:
+        if _CACHE is None or _CACHE_CONFIG != config:
+            max_entries, ttl_s, directory = config
+            _CACHE = TaskResultCache(
+                max_entries=max_entries,
+                ttl_s=ttl_s,
+                directory=Path(directory) if directory else None,
+            )
+            _CACHE_CONFIG = config
+        return _CACHE
+
+
+def reset_task_cache() -> None:
+    """Drop the in-memory tier and the normalizer override (the disk tier is kept)."""
+    global _CACHE, _CACHE_CONFIG
+    with _CACHE_LOCK:
+        _CACHE = None
+        _CACHE_CONFIG = None
+    set_prompt_normalizer(None)
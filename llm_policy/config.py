@@ -17,3 +17,173 @@ def get_llm_policy_profile() -> str:
 
 def get_llm_policy_allow_placeholders() -> bool:
     return os.getenv("LLM_POLICY_ALLOW_PLACEHOLDERS", "false").lower() in {"1", "true", "yes"}
+
+
+def get_llm_policy_reload_interval_ms() -> int:
+    """Minimum time between policy file change checks (0 = check on every call)."""
+    value = os.getenv("LLM_POLICY_RELOAD_INTERVAL_MS", "1000").strip()
+    try:
+        return max(int(value), 0)
+    except ValueError:
+        return 1000
+
+
+def get_llm_http_max_connections() -> int:
+    return _positive_int("LLM_HTTP_MAX_CONNECTIONS", 20)
+
+
+def get_llm_http_max_keepalive() -> int:
+    return _positive_int("LLM_HTTP_MAX_KEEPALIVE", 10)
+
+
+def get_llm_http_keepalive_expiry_s() -> float:
+    value = os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY_S", "30").strip()
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        return 30.0
+
+
+def get_llm_http_pool_timeout_ms() -> int:
+    return _positive_int("LLM_HTTP_POOL_TIMEOUT_MS", 5000)
+
+
+def get_llm_http2_enabled() -> bool:
+    return os.getenv("LLM_HTTP2_ENABLED", "false").lower() in {"1", "true", "yes"}
+
+
+def is_llm_task_cache_enabled() -> bool:
+    return os.getenv("LLM_TASK_CACHE_ENABLED", "false").lower() in {"1", "true", "yes"}
+
+
+def get_llm_task_cache_max_entries() -> int:
+    return _positive_int("LLM_TASK_CACHE_MAX_ENTRIES", 2048)
+
+
+def get_llm_task_cache_ttl_s() -> int:
+    return _positive_int("LLM_TASK_CACHE_TTL_S", 3600)
+
+
+def get_llm_task_cache_dir() -> str | None:
+    value = os.getenv("LLM_TASK_CACHE_DIR", "").strip()
+    return value or None
+
+
+def get_llm_task_cache_normalize() -> bool:
+    return os.getenv("LLM_TASK_CACHE_NORMALIZE", "true").lower() in {"1", "true", "yes"}
+
+
+def is_llm_single_flight_enabled() -> bool:
+    return os.getenv("LLM_SINGLE_FLIGHT_ENABLED", "false").lower() in {"1", "true", "yes"}
+
+
+def is_llm_breaker_enabled() -> bool:
+    return os.getenv("LLM_BREAKER_ENABLED", "false").lower() in {"1", "true", "yes"}
+
+
+def get_llm_breaker_window() -> int:
+    return _positive_int("LLM_BREAKER_WINDOW", 20)
+
+
+def get_llm_breaker_min_calls() -> int:
+    return _positive_int("LLM_BREAKER_MIN_CALLS", 10)
+
+
+def get_llm_breaker_failure_rate() -> float:
+    return _fraction("LLM_BREAKER_FAILURE_RATE", 0.5)
+
+
+def get_llm_breaker_open_ms() -> int:
+    return _positive_int("LLM_BREAKER_OPEN_MS", 30000)
+
+
+def is_llm_adaptive_timeout_enabled() -> bool:
+    return os.getenv("LLM_ADAPTIVE_TIMEOUT_ENABLED", "false").lower() in {"1", "true", "yes"}
+
+
+def get_llm_adaptive_timeout_quantile() -> float:
+    return _fraction("LLM_ADAPTIVE_TIMEOUT_QUANTILE", 0.99)
+
+
+def get_llm_adaptive_timeout_multiplier() -> float:
+    value = os.getenv("LLM_ADAPTIVE_TIMEOUT_MULTIPLIER", "2").strip()
+    try:
+        parsed = float(value)
+    except ValueError:
+        return 2.0
+    return parsed if parsed >= 1.0 else 2.0
+
+
+def get_llm_adaptive_timeout_min_samples() -> int:
+    return _positive_int("LLM_ADAPTIVE_TIMEOUT_MIN_SAMPLES", 20)
+
+
+def get_llm_adaptive_timeout_min_ms() -> int:
+    return _positive_int("LLM_ADAPTIVE_TIMEOUT_MIN_MS", 500)
+
+
+def get_llm_adaptive_timeout_step_ms() -> int:
+    return _positive_int("LLM_ADAPTIVE_TIMEOUT_STEP_MS", 250)
+
+
+def is_llm_hedging_enabled() -> bool:
+    return os.getenv("LLM_HEDGING_ENABLED", "true").lower() in {"1", "true", "yes"}
+
+
+def get_llm_hedge_max_workers() -> int:
+    return _positive_int("LLM_HEDGE_MAX_WORKERS", 8)
+
+
+def is_llm_scheduler_enabled() -> bool:
+    return os.getenv("LLM_SCHEDULER_ENABLED", "false").lower() in {"1", "true", "yes"}
+
+
+def get_llm_scheduler_max_concurrency() -> int:
+    return _positive_int("LLM_SCHEDULER_MAX_CONCURRENCY", 16)
+
+
+def get_llm_scheduler_max_wait_ms() -> int:
+    return _positive_int("LLM_SCHEDULER_MAX_WAIT_MS", 2000)
+
+
+def get_llm_scheduler_shed_queue() -> int:
+    """Shadow/analysis calls allowed to queue when saturated (0 = shed at once)."""
+    value = os.getenv("LLM_SCHEDULER_SHED_QUEUE", "16").strip()
+    try:
+        return max(int(value), 0)
+    except ValueError:
+        return 16
+
+
+def get_llm_provider_rate_limits() -> dict[str, float]:
+    """``LLM_PROVIDER_RATE_LIMITS=yandex_ai_studio=20,openai_compatible=5`` -> calls/s per provider."""
+    limits: dict[str, float] = {}
+    for item in os.getenv("LLM_PROVIDER_RATE_LIMITS", "").split(","):
+        provider, sep, value = item.partition("=")
+        if not sep or not provider.strip():
+            continue
+        try:
+            rate = float(value)
+        except ValueError:
+            continue
+        if rate > 0:
+            limits[provider.strip()] = rate
+    return limits
+
+
+def _fraction(name: str, default: float) -> float:
+    value = os.getenv(name, str(default)).strip()
+    try:
+        parsed = float(value)
+    except ValueError:
+        return default
+    return parsed if 0.0 < parsed <= 1.0 else default
+
+
+def _positive_int(name: str, default: int) -> int:
+    value = os.getenv(name, str(default)).strip()
+    try:
+        parsed = int(value)
+    except ValueError:
+        return default
+    return parsed if parsed > 0 else default
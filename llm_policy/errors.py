@@ -1,2 +1,6 @@
 class LlmUnavailableError(RuntimeError):
     pass
+
+
+class LlmShedError(LlmUnavailableError):
+    """The LLM scheduler refused the call (saturated or rate limited)."""
@@ -4,11 +4,13 @@ from __future__ import annotations
 
 import logging
 import os
-from typing import Any, Dict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Tuple
 
 import httpx
 
 from llm_policy.errors import LlmUnavailableError
+from llm_policy.http_pool import get_async_http_client, get_http_client
 from llm_policy.models import CallSpec
 
 _LOGGER = logging.getLogger("llm_policy.http_caller")
@@ -26,17 +28,33 @@ def create_http_caller(*, api_key: str | None = None) -> "HttpLlmCaller":
     return HttpLlmCaller(api_key=key)
 
 
+def create_async_http_caller(*, api_key: str | None = None) -> "AsyncHttpLlmCaller":
+    """Factory: create async caller. Reads LLM_API_KEY from env if not provided."""
+    key = api_key or os.getenv("LLM_API_KEY", "")
+    if not key:
+        raise ValueError("LLM_API_KEY is required")
+    return AsyncHttpLlmCaller(api_key=key)
+
+
 class HttpLlmCaller:
     """Callable implementing LlmCaller = Callable[[CallSpec, str], str].
 
     Supports providers: yandex_ai_studio, openai_compatible.
-    Uses OpenAI-compatible chat/completions API format.
+    Uses OpenAI-compatible chat/completions API format over pooled
+    keep-alive connections (see ``llm_policy.http_pool``).
     """
 
     def __init__(self, *, api_key: str) -> None:
         self._api_key = api_key
 
     def __call__(self, spec: CallSpec, prompt: str) -> str:
+        url, headers, body, timeout_s = self._prepare(spec, prompt)
+        with _map_http_errors(timeout_s):
+            response = get_http_client(url, timeout_s).post(url, headers=headers, json=body)
+            response.raise_for_status()
+        return self._extract_content(response)
+
+    def _prepare(self, spec: CallSpec, prompt: str) -> Tuple[str, Dict[str, str], Dict[str, Any], float]:
         url = self._build_url(spec)
         headers = self._build_headers(spec)
         body = self._build_body(spec, prompt)
@@ -48,23 +66,7 @@ class HttpLlmCaller:
             spec.model,
             timeout_s,
         )
-
-        try:
-            with httpx.Client(timeout=timeout_s) as client:
-                response = client.post(url, headers=headers, json=body)
-                response.raise_for_status()
-        except httpx.TimeoutException as exc:
-            raise TimeoutError(f"LLM request timed out after {timeout_s}s") from exc
-        except httpx.ConnectError as exc:
-            raise LlmUnavailableError(f"LLM connection failed: {exc}") from exc
-        except httpx.HTTPStatusError as exc:
-            raise LlmUnavailableError(
-                f"LLM HTTP error {exc.response.status_code}"
-            ) from exc
-        except httpx.HTTPError as exc:
-            raise LlmUnavailableError(f"LLM HTTP error: {exc}") from exc
-
-        return self._extract_content(response)
+        return url, headers, body, timeout_s
 
     def _build_url(self, spec: CallSpec) -> str:
         base = spec.base_url or os.getenv("LLM_BASE_URL", "")
@@ -104,3 +106,33 @@ class HttpLlmCaller:
             return data["choices"][0]["message"]["content"]
         except (KeyError, IndexError, TypeError) as exc:
             raise LlmUnavailableError("Cannot extract content from LLM response") from exc
+
+
+class AsyncHttpLlmCaller(HttpLlmCaller):
+    """Async variant implementing AsyncLlmCaller on a pooled ``httpx.AsyncClient``.
+
+    Request building, error mapping and response parsing match HttpLlmCaller.
+    """
+
+    async def __call__(self, spec: CallSpec, prompt: str) -> str:  # type: ignore[override]
+        url, headers, body, timeout_s = self._prepare(spec, prompt)
+        with _map_http_errors(timeout_s):
+            response = await get_async_http_client(url, timeout_s).post(url, headers=headers, json=body)
+            response.raise_for_status()
+        return self._extract_content(response)
+
+
+@contextmanager
+def _map_http_errors(timeout_s: float) -> Iterator[None]:
+    try:
+        yield
+    except httpx.TimeoutException as exc:
+        raise TimeoutError(f"LLM request timed out after {timeout_s}s") from exc
+    except httpx.ConnectError as exc:
+        raise LlmUnavailableError(f"LLM connection failed: {exc}") from exc
+    except httpx.HTTPStatusError as exc:
+        raise LlmUnavailableError(
+            f"LLM HTTP error {exc.response.status_code}"
+        ) from exc
+    except httpx.HTTPError as exc:
+        raise LlmUnavailableError(f"LLM HTTP error: {exc}") from exc
@@ -0,0 +1,286 @@
+"""Long-lived, keep-alive HTTP clients shared by the LLM callers.
+
+Opening an ``httpx.Client`` per completion pays a fresh TCP + TLS handshake on
+every LLM call. Callers instead borrow a pooled client keyed by
+(base_url, timeout class); connections stay open between calls up to the
+keep-alive limits. HTTP/2 is used when enabled and the optional ``h2``
+package is installed.
+
+Admission to a client is gated by a semaphore sized to its connection limit,
+so time spent waiting for a free connection is measured here (see
+``http_pool_stats``) instead of disappearing inside the transport.
+
+``httpx.AsyncClient`` connections belong to one event loop, so async clients
+are pooled per running loop as well (``get_async_http_client``). They are
+closed and dropped when that loop shuts down (``asyncio.run`` and uvicorn
+call ``loop.shutdown_asyncgens`` first), or by ``aclose_async_http_clients``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+from typing import Any, AsyncGenerator, Dict, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from llm_policy.config import (
+    get_llm_http2_enabled,
+    get_llm_http_keepalive_expiry_s,
+    get_llm_http_max_connections,
+    get_llm_http_max_keepalive,
+    get_llm_http_pool_timeout_ms,
+)
+
+_LOGGER = logging.getLogger("llm_policy.http_pool")
+
+_PoolKey = Tuple[str, float]
+
+
+@dataclass
+class PoolStats:
+    requests: int = 0
+    waited: int = 0
+    wait_ms_total: float = 0.0
+    wait_ms_max: float = 0.0
+    pool_timeouts: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "waited": self.waited,
+            "wait_ms_total": round(self.wait_ms_total, 2),
+            "wait_ms_max": round(self.wait_ms_max, 2),
+            "pool_timeouts": self.pool_timeouts,
+        }
+
+
+class PooledHttpClient:
+    """One ``httpx.Client`` plus a connection-slot semaphore and wait stats."""
+
+    def __init__(self, *, timeout_s: float, max_connections: int, max_keepalive: int, keepalive_expiry_s: float,
+                 http2: bool, pool_timeout_s: float) -> None:
+        self.http2 = http2
+        self._pool_timeout_s = pool_timeout_s
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._stats_lock = threading.Lock()
+        self.stats = PoolStats()
+        self._client = httpx.Client(
+            timeout=timeout_s,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive,
+                keepalive_expiry=keepalive_expiry_s,
+            ),
+            http2=http2,
+        )
+
+    def post(self, url: str, **kwargs: Any) -> httpx.Response:
+        started = time.monotonic()
+        acquired = self._slots.acquire(timeout=self._pool_timeout_s)
+        wait_ms = (time.monotonic() - started) * 1000
+        self._record_wait(wait_ms, acquired)
+        if not acquired:
+            raise httpx.PoolTimeout(f"no free connection after {wait_ms:.0f}ms")
+        try:
+            return self._client.post(url, **kwargs)
+        finally:
+            self._slots.release()
+
+    def close(self) -> None:
+        self._client.close()
+
+    def _record_wait(self, wait_ms: float, acquired: bool) -> None:
+        with self._stats_lock:
+            _record_wait(self.stats, wait_ms, acquired)
+
+
+class AsyncPooledHttpClient:
+    """``httpx.AsyncClient`` counterpart of ``PooledHttpClient`` (one event loop)."""
+
+    def __init__(self, *, timeout_s: float, max_connections: int, max_keepalive: int, keepalive_expiry_s: float,
+                 http2: bool, pool_timeout_s: float) -> None:
+        self.http2 = http2
+        self._pool_timeout_s = pool_timeout_s
+        self._slots = asyncio.Semaphore(max_connections)
+        self.stats = PoolStats()
+        self._client = httpx.AsyncClient(
+            timeout=timeout_s,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive,
+                keepalive_expiry=keepalive_expiry_s,
+            ),
+            http2=http2,
+        )
+
+    async def post(self, url: str, **kwargs: Any) -> httpx.Response:
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self._pool_timeout_s)
+            acquired = True
+        except asyncio.TimeoutError:
+            acquired = False
+        wait_ms = (time.monotonic() - started) * 1000
+        _record_wait(self.stats, wait_ms, acquired)
+        if not acquired:
+            raise httpx.PoolTimeout(f"no free connection after {wait_ms:.0f}ms")
+        try:
+            return await self._client.post(url, **kwargs)
+        finally:
+            self._slots.release()
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+def _record_wait(stats: PoolStats, wait_ms: float, acquired: bool) -> None:
+    if not acquired:
+        stats.pool_timeouts += 1
+        return
+    stats.requests += 1
+    # Sub-millisecond acquisitions are an uncontended semaphore, not a wait.
+    if wait_ms >= 1.0:
+        stats.waited += 1
+        stats.wait_ms_total += wait_ms
+        stats.wait_ms_max = max(stats.wait_ms_max, wait_ms)
+
+
+_CLIENTS: Dict[_PoolKey, PooledHttpClient] = {}
+_ASYNC_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[_PoolKey, AsyncPooledHttpClient]]" = (
+    weakref.WeakKeyDictionary()
+)
+# loop -> async generator that closes the loop's clients when the loop shuts down
+_LOOP_WATCHERS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncGenerator[None, None]]" = (
+    weakref.WeakKeyDictionary()
+)
+_CLIENTS_LOCK = threading.Lock()
+_HTTP2_WARNED = False
+
+
+def get_http_client(base_url: str, timeout_s: float) -> PooledHttpClient:
+    """Return the shared client for this origin and timeout class, creating it once."""
+    key = (_origin(base_url), float(timeout_s))
+    client = _CLIENTS.get(key)
+    if client is None:
+        with _CLIENTS_LOCK:
+            client = _CLIENTS.get(key)
+            if client is None:
+                client = PooledHttpClient(timeout_s=key[1], **_client_options())
+                _CLIENTS[key] = client
+    return client
+
+
+def get_async_http_client(base_url: str, timeout_s: float) -> AsyncPooledHttpClient:
+    """Async variant of ``get_http_client`` for the running event loop."""
+    loop = asyncio.get_running_loop()
+    key = (_origin(base_url), float(timeout_s))
+    with _CLIENTS_LOCK:
+        clients = _ASYNC_CLIENTS.setdefault(loop, {})
+        client = clients.get(key)
+        if client is None:
+            client = AsyncPooledHttpClient(timeout_s=key[1], **_client_options())
+            clients[key] = client
+        if loop not in _LOOP_WATCHERS:
+            _LOOP_WATCHERS[loop] = _start_loop_watcher()
+    return client
+
+
+def _start_loop_watcher() -> AsyncGenerator[None, None]:
+    """Park an async generator on the running loop; its ``finally`` runs at loop shutdown.
+
+    ``loop.shutdown_asyncgens`` closes every generator the loop has seen while
+    the loop can still await, which is when this one closes the clients.
+    """
+    watcher = _close_with_loop()
+    try:
+        watcher.asend(None).send(None)  # runs up to the ``yield`` without awaiting
+    except StopIteration:
+        pass
+    return watcher
+
+
+async def _close_with_loop() -> AsyncGenerator[None, None]:
+    try:
+        yield
+    finally:
+        with _CLIENTS_LOCK:
+            _LOOP_WATCHERS.pop(asyncio.get_running_loop(), None)
+        await aclose_async_http_clients()
+
+
+def http_pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Pool wait metrics per "<origin> timeout=<s>" key (async pools are summed in)."""
+    with _CLIENTS_LOCK:
+        pools = [(key, client.stats) for key, client in _CLIENTS.items()]
+        for clients in list(_ASYNC_CLIENTS.values()):
+            pools.extend((key, client.stats) for key, client in clients.items())
+    merged: Dict[str, PoolStats] = {}
+    for (origin, timeout_s), stats in pools:
+        total = merged.setdefault(f"{origin} timeout={timeout_s:g}", PoolStats())
+        total.requests += stats.requests
+        total.waited += stats.waited
+        total.wait_ms_total += stats.wait_ms_total
+        total.wait_ms_max = max(total.wait_ms_max, stats.wait_ms_max)
+        total.pool_timeouts += stats.pool_timeouts
+    return {name: stats.as_dict() for name, stats in merged.items()}
+
+
+def close_http_clients() -> None:
+    """Close every pooled sync client (called on application shutdown)."""
+    with _CLIENTS_LOCK:
+        clients = list(_CLIENTS.values())
+        _CLIENTS.clear()
+    for client in clients:
+        try:
+            client.close()
+        except Exception:
+            _LOGGER.warning("failed to close pooled http client", exc_info=True)
+
+
+async def aclose_async_http_clients() -> None:
+    """Close the async clients that belong to the running event loop."""
+    loop = asyncio.get_running_loop()
+    with _CLIENTS_LOCK:
+        clients = list(_ASYNC_CLIENTS.pop(loop, {}).values())
+    for client in clients:
+        try:
+            await client.aclose()
+        except Exception:
+            _LOGGER.warning("failed to close pooled async http client", exc_info=True)
+
+
+def _client_options() -> Dict[str, Any]:
+    return {
+        "max_connections": get_llm_http_max_connections(),
+        "max_keepalive": get_llm_http_max_keepalive(),
+        "keepalive_expiry_s": get_llm_http_keepalive_expiry_s(),
+        "http2": _http2_available(),
+        "pool_timeout_s": get_llm_http_pool_timeout_ms() / 1000,
+    }
+
+
+def _origin(base_url: str) -> str:
+    parts = urlsplit(base_url)
+    if parts.scheme and parts.netloc:
+        return f"{parts.scheme}://{parts.netloc}"
+    return base_url.rstrip("/")
+
+
+def _http2_available() -> bool:
+    global _HTTP2_WARNED
+    if not get_llm_http2_enabled():
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        if not _HTTP2_WARNED:
+            _LOGGER.warning("LLM_HTTP2_ENABLED is set but the h2 package is not installed; using HTTP/1.1")
+            _HTTP2_WARNED = True
+        return False
+    return True
@@ -1,10 +1,15 @@
 from __future__ import annotations
 
+import hashlib
 import json
+import threading
+import time
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Mapping
 
-from llm_policy.models import CallSpec, FallbackRule, LlmPolicy
+from llm_policy.config import get_llm_policy_reload_interval_ms
+from llm_policy.models import CallSpec, FallbackRule, HedgePolicy, LlmPolicy
 
 _ALLOWED_TOP_LEVEL_KEYS = {
     "schema_version",
@@ -31,6 +36,9 @@ _ALLOWED_EVENTS = {
     "llm_error",
 }
 _ALLOWED_ACTIONS = {"repair_retry", "escalate_to", "return_error"}
+_ALLOWED_HEDGE_KEYS = {"profile", "after_quantile", "delay_ms"}
+_DEFAULT_HEDGE_QUANTILE = 0.95
+_DEFAULT_HEDGE_DELAY_MS = 1000
 
 
 class LlmPolicyLoader:
@@ -48,17 +56,95 @@ class LlmPolicyLoader:
         _validate_policy(payload, allow_placeholders=allow_placeholders)
         return _to_policy(payload)
 
+    @staticmethod
+    def load_cached(
+        enabled: bool,
+        path_override: str | None = None,
+        allow_placeholders: bool = False,
+    ) -> LlmPolicy | None:
+        """Like ``load``, but reuse the parsed policy while the file content is unchanged.
+
+        Policies are cached by (path, content hash, allow_placeholders). The file
+        is re-checked by mtime/size at most every LLM_POLICY_RELOAD_INTERVAL_MS;
+        ``reset_llm_policy_cache`` forces a reload on the next call.
+        """
+        if not enabled:
+            return None
+
+        policy_path = Path(path_override) if path_override else _default_policy_path()
+        digest, raw = _current_digest(policy_path)
+        key = (policy_path, digest, allow_placeholders)
+        policy = _POLICIES.get(key)
+        if policy is not None:
+            return policy
+        if raw is None:
+            raw = _read_policy_text(policy_path)
+        payload = _parse_policy_text(raw)
+        _validate_policy(payload, allow_placeholders=allow_placeholders)
+        policy = _to_policy(payload)
+        with _CACHE_LOCK:
+            for stale in [cached for cached in _POLICIES if cached[0] == policy_path and cached[1] != digest]:
+                del _POLICIES[stale]
+            _POLICIES[key] = policy
+        return policy
+
+
+@dataclass
+class _SourceState:
+    fingerprint: tuple[int, int]
+    digest: str
+    checked_at: float
+
+
+_CACHE_LOCK = threading.Lock()
+_SOURCES: dict[Path, _SourceState] = {}
+_POLICIES: dict[tuple[Path, str, bool], LlmPolicy] = {}
+
+
+def reset_llm_policy_cache() -> None:
+    """Forget cached policies; the next ``load_cached`` re-reads the file."""
+    with _CACHE_LOCK:
+        _SOURCES.clear()
+        _POLICIES.clear()
+
+
+def _current_digest(path: Path) -> tuple[str, str | None]:
+    """Content hash of ``path``; the text is returned too when it had to be read."""
+    state = _SOURCES.get(path)
+    now = time.monotonic()
+    if state is not None and now - state.checked_at < get_llm_policy_reload_interval_ms() / 1000:
+        return state.digest, None
+    try:
+        stat = path.stat()
+    except FileNotFoundError as exc:
+        _SOURCES.pop(path, None)
+        raise ValueError(f"llm policy not found: {path}") from exc
+    fingerprint = (stat.st_mtime_ns, stat.st_size)
+    if state is not None and state.fingerprint == fingerprint:
+        state.checked_at = now
+        return state.digest, None
+    raw = _read_policy_text(path)
+    digest = hashlib.sha256(raw.encode("utf-8")).hexdigest()
+    _SOURCES[path] = _SourceState(fingerprint=fingerprint, digest=digest, checked_at=now)
+    return digest, raw
+
 
 def _default_policy_path() -> Path:
     return Path(__file__).resolve().parent / "llm-policy.yaml"
 
 
 def _load_policy_payload(path: Path) -> dict[str, Any]:
+    return _parse_policy_text(_read_policy_text(path))
+
+
+def _read_policy_text(path: Path) -> str:
     try:
-        raw = path.read_text(encoding="utf-8")
+        return path.read_text(encoding="utf-8")
     except FileNotFoundError as exc:
         raise ValueError(f"llm policy not found: {path}") from exc
 
+
+def _parse_policy_text(raw: str) -> dict[str, Any]:
     try:
         parsed = json.loads(raw)
     except json.JSONDecodeError:
@@ -227,6 +313,10 @@ def _validate_policy(payload: dict[str, Any], *, allow_placeholders: bool) -> No
             if not allow_placeholders:
                 _validate_no_placeholders(spec, task_id=task_id, profile=profile)
 
+    for task_id, task in tasks.items():
+        if isinstance(task, dict) and "hedge" in task:
+            _validate_hedge(task["hedge"], task_id=task_id, profiles=profiles, routing=routing)
+
     fallback_chain = payload["fallback_chain"]
     if not isinstance(fallback_chain, list):
         raise ValueError("fallback_chain must be a list")
@@ -255,6 +345,29 @@ def _validate_policy(payload: dict[str, Any], *, allow_placeholders: bool) -> No
                 raise ValueError("escalate_to must reference a known profile")
 
 
+def _validate_hedge(hedge: Any, *, task_id: str, profiles: Mapping[str, Any], routing: Mapping[str, Any]) -> None:
+    if not isinstance(hedge, dict):
+        raise ValueError(f"hedge for {task_id} must be a mapping")
+    extra = set(hedge) - _ALLOWED_HEDGE_KEYS
+    if extra:
+        extras = ", ".join(sorted(extra))
+        raise ValueError(f"unexpected hedge fields for {task_id}: {extras}")
+    profile = hedge.get("profile", "reliable")
+    if profile not in profiles:
+        raise ValueError(f"hedge profile {profile} not declared in profiles")
+    if profile not in routing.get(task_id, {}):
+        raise ValueError(f"hedge profile {profile} has no routing for {task_id}")
+    try:
+        quantile = _maybe_float(hedge.get("after_quantile"))
+        delay_ms = _maybe_int(hedge.get("delay_ms"))
+    except ValueError as exc:
+        raise ValueError(f"invalid hedge settings for {task_id}") from exc
+    if quantile is not None and not 0 < quantile < 1:
+        raise ValueError(f"hedge after_quantile for {task_id} must be between 0 and 1")
+    if delay_ms is not None and delay_ms < 0:
+        raise ValueError(f"hedge delay_ms for {task_id} must be >= 0")
+
+
 def _to_policy(payload: dict[str, Any]) -> LlmPolicy:
     compat = payload["compat"]
     profiles = tuple(payload["profiles"].keys())
@@ -283,6 +396,19 @@ def _to_policy(payload: dict[str, Any]) -> LlmPolicy:
         for entry in payload["fallback_chain"]
     )
 
+    hedging: dict[str, HedgePolicy] = {}
+    for task_id, task in payload["tasks"].items():
+        if not isinstance(task, dict) or not isinstance(task.get("hedge"), dict):
+            continue
+        hedge = task["hedge"]
+        quantile = _maybe_float(hedge.get("after_quantile"))
+        delay_ms = _maybe_int(hedge.get("delay_ms"))
+        hedging[task_id] = HedgePolicy(
+            profile=str(hedge.get("profile", "reliable")),
+            after_quantile=_DEFAULT_HEDGE_QUANTILE if quantile is None else quantile,
+            delay_ms=_DEFAULT_HEDGE_DELAY_MS if delay_ms is None else delay_ms,
+        )
+
     return LlmPolicy(
         schema_version=str(payload["schema_version"]),
         compat_adr=str(compat["adr"]),
@@ -291,6 +417,7 @@ def _to_policy(payload: dict[str, Any]) -> LlmPolicy:
         tasks=tasks,
         routing=routing,
         fallback_chain=fallback_chain,
+        hedging=hedging,
     )
 
 
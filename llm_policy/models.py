@@ -1,7 +1,8 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Callable, Mapping
+import hashlib
+from dataclasses import dataclass, field
+from typing import Callable, Mapping, Protocol
 
 
 @dataclass(frozen=True)
@@ -23,6 +24,15 @@ class FallbackRule:
     max_retries: int | None
 
 
+@dataclass(frozen=True)
+class HedgePolicy:
+    """Per-task hedging: fire ``profile`` when the first call outlives its latency quantile."""
+
+    profile: str
+    after_quantile: float
+    delay_ms: int
+
+
 @dataclass(frozen=True)
 class LlmPolicy:
     schema_version: str
@@ -32,6 +42,30 @@ class LlmPolicy:
     tasks: tuple[str, ...]
     routing: Mapping[str, Mapping[str, CallSpec]]
     fallback_chain: tuple[FallbackRule, ...]
+    hedging: Mapping[str, HedgePolicy] = field(default_factory=dict)
+    call_specs: Mapping[tuple[str, str], CallSpec] = field(default_factory=dict, compare=False, repr=False)
+    # Digest of everything that can change a task's answer (routing, fallbacks, hedging).
+    version: str = field(default="", compare=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if not self.call_specs:
+            call_specs = {
+                (task_id, profile): spec
+                for task_id, task_routes in self.routing.items()
+                for profile, spec in task_routes.items()
+            }
+            object.__setattr__(self, "call_specs", call_specs)
+        if not self.version:
+            material = repr(
+                (
+                    self.schema_version,
+                    sorted(self.call_specs.items()),
+                    self.fallback_chain,
+                    sorted(self.hedging.items()),
+                )
+            )
+            version = hashlib.blake2b(material.encode("utf-8"), digest_size=8).hexdigest()
+            object.__setattr__(self, "version", version)
 
 
 @dataclass(frozen=True)
@@ -42,6 +76,10 @@ class TaskRunResult:
     attempts: int
     profile: str
     escalated: bool
+    cached: bool = False
+    coalesced: bool = False
+    hedged: bool = False
+    hedge_won: bool = False
 
 
 @dataclass(frozen=True)
@@ -52,3 +90,7 @@ class PolicyCall:
 
 
 LlmCaller = Callable[[CallSpec, str], str]
+
+
+class AsyncLlmCaller(Protocol):
+    async def __call__(self, spec: CallSpec, prompt: str) -> str: ...
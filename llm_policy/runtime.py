@@ -1,24 +1,62 @@
 from __future__ import annotations
 
+import asyncio
+import copy
+import hashlib
 import json
 import logging
+import threading
 import time
-from typing import Mapping
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import replace
+from typing import Callable, Generator, Mapping, Tuple
 
 from jsonschema import ValidationError, validate
 
+from app.metrics import counter, histogram
+from app.tracing import annotate_span, propagate, record_span, span
+from llm_policy.breaker import get_breaker
+from llm_policy.cache import TaskResultCache, get_task_cache, task_cache_key
 from llm_policy.config import (
     get_llm_policy_allow_placeholders,
     get_llm_policy_path,
+    get_llm_hedge_max_workers,
     get_llm_policy_profile,
+    is_llm_hedging_enabled,
     is_llm_policy_enabled,
+    is_llm_single_flight_enabled,
 )
-from llm_policy.errors import LlmUnavailableError
+from llm_policy.errors import LlmShedError, LlmUnavailableError
 from llm_policy.loader import LlmPolicyLoader
-from llm_policy.models import CallSpec, LlmCaller, LlmPolicy, TaskRunResult
+from llm_policy.models import AsyncLlmCaller, CallSpec, HedgePolicy, LlmCaller, LlmPolicy, TaskRunResult
+from llm_policy.scheduler import current_llm_priority, get_llm_scheduler, with_llm_priority
+from llm_policy.single_flight import AsyncSingleFlight, SingleFlight
 
 _LOGGER = logging.getLogger("llm_policy")
 _LLM_CALLER: LlmCaller | None = None
+_ASYNC_LLM_CALLER: AsyncLlmCaller | None = None
+
+# The repair/escalation state machine is written once as a generator that
+# yields (spec, prompt) for every LLM call and receives (raw, latency_ms) or
+# the caller's exception; the sync and async entry points only drive it.
+_Steps = Generator[Tuple[CallSpec, str], Tuple[str, float], TaskRunResult]
+
+LLM_TASK_MS = histogram("llm_task_ms", "run_task_with_policy latency incl. repair/escalation (ms)", ("task_id", "profile"))
+LLM_TASKS = counter("llm_tasks_total", "LLM task results", ("task_id", "profile", "outcome"))
+LLM_TASKS_COALESCED = counter(
+    "llm_task_coalesced_total", "LLM task calls that waited for an identical in-flight call", ("task_id",)
+)
+
+# Identical concurrent calls (task, profile, policy version, schema + prompt)
+# share one upstream call; see llm_policy/single_flight.py.
+_IN_FLIGHT: SingleFlight[TaskRunResult] = SingleFlight()
+_ASYNC_IN_FLIGHT: AsyncSingleFlight[TaskRunResult] = AsyncSingleFlight()
+
+LLM_HEDGES = counter("llm_task_hedges_total", "Hedged LLM tasks by outcome", ("task_id", "outcome"))
+
+# Sync hedged tasks run both legs here; see _run_hedged.
+_HEDGE_EXECUTOR: ThreadPoolExecutor | None = None
+_HEDGE_EXECUTOR_LOCK = threading.Lock()
 
 
 def set_llm_caller(caller: LlmCaller | None) -> None:
@@ -30,14 +68,22 @@ def get_llm_caller() -> LlmCaller | None:
     return _LLM_CALLER
 
 
+def set_async_llm_caller(caller: AsyncLlmCaller | None) -> None:
+    global _ASYNC_LLM_CALLER
+    _ASYNC_LLM_CALLER = caller
+
+
+def get_async_llm_caller() -> AsyncLlmCaller | None:
+    return _ASYNC_LLM_CALLER
+
+
 def resolve_call_spec(policy: LlmPolicy, task_id: str, profile: str) -> CallSpec:
-    task_routes = policy.routing.get(task_id)
-    if task_routes is None:
+    spec = policy.call_specs.get((task_id, profile))
+    if spec is not None:
+        return spec
+    if task_id not in policy.routing:
         raise ValueError(f"no routing for task {task_id}")
-    spec = task_routes.get(profile)
-    if spec is None:
-        raise ValueError(f"no routing for task {task_id} profile {profile}")
-    return spec
+    raise ValueError(f"no routing for task {task_id} profile {profile}")
 
 
 def run_task_with_policy(
@@ -51,6 +97,372 @@ def run_task_with_policy(
     caller: LlmCaller | None = None,
     policy_enabled: bool | None = None,
 ) -> TaskRunResult:
+    with span("llm.task", trace_id=trace_id, task_id=task_id):
+        started = time.monotonic()
+        caller = caller or get_llm_caller()
+        prepared = _prepare_task(
+            profile=profile, policy=policy, policy_enabled=policy_enabled, has_caller=caller is not None
+        )
+        if isinstance(prepared, TaskRunResult):
+            return _record_task(task_id, prepared, started)
+        cache, cache_key, cached = _cache_lookup(prepared, task_id, prompt, schema, profile)
+        if cached is not None:
+            return _record_task(task_id, cached, started)
+
+        def steps_for(start_profile: str | None, hedge: bool = False) -> _Steps:
+            return _task_steps(
+                policy=prepared,
+                task_id=task_id,
+                prompt=prompt,
+                schema=schema,
+                profile=start_profile,
+                trace_id=trace_id,
+                hedge=hedge,
+            )
+
+        def execute() -> TaskRunResult:
+            hedge = _hedge_policy(prepared, task_id, profile)
+            if hedge is None:
+                result = _drive_steps(steps_for(profile), caller)
+            else:
+                result = _run_hedged(
+                    task_id=task_id,
+                    trace_id=trace_id,
+                    delay_s=_hedge_delay_s(prepared, task_id, profile, hedge),
+                    primary=steps_for(profile),
+                    make_hedge=lambda: steps_for(hedge.profile, hedge=True),
+                    caller=caller,
+                )
+            if cache is not None:
+                cache.put(task_id, cache_key, result)
+            return result
+
+        if not is_llm_single_flight_enabled():
+            return _record_task(task_id, execute(), started)
+        result, shared = _IN_FLIGHT.run(_flight_key(prepared, task_id, prompt, schema, profile), execute)
+        return _record_task(task_id, _shared_result(task_id, result) if shared else result, started)
+
+
+async def run_task_with_policy_async(
+    *,
+    task_id: str,
+    prompt: str,
+    schema: Mapping[str, object],
+    profile: str | None = None,
+    trace_id: str | None = None,
+    policy: LlmPolicy | None = None,
+    caller: AsyncLlmCaller | None = None,
+    policy_enabled: bool | None = None,
+) -> TaskRunResult:
+    """Async ``run_task_with_policy``: same repair, escalation and logging, no thread per call."""
+    with span("llm.task", trace_id=trace_id, task_id=task_id):
+        started = time.monotonic()
+        caller = caller or get_async_llm_caller()
+        prepared = _prepare_task(
+            profile=profile, policy=policy, policy_enabled=policy_enabled, has_caller=caller is not None
+        )
+        if isinstance(prepared, TaskRunResult):
+            return _record_task(task_id, prepared, started)
+        cache, cache_key, cached = _cache_lookup(prepared, task_id, prompt, schema, profile)
+        if cached is not None:
+            return _record_task(task_id, cached, started)
+
+        def steps_for(start_profile: str | None, hedge: bool = False) -> _Steps:
+            return _task_steps(
+                policy=prepared,
+                task_id=task_id,
+                prompt=prompt,
+                schema=schema,
+                profile=start_profile,
+                trace_id=trace_id,
+                hedge=hedge,
+            )
+
+        async def execute() -> TaskRunResult:
+            hedge = _hedge_policy(prepared, task_id, profile)
+            if hedge is None:
+                result = await _drive_steps_async(steps_for(profile), caller)
+            else:
+                result = await _run_hedged_async(
+                    task_id=task_id,
+                    trace_id=trace_id,
+                    delay_s=_hedge_delay_s(prepared, task_id, profile, hedge),
+                    primary=steps_for(profile),
+                    make_hedge=lambda: steps_for(hedge.profile, hedge=True),
+                    caller=caller,
+                )
+            if cache is not None:
+                cache.put(task_id, cache_key, result)
+            return result
+
+        if not is_llm_single_flight_enabled():
+            return _record_task(task_id, await execute(), started)
+        result, shared = await _ASYNC_IN_FLIGHT.run(_flight_key(prepared, task_id, prompt, schema, profile), execute)
+        return _record_task(task_id, _shared_result(task_id, result) if shared else result, started)
+
+
+class _Leg:
+    """Calls started by one leg of a hedged task; ``cancelled`` stops it before its next call."""
+
+    __slots__ = ("calls", "cancelled")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.cancelled = threading.Event()
+
+
+def _drive_steps(steps: _Steps, caller: LlmCaller, leg: _Leg | None = None) -> TaskRunResult | None:
+    try:
+        request = next(steps)
+        while True:
+            if leg is not None:
+                if leg.cancelled.is_set():
+                    steps.close()
+                    return None
+                leg.calls += 1
+            spec, call_prompt = request
+            try:
+                outcome = _call_llm(caller, spec, call_prompt)
+            except Exception as exc:
+                request = steps.throw(exc)
+            else:
+                request = steps.send(outcome)
+    except StopIteration as stop:
+        return stop.value
+
+
+async def _drive_steps_async(steps: _Steps, caller: AsyncLlmCaller, leg: _Leg | None = None) -> TaskRunResult:
+    try:
+        request = next(steps)
+        while True:
+            if leg is not None:
+                leg.calls += 1
+            spec, call_prompt = request
+            try:
+                outcome = await _call_llm_async(caller, spec, call_prompt)
+            except Exception as exc:
+                request = steps.throw(exc)
+            else:
+                request = steps.send(outcome)
+    except StopIteration as stop:
+        return stop.value
+
+
+def _hedge_policy(policy: LlmPolicy, task_id: str, profile: str | None) -> HedgePolicy | None:
+    hedge = policy.hedging.get(task_id)
+    if hedge is None or not is_llm_hedging_enabled():
+        return None
+    if (profile or get_llm_policy_profile()) == hedge.profile or (task_id, hedge.profile) not in policy.call_specs:
+        return None
+    return hedge
+
+
+def _hedge_delay_s(policy: LlmPolicy, task_id: str, profile: str | None, hedge: HedgePolicy) -> float:
+    """Primary's recent latency quantile; the configured delay until there is enough history."""
+    start_profile = profile or get_llm_policy_profile()
+    spec = resolve_call_spec(policy, task_id, start_profile)
+    observed_ms = get_breaker(spec, start_profile).latency_quantile(hedge.after_quantile)
+    return (hedge.delay_ms if observed_ms is None else observed_ms) / 1000
+
+
+def _run_hedged(
+    *,
+    task_id: str,
+    trace_id: str | None,
+    delay_s: float,
+    primary: _Steps,
+    make_hedge: Callable[[], _Steps],
+    caller: LlmCaller,
+) -> TaskRunResult:
+    """Run ``primary``; after ``delay_s`` race it against the hedge leg, first ok answer wins.
+
+    A losing sync leg cannot be interrupted mid-request: it is told to stop
+    before its next call (repair or escalation) and its answer is dropped.
+    """
+    executor = _hedge_executor()
+    legs: dict[Future, tuple[_Leg, bool]] = {}
+    primary_leg = _Leg()
+    primary_future = executor.submit(propagate(with_llm_priority(_drive_steps)), primary, caller, primary_leg)
+    legs[primary_future] = (primary_leg, False)
+    try:
+        done, _ = wait([primary_future], timeout=delay_s)
+        if done:
+            LLM_HEDGES.labels(task_id, "not_fired").inc()
+            return primary_future.result()
+        hedge_leg = _Leg()
+        hedge_future = executor.submit(propagate(with_llm_priority(_drive_steps)), make_hedge(), caller, hedge_leg)
+        legs[hedge_future] = (hedge_leg, True)
+        pending = set(legs)
+        results: dict[bool, TaskRunResult] = {}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                results[legs[future][1]] = result
+                if result.status == "ok":
+                    return _hedge_outcome(task_id, trace_id, result, legs, winner=future)
+        return _hedge_outcome(task_id, trace_id, results[False], legs, winner=primary_future)
+    finally:
+        for leg, _is_hedge in legs.values():
+            leg.cancelled.set()
+
+
+async def _run_hedged_async(
+    *,
+    task_id: str,
+    trace_id: str | None,
+    delay_s: float,
+    primary: _Steps,
+    make_hedge: Callable[[], _Steps],
+    caller: AsyncLlmCaller,
+) -> TaskRunResult:
+    """Async ``_run_hedged``; the losing leg's task is cancelled."""
+    legs: dict[asyncio.Future, tuple[_Leg, bool]] = {}
+
+    def start(steps: _Steps, is_hedge: bool) -> asyncio.Future:
+        leg = _Leg()
+        task = asyncio.ensure_future(_drive_steps_async(steps, caller, leg))
+        legs[task] = (leg, is_hedge)
+        return task
+
+    primary_task = start(primary, False)
+    try:
+        done, _ = await asyncio.wait({primary_task}, timeout=delay_s)
+        if done:
+            LLM_HEDGES.labels(task_id, "not_fired").inc()
+            return primary_task.result()
+        start(make_hedge(), True)
+        pending = set(legs)
+        results: dict[bool, TaskRunResult] = {}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                result = task.result()
+                results[legs[task][1]] = result
+                if result.status == "ok":
+                    return _hedge_outcome(task_id, trace_id, result, legs, winner=task)
+        return _hedge_outcome(task_id, trace_id, results[False], legs, winner=primary_task)
+    finally:
+        for task in legs:
+            task.cancel()
+
+
+def _hedge_outcome(
+    task_id: str,
+    trace_id: str | None,
+    result: TaskRunResult,
+    legs: Mapping[object, tuple[_Leg, bool]],
+    *,
+    winner: object,
+) -> TaskRunResult:
+    hedge_won = legs[winner][1] and result.status == "ok"
+    other_calls = sum(leg.calls for handle, (leg, _is_hedge) in legs.items() if handle is not winner)
+    outcome = "hedge_won" if hedge_won else "primary_won" if result.status == "ok" else "failed"
+    LLM_HEDGES.labels(task_id, outcome).inc()
+    _LOGGER.info(
+        "llm_policy_hedge %s",
+        {"trace_id": trace_id, "task_id": task_id, "outcome": outcome, "profile": result.profile},
+    )
+    return replace(
+        result,
+        attempts=result.attempts + other_calls,
+        escalated=result.escalated or hedge_won,
+        hedged=True,
+        hedge_won=hedge_won,
+    )
+
+
+def _hedge_executor() -> ThreadPoolExecutor:
+    global _HEDGE_EXECUTOR
+    with _HEDGE_EXECUTOR_LOCK:
+        if _HEDGE_EXECUTOR is None:
+            _HEDGE_EXECUTOR = ThreadPoolExecutor(
+                max_workers=get_llm_hedge_max_workers(), thread_name_prefix="llm-hedge"
+            )
+        return _HEDGE_EXECUTOR
+
+
+def shutdown_hedge_executor() -> None:
+    global _HEDGE_EXECUTOR
+    with _HEDGE_EXECUTOR_LOCK:
+        executor, _HEDGE_EXECUTOR = _HEDGE_EXECUTOR, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _flight_key(
+    policy: LlmPolicy,
+    task_id: str,
+    prompt: str,
+    schema: Mapping[str, object],
+    profile: str | None,
+) -> tuple[str, str, str, str, str]:
+    # The priority class is part of the key: a user call must never wait behind
+    # a shadow leader's queue position or inherit its llm_shed result.
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(json.dumps(schema, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(prompt.encode("utf-8"))
+    return (
+        task_id,
+        profile or get_llm_policy_profile(),
+        policy.version,
+        current_llm_priority(),
+        digest.hexdigest(),
+    )
+
+
+def _shared_result(task_id: str, result: TaskRunResult) -> TaskRunResult:
+    # Every waiter gets its own copy of the payload; callers may edit it.
+    LLM_TASKS_COALESCED.labels(task_id).inc()
+    return replace(result, data=copy.deepcopy(result.data), coalesced=True)
+
+
+def _record_task(task_id: str, result: TaskRunResult, started: float) -> TaskRunResult:
+    profile = result.profile or "unknown"
+    LLM_TASK_MS.labels(task_id, profile).observe((time.monotonic() - started) * 1000)
+    LLM_TASKS.labels(task_id, profile, result.error_type or result.status).inc()
+    annotate_span(
+        error_type=result.error_type if result.status == "error" else None,
+        profile=profile,
+        status=result.status,
+        attempts=result.attempts,
+        escalated=result.escalated,
+        cached=result.cached,
+        coalesced=result.coalesced,
+        hedged=result.hedged,
+        hedge_won=result.hedge_won,
+    )
+    return result
+
+
+def _cache_lookup(
+    policy: LlmPolicy,
+    task_id: str,
+    prompt: str,
+    schema: Mapping[str, object],
+    profile: str | None,
+) -> tuple[TaskResultCache | None, str, TaskRunResult | None]:
+    cache = get_task_cache()
+    if cache is None:
+        return None, "", None
+    key = task_cache_key(
+        task_id=task_id,
+        profile=profile or get_llm_policy_profile(),
+        prompt=prompt,
+        schema=schema,
+        policy_version=policy.version,
+    )
+    return cache, key, cache.get(task_id, key)
+
+
+def _prepare_task(
+    *,
+    profile: str | None,
+    policy: LlmPolicy | None,
+    policy_enabled: bool | None,
+    has_caller: bool,
+) -> LlmPolicy | TaskRunResult:
     enabled = is_llm_policy_enabled() if policy_enabled is None else policy_enabled
     if not enabled:
         return TaskRunResult(
@@ -62,7 +474,7 @@ def run_task_with_policy(
             escalated=False,
         )
 
-    policy = policy or LlmPolicyLoader.load(
+    policy = policy or LlmPolicyLoader.load_cached(
         enabled=True,
         path_override=get_llm_policy_path(),
         allow_placeholders=get_llm_policy_allow_placeholders(),
@@ -77,8 +489,7 @@ def run_task_with_policy(
             escalated=False,
         )
 
-    caller = caller or get_llm_caller()
-    if caller is None:
+    if not has_caller:
         return TaskRunResult(
             status="error",
             data=None,
@@ -87,7 +498,19 @@ def run_task_with_policy(
             profile=profile or get_llm_policy_profile(),
             escalated=False,
         )
+    return policy
 
+
+def _task_steps(
+    *,
+    policy: LlmPolicy,
+    task_id: str,
+    prompt: str,
+    schema: Mapping[str, object],
+    profile: str | None,
+    trace_id: str | None,
+    hedge: bool = False,
+) -> _Steps:
     start_profile = profile or get_llm_policy_profile()
     profiles_to_try = [start_profile]
     if start_profile != "reliable":
@@ -99,15 +522,15 @@ def run_task_with_policy(
     for current_profile in profiles_to_try:
         if current_profile != start_profile:
             escalated = True
-        result = _run_profile(
+        result = yield from _profile_steps(
             policy=policy,
             task_id=task_id,
             profile=current_profile,
             prompt=prompt,
             schema=schema,
-            caller=caller,
             trace_id=trace_id,
             escalated=escalated,
+            hedge=hedge,
         )
         attempts += result.attempts
         if result.status == "ok":
@@ -149,25 +572,37 @@ def run_task_with_policy(
     )
 
 
-def _run_profile(
+def _profile_steps(
     *,
     policy: LlmPolicy,
     task_id: str,
     profile: str,
     prompt: str,
     schema: Mapping[str, object],
-    caller: LlmCaller,
     trace_id: str | None,
     escalated: bool,
-) -> TaskRunResult:
+    hedge: bool = False,
+) -> _Steps:
     last_raw: str | None = None
     attempts = 0
     for attempt_index in range(2):
         attempts += 1
         spec = resolve_call_spec(policy, task_id, profile)
+        breaker = get_breaker(spec, profile)
+        if not breaker.allow():
+            _log_circuit_open(trace_id=trace_id, profile=profile, spec=spec, escalated=escalated, hedge=hedge)
+            return TaskRunResult(
+                status="error",
+                data=None,
+                error_type="llm_unavailable",
+                attempts=attempts - 1,
+                profile=profile,
+                escalated=False,
+            )
+        spec = breaker.adapt(spec)
         call_prompt = prompt if attempt_index == 0 else _build_repair_prompt(schema, last_raw or "")
         try:
-            raw, latency_ms = _call_llm(caller, spec, call_prompt)
+            raw, latency_ms = yield spec, call_prompt
         except TimeoutError:
             _log_attempt(
                 trace_id=trace_id,
@@ -178,6 +613,7 @@ def _run_profile(
                 error_type="timeout",
                 attempts=attempts,
                 escalated=escalated,
+                hedge=hedge,
             )
             return TaskRunResult(
                 status="error",
@@ -187,6 +623,18 @@ def _run_profile(
                 profile=profile,
                 escalated=False,
             )
+        except LlmShedError:
+            # Refused before reaching the provider: not an upstream failure, so
+            # neither the breaker nor llm.attempt sees it.
+            _log_shed(trace_id=trace_id, profile=profile, spec=spec, escalated=escalated, hedge=hedge)
+            return TaskRunResult(
+                status="error",
+                data=None,
+                error_type="llm_shed",
+                attempts=attempts - 1,
+                profile=profile,
+                escalated=False,
+            )
         except LlmUnavailableError:
             _log_attempt(
                 trace_id=trace_id,
@@ -197,6 +645,7 @@ def _run_profile(
                 error_type="llm_unavailable",
                 attempts=attempts,
                 escalated=escalated,
+                hedge=hedge,
             )
             return TaskRunResult(
                 status="error",
@@ -216,6 +665,7 @@ def _run_profile(
                 error_type="llm_error",
                 attempts=attempts,
                 escalated=escalated,
+                hedge=hedge,
             )
             return TaskRunResult(
                 status="error",
@@ -238,6 +688,7 @@ def _run_profile(
                 error_type="invalid_json",
                 attempts=attempts,
                 escalated=escalated,
+                hedge=hedge,
             )
             if attempt_index == 0:
                 continue
@@ -260,6 +711,7 @@ def _run_profile(
                 error_type="schema_validation_failed",
                 attempts=attempts,
                 escalated=escalated,
+                hedge=hedge,
             )
             if attempt_index == 0:
                 continue
@@ -281,6 +733,7 @@ def _run_profile(
             error_type=None,
             attempts=attempts,
             escalated=escalated,
+            hedge=hedge,
         )
         return TaskRunResult(
             status="ok",
@@ -302,12 +755,37 @@ def _run_profile(
 
 
 def _call_llm(caller: LlmCaller, spec: CallSpec, prompt: str) -> tuple[str, float]:
+    scheduler = get_llm_scheduler()
+    if scheduler is None:
+        return _timed_call(caller, spec, prompt)
+    with scheduler.slot(spec.provider):
+        # Latency is measured after admission, so queue wait never feeds the
+        # breaker's adaptive timeout or the hedge delay.
+        return _timed_call(caller, spec, prompt)
+
+
+def _timed_call(caller: LlmCaller, spec: CallSpec, prompt: str) -> tuple[str, float]:
     start = time.monotonic()
     raw = caller(spec, prompt)
     latency_ms = (time.monotonic() - start) * 1000
     return raw, latency_ms
 
 
+async def _call_llm_async(caller: AsyncLlmCaller, spec: CallSpec, prompt: str) -> tuple[str, float]:
+    scheduler = get_llm_scheduler()
+    if scheduler is None:
+        return await _timed_call_async(caller, spec, prompt)
+    async with scheduler.slot_async(spec.provider):
+        return await _timed_call_async(caller, spec, prompt)
+
+
+async def _timed_call_async(caller: AsyncLlmCaller, spec: CallSpec, prompt: str) -> tuple[str, float]:
+    start = time.monotonic()
+    raw = await caller(spec, prompt)
+    latency_ms = (time.monotonic() - start) * 1000
+    return raw, latency_ms
+
+
 def _parse_json(raw: str) -> Mapping[str, object] | None:
     direct = _load_json_object(raw)
     if direct is not None:
@@ -448,6 +926,7 @@ def _log_attempt(
     error_type: str | None,
     attempts: int,
     escalated: bool,
+    hedge: bool = False,
 ) -> None:
     payload = {
         "trace_id": trace_id,
@@ -458,6 +937,59 @@ def _log_attempt(
         "latency_ms": round(latency_ms, 2) if latency_ms is not None else None,
         "attempts": attempts,
         "escalated": escalated,
+        "hedge": hedge,
         "error_type": error_type,
     }
     _LOGGER.info("llm_policy_attempt %s", payload)
+    # A timeout's latency is unknown but at least the timeout it was given.
+    observed_ms = spec.timeout_ms if error_type == "timeout" else latency_ms
+    get_breaker(spec, profile).record(error_type=error_type, latency_ms=observed_ms)
+    record_span(
+        "llm.attempt",
+        latency_ms,
+        error_type=None if ok else error_type or "llm_error",
+        provider=spec.provider,
+        model=spec.model,
+        profile=profile,
+        attempt=attempts,
+        escalated=escalated,
+        hedge=hedge,
+    )
+
+
+def _log_shed(*, trace_id: str | None, profile: str, spec: CallSpec, escalated: bool, hedge: bool) -> None:
+    payload = {
+        "trace_id": trace_id,
+        "provider": spec.provider,
+        "model": spec.model,
+        "profile": profile,
+        "escalated": escalated,
+        "hedge": hedge,
+        "priority": current_llm_priority(),
+        "error_type": "llm_shed",
+    }
+    _LOGGER.info("llm_policy_shed %s", payload)
+
+
+def _log_circuit_open(*, trace_id: str | None, profile: str, spec: CallSpec, escalated: bool, hedge: bool) -> None:
+    payload = {
+        "trace_id": trace_id,
+        "provider": spec.provider,
+        "model": spec.model,
+        "profile": profile,
+        "escalated": escalated,
+        "hedge": hedge,
+        "error_type": "llm_unavailable",
+        "circuit": "open",
+    }
+    _LOGGER.info("llm_policy_circuit_open %s", payload)
+    record_span(
+        "llm.attempt",
+        0.0,
+        error_type="llm_unavailable",
+        provider=spec.provider,
+        model=spec.model,
+        profile=profile,
+        hedge=hedge,
+        circuit="open",
+    )
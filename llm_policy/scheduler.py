@@ -0,0 +1,302 @@
+"""Process-wide admission control for LLM calls.
+
+Assist, partial trust, the shadow router, shadow agents and the v0 runner
+each run their own thread pool, but they all share one provider quota.
+Every LLM call made by ``run_task_with_policy`` passes through this
+scheduler, which enforces:
+
+- LLM_SCHEDULER_MAX_CONCURRENCY calls in flight at once;
+- per provider, a token bucket of LLM_PROVIDER_RATE_LIMITS
+  (``provider=calls_per_s,...``) with one second of burst. An unlisted
+  provider is not rate limited.
+
+It is opt-in: without LLM_SCHEDULER_ENABLED=true calls are admitted directly.
+
+Each call carries a priority class from the ``llm_priority`` context
+(``with_llm_priority`` hands it to executor threads): ``user`` (the default,
+which covers assist, partial trust and the baseline path), then ``shadow``,
+then ``analysis``. When a slot frees up it goes to the oldest waiter of the best
+class. Lower classes are shed first:
+
+- ``shadow`` and ``analysis`` calls wait only while fewer than
+  LLM_SCHEDULER_SHED_QUEUE of them are queued, and never wait for tokens.
+- ``user`` calls wait up to LLM_SCHEDULER_MAX_WAIT_MS, for a slot and then
+  for a token.
+
+A call that cannot be admitted raises ``LlmShedError``. The runtime reports
+it as ``llm_shed`` and does not count it against the circuit breaker.
+Queue wait is recorded in ``llm_scheduler_wait_ms``, and sheds in
+``llm_scheduler_shed_total``. ``scheduler_stats`` reports in-flight and
+queued calls.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import heapq
+import itertools
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Tuple, TypeVar
+
+from app.metrics import counter, histogram
+from llm_policy.config import (
+    get_llm_provider_rate_limits,
+    get_llm_scheduler_max_concurrency,
+    get_llm_scheduler_max_wait_ms,
+    get_llm_scheduler_shed_queue,
+    is_llm_scheduler_enabled,
+)
+from llm_policy.errors import LlmShedError
+
+PRIORITY_CLASSES = ("user", "shadow", "analysis")
+SHEDDABLE = frozenset({"shadow", "analysis"})
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_PRIORITY: ContextVar[str] = ContextVar("llm_priority", default="user")
+
+LLM_SCHEDULER_WAIT_MS = histogram("llm_scheduler_wait_ms", "Time LLM calls waited for admission (ms)", ("priority",))
+LLM_SCHEDULER_SHED = counter("llm_scheduler_shed_total", "LLM calls shed by the scheduler", ("priority", "reason"))
+
+
+@contextmanager
+def llm_priority(priority: str) -> Iterator[None]:
+    """Priority class for LLM calls made in this block (and in work it ``propagate``s)."""
+    if priority not in PRIORITY_CLASSES:
+        raise ValueError(f"unknown LLM priority class: {priority}")
+    token = _PRIORITY.set(priority)
+    try:
+        yield
+    finally:
+        _PRIORITY.reset(token)
+
+
+def current_llm_priority() -> str:
+    return _PRIORITY.get()
+
+
+def with_llm_priority(func: F) -> F:
+    """Bind ``func`` to the current priority class (for ``executor.submit``).
+
+    ``propagate`` only copies the context while tracing is on, so work handed
+    to another pool is wrapped with this as well.
+    """
+    priority = _PRIORITY.get()
+    if priority == "user":
+        return func
+
+    @functools.wraps(func)
+    def run(*args: Any, **kwargs: Any) -> Any:
+        with llm_priority(priority):
+            return func(*args, **kwargs)
+
+    return run  # type: ignore[return-value]
+
+
+class _TokenBucket:
+    """Reservation bucket: ``reserve`` books a token and says how long until it is valid."""
+
+    def __init__(self, rate: float) -> None:
+        self.rate = rate
+        self.burst = max(rate, 1.0)
+        self._tokens = self.burst
+        self._refilled_at: float | None = None
+
+    def reserve(self, now: float, max_delay_s: float) -> float | None:
+        if self._refilled_at is not None:
+            self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+        delay_s = max(0.0, (1.0 - self._tokens) / self.rate)
+        if delay_s > max_delay_s:
+            return None
+        self._tokens -= 1.0
+        return delay_s
+
+
+class _Waiter:
+    __slots__ = ("rank", "seq", "priority", "granted", "wake")
+
+    def __init__(self, priority: str, seq: int, wake: Callable[[], None]) -> None:
+        self.rank = PRIORITY_CLASSES.index(priority)
+        self.seq = seq
+        self.priority = priority
+        self.granted = False
+        self.wake = wake
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.rank, self.seq) < (other.rank, other.seq)
+
+
+class LlmScheduler:
+    def __init__(self, *, max_concurrency: int, rate_limits: Dict[str, float]) -> None:
+        self.max_concurrency = max_concurrency
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._queue: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._buckets = {provider: _TokenBucket(rate) for provider, rate in rate_limits.items()}
+        self.in_flight_by_priority: Dict[str, int] = {priority: 0 for priority in PRIORITY_CLASSES}
+
+    @contextmanager
+    def slot(self, provider: str) -> Iterator[None]:
+        """Hold one admission for a synchronous call to ``provider``."""
+        priority = current_llm_priority()
+        event = threading.Event()
+        waiter = self._enqueue(priority, event.set)
+        if waiter is not None:
+            started = time.monotonic()
+            admitted = event.wait(get_llm_scheduler_max_wait_ms() / 1000)
+            self._observe_wait(priority, started)
+            if not admitted:
+                self._abandon(waiter)
+        else:
+            LLM_SCHEDULER_WAIT_MS.labels(priority).observe(0.0)
+        try:
+            delay_s = self._reserve_token(provider, priority)
+            if delay_s:
+                time.sleep(delay_s)
+            yield
+        finally:
+            self._release(priority)
+
+    @asynccontextmanager
+    async def slot_async(self, provider: str) -> AsyncIterator[None]:
+        """``slot`` for coroutines: waits on the event loop instead of blocking a thread."""
+        priority = current_llm_priority()
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[None] = loop.create_future()
+
+        def wake() -> None:
+            loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+
+        waiter = self._enqueue(priority, wake)
+        if waiter is not None:
+            started = time.monotonic()
+            try:
+                await asyncio.wait_for(asyncio.shield(future), get_llm_scheduler_max_wait_ms() / 1000)
+            except asyncio.TimeoutError:
+                self._observe_wait(priority, started)
+                self._abandon(waiter)
+            except asyncio.CancelledError:
+                if not self._withdraw(waiter):
+                    self._release(priority)
+                raise
+            else:
+                self._observe_wait(priority, started)
+        else:
+            LLM_SCHEDULER_WAIT_MS.labels(priority).observe(0.0)
+        try:
+            delay_s = self._reserve_token(provider, priority)
+            if delay_s:
+                await asyncio.sleep(delay_s)
+            yield
+        finally:
+            self._release(priority)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            queued = {priority: 0 for priority in PRIORITY_CLASSES}
+            for waiter in self._queue:
+                queued[waiter.priority] += 1
+            return {"in_flight": dict(self.in_flight_by_priority), "queued": queued}
+
+    # -- internals ---------------------------------------------------------
+
+    def _enqueue(self, priority: str, wake: Callable[[], None]) -> _Waiter | None:
+        """Admit now (``None``) or return the queued waiter; sheds raise ``LlmShedError``."""
+        with self._lock:
+            if self._in_flight < self.max_concurrency and not self._queue:
+                self._take(priority)
+                return None
+            if priority in SHEDDABLE:
+                queued = sum(1 for waiter in self._queue if waiter.priority in SHEDDABLE)
+                if queued >= get_llm_scheduler_shed_queue():
+                    LLM_SCHEDULER_SHED.labels(priority, "saturated").inc()
+                    raise LlmShedError(f"LLM scheduler saturated; {priority} call shed")
+            waiter = _Waiter(priority, next(self._seq), wake)
+            heapq.heappush(self._queue, waiter)
+            return waiter
+
+    def _withdraw(self, waiter: _Waiter) -> bool:
+        """Leave the queue; ``False`` if a slot was granted in the meantime."""
+        with self._lock:
+            if waiter.granted:
+                return False
+            self._queue.remove(waiter)
+            heapq.heapify(self._queue)
+            return True
+
+    def _abandon(self, waiter: _Waiter) -> None:
+        if not self._withdraw(waiter):
+            return  # granted while timing out: keep the slot
+        LLM_SCHEDULER_SHED.labels(waiter.priority, "queue_timeout").inc()
+        raise LlmShedError(f"LLM scheduler queue wait exceeded for {waiter.priority} call")
+
+    def _observe_wait(self, priority: str, started: float) -> None:
+        LLM_SCHEDULER_WAIT_MS.labels(priority).observe((time.monotonic() - started) * 1000)
+
+    def _reserve_token(self, provider: str, priority: str) -> float:
+        bucket = self._buckets.get(provider)
+        if bucket is None:
+            return 0.0
+        max_delay_s = 0.0 if priority in SHEDDABLE else get_llm_scheduler_max_wait_ms() / 1000
+        with self._lock:
+            delay_s = bucket.reserve(time.monotonic(), max_delay_s)
+        if delay_s is None:
+            LLM_SCHEDULER_SHED.labels(priority, "rate_limited").inc()
+            raise LlmShedError(f"LLM provider {provider} rate limit; {priority} call shed")
+        return delay_s
+
+    def _take(self, priority: str) -> None:
+        self._in_flight += 1
+        self.in_flight_by_priority[priority] += 1
+
+    def _release(self, priority: str) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self.in_flight_by_priority[priority] -= 1
+            if not self._queue or self._in_flight >= self.max_concurrency:
+                return
+            waiter = heapq.heappop(self._queue)
+            waiter.granted = True
+            self._take(waiter.priority)
+        waiter.wake()
+
+
+_SCHEDULER: LlmScheduler | None = None
+_SCHEDULER_CONFIG: Tuple[int, Tuple[Tuple[str, float], ...]] | None = None
+_SCHEDULER_LOCK = threading.Lock()
+
+
+def get_llm_scheduler() -> LlmScheduler | None:
+    """The process-wide scheduler, or ``None`` while LLM_SCHEDULER_ENABLED is off."""
+    global _SCHEDULER, _SCHEDULER_CONFIG
+    if not is_llm_scheduler_enabled():
+        return None
+    config = (get_llm_scheduler_max_concurrency(), tuple(sorted(get_llm_provider_rate_limits().items())))
+    scheduler = _SCHEDULER
+    if scheduler is not None and _SCHEDULER_CONFIG == config:
+        return scheduler
+    with _SCHEDULER_LOCK:
+        if _SCHEDULER is None or _SCHEDULER_CONFIG != config:
+            _SCHEDULER = LlmScheduler(max_concurrency=config[0], rate_limits=dict(config[1]))
+            _SCHEDULER_CONFIG = config
+        return _SCHEDULER
+
+
+def scheduler_stats() -> Dict[str, Dict[str, int]]:
+    scheduler = _SCHEDULER
+    if scheduler is None:
+        return {}
+    return scheduler.stats()
+
+
+def reset_llm_scheduler() -> None:
+    global _SCHEDULER, _SCHEDULER_CONFIG
+    with _SCHEDULER_LOCK:
+        _SCHEDULER = None
+        _SCHEDULER_CONFIG = None
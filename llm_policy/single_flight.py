@@ -0,0 +1,98 @@
+"""Coalescing of identical in-flight calls ("single flight").
+
+The first caller of a key runs the call; callers that arrive while it is in
+flight wait for that result instead of starting their own. A waiter never
+owns the call. When a waiter gives up (a ``future.result(timeout=...)``
+around it, or a cancelled ``asyncio.wait_for``), the shared call goes on for
+everyone else. The same holds if the caller that started it gives up.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import weakref
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class _Call(Generic[T]):
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.waiters = 0
+        self.result: T | None = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight(Generic[T]):
+    """Thread-based coalescing: ``run`` returns ``(result, shared)``."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call[T]] = {}
+
+    def run(self, key: Hashable, func: Callable[[], T]) -> Tuple[T, bool]:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if call is None:
+                call = self._calls[key] = _Call()
+            else:
+                call.waiters += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True  # type: ignore[return-value]
+        try:
+            call.result = func()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result, False
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def waiting(self) -> int:
+        with self._lock:
+            return sum(call.waiters for call in self._calls.values())
+
+
+class AsyncSingleFlight(Generic[T]):
+    """Event-loop coalescing: the call runs as its own task, awaited through ``shield``."""
+
+    def __init__(self) -> None:
+        self._calls: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Hashable, asyncio.Task[Any]]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        loop = asyncio.get_running_loop()
+        calls = self._calls.setdefault(loop, {})
+        task = calls.get(key)
+        if task is not None:
+            return await asyncio.shield(task), True
+        task = loop.create_task(_await(factory))
+        calls[key] = task
+
+        def _forget(done: "asyncio.Task[Any]") -> None:
+            if calls.get(key) is done:
+                del calls[key]
+            if not done.cancelled():
+                done.exception()  # retrieved even if every waiter gave up
+
+        task.add_done_callback(_forget)
+        return await asyncio.shield(task), False
+
+
+async def _await(factory: Callable[[], Awaitable[T]]) -> T:
+    return await factory()
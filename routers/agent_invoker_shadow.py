@@ -6,10 +6,12 @@ from concurrent.futures import ThreadPoolExecutor
 from dataclasses import replace
 from typing import Any, Dict, Iterable
 
-from agent_registry.v0_loader import AgentRegistryV0Loader, load_capability_catalog
+from agent_registry.snapshot import get_capability_catalog, get_registry_snapshot
 from agent_registry.v0_models import AgentRegistryV0, AgentSpec, TimeoutSpec
 from agent_registry.v0_runner import AgentOutput, run as run_agent
 from app.logging.shadow_agent_diff_log import log_shadow_agent_diff, summarize_agent_payload
+from app.tracing import propagate
+from llm_policy.scheduler import llm_priority
 from routers.partial_trust_sampling import stable_sample
 from routers.shadow_agent_config import (
     shadow_agent_allowlist,
@@ -22,10 +24,6 @@ from routers.shadow_agent_config import (
 
 
 _EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="shadow-agent-invoker")
-_REGISTRY_CACHE: tuple[str, AgentRegistryV0] | None = None
-_REGISTRY_ERROR: str | None = None
-_CATALOG_CACHE: dict[str, dict[str, Any]] | None = None
-_CATALOG_ERROR: str | None = None
 
 
 def invoke_shadow_agents(
@@ -111,33 +109,17 @@ def _override_spec(agent: AgentSpec, timeout_ms: int) -> AgentSpec:
 
 
 def _load_registry(path: str) -> AgentRegistryV0 | None:
-    global _REGISTRY_CACHE, _REGISTRY_ERROR
-    if _REGISTRY_CACHE and _REGISTRY_CACHE[0] == path:
-        return _REGISTRY_CACHE[1]
-    if _REGISTRY_ERROR == path:
-        return None
     try:
-        registry = AgentRegistryV0Loader.load(path_override=path)
+        return get_registry_snapshot(path).registry
     except Exception:
-        _REGISTRY_ERROR = path
         return None
-    _REGISTRY_CACHE = (path, registry)
-    return registry
 
 
 def _load_catalog() -> dict[str, dict[str, Any]] | None:
-    global _CATALOG_CACHE, _CATALOG_ERROR
-    if _CATALOG_CACHE is not None:
-        return _CATALOG_CACHE
-    if _CATALOG_ERROR is not None:
-        return None
     try:
-        catalog = load_capability_catalog()
+        return get_capability_catalog()
     except Exception:
-        _CATALOG_ERROR = "error"
         return None
-    _CATALOG_CACHE = catalog
-    return catalog
 
 
 def _submit_agent_run(
@@ -151,7 +133,7 @@ def _submit_agent_run(
 ) -> None:
     try:
         future = _EXECUTOR.submit(
-            _run_agent,
+            propagate(_run_agent),
             agent,
             agent_input,
             trace_id,
@@ -174,7 +156,8 @@ def _run_agent(
     catalog: dict[str, dict[str, Any]] | None,
     log_diff: bool,
 ) -> None:
-    output = run_agent(agent, agent_input, trace_id=trace_id)
+    with llm_priority("shadow"):
+        output = run_agent(agent, agent_input, trace_id=trace_id)
     if log_diff:
         _log_diff_event(output, agent, baseline_summary, catalog, trace_id, command_id)
 
@@ -29,6 +29,22 @@ def assist_timeout_ms() -> int:
         return 200
 
 
+def assist_hints_budget_ms() -> int:
+    """Worst-case wall time of the assist LLM steps (they share one deadline)."""
+    enabled = [assist_normalization_enabled(), assist_entity_extraction_enabled(), assist_clarify_enabled()]
+    return max(assist_timeout_ms(), 1) if any(enabled) else 0
+
+
+def assist_max_workers() -> int:
+    """Worker threads for assist LLM calls: three hint steps per concurrent request."""
+    value = os.getenv("ASSIST_MAX_WORKERS", "24").strip()
+    try:
+        workers = int(value)
+    except ValueError:
+        return 24
+    return max(workers, 3)
+
+
 def assist_log_path() -> str:
     return os.getenv("ASSIST_LOG_PATH", "logs/assist.jsonl").strip()
 
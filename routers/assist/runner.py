@@ -5,11 +5,14 @@ from __future__ import annotations
 import re
 import time
 from dataclasses import replace
-from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
-from typing import Any, Dict, Iterable, List, Optional
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional
 
 from app.logging.assist_log import append_assist_log
-from agent_registry.v0_loader import AgentRegistryV0Loader
+from app.logging.sampling import sampling_key
+from app.tracing import propagate, span
+from agent_registry.capabilities_lookup import CapabilitiesLookup
+from agent_registry.snapshot import get_registry_snapshot
 from agent_registry.v0_models import AgentRegistryV0, AgentSpec, TimeoutSpec
 from agent_registry.v0_runner import run as run_agent
 from graphs.core_graph import detect_intent, extract_item_name as fallback_extract_item_name
@@ -24,6 +27,7 @@ from routers.assist.config import (
     assist_agent_hints_timeout_ms,
     assist_clarify_enabled,
     assist_entity_extraction_enabled,
+    assist_max_workers,
     assist_mode_enabled,
     assist_normalization_enabled,
     assist_timeout_ms,
@@ -41,9 +45,10 @@ from routers.partial_trust_sampling import stable_sample
 
 
 ASSIST_VERSION = "assist-0.1"
-_EXECUTOR = ThreadPoolExecutor(max_workers=3, thread_name_prefix="assist-mode")
-_AGENT_REGISTRY_CACHE: Optional[AgentRegistryV0] = None
-_AGENT_REGISTRY_ERROR: bool = False
+# LLM calls and the per-request hint fan-out use separate pools so a hint step
+# waiting on its LLM call never starves the pool that call needs.
+_EXECUTOR = ThreadPoolExecutor(max_workers=assist_max_workers(), thread_name_prefix="assist-mode")
+_HINT_EXECUTOR = ThreadPoolExecutor(max_workers=assist_max_workers(), thread_name_prefix="assist-hints")
 
 _NORMALIZATION_TASK_ID = "assist_normalization"
 _ENTITY_TASK_ID = "assist_entity_extraction"
@@ -108,11 +113,31 @@ _CLARIFY_SCHEMA = {
 }
 
 
-def apply_assist_hints(command: Dict[str, Any], normalized: Dict[str, Any]) -> AssistApplication:
+def apply_assist_hints(
+    command: Dict[str, Any],
+    normalized: Dict[str, Any],
+    hints: Optional[AssistHints] = None,
+) -> AssistApplication:
+    """Apply assist hints to ``normalized``.
+
+    ``hints`` may be collected up front with ``collect_assist_hints`` (the
+    async router does this concurrently with other stages); otherwise they
+    are built here.
+    """
     if not assist_mode_enabled():
         return AssistApplication(normalized=normalized, clarify_question=None, clarify_missing_fields=None)
+    # Assist records carry no ids; sample them under the command's key.
+    with sampling_key(command.get("command_id")):
+        return _apply_assist_hints(command, normalized, hints)
+
 
-    hints = _build_assist_hints(command, normalized)
+def _apply_assist_hints(
+    command: Dict[str, Any],
+    normalized: Dict[str, Any],
+    hints: Optional[AssistHints],
+) -> AssistApplication:
+    if hints is None:
+        hints = _build_assist_hints(command, normalized)
     updated, _ = _apply_normalization_hint(normalized, hints.normalization)
     agent_hint = _run_agent_entity_hint(command, updated)
     updated, _ = _apply_entity_hints(
@@ -132,34 +157,117 @@ def apply_assist_hints(command: Dict[str, Any], normalized: Dict[str, Any]) -> A
     )
 
 
-def _build_assist_hints(command: Dict[str, Any], normalized: Dict[str, Any]) -> AssistHints:
-    normalization = None
-    entities = None
-    clarify = None
+def collect_assist_hints(
+    command: Dict[str, Any],
+    normalized: Dict[str, Any],
+    budget_ms: Optional[int] = None,
+) -> AssistHints:
+    """Run the enabled hint steps; wait at most ASSIST_TIMEOUT_MS (or ``budget_ms`` if smaller)."""
+    with span("assist.hints", command_id=command.get("command_id")), sampling_key(command.get("command_id")):
+        return _build_assist_hints(command, normalized, budget_ms)
+
+
+def expired_assist_hints(error_type: str = "deadline_exceeded") -> AssistHints:
+    """Hints for enabled steps that did not finish before the request deadline."""
+    return AssistHints(
+        normalization=_failed_normalization_hint(error_type) if assist_normalization_enabled() else None,
+        entities=_failed_entity_hint(error_type) if assist_entity_extraction_enabled() else None,
+        clarify=_failed_clarify_hint(error_type) if assist_clarify_enabled() else None,
+    )
+
+
+def _build_assist_hints(
+    command: Dict[str, Any],
+    normalized: Dict[str, Any],
+    budget_ms: Optional[int] = None,
+) -> AssistHints:
+    # The three hint steps are independent (clarify reads the deterministic
+    # intent, not the normalizer's output), so they run concurrently under one
+    # ASSIST_TIMEOUT_MS deadline instead of one budget per step.
+    text = normalized.get("text", "")
+    futures: Dict[str, Future] = {}
 
     if assist_normalization_enabled():
-        normalization = _run_normalization_hint(normalized.get("text", ""))
+        futures["normalizer"] = _submit_hint("normalizer", _run_normalization_hint, text, budget_ms=budget_ms)
     else:
         _log_step("normalizer", "skipped", None, accepted=False, error_type="disabled")
 
     if assist_entity_extraction_enabled():
-        entities = _run_entity_hint(normalized.get("text", ""))
+        futures["entities"] = _submit_hint("entities", _run_entity_hint, text, budget_ms=budget_ms)
     else:
         _log_step("entities", "skipped", None, accepted=False, error_type="disabled")
 
     if assist_clarify_enabled():
-        clarify = _run_clarify_hint(command.get("text", ""), normalized.get("intent"), normalized)
+        futures["clarify"] = _submit_hint(
+            "clarify",
+            _run_clarify_hint,
+            command.get("text", ""),
+            normalized.get("intent"),
+            normalized,
+            budget_ms=budget_ms,
+        )
     else:
         _log_step("clarify", "skipped", None, accepted=False, error_type="disabled")
 
-    return AssistHints(normalization=normalization, entities=entities, clarify=clarify)
+    if futures:
+        timeout_ms = assist_timeout_ms() if budget_ms is None else min(assist_timeout_ms(), budget_ms)
+        wait(futures.values(), timeout=max(timeout_ms, 1) / 1000)
+
+    return AssistHints(
+        normalization=_hint_result(futures.get("normalizer"), _failed_normalization_hint),
+        entities=_hint_result(futures.get("entities"), _failed_entity_hint),
+        clarify=_hint_result(futures.get("clarify"), _failed_clarify_hint),
+    )
+
+
+def _submit_hint(step: str, func, *args: Any, budget_ms: Optional[int] = None) -> Future:
+    # The step's LLM call stops at ``budget_ms`` too, not only the wait for it.
+    kwargs = {} if budget_ms is None else {"budget_ms": budget_ms}
+    return _HINT_EXECUTOR.submit(propagate(_run_hint_step), step, func, *args, **kwargs)
+
+
+def _run_hint_step(step: str, func, *args: Any, **kwargs: Any) -> Any:
+    with span(f"assist.{step}"):
+        return func(*args, **kwargs)
+
+
+def _hint_result(future: Optional[Future], failed: Callable[[str], Any]) -> Any:
+    if future is None:
+        return None
+    if not future.done():
+        future.cancel()
+        return failed("timeout")
+    try:
+        return future.result()
+    except Exception as exc:
+        return failed(type(exc).__name__)
 
 
-def _run_normalization_hint(text: str) -> NormalizationHint:
+def _failed_normalization_hint(error_type: str) -> NormalizationHint:
+    return NormalizationHint(
+        normalized_text=None,
+        intent_hint=None,
+        entities_hint=None,
+        confidence=None,
+        error_type=error_type,
+        latency_ms=None,
+    )
+
+
+def _failed_entity_hint(error_type: str) -> EntityHints:
+    return EntityHints(items=[], task_hints={}, confidence=None, error_type=error_type, latency_ms=None)
+
+
+def _failed_clarify_hint(error_type: str) -> ClarifyHint:
+    return ClarifyHint(question=None, missing_fields=None, confidence=None, error_type=error_type, latency_ms=None)
+
+
+def _run_normalization_hint(text: str, budget_ms: Optional[int] = None) -> NormalizationHint:
     result = _run_llm_task(
         task_id=_NORMALIZATION_TASK_ID,
         prompt=_build_normalization_prompt(text),
         schema=_NORMALIZATION_SCHEMA,
+        budget_ms=budget_ms,
     )
     if result["status"] != "ok":
         return NormalizationHint(
@@ -181,11 +289,12 @@ def _run_normalization_hint(text: str) -> NormalizationHint:
     )
 
 
-def _run_entity_hint(text: str) -> EntityHints:
+def _run_entity_hint(text: str, budget_ms: Optional[int] = None) -> EntityHints:
     result = _run_llm_task(
         task_id=_ENTITY_TASK_ID,
         prompt=_build_entity_prompt(text),
         schema=_ENTITY_SCHEMA,
+        budget_ms=budget_ms,
     )
     if result["status"] != "ok":
         return EntityHints(
@@ -315,11 +424,13 @@ def _run_clarify_hint(
     text: str,
     intent: Optional[str],
     normalized: Optional[Dict[str, Any]] = None,
+    budget_ms: Optional[int] = None,
 ) -> ClarifyHint:
     result = _run_llm_task(
         task_id=_CLARIFY_TASK_ID,
         prompt=_build_clarify_prompt(text, intent, normalized),
         schema=_CLARIFY_SCHEMA,
+        budget_ms=budget_ms,
     )
     if result["status"] != "ok":
         return ClarifyHint(
@@ -343,18 +454,20 @@ def _run_clarify_hint(
 
 
 def _load_agent_registry() -> AgentRegistryV0 | None:
-    global _AGENT_REGISTRY_CACHE, _AGENT_REGISTRY_ERROR
-    if _AGENT_REGISTRY_CACHE is not None:
-        return _AGENT_REGISTRY_CACHE
-    if _AGENT_REGISTRY_ERROR:
-        return None
     try:
-        registry = AgentRegistryV0Loader.load()
+        return get_registry_snapshot().registry
     except Exception:
-        _AGENT_REGISTRY_ERROR = True
         return None
-    _AGENT_REGISTRY_CACHE = registry
-    return registry
+
+
+def _load_agent_lookup(registry: AgentRegistryV0) -> CapabilitiesLookup:
+    try:
+        snapshot = get_registry_snapshot()
+    except Exception:
+        snapshot = None
+    if snapshot is not None and snapshot.registry is registry:
+        return snapshot.lookup
+    return CapabilitiesLookup(registry)
 
 
 def _load_agent_candidates(
@@ -366,25 +479,12 @@ def _load_agent_candidates(
     registry = _load_agent_registry()
     if registry is None:
         return []
-    allowed_ids = set(allowlist) if allowlist else set()
-    candidates: List[AgentSpec] = []
-    for agent in registry.agents:
-        if override_agent_id and agent.agent_id != override_agent_id:
-            continue
-        if allowed_ids and agent.agent_id not in allowed_ids:
-            continue
-        if not agent.enabled:
-            continue
-        if agent.mode != "assist":
-            continue
-        if len(agent.capabilities) != 1:
-            continue
-        capability = agent.capabilities[0]
-        if capability.capability_id != capability_id:
-            continue
-        if not _agent_intent_allowed(capability.allowed_intents, intent):
-            continue
-        candidates.append(agent)
+    candidates = _load_agent_lookup(registry).find_single_capability_agents(capability_id, "assist", intent)
+    if override_agent_id:
+        candidates = [agent for agent in candidates if agent.agent_id == override_agent_id]
+    if allowlist:
+        allowed_ids = frozenset(allowlist)
+        candidates = [agent for agent in candidates if agent.agent_id in allowed_ids]
     return candidates
 
 
@@ -396,15 +496,6 @@ def _apply_agent_timeout(agent: AgentSpec) -> AgentSpec:
     return replace(agent, timeouts=timeouts)
 
 
-def _agent_intent_allowed(allowed_intents: Iterable[str], intent: Optional[str]) -> bool:
-    if not intent:
-        return False
-    allowed = list(allowed_intents)
-    if allowed and intent not in allowed:
-        return False
-    return True
-
-
 def _apply_normalization_hint(
     normalized: Dict[str, Any], hint: Optional[NormalizationHint]
 ) -> tuple[Dict[str, Any], bool]:
@@ -545,12 +636,19 @@ def _select_clarify_hint(
     return question, hint.missing_fields
 
 
-def _run_llm_task(*, task_id: str, prompt: str, schema: Dict[str, Any]) -> Dict[str, Any]:
+def _run_llm_task(
+    *,
+    task_id: str,
+    prompt: str,
+    schema: Dict[str, Any],
+    budget_ms: Optional[int] = None,
+) -> Dict[str, Any]:
     if not is_llm_policy_enabled():
         return {"status": "skipped", "payload": {}, "error_type": "policy_disabled", "latency_ms": None}
 
     start = time.monotonic()
-    timeout_s = max(assist_timeout_ms(), 1) / 1000
+    timeout_ms = assist_timeout_ms() if budget_ms is None else min(assist_timeout_ms(), budget_ms)
+    timeout_s = max(timeout_ms, 1) / 1000
     try:
         payload = _run_with_timeout(
             lambda: run_task_with_policy(
@@ -576,7 +674,7 @@ def _run_llm_task(*, task_id: str, prompt: str, schema: Dict[str, Any]) -> Dict[
 
 
 def _run_with_timeout(func, timeout_s: float):
-    future = _EXECUTOR.submit(func)
+    future = _EXECUTOR.submit(propagate(func))
     return future.result(timeout=timeout_s)
 
 
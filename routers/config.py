@@ -7,3 +7,15 @@ import os
 
 def get_strategy_name() -> str:
     return os.getenv("DECISION_ROUTER_STRATEGY", "v1").strip().lower()
+
+
+def router_v2_async_deadline_ms() -> int | None:
+    """Per-request deadline for the async v2 pipeline (None = derive from stage timeouts)."""
+    value = os.getenv("ROUTER_V2_ASYNC_DEADLINE_MS", "").strip()
+    if not value:
+        return None
+    try:
+        deadline = int(value)
+    except ValueError:
+        return None
+    return deadline if deadline > 0 else None
@@ -2,21 +2,58 @@
 
 from __future__ import annotations
 
+import time
 from typing import Any, Dict
 
+from app.metrics import counter, histogram
+from app.tracing import span
 from routers.base import RouterStrategy
 from routers.config import get_strategy_name
 from routers.v1 import RouterV1Adapter
 from routers.v2 import RouterV2Pipeline
+from routers.v2_async import AsyncRouterV2Pipeline
+
+
+ROUTER_DECIDE_MS = histogram("router_decide_ms", "Router strategy decide latency (ms)", ("strategy",))
+ROUTER_DECISIONS = counter("router_decisions_total", "Decisions per router strategy", ("strategy", "action"))
+_STRATEGY_LABELS = {RouterV1Adapter: "v1", RouterV2Pipeline: "v2", AsyncRouterV2Pipeline: "v2_async"}
 
 
 def get_router() -> RouterStrategy:
     strategy = get_strategy_name()
     if strategy == "v2":
         return RouterV2Pipeline()
+    if strategy == "v2_async":
+        return AsyncRouterV2Pipeline()
     return RouterV1Adapter()
 
 
 def decide(command: Dict[str, Any]) -> Dict[str, Any]:
     router = get_router()
-    return router.decide(command)
+    strategy = _STRATEGY_LABELS.get(type(router), "custom")
+    started = time.monotonic()
+    with span("router.decide", strategy=strategy) as router_span:
+        decision = router.decide(command)
+        router_span.set_attribute("action", decision.get("action"))
+    _record_decision(strategy, decision, started)
+    return decision
+
+
+async def decide_async(command: Dict[str, Any]) -> Dict[str, Any]:
+    """``decide`` for the event loop: awaits routers that have ``decide_async``."""
+    router = get_router()
+    strategy = _STRATEGY_LABELS.get(type(router), "custom")
+    started = time.monotonic()
+    with span("router.decide", strategy=strategy) as router_span:
+        if isinstance(router, AsyncRouterV2Pipeline):
+            decision = await router.decide_async(command)
+        else:
+            decision = router.decide(command)
+        router_span.set_attribute("action", decision.get("action"))
+    _record_decision(strategy, decision, started)
+    return decision
+
+
+def _record_decision(strategy: str, decision: Dict[str, Any], started: float) -> None:
+    ROUTER_DECIDE_MS.labels(strategy).observe((time.monotonic() - started) * 1000)
+    ROUTER_DECISIONS.labels(strategy, str(decision.get("action"))).inc()
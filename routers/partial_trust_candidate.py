@@ -7,6 +7,7 @@ import time
 from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 from typing import Any, Dict, Mapping, Optional
 
+from app.tracing import propagate
 from llm_policy.config import (
     get_llm_policy_allow_placeholders,
     get_llm_policy_path,
@@ -133,7 +134,7 @@ def _run_policy_task(
     prompt = _build_prompt(text)
     profile = profile_id or get_llm_policy_profile()
     future = _EXECUTOR.submit(
-        run_task_with_policy,
+        propagate(run_task_with_policy),
         task_id=PARTIAL_TRUST_TASK_ID,
         prompt=prompt,
         schema=_CANDIDATE_SCHEMA,
@@ -158,7 +159,7 @@ def policy_route_available(profile_id: Optional[str] = None) -> bool:
     if not is_llm_policy_enabled():
         return False
     try:
-        policy = LlmPolicyLoader.load(
+        policy = LlmPolicyLoader.load_cached(
             enabled=True,
             path_override=get_llm_policy_path(),
             allow_placeholders=get_llm_policy_allow_placeholders(),
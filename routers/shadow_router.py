@@ -8,7 +8,9 @@ from typing import Any, Dict
 from uuid import uuid4
 
 from app.logging.shadow_router_log import append_shadow_router_log
+from app.tracing import current_trace_id, propagate, record_span
 from llm_policy.config import get_llm_policy_profile, is_llm_policy_enabled
+from llm_policy.scheduler import llm_priority
 from llm_policy.tasks import extract_shopping_item_name
 from routers.shadow_config import (
     shadow_router_enabled,
@@ -37,7 +39,7 @@ def start_shadow_router(command: Dict[str, Any], normalized: Dict[str, Any]) ->
 
 
 def _resolve_trace_id(command: Dict[str, Any]) -> str:
-    trace_id = command.get("trace_id")
+    trace_id = command.get("trace_id") or current_trace_id()
     if trace_id:
         return str(trace_id)
     return f"shadow-{uuid4().hex}"
@@ -45,7 +47,7 @@ def _resolve_trace_id(command: Dict[str, Any]) -> str:
 
 def _submit_shadow_task(payload: Dict[str, Any]) -> None:
     try:
-        future = _EXECUTOR.submit(_run_shadow_router, payload)
+        future = _EXECUTOR.submit(propagate(_run_shadow_router), payload)
         future.add_done_callback(_consume_future_error)
     except Exception:
         _log_shadow_result(
@@ -91,7 +93,8 @@ def _run_shadow_router(payload: Dict[str, Any]) -> None:
         return
 
     try:
-        suggestion = _build_suggestion(payload)
+        with llm_priority("shadow"):
+            suggestion = _build_suggestion(payload)
         latency_ms = int((time.monotonic() - started) * 1000)
         if latency_ms > timeout_ms:
             _log_shadow_result(
@@ -161,6 +164,7 @@ def _log_shadow_result(
     suggestion: RouterSuggestion | None,
     latency_ms: int,
 ) -> None:
+    record_span("shadow_router", latency_ms, error_type=error_type, result=status)
     append_shadow_router_log(
         {
             "trace_id": payload.get("trace_id"),
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 from graphs.core_graph import (
     build_clarify_decision,
@@ -36,6 +36,10 @@ from routers.partial_trust_config import (
 from routers.partial_trust_sampling import stable_sample
 from routers.shadow_router import start_shadow_router
 from routers.agent_invoker_shadow import invoke_shadow_agents
+from routers.partial_trust_types import LLMDecisionCandidate
+
+
+CandidateSource = Callable[..., Tuple[Optional[LLMDecisionCandidate], Optional[str]]]
 
 
 class RouterV2Pipeline(RouterStrategy):
@@ -286,6 +290,7 @@ class RouterV2Pipeline(RouterStrategy):
         command: Dict[str, Any],
         normalized: Dict[str, Any],
         baseline: Dict[str, Any],
+        candidate_source: Optional[CandidateSource] = None,
     ) -> Dict[str, Any] | None:
         if not partial_trust_enabled():
             return None
@@ -383,7 +388,8 @@ class RouterV2Pipeline(RouterStrategy):
                 )
                 return None
 
-            candidate, error_type = generate_llm_candidate_with_meta(
+            generate = candidate_source or generate_llm_candidate_with_meta
+            candidate, error_type = generate(
                 command,
                 trace_id=trace_id,
                 timeout_ms=partial_trust_timeout_ms(),
@@ -0,0 +1,255 @@
+"""Async variant of the V2 pipeline with concurrent LLM-backed stages.
+
+Assist hint collection and the partial trust LLM candidate run as asyncio
+tasks under one per-request deadline, so the worst case is the slowest stage
+rather than the sum of stage timeouts. Each stage is started with the time
+left on that deadline as its own budget, so its worker returns when the
+deadline expires instead of running on to the stage's full timeout. At that
+point the request stops waiting: stages that have not started are dropped,
+and the pipeline continues with the deterministic result. With all LLM
+stages disabled the output is the same as ``RouterV2Pipeline``.
+
+Every blocking call, deterministic stages included, runs on the
+``router-v2-async`` pool, so the event loop that awaits ``decide_async`` is
+never blocked by a request.
+
+The /decide route awaits ``decide_async`` directly. The synchronous
+``decide`` (scripts, other callers) runs it on one shared helper loop.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Awaitable, Coroutine, Dict, Optional, Tuple, TypeVar
+from uuid import uuid4
+
+from app.tracing import current_trace_id, propagate
+from routers.agent_invoker_shadow import invoke_shadow_agents
+from routers.assist.config import assist_hints_budget_ms, assist_mode_enabled
+from routers.assist.runner import apply_assist_hints, collect_assist_hints, expired_assist_hints
+from routers.assist.types import AssistApplication, AssistHints
+from routers.config import router_v2_async_deadline_ms
+from routers.partial_trust_candidate import (
+    generate_llm_candidate_with_meta,
+    policy_route_available,
+)
+from routers.partial_trust_config import (
+    partial_trust_corridor_intent,
+    partial_trust_enabled,
+    partial_trust_profile_id,
+    partial_trust_sample_rate,
+    partial_trust_timeout_ms,
+)
+from routers.partial_trust_sampling import stable_sample
+from routers.partial_trust_types import LLMDecisionCandidate
+from routers.shadow_router import start_shadow_router
+from routers.v2 import RouterV2Pipeline
+
+
+CandidateResult = Tuple[Optional[LLMDecisionCandidate], Optional[str]]
+T = TypeVar("T")
+
+# Stages block on their own executors (assist, partial trust); this pool only
+# hosts the blocking stage calls so the request loop can await them together.
+_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="router-v2-async")
+
+
+class _Deadline:
+    def __init__(self, budget_ms: int) -> None:
+        self.budget_ms = budget_ms
+        self._expires_at = time.monotonic() + budget_ms / 1000
+
+    def remaining_s(self) -> float:
+        return max(0.0, self._expires_at - time.monotonic())
+
+    def remaining_ms(self) -> int:
+        return int(self.remaining_s() * 1000)
+
+
+class AsyncRouterV2Pipeline(RouterV2Pipeline):
+    def decide(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        return _run_sync(self.decide_async(command))
+
+    async def decide_async(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        deadline = _Deadline(request_deadline_ms())
+        normalized = await _submit(self.normalize, command)
+        start_shadow_router(command, normalized)
+
+        trace_id: Optional[str] = None
+        candidate_task: Optional[asyncio.Future] = None
+        if self._should_prefetch_candidate(command, normalized):
+            trace_id = current_trace_id() or f"trace-{uuid4().hex}"
+            candidate_task = _submit(
+                generate_llm_candidate_with_meta,
+                command,
+                trace_id=trace_id,
+                timeout_ms=max(min(partial_trust_timeout_ms(), deadline.remaining_ms()), 1),
+                profile_id=partial_trust_profile_id(),
+            )
+        hints_task = None
+        if assist_mode_enabled():
+            hints_task = _submit(collect_assist_hints, command, normalized, budget_ms=deadline.remaining_ms())
+
+        try:
+            hints: Optional[AssistHints] = None
+            if hints_task is not None:
+                hints = await _await_stage(hints_task, deadline, expired_assist_hints())
+            # The response is built from the baseline: awaited in full.
+            assist, baseline = await _submit(self._build_baseline, command, normalized, hints)
+            if trace_id is not None:
+                # The prefetched candidate was requested under this trace id.
+                baseline["trace_id"] = trace_id
+            shadow_task = _submit(
+                invoke_shadow_agents,
+                command,
+                assist.normalized,
+                baseline,
+                baseline.get("trace_id"),
+                command.get("command_id"),
+            )
+            await _await_stage(shadow_task, deadline, None)
+
+            candidate: Optional[CandidateResult] = None
+            candidate_error: Optional[Exception] = None
+            if candidate_task is not None and self._candidate_needed(baseline, assist.normalized):
+                try:
+                    candidate = await _await_stage(candidate_task, deadline, (None, "timeout"))
+                except Exception as exc:
+                    candidate_error = exc
+        finally:
+            # Stop waiting: a stage that has not started is dropped; a running
+            # one returns on its own budget, which ends with the deadline.
+            for task in (hints_task, candidate_task):
+                if task is not None and not task.done():
+                    task.cancel()
+
+        # Awaited in full: its only LLM call, a candidate that was not
+        # prefetched, gets what is left of the deadline (``_candidate_source``).
+        partial_decision = await _submit(
+            self._maybe_apply_partial_trust,
+            command=command,
+            normalized=assist.normalized,
+            baseline=baseline,
+            candidate_source=self._candidate_source(candidate, candidate_error, deadline),
+        )
+        return partial_decision or baseline
+
+    def _build_baseline(
+        self,
+        command: Dict[str, Any],
+        normalized: Dict[str, Any],
+        hints: Optional[AssistHints],
+    ) -> Tuple[AssistApplication, Dict[str, Any]]:
+        assist = apply_assist_hints(command, normalized, hints)
+        plan = self.plan(assist.normalized, command)
+        return assist, self.validate_and_build(plan, assist.normalized, command, assist)
+
+    @staticmethod
+    def _should_prefetch_candidate(command: Dict[str, Any], normalized: Dict[str, Any]) -> bool:
+        if not partial_trust_enabled():
+            return False
+        corridor_intent = partial_trust_corridor_intent()
+        if corridor_intent is None or normalized.get("intent") != corridor_intent:
+            return False
+        if "start_job" not in normalized.get("capabilities", set()):
+            return False
+        if not stable_sample(command.get("command_id"), partial_trust_sample_rate()):
+            return False
+        try:
+            return policy_route_available(partial_trust_profile_id())
+        except Exception:
+            return False
+
+    @staticmethod
+    def _candidate_needed(baseline: Dict[str, Any], normalized: Dict[str, Any]) -> bool:
+        return (
+            baseline.get("status") == "ok"
+            and baseline.get("action") == "start_job"
+            and normalized.get("intent") == partial_trust_corridor_intent()
+        )
+
+    @staticmethod
+    def _candidate_source(
+        candidate: Optional[CandidateResult],
+        candidate_error: Optional[Exception],
+        deadline: _Deadline,
+    ):
+        # Called by ``_maybe_apply_partial_trust`` on a router-v2-async worker.
+        def source(command: Dict[str, Any], **kwargs: Any) -> CandidateResult:
+            if candidate_error is not None:
+                raise candidate_error
+            if candidate is not None:
+                return candidate
+            # Not prefetched (e.g. assist changed the intent): spend what is left.
+            remaining_ms = deadline.remaining_ms()
+            if remaining_ms <= 0:
+                return None, "timeout"
+            timeout_ms = kwargs.get("timeout_ms")
+            kwargs["timeout_ms"] = min(timeout_ms, remaining_ms) if timeout_ms else remaining_ms
+            return generate_llm_candidate_with_meta(command, **kwargs)
+
+        return source
+
+
+def request_deadline_ms() -> int:
+    """Configured deadline, or the slowest enabled LLM stage budget."""
+    configured = router_v2_async_deadline_ms()
+    if configured is not None:
+        return configured
+    assist_budget = assist_hints_budget_ms() if assist_mode_enabled() else 0
+    return max(assist_budget, partial_trust_timeout_ms(), 1)
+
+
+def _submit(func, *args: Any, **kwargs: Any) -> asyncio.Future:
+    loop = asyncio.get_running_loop()
+    return loop.run_in_executor(_EXECUTOR, propagate(lambda: func(*args, **kwargs)))
+
+
+async def _await_stage(task: Awaitable[T], deadline: _Deadline, on_timeout: T) -> T:
+    try:
+        return await asyncio.wait_for(task, timeout=deadline.remaining_s())
+    except asyncio.TimeoutError:
+        return on_timeout
+
+
+_HELPER_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_HELPER_LOOP_LOCK = threading.Lock()
+
+
+def _helper_loop() -> asyncio.AbstractEventLoop:
+    global _HELPER_LOOP
+    loop = _HELPER_LOOP
+    if loop is None:
+        with _HELPER_LOOP_LOCK:
+            if _HELPER_LOOP is None:
+                _HELPER_LOOP = asyncio.new_event_loop()
+                threading.Thread(
+                    target=_HELPER_LOOP.run_forever, name="router-v2-async-loop", daemon=True
+                ).start()
+            loop = _HELPER_LOOP
+    return loop
+
+
+def _run_sync(coro: Coroutine[Any, Any, T]) -> T:
+    """Run ``coro`` on the shared helper loop; works with or without a loop in this thread."""
+    loop = _helper_loop()
+    context = contextvars.copy_context()  # trace and LLM priority of the caller
+    result: "Future[T]" = Future()
+
+    def settle(task: "asyncio.Task[T]") -> None:
+        if task.cancelled():
+            result.cancel()
+        elif task.exception() is not None:
+            result.set_exception(task.exception())
+        else:
+            result.set_result(task.result())
+
+    def start() -> None:
+        loop.create_task(coro, context=context).add_done_callback(settle)
+
+    loop.call_soon_threadsafe(start)
+    return result.result()
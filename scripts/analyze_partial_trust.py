@@ -14,6 +14,12 @@ from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any, Dict, Iterable, List
 
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from app.logging.aggregation import QuantileSketch, iter_jsonl_records  # noqa: E402
+
 
 @dataclass
 class MetricsReport:
@@ -31,26 +37,15 @@ class MetricsReport:
 
 
 def iter_risk_log(path: Path) -> Iterable[tuple[dict[str, Any], bool]]:
-    """Yield (record, ok) tuples from JSONL. ok=False on parse error."""
-    if not path.exists() or not path.is_file():
-        return
-    with path.open("r", encoding="utf-8") as fh:
-        for line in fh:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                yield json.loads(line), True
-            except (json.JSONDecodeError, ValueError):
-                yield {}, False
-
-
-def compute_metrics(records: list[dict[str, Any]]) -> MetricsReport:
-    """Compute regression metrics from risk-log records."""
+    """Yield (record, ok) tuples from JSONL (rotated segments included). ok=False on parse error."""
+    return iter_jsonl_records(path)
+
+
+def compute_metrics(records: Iterable[dict[str, Any]]) -> MetricsReport:
+    """Compute regression metrics from risk-log records in one constant-memory pass."""
     report = MetricsReport()
-    report.total_records = len(records)
 
-    latencies: list[int] = []
+    latencies = QuantileSketch()
     accepted_count = 0
     fallback_count = 0
     error_count = 0
@@ -59,6 +54,7 @@ def compute_metrics(records: list[dict[str, Any]]) -> MetricsReport:
     diff_records = 0
 
     for rec in records:
+        report.total_records += 1
         # Status breakdown
         status = rec.get("status", "unknown")
         report.status_breakdown[status] = report.status_breakdown.get(status, 0) + 1
@@ -83,7 +79,7 @@ def compute_metrics(records: list[dict[str, Any]]) -> MetricsReport:
         # Latency (only for records with latency_ms)
         lat = rec.get("latency_ms")
         if isinstance(lat, (int, float)):
-            latencies.append(int(lat))
+            latencies.add(int(lat))
 
         # Diff summary analysis (only for records that have it)
         diff = rec.get("diff_summary")
@@ -106,20 +102,17 @@ def compute_metrics(records: list[dict[str, Any]]) -> MetricsReport:
     if report.total_records > 0:
         report.error_rate = error_count / report.total_records
 
-    if latencies:
+    if latencies.count:
         report.latency_p50 = _percentile(latencies, 0.50)
         report.latency_p95 = _percentile(latencies, 0.95)
 
     return report
 
 
-def _percentile(values: list[int], p: float) -> int:
+def _percentile(values: QuantileSketch, p: float) -> int:
     """Index-based percentile (same pattern as analyze_shadow_router.py)."""
-    if not values:
-        return 0
-    s = sorted(values)
-    idx = int((len(s) - 1) * p)
-    return s[idx]
+    value = values.quantile(p)
+    return 0 if value is None else int(round(value))
 
 
 def format_report_json(report: MetricsReport) -> dict[str, Any]:
@@ -201,11 +194,7 @@ def run_self_test() -> None:
         log_path = Path(td) / "risk.jsonl"
         log_path.write_text(json.dumps(record, ensure_ascii=False) + "\n", encoding="utf-8")
 
-        all_records = []
-        for rec, ok in iter_risk_log(log_path):
-            if ok:
-                all_records.append(rec)
-        report = compute_metrics(all_records)
+        report = compute_metrics(rec for rec, ok in iter_risk_log(log_path) if ok)
 
         json_text = json.dumps(format_report_json(report), ensure_ascii=False)
         human_text = format_report_human(report)
@@ -243,15 +232,17 @@ def main() -> None:
         run_self_test()
         return
 
-    all_records = []
     parse_errors = 0
-    for rec, ok in iter_risk_log(args.risk_log):
-        if ok:
-            all_records.append(rec)
-        else:
-            parse_errors += 1
 
-    report = compute_metrics(all_records)
+    def parsed_records() -> Iterable[dict[str, Any]]:
+        nonlocal parse_errors
+        for rec, ok in iter_risk_log(args.risk_log):
+            if ok:
+                yield rec
+            else:
+                parse_errors += 1
+
+    report = compute_metrics(parsed_records())
     report.parse_errors = parse_errors
 
     print(format_report_human(report))
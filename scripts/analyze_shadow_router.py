@@ -8,12 +8,24 @@ Only aggregated numeric metrics in report.
 from __future__ import annotations
 
 import argparse
+import functools
 import json
 import sys
 import tempfile
 from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import compress
 from pathlib import Path
-from typing import Any, Dict, Iterable, List
+from typing import Any, Dict, Iterable, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from app.logging.aggregation import QuantileSketch, iter_jsonl_records  # noqa: E402
+from app.logging.columnar import is_columnar, read_columns, read_header  # noqa: E402
+from app.logging.segments import as_utc, parse_timestamp  # noqa: E402
+from app.logging.sharding import Shard, iter_shard_records, map_shards, plan_shards  # noqa: E402
 
 DANGEROUS_FIELDS = {
     "text",
@@ -26,6 +38,18 @@ DANGEROUS_FIELDS = {
     "normalized_text",
 }
 
+# Fields the metrics read; columnar segments decode only these columns (plus
+# ``timestamp`` when a --since/--until window is set) and aggregate them
+# column by column.
+ANALYZED_COLUMNS = (
+    "command_id",
+    "latency_ms",
+    "error_type",
+    "suggested_intent",
+    "entities_summary",
+    "sample_weight",
+)
+
 
 @dataclass(frozen=True)
 class GoldenEntry:
@@ -37,6 +61,7 @@ class GoldenEntry:
 @dataclass
 class MetricsReport:
     total_records: int = 0
+    estimated_total_records: int = 0
     matched_records: int = 0
     intent_match_rate: float | None = None
     entity_hit_rate: float | None = None
@@ -59,88 +84,212 @@ def load_golden_dataset(path: Path) -> dict[str, GoldenEntry]:
     return result
 
 
-def iter_shadow_log(path: Path) -> Iterable[tuple[dict[str, Any], bool]]:
-    """Yield (record, ok) tuples from JSONL. ok=False on parse error."""
-    if not path.exists() or not path.is_file():
-        return
-    with path.open("r", encoding="utf-8") as fh:
-        for line in fh:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                yield json.loads(line), True
-            except (json.JSONDecodeError, ValueError):
-                yield {}, False
+def iter_shadow_log(
+    path: Path,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> Iterable[tuple[dict[str, Any], bool]]:
+    """Yield (record, ok) tuples from JSONL. ok=False on parse error.
 
+    Rotated segments of ``path`` (plain, .gz, .zst) are read oldest first;
+    segments and records outside ``[since, until]`` are skipped.
+    """
+    for record, ok in iter_jsonl_records(path, since, until):
+        if not ok or _in_window(record, since, until):
+            yield record, ok
 
-def compute_metrics(
-    records: list[dict[str, Any]],
-    golden: dict[str, GoldenEntry],
-) -> MetricsReport:
-    """Compute metrics from JSONL records matched against golden dataset."""
-    report = MetricsReport()
-    report.total_records = len(records)
 
-    latencies: list[int] = []
-    intent_matches = 0
-    entity_matches = 0
-    matched = 0
+def _window_covers(header: dict[str, Any], since: Optional[datetime], until: Optional[datetime]) -> bool:
+    first = parse_timestamp(header.get("first_ts"))
+    last = parse_timestamp(header.get("last_ts"))
+    if first is None or last is None:
+        return False
+    return (since is None or first >= as_utc(since)) and (until is None or last <= as_utc(until))
 
-    for rec in records:
+
+def _in_window(record: Any, since: Optional[datetime], until: Optional[datetime]) -> bool:
+    if since is None and until is None:
+        return True
+    ts = parse_timestamp(record.get("timestamp")) if isinstance(record, dict) else None
+    if ts is None:
+        return True
+    if since is not None and ts < as_utc(since):
+        return False
+    if until is not None and ts > as_utc(until):
+        return False
+    return True
+
+
+@dataclass
+class ShadowAggregate:
+    """Mergeable partial state of ``compute_metrics`` (one per log shard)."""
+
+    total_records: int = 0
+    weighted_records: float = 0.0
+    matched: int = 0
+    intent_matches: int = 0
+    entity_matches: int = 0
+    parse_errors: int = 0
+    latencies: QuantileSketch = field(default_factory=QuantileSketch)
+    error_breakdown: dict[str, int] = field(default_factory=dict)
+
+    def add(self, rec: dict[str, Any], golden: dict[str, GoldenEntry]) -> None:
+        self.total_records += 1
+        self.weighted_records += _sample_weight(rec.get("sample_weight"))
         # Collect latency from ALL records
         lat = rec.get("latency_ms")
         if isinstance(lat, (int, float)):
-            latencies.append(int(lat))
+            self.latencies.add(int(lat))
 
         # Collect errors from ALL records
         err = rec.get("error_type")
         if isinstance(err, str) and err:
-            report.error_breakdown[err] = report.error_breakdown.get(err, 0) + 1
+            self.error_breakdown[err] = self.error_breakdown.get(err, 0) + 1
 
         # Match against golden dataset
         cid = rec.get("command_id")
         if not isinstance(cid, str) or cid not in golden:
-            continue
-        matched += 1
+            return
+        self.matched += 1
         entry = golden[cid]
 
         # Intent match
         suggested = rec.get("suggested_intent")
         if suggested == entry.expected_intent:
-            intent_matches += 1
+            self.intent_matches += 1
 
         # Entity key match
         es = rec.get("entities_summary")
         actual_keys = sorted(es.get("keys", [])) if isinstance(es, dict) else []
         expected_keys = sorted(entry.expected_entity_keys)
         if actual_keys == expected_keys:
-            entity_matches += 1
+            self.entity_matches += 1
+
+    def add_columns(self, columns: dict[str, list[Any]], golden: dict[str, GoldenEntry]) -> None:
+        """Same as ``add`` for every row of decoded columns (columnar segments)."""
+        cids = columns["command_id"]
+        self.total_records += len(cids)
+        self.weighted_records += sum(_sample_weight(weight) for weight in columns["sample_weight"])
+        self.latencies.add_many(int(lat) for lat in columns["latency_ms"] if isinstance(lat, (int, float)))
+        for err in columns["error_type"]:
+            if isinstance(err, str) and err:
+                self.error_breakdown[err] = self.error_breakdown.get(err, 0) + 1
+        for cid, suggested, es in zip(cids, columns["suggested_intent"], columns["entities_summary"]):
+            if not isinstance(cid, str) or cid not in golden:
+                continue
+            self.matched += 1
+            entry = golden[cid]
+            if suggested == entry.expected_intent:
+                self.intent_matches += 1
+            actual_keys = sorted(es.get("keys", [])) if isinstance(es, dict) else []
+            if actual_keys == sorted(entry.expected_entity_keys):
+                self.entity_matches += 1
+
+    def merge(self, other: "ShadowAggregate") -> None:
+        self.total_records += other.total_records
+        self.weighted_records += other.weighted_records
+        self.matched += other.matched
+        self.intent_matches += other.intent_matches
+        self.entity_matches += other.entity_matches
+        self.parse_errors += other.parse_errors
+        self.latencies.merge(other.latencies)
+        for err, count in other.error_breakdown.items():
+            self.error_breakdown[err] = self.error_breakdown.get(err, 0) + count
+
+    def report(self) -> MetricsReport:
+        report = MetricsReport(
+            total_records=self.total_records,
+            estimated_total_records=int(round(self.weighted_records)),
+            matched_records=self.matched,
+            error_breakdown=self.error_breakdown,
+            parse_errors=self.parse_errors,
+        )
+        if self.matched > 0:
+            report.intent_match_rate = self.intent_matches / self.matched
+            report.entity_hit_rate = self.entity_matches / self.matched
+        if self.latencies.count:
+            report.latency_p50 = _percentile(self.latencies, 0.50)
+            report.latency_p95 = _percentile(self.latencies, 0.95)
+        return report
 
-    report.matched_records = matched
-    if matched > 0:
-        report.intent_match_rate = intent_matches / matched
-        report.entity_hit_rate = entity_matches / matched
-    if latencies:
-        report.latency_p50 = _percentile(latencies, 0.50)
-        report.latency_p95 = _percentile(latencies, 0.95)
 
-    return report
+def compute_metrics(
+    records: Iterable[dict[str, Any]],
+    golden: dict[str, GoldenEntry],
+) -> MetricsReport:
+    """Compute metrics from JSONL records matched against golden dataset.
+
+    One pass over ``records`` (any iterable, e.g. a generator over a huge
+    log); memory does not grow with the number of records.
+    """
+    aggregate = ShadowAggregate()
+    for rec in records:
+        aggregate.add(rec, golden)
+    return aggregate.report()
+
+
+def analyze_shard(
+    shard: Shard,
+    golden: dict[str, GoldenEntry],
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> ShadowAggregate:
+    """Aggregate the records of one log shard (runs in a worker process)."""
+    aggregate = ShadowAggregate()
+    windowed = since is not None or until is not None
+    if is_columnar(shard.path):
+        # Segments entirely inside the window need no per-row timestamp check.
+        windowed = windowed and not _window_covers(read_header(shard.path), since, until)
+        columns = read_columns(shard.path, ("timestamp", *ANALYZED_COLUMNS) if windowed else ANALYZED_COLUMNS)
+        if windowed:
+            keep = [_in_window({"timestamp": ts}, since, until) for ts in columns.pop("timestamp")]
+            columns = {name: list(compress(values, keep)) for name, values in columns.items()}
+        aggregate.add_columns(columns, golden)
+        return aggregate
+    for rec, ok in iter_shard_records(shard):
+        if not ok:
+            aggregate.parse_errors += 1
+        elif _in_window(rec, since, until):
+            aggregate.add(rec, golden)
+    return aggregate
+
+
+def collect_report(
+    path: Path,
+    golden: dict[str, GoldenEntry],
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    workers: int = 1,
+) -> MetricsReport:
+    """Analyze ``path`` (and its rotated segments) split across ``workers`` processes.
+
+    Shard aggregates are merged in log order, so the report matches a
+    single-process run.
+    """
+    shards = plan_shards(path, workers, since, until)
+    analyze = functools.partial(analyze_shard, golden=golden, since=since, until=until)
+    total = ShadowAggregate()
+    for partial in map_shards(analyze, shards, workers):
+        total.merge(partial)
+    return total.report()
 
 
-def _percentile(values: list[int], p: float) -> int:
+def _sample_weight(value: Any) -> float:
+    """Records written under log sampling stand for ``sample_weight`` records."""
+    return float(value) if isinstance(value, (int, float)) and value > 0 else 1.0
+
+
+def _percentile(values: QuantileSketch, p: float) -> int:
     """Index-based percentile (same pattern as metrics_agent_hints_v0.py)."""
-    if not values:
-        return 0
-    s = sorted(values)
-    idx = int((len(s) - 1) * p)
-    return s[idx]
+    value = values.quantile(p)
+    return 0 if value is None else int(round(value))
 
 
 def format_report_json(report: MetricsReport) -> dict[str, Any]:
     """Convert report to JSON-serializable dict."""
     return {
         "total_records": report.total_records,
+        "estimated_total_records": report.estimated_total_records,
         "matched_records": report.matched_records,
         "intent_match_rate": report.intent_match_rate,
         "entity_hit_rate": report.entity_hit_rate,
@@ -156,6 +305,7 @@ def format_report_human(report: MetricsReport) -> str:
     lines = [
         "=== Shadow Router Analyzer Report ===",
         f"Total records:      {report.total_records}",
+        f"Estimated records:  {report.estimated_total_records} (sampling re-weighted)",
         f"Matched records:    {report.matched_records}",
         f"Intent match rate:  {_fmt_rate(report.intent_match_rate)}",
         f"Entity hit rate:    {_fmt_rate(report.entity_hit_rate)}",
@@ -219,8 +369,7 @@ def run_self_test() -> None:
         golden_path.write_text(json.dumps(golden_data, ensure_ascii=False), encoding="utf-8")
 
         golden = load_golden_dataset(golden_path)
-        records = [r for r, ok in iter_shadow_log(log_path) if ok]
-        report = compute_metrics(records, golden)
+        report = compute_metrics((r for r, ok in iter_shadow_log(log_path) if ok), golden)
 
         json_text = json.dumps(format_report_json(report), ensure_ascii=False)
         human_text = format_report_human(report)
@@ -253,6 +402,24 @@ def main() -> None:
         default=None,
         help="Write JSON report to this file",
     )
+    parser.add_argument(
+        "--since",
+        type=datetime.fromisoformat,
+        default=None,
+        help="Only records at or after this ISO timestamp (naive = UTC)",
+    )
+    parser.add_argument(
+        "--until",
+        type=datetime.fromisoformat,
+        default=None,
+        help="Only records at or before this ISO timestamp (naive = UTC)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Parse byte-range shards of the log in this many processes",
+    )
     parser.add_argument(
         "--self-test",
         action="store_true",
@@ -265,16 +432,7 @@ def main() -> None:
         return
 
     golden = load_golden_dataset(args.golden_dataset)
-    all_records = []
-    parse_errors = 0
-    for rec, ok in iter_shadow_log(args.shadow_log):
-        if ok:
-            all_records.append(rec)
-        else:
-            parse_errors += 1
-
-    report = compute_metrics(all_records, golden)
-    report.parse_errors = parse_errors
+    report = collect_report(args.shadow_log, golden, args.since, args.until, args.workers)
 
     print(format_report_human(report))
 
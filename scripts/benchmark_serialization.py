@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""Benchmark the JSON serialization paths (app/serialization.py).
+
+Measures, per request / per record:
+- rendering a decision response alone: DecisionResponse.model_validate plus
+  the response-model validate/serialize FastAPI performs, then JSONResponse,
+  vs DecisionJSONResponse;
+- the /v1/decide response path before (DecisionResponse.model_validate plus
+  FastAPI response-model validation and serialization) and after
+  (DecisionJSONResponse), both driven through the ASGI app with the decision
+  pipeline stubbed out so only request handling and rendering are timed;
+- log-record encoding with stdlib ``json.dumps`` vs ``serialization.dumps``.
+
+Usage:
+    python scripts/benchmark_serialization.py [--requests 2000] [--records 50000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from app import serialization  # noqa: E402
+from app.models.api_models import CommandRequest, DecisionResponse  # noqa: E402
+from app.routes import decide as decide_route_module  # noqa: E402
+
+COMMAND_FIXTURE = REPO_ROOT / "skills" / "contract-checker" / "fixtures" / "valid_command_create_task.json"
+
+DECISION: Dict[str, Any] = {
+    "decision_id": "dec-0d9f3c1e",
+    "command_id": "cmd-bench-001",
+    "status": "ok",
+    "action": "propose_add_shopping_item",
+    "confidence": 0.82,
+    "payload": {
+        "items": [
+            {"item_name": "молоко", "quantity": "2", "unit": "л", "list_id": "list-1"},
+            {"item_name": "хлеб", "quantity": "1", "unit": "шт", "list_id": "list-1"},
+        ],
+    },
+    "explanation": "Распознан запрос на добавление покупок.",
+    "trace_id": "trace-6a1f2e9b",
+    "schema_version": "2.0.0",
+    "decision_version": "mvp1-graph-0.1",
+    "created_at": "2026-02-01T10:00:00+00:00",
+}
+
+LOG_RECORD: Dict[str, Any] = {
+    "timestamp": "2026-02-01T10:00:00.123456+00:00",
+    "trace_id": "trace-6a1f2e9b",
+    "command_id": "cmd-bench-001",
+    "step": "entities",
+    "status": "ok",
+    "latency_ms": 42,
+    "agent_hint_status": "ok",
+    "agent_hint_candidates_count": 2,
+    "entities_summary": {"keys": ["item", "quantity"], "counts": {"item": 2, "quantity": 2}},
+    "model_meta": {"profile": "cheap", "task_id": "shopping_extraction", "attempts": 1},
+}
+
+
+def _legacy_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/v1/decide", response_model=DecisionResponse, response_model_exclude_none=True)
+    async def legacy_decide(command: CommandRequest) -> DecisionResponse:
+        command.model_dump(exclude_none=True)
+        return DecisionResponse.model_validate(dict(DECISION))
+
+    return app
+
+
+def _current_app() -> FastAPI:
+    decide_route_module.decide = lambda payload: dict(DECISION)
+    decide_route_module.decide_execution_mode = lambda: "inline"
+    app = FastAPI()
+    app.include_router(decide_route_module.router, prefix="/v1")
+    return app
+
+
+def _time_render(count: int) -> tuple[float, float]:
+    adapter = TypeAdapter(DecisionResponse)
+
+    def legacy() -> bytes:
+        model = DecisionResponse.model_validate(dict(DECISION))
+        validated = adapter.validate_python(model)
+        return JSONResponse(adapter.dump_python(validated, mode="json", exclude_none=True)).body
+
+    def current() -> bytes:
+        return decide_route_module.DecisionJSONResponse(dict(DECISION)).body
+
+    assert json.loads(legacy()) == json.loads(current())
+    return _best_of(legacy, count), _best_of(current, count)
+
+
+def _best_of(func: Any, count: int, rounds: int = 3) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(count):
+            func()
+        best = min(best, time.perf_counter() - started)
+    return best / count * 1e6
+
+
+async def _time_requests(app: FastAPI, command: Dict[str, Any], count: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(min(100, count)):
+            await client.post("/v1/decide", json=command)
+        started = time.perf_counter()
+        for _ in range(count):
+            response = await client.post("/v1/decide", json=command)
+        elapsed = time.perf_counter() - started
+        assert response.status_code == 200, response.text
+    return elapsed / count * 1e6
+
+
+def _time_encode(func: Any, count: int) -> float:
+    started = time.perf_counter()
+    for _ in range(count):
+        func(LOG_RECORD)
+    return (time.perf_counter() - started) / count * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="JSON serialization benchmark")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--records", type=int, default=50000)
+    args = parser.parse_args()
+
+    command = json.loads(COMMAND_FIXTURE.read_text(encoding="utf-8"))
+    render_legacy_us, render_current_us = _time_render(args.records // 5)
+    legacy_us = asyncio.run(_time_requests(_legacy_app(), command, args.requests))
+    current_us = asyncio.run(_time_requests(_current_app(), command, args.requests))
+
+    stdlib_us = _time_encode(lambda record: json.dumps(record, ensure_ascii=False), args.records)
+    backend_us = _time_encode(serialization.dumps, args.records)
+
+    print(f"json backend: {serialization.json_backend()}")
+    print("decide response rendering only:")
+    print(f"  model_validate + response_model: {render_legacy_us:8.1f} us/request")
+    print(f"  DecisionJSONResponse:            {render_current_us:8.1f} us/request")
+    print(f"  saving:                          {render_legacy_us - render_current_us:8.1f} us/request")
+    print("decide response (ASGI round trip, pipeline stubbed):")
+    print(f"  model_validate + response_model: {legacy_us:8.1f} us/request")
+    print(f"  DecisionJSONResponse:            {current_us:8.1f} us/request")
+    print(f"  saving:                          {legacy_us - current_us:8.1f} us/request")
+    print("log record encoding:")
+    print(f"  json.dumps:                      {stdlib_us:8.2f} us/record")
+    print(f"  serialization.dumps:             {backend_us:8.2f} us/record")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Compact closed JSONL log segments into the columnar (.cols) format.
+
+Converts rotated segments of the decision, pipeline latency, fallback,
+assist, agent run, shadow diff, shadow router and partial trust logs (see
+app/logging/compaction.py). Active files are left alone. The analyzers read
+.cols segments directly.
+
+Usage:
+    python scripts/compact_logs.py [--logs-dir logs] [--log shadow_router.jsonl] [--keep-source]
+    python scripts/compact_logs.py --describe logs/shadow_router.20260201T000000Z.cols
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from app.logging.columnar import read_header  # noqa: E402
+from app.logging.compaction import DEFAULT_LOGS, compact_log  # noqa: E402
+from app.logging import decision_index  # noqa: E402,F401  (keeps decisions.jsonl.index current)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compact rotated JSONL logs into columnar segments")
+    parser.add_argument("--logs-dir", type=Path, default=Path("logs"))
+    parser.add_argument(
+        "--log",
+        action="append",
+        default=None,
+        help="Log file name inside --logs-dir (repeatable; default: all known logs)",
+    )
+    parser.add_argument("--keep-source", action="store_true", help="Keep JSONL segments after compaction")
+    parser.add_argument("--describe", type=Path, default=None, help="Print the header of a .cols file and exit")
+    args = parser.parse_args()
+
+    if args.describe is not None:
+        header = read_header(args.describe)
+        print(json.dumps(header, ensure_ascii=False, indent=2))
+        return 0
+
+    status = 0
+    for name in args.log or DEFAULT_LOGS:
+        result = compact_log(args.logs_dir / name, keep_source=args.keep_source)
+        if not result.compacted and not result.skipped:
+            continue
+        ratio = result.columnar_bytes / result.source_bytes if result.source_bytes else 0.0
+        print(
+            f"{name}: compacted={len(result.compacted)} skipped={len(result.skipped)} "
+            f"bytes {result.source_bytes} -> {result.columnar_bytes} ({ratio:.0%})"
+        )
+        for segment in result.skipped:
+            print(f"  left as JSONL (unparsable lines): {segment.name}", file=sys.stderr)
+            status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""Find decisions in logs/decisions.jsonl by trace_id or command_id.
+
+Uses the sidecar index maintained by the decision log writer (see
+app/logging/decision_index.py) instead of scanning every segment.
+``--rebuild`` recreates the index from the segments first (after a manual
+cleanup, or when the log was written with the index disabled).
+
+Usage:
+    python scripts/decision_lookup.py --trace-id trace-... [--log logs/decisions.jsonl]
+    python scripts/decision_lookup.py --command-id cmd-... --rebuild
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from app.logging.decision_index import find_decisions, rebuild_decision_index  # noqa: E402
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Look up decision records through the decision log index")
+    parser.add_argument("--log", type=Path, default=Path("logs/decisions.jsonl"))
+    parser.add_argument("--trace-id", default=None)
+    parser.add_argument("--command-id", default=None)
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild the index from the log segments first")
+    args = parser.parse_args(argv)
+
+    if args.rebuild:
+        entries = rebuild_decision_index(args.log)
+        print(f"indexed {entries} keys", file=sys.stderr)
+    if args.trace_id is None and args.command_id is None:
+        if args.rebuild:
+            return 0
+        parser.error("--trace-id or --command-id is required")
+
+    records = find_decisions(args.log, trace_id=args.trace_id, command_id=args.command_id)
+    for record in records:
+        print(json.dumps(record, ensure_ascii=False))
+    return 0 if records else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,15 +10,26 @@ from __future__ import annotations
 
 import argparse
 import contextlib
+import dataclasses
+import functools
 import io
 import json
 import statistics
+import sys
 import tempfile
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Optional, Tuple
 
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from app.logging.aggregation import DistinctCounter, QuantileSketch  # noqa: E402
+from app.logging.segments import as_utc  # noqa: E402
+from app.logging.sharding import Shard, iter_shard_records, map_shards, plan_shards  # noqa: E402
+
 
 DANGEROUS_FIELDS = {
     "text",
@@ -64,15 +75,15 @@ class Metrics:
     skipped: int = 0
     error: int = 0
     reason_codes: Dict[str, int] = field(default_factory=dict)
-    agent_hint_latencies: List[int] = field(default_factory=list)
-    agent_run_latencies: List[int] = field(default_factory=list)
-    diff_overlap_counts: List[int] = field(default_factory=list)
-    diff_agent_keys_counts: List[int] = field(default_factory=list)
-    diff_baseline_keys_counts: List[int] = field(default_factory=list)
+    agent_hint_latencies: QuantileSketch = field(default_factory=QuantileSketch)
+    agent_run_latencies: QuantileSketch = field(default_factory=QuantileSketch)
+    diff_overlap_counts: QuantileSketch = field(default_factory=QuantileSketch)
+    diff_agent_keys_counts: QuantileSketch = field(default_factory=QuantileSketch)
+    diff_baseline_keys_counts: QuantileSketch = field(default_factory=QuantileSketch)
     uplift_proxy: int = 0
     total_events: int = 0
     total_commands: int = 0
-    command_ids: set[str] = field(default_factory=set)
+    command_ids: DistinctCounter = field(default_factory=DistinctCounter)
     candidate_events_seen: int = 0
     candidates_total: int = 0
     selection_attempted: int = 0
@@ -94,13 +105,14 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--since", default=None)
     parser.add_argument("--until", default=None)
     parser.add_argument("--no-dedupe", action="store_true")
+    parser.add_argument("--workers", type=int, default=1, help="parse byte-range shards in N processes")
     parser.add_argument("--self-test", action="store_true")
     return parser.parse_args()
 
 
 def _parse_iso(ts: str) -> Optional[datetime]:
     try:
-        return datetime.fromisoformat(ts)
+        return as_utc(datetime.fromisoformat(ts))
     except Exception:
         return None
 
@@ -118,25 +130,22 @@ def _should_include(ts: Optional[str], since: Optional[datetime], until: Optiona
     return True
 
 
-def _iter_jsonl(path: Path, inventory: FileInventory, warnings: Warnings) -> Iterable[Dict[str, Any]]:
-    if not path.exists():
-        return
-    with path.open("r", encoding="utf-8") as handle:
-        for line in handle:
-            inventory.lines_read += 1
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                payload = json.loads(line)
-            except Exception:
-                inventory.parse_errors += 1
-                warnings.parse_errors += 1
-                continue
-            if isinstance(payload, dict):
-                for key in payload.keys():
-                    inventory.keys_seen[key] = inventory.keys_seen.get(key, 0) + 1
-            yield payload
+def _iter_jsonl(
+    records: Iterable[Tuple[Any, bool]],
+    inventory: FileInventory,
+    warnings: Warnings,
+) -> Iterable[Dict[str, Any]]:
+    # ``records`` come from JSONL lines or columnar rows (iter_shard_records).
+    for payload, ok in records:
+        inventory.lines_read += 1
+        if not ok:
+            inventory.parse_errors += 1
+            warnings.parse_errors += 1
+            continue
+        if isinstance(payload, dict):
+            for key in payload.keys():
+                inventory.keys_seen[key] = inventory.keys_seen.get(key, 0) + 1
+        yield payload
 
 
 def _count_string_values(value: Any, safe_string_fields: set[str]) -> int:
@@ -169,24 +178,18 @@ def _update_reason(metrics: Metrics, code: Optional[str]) -> None:
     metrics.reason_codes[code] = metrics.reason_codes.get(code, 0) + 1
 
 
-def _percentile(values: List[int], p: float) -> Optional[int]:
-    if not values:
-        return None
-    values_sorted = sorted(values)
-    if len(values_sorted) == 1:
-        return values_sorted[0]
-    idx = int((len(values_sorted) - 1) * p)
-    return values_sorted[idx]
+def _percentile(values: QuantileSketch, p: float) -> Optional[int]:
+    value = values.quantile(p)
+    return None if value is None else int(round(value))
 
 
 def _record_command_id(metrics: Metrics, command_id: Any, dedupe: bool) -> None:
+    # Deduplicated commands are counted by the distinct counter at report time.
     if not dedupe:
         metrics.total_commands += 1
         return
     if isinstance(command_id, str):
-        if command_id not in metrics.command_ids:
-            metrics.command_ids.add(command_id)
-            metrics.total_commands += 1
+        metrics.command_ids.add(command_id)
 
 
 def _handle_assist(
@@ -228,7 +231,7 @@ def _handle_assist(
 
     latency = payload.get("agent_hint_latency_ms")
     if isinstance(latency, int):
-        metrics.agent_hint_latencies.append(latency)
+        metrics.agent_hint_latencies.add(latency)
 
     selection_fields = {
         "agent_hint_candidates_count",
@@ -295,7 +298,7 @@ def _handle_agent_run(
     _update_reason(metrics, payload.get("reason_code"))
     latency = payload.get("latency_ms")
     if isinstance(latency, int):
-        metrics.agent_run_latencies.append(latency)
+        metrics.agent_run_latencies.add(latency)
 
 
 def _handle_diff(
@@ -322,13 +325,13 @@ def _handle_diff(
     diff = payload.get("diff_summary") or {}
     overlap = diff.get("keys_overlap_count")
     if isinstance(overlap, int):
-        metrics.diff_overlap_counts.append(overlap)
+        metrics.diff_overlap_counts.add(overlap)
     agent_keys = diff.get("agent_keys_count")
     if isinstance(agent_keys, int):
-        metrics.diff_agent_keys_counts.append(agent_keys)
+        metrics.diff_agent_keys_counts.add(agent_keys)
     baseline_keys = diff.get("baseline_keys_count")
     if isinstance(baseline_keys, int):
-        metrics.diff_baseline_keys_counts.append(baseline_keys)
+        metrics.diff_baseline_keys_counts.add(baseline_keys)
 
 
 def _write_json(path: Optional[Path], payload: Dict[str, Any]) -> None:
@@ -350,7 +353,7 @@ def _report_metrics(metrics: Metrics) -> Dict[str, Any]:
             "skipped": metrics.skipped,
             "error": metrics.error,
             "total_events": metrics.total_events,
-            "total_commands": metrics.total_commands or None,
+            "total_commands": (metrics.total_commands + len(metrics.command_ids)) or None,
         },
         "selection": {
             "candidate_events_seen": metrics.candidate_events_seen,
@@ -391,6 +394,43 @@ def _report_inventory(inventories: List[FileInventory]) -> Dict[str, Any]:
     }
 
 
+def _merge_into(target: Any, source: Any) -> None:
+    """Add the counts of dataclass ``source`` into ``target`` (same type)."""
+    for item in dataclasses.fields(target):
+        mine = getattr(target, item.name)
+        theirs = getattr(source, item.name)
+        if isinstance(mine, (QuantileSketch, DistinctCounter)):
+            mine.merge(theirs)
+        elif isinstance(mine, dict):
+            for key, count in theirs.items():
+                mine[key] = mine.get(key, 0) + count
+        elif isinstance(mine, int):
+            setattr(target, item.name, mine + theirs)
+
+
+_HANDLERS = {"assist": _handle_assist, "agent_run": _handle_agent_run, "diff": _handle_diff}
+
+
+def _analyze_shard(
+    kind: str,
+    log_path: Path,
+    since: Optional[datetime],
+    until: Optional[datetime],
+    dedupe: bool,
+    shard: Shard,
+) -> Tuple[Metrics, Warnings, FileInventory]:
+    """Partial metrics, warnings and inventory of one shard of ``log_path``."""
+    metrics = Metrics()
+    warnings = Warnings()
+    inventory = FileInventory(path=log_path)
+    handler = _HANDLERS[kind]
+    extra = () if kind == "assist" else (dedupe,)
+    for event in _iter_jsonl(iter_shard_records(shard), inventory, warnings):
+        if isinstance(event, dict):
+            handler(event, metrics, warnings, inventory, since, until, *extra)
+    return metrics, warnings, inventory
+
+
 def _collect_reports(
     assist_path: Path,
     agent_run_path: Path,
@@ -399,28 +439,24 @@ def _collect_reports(
     since: Optional[datetime],
     until: Optional[datetime],
     dedupe: bool,
+    workers: int = 1,
 ) -> tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
     inventories: List[FileInventory] = []
     warnings = Warnings()
     metrics = Metrics()
 
-    assist_inv = FileInventory(path=assist_path)
-    inventories.append(assist_inv)
-    for event in _iter_jsonl(assist_path, assist_inv, warnings):
-        if isinstance(event, dict):
-            _handle_assist(event, metrics, warnings, assist_inv, since, until)
-
-    agent_inv = FileInventory(path=agent_run_path)
-    inventories.append(agent_inv)
-    for event in _iter_jsonl(agent_run_path, agent_inv, warnings):
-        if isinstance(event, dict):
-            _handle_agent_run(event, metrics, warnings, agent_inv, since, until, dedupe)
-
-    diff_inv = FileInventory(path=diff_path)
-    inventories.append(diff_inv)
-    for event in _iter_jsonl(diff_path, diff_inv, warnings):
-        if isinstance(event, dict):
-            _handle_diff(event, metrics, warnings, diff_inv, since, until, dedupe)
+    # Each log (with its rotated segments) is cut into byte-range shards;
+    # partials are merged in log order, so the result matches a serial run.
+    for kind, path in (("assist", assist_path), ("agent_run", agent_run_path), ("diff", diff_path)):
+        inventory = FileInventory(path=path)
+        inventories.append(inventory)
+        analyze = functools.partial(_analyze_shard, kind, path, since, until, dedupe)
+        for part_metrics, part_warnings, part_inventory in map_shards(
+            analyze, plan_shards(path, workers, since, until), workers
+        ):
+            _merge_into(metrics, part_metrics)
+            _merge_into(warnings, part_warnings)
+            _merge_into(inventory, part_inventory)
 
     inventory_report = _report_inventory(inventories)
     metrics_report = _report_metrics(metrics)
@@ -525,6 +561,7 @@ def main() -> None:
         since=since,
         until=until,
         dedupe=not args.no_dedupe,
+        workers=args.workers,
     )
 
     report_path = None
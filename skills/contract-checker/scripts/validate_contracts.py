@@ -1,23 +1,22 @@
 import json
+import sys
 from pathlib import Path
 
-from jsonschema import Draft202012Validator
-
 
 BASE_DIR = Path(__file__).resolve().parents[3]
-SCHEMA_DIR = BASE_DIR / "contracts" / "schemas"
 FIXTURE_DIR = BASE_DIR / "skills" / "contract-checker" / "fixtures"
 
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
 
-def _load_schema(name: str) -> dict:
-    return json.loads((SCHEMA_DIR / name).read_text(encoding="utf-8"))
+from contracts import registry as contract_registry  # noqa: E402
 
 
-def _schema_for_fixture(path: Path) -> dict:
+def _schema_for_fixture(path: Path) -> str:
     if "command" in path.name:
-        return _load_schema("command.schema.json")
+        return contract_registry.COMMAND_SCHEMA
     if "decision" in path.name:
-        return _load_schema("decision.schema.json")
+        return contract_registry.DECISION_SCHEMA
     raise ValueError(f"Unsupported fixture name: {path.name}")
 
 
@@ -29,10 +28,9 @@ def validate_fixtures() -> list[str]:
         return failures
 
     for fixture in fixtures:
-        schema = _schema_for_fixture(fixture)
+        schema_name = _schema_for_fixture(fixture)
         payload = json.loads(fixture.read_text(encoding="utf-8"))
-        validator = Draft202012Validator(schema)
-        errors = sorted(validator.iter_errors(payload), key=lambda err: err.path)
+        errors = contract_registry.iter_errors(schema_name, payload)
         is_invalid = fixture.name.startswith("invalid_")
 
         if is_invalid and not errors:
@@ -1,20 +1,22 @@
 import argparse
 import json
+import sys
 from pathlib import Path
 
-from jsonschema import Draft202012Validator
-
 
 BASE_DIR = Path(__file__).resolve().parents[3]
-SCHEMA_PATH = BASE_DIR / "contracts" / "schemas" / "decision.schema.json"
 DEFAULT_LOG_PATH = (
     BASE_DIR / "skills" / "decision-log-audit" / "fixtures" / "sample_decision_log.jsonl"
 )
 
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from contracts import registry as contract_registry  # noqa: E402
+
 
 def audit_log(path: Path) -> list[str]:
-    schema = json.loads(SCHEMA_PATH.read_text(encoding="utf-8"))
-    validator = Draft202012Validator(schema)
+    validator = contract_registry.get_validator(contract_registry.DECISION_SCHEMA)
     errors: list[str] = []
 
     lines = path.read_text(encoding="utf-8").splitlines()
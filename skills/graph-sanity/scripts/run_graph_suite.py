@@ -8,12 +8,9 @@ import sys
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Optional, Protocol
 
-from jsonschema import validate
-
 SUITE_DIR = Path(__file__).resolve().parent
 FIXTURE_DIR = SUITE_DIR.parent / "fixtures" / "commands"
 REPO_ROOT = SUITE_DIR.parents[2]
-DECISION_SCHEMA_PATH = REPO_ROOT / "contracts" / "schemas" / "decision.schema.json"
 CORE_GRAPH_PATH = REPO_ROOT / "graphs" / "core_graph.py"
 
 
@@ -23,6 +20,9 @@ class ProcessCommand(Protocol):
 if str(REPO_ROOT) not in sys.path:
     sys.path.insert(0, str(REPO_ROOT))
 
+from contracts import registry as contract_registry  # noqa: E402
+
+
 def load_process_command() -> ProcessCommand:
     spec = importlib.util.spec_from_file_location("core_graph", CORE_GRAPH_PATH)
     if spec is None or spec.loader is None:
@@ -43,10 +43,6 @@ def load_fixture_commands(paths: Optional[Iterable[Path]] = None) -> List[Dict[s
     return [json.loads(path.read_text(encoding="utf-8")) for path in fixture_paths]
 
 
-def load_decision_schema() -> Dict[str, Any]:
-    return json.loads(DECISION_SCHEMA_PATH.read_text(encoding="utf-8"))
-
-
 def assert_decision_metadata(decision: Dict[str, Any]) -> None:
     assert decision.get("decision_id"), "decision_id must be present"
     assert decision.get("created_at"), "created_at must be present"
@@ -64,8 +60,8 @@ def assert_decision_metadata(decision: Dict[str, Any]) -> None:
     }, "action must be in MVP list"
 
 
-def validate_decision(decision: Dict[str, Any], schema: Dict[str, Any]) -> None:
-    validate(instance=decision, schema=schema)
+def validate_decision(decision: Dict[str, Any]) -> None:
+    contract_registry.validate(contract_registry.DECISION_SCHEMA, decision)
     assert_decision_metadata(decision)
 
 
@@ -74,14 +70,14 @@ def run_graph_suite(
 ) -> List[Dict[str, Any]] | List[str]:
     failures: List[str] = []
     fixture_commands = load_fixture_commands(fixture_paths)
-    decision_schema = load_decision_schema()
+    contract_registry.warm_up()
     process_command = load_process_command()
 
     decisions = []
     for command in fixture_commands:
         try:
             decision = process_command(command)
-            validate_decision(decision, decision_schema)
+            validate_decision(decision)
             decisions.append(decision)
         except Exception as exc:  # noqa: BLE001 - used for fixture validation summary
             failures.append(str(exc))
@@ -1,11 +1,19 @@
-"""Latency and fallback summary aggregation script (ST-030)."""
+"""Latency and fallback summary aggregation script (ST-030).
+
+Logs are streamed once through constant-memory aggregators
+(``app/logging/aggregation.py``); percentiles come from quantile sketches,
+exact for small logs and within 1% relative error for large ones.
+"""
 
 from __future__ import annotations
 
+import argparse
 import json
 import sys
+from collections import Counter
+from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
 SCRIPT_DIR = Path(__file__).resolve().parent
 REPO_ROOT = SCRIPT_DIR.parents[2]
@@ -16,33 +24,50 @@ if str(REPO_ROOT) not in sys.path:
 DEFAULT_LATENCY_LOG = REPO_ROOT / "logs" / "pipeline_latency.jsonl"
 DEFAULT_FALLBACK_LOG = REPO_ROOT / "logs" / "fallback_metrics.jsonl"
 
-
-def load_jsonl(path: Path) -> List[Dict[str, Any]]:
-    """Load JSONL file into a list of dicts. Returns empty list if missing."""
-    if not path.exists():
-        return []
-    records: List[Dict[str, Any]] = []
-    for line in path.read_text(encoding="utf-8").strip().splitlines():
-        line = line.strip()
-        if line:
-            records.append(json.loads(line))
-    return records
+from app.logging.aggregation import QuantileSketch, iter_jsonl_records  # noqa: E402
+from app.logging.segments import as_utc, parse_timestamp  # noqa: E402
+
+
+def iter_jsonl(
+    path: Path,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Stream records from a JSONL log and its rotated (or compacted) segments.
+
+    Records (and whole segments) outside ``[since, until]`` are skipped;
+    records without a timestamp are kept.
+    """
+    since_utc = as_utc(since)
+    until_utc = as_utc(until)
+    for record, ok in iter_jsonl_records(path, since_utc, until_utc):
+        if not ok:
+            raise ValueError(f"unparsable line in {path}")
+        ts = parse_timestamp(record.get("timestamp")) if isinstance(record, dict) else None
+        if ts is not None and since_utc is not None and ts < since_utc:
+            continue
+        if ts is not None and until_utc is not None and ts > until_utc:
+            continue
+        yield record
+
+
+def load_jsonl(
+    path: Path,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> List[Dict[str, Any]]:
+    """Load a JSONL log into a list (small logs / tests; see ``iter_jsonl``)."""
+    return list(iter_jsonl(path, since, until))
+
+
+def _percentile(values: QuantileSketch, p: float) -> Optional[float]:
+    """Compute p-th percentile using linear interpolation."""
+    value = values.quantile(p / 100.0, interpolate=True)
+    return None if value is None else round(value, 3)
 
 
-def _percentile(values: List[float], p: float) -> Optional[float]:
-    """Compute p-th percentile using linear interpolation."""
-    if not values:
-        return None
-    s = sorted(values)
-    k = (len(s) - 1) * p / 100.0
-    f = int(k)
-    c = min(f + 1, len(s) - 1)
-    d = k - f
-    return round(s[f] + d * (s[c] - s[f]), 3)
-
-
-def _percentile_set(values: List[float]) -> Dict[str, Optional[float]]:
-    """Compute p50, p95, p99 for a list of values."""
+def _percentile_set(values: QuantileSketch) -> Dict[str, Optional[float]]:
+    """Compute p50, p95, p99 for a sketch of values."""
     return {
         "p50": _percentile(values, 50),
         "p95": _percentile(values, 95),
@@ -50,106 +75,141 @@ def _percentile_set(values: List[float]) -> Dict[str, Optional[float]]:
     }
 
 
-def compute_latency_stats(records: List[Dict[str, Any]]) -> Dict[str, Any]:
-    """Compute latency percentiles for total_ms and per-step."""
-    if not records:
-        return {
-            "count": 0,
-            "total_ms": _percentile_set([]),
-            "steps": {},
-        }
+class LatencyAggregator:
+    """One-pass total and per-step latency percentiles."""
 
-    total_values = [r["total_ms"] for r in records]
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = QuantileSketch()
+        self.steps: Dict[str, QuantileSketch] = {}
 
-    step_names: set = set()
-    for r in records:
-        step_names.update(r.get("steps", {}).keys())
+    def add(self, record: Dict[str, Any]) -> None:
+        self.count += 1
+        self.total.add(record["total_ms"])
+        for name, value in record.get("steps", {}).items():
+            sketch = self.steps.get(name)
+            if sketch is None:
+                sketch = self.steps[name] = QuantileSketch()
+            sketch.add(value)
 
-    steps_stats: Dict[str, Any] = {}
-    for name in sorted(step_names):
-        values = [r["steps"][name] for r in records if name in r.get("steps", {})]
-        steps_stats[name] = _percentile_set(values)
+    def result(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "total_ms": _percentile_set(self.total),
+            "steps": {name: _percentile_set(self.steps[name]) for name in sorted(self.steps)},
+        }
 
-    return {
-        "count": len(records),
-        "total_ms": _percentile_set(total_values),
-        "steps": steps_stats,
-    }
 
+class FallbackAggregator:
+    """One-pass outcome counts for fallback metrics records."""
 
-def compute_latency_comparison(
-    records: List[Dict[str, Any]],
-) -> Dict[str, Any]:
-    """Split records by llm_enabled and compute stats for each group."""
-    with_llm = [r for r in records if r.get("llm_enabled") is True]
-    without_llm = [r for r in records if r.get("llm_enabled") is not True]
-    return {
-        "all": compute_latency_stats(records),
-        "with_llm": compute_latency_stats(with_llm),
-        "without_llm": compute_latency_stats(without_llm),
-    }
+    def __init__(self) -> None:
+        self.outcome_counts: Counter[str] = Counter()
 
+    def add(self, record: Dict[str, Any]) -> None:
+        self.outcome_counts[record.get("llm_outcome", "unknown")] += 1
 
-def compute_fallback_rates(records: List[Dict[str, Any]]) -> Dict[str, Any]:
-    """Compute fallback, error, and success rates."""
-    total = len(records)
-    if total == 0:
+    def result(self) -> Dict[str, Any]:
+        total = sum(self.outcome_counts.values())
+        if total == 0:
+            return {
+                "count": 0,
+                "fallback_rate": 0.0,
+                "error_rate": 0.0,
+                "success_rate": 0.0,
+                "outcome_counts": {},
+            }
         return {
-            "count": 0,
-            "fallback_rate": 0.0,
-            "error_rate": 0.0,
-            "success_rate": 0.0,
-            "outcome_counts": {},
+            "count": total,
+            "fallback_rate": round(self.outcome_counts.get("fallback", 0) / total, 4),
+            "error_rate": round(self.outcome_counts.get("error", 0) / total, 4),
+            "success_rate": round(self.outcome_counts.get("success", 0) / total, 4),
+            "outcome_counts": dict(self.outcome_counts),
         }
 
-    outcome_counts: Dict[str, int] = {}
-    for r in records:
-        outcome = r.get("llm_outcome", "unknown")
-        outcome_counts[outcome] = outcome_counts.get(outcome, 0) + 1
 
-    return {
-        "count": total,
-        "fallback_rate": round(outcome_counts.get("fallback", 0) / total, 4),
-        "error_rate": round(outcome_counts.get("error", 0) / total, 4),
-        "success_rate": round(outcome_counts.get("success", 0) / total, 4),
-        "outcome_counts": outcome_counts,
-    }
+class TimeRange:
+    """First and last ``timestamp`` seen (ISO strings compare chronologically)."""
+
+    def __init__(self) -> None:
+        self.first: Optional[str] = None
+        self.last: Optional[str] = None
+
+    def add(self, record: Dict[str, Any]) -> None:
+        ts = record.get("timestamp")
+        if not ts:
+            return
+        if self.first is None or ts < self.first:
+            self.first = ts
+        if self.last is None or ts > self.last:
+            self.last = ts
+
+    def result(self) -> Dict[str, Optional[str]]:
+        return {"first": self.first, "last": self.last}
+
+
+def compute_latency_stats(records: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Compute latency percentiles for total_ms and per-step."""
+    aggregator = LatencyAggregator()
+    for record in records:
+        aggregator.add(record)
+    return aggregator.result()
+
+
+def compute_latency_comparison(
+    records: Iterable[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """Split records by llm_enabled and compute stats for each group."""
+    groups = {"all": LatencyAggregator(), "with_llm": LatencyAggregator(), "without_llm": LatencyAggregator()}
+    for record in records:
+        groups["all"].add(record)
+        groups["with_llm" if record.get("llm_enabled") is True else "without_llm"].add(record)
+    return {name: aggregator.result() for name, aggregator in groups.items()}
 
 
-def _time_range(
-    latency_records: List[Dict[str, Any]],
-    fallback_records: List[Dict[str, Any]],
-) -> Dict[str, Optional[str]]:
-    """Extract first and last timestamps across both log files."""
-    timestamps: List[str] = []
-    for r in latency_records + fallback_records:
-        ts = r.get("timestamp")
-        if ts:
-            timestamps.append(ts)
-    if not timestamps:
-        return {"first": None, "last": None}
-    timestamps.sort()
-    return {"first": timestamps[0], "last": timestamps[-1]}
+def compute_fallback_rates(records: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Compute fallback, error, and success rates."""
+    aggregator = FallbackAggregator()
+    for record in records:
+        aggregator.add(record)
+    return aggregator.result()
 
 
 def build_report(
-    latency_records: List[Dict[str, Any]],
-    fallback_records: List[Dict[str, Any]],
+    latency_records: Iterable[Dict[str, Any]],
+    fallback_records: Iterable[Dict[str, Any]],
 ) -> Dict[str, Any]:
-    """Build the full aggregation report."""
+    """Build the full aggregation report in a single pass over each log."""
+    groups = {"all": LatencyAggregator(), "with_llm": LatencyAggregator(), "without_llm": LatencyAggregator()}
+    fallback = FallbackAggregator()
+    time_range = TimeRange()
+    for record in latency_records:
+        groups["all"].add(record)
+        groups["with_llm" if record.get("llm_enabled") is True else "without_llm"].add(record)
+        time_range.add(record)
+    for record in fallback_records:
+        fallback.add(record)
+        time_range.add(record)
     return {
-        "latency": compute_latency_comparison(latency_records),
-        "fallback": compute_fallback_rates(fallback_records),
-        "time_range": _time_range(latency_records, fallback_records),
+        "latency": {name: aggregator.result() for name, aggregator in groups.items()},
+        "fallback": fallback.result(),
+        "time_range": time_range.result(),
     }
 
 
 def main() -> None:
-    """Load logs from default paths and print JSON report."""
-    latency_records = load_jsonl(DEFAULT_LATENCY_LOG)
-    fallback_records = load_jsonl(DEFAULT_FALLBACK_LOG)
-
-    report = build_report(latency_records, fallback_records)
+    """Stream logs (default paths unless overridden) and print JSON report."""
+    parser = argparse.ArgumentParser(description="Latency and fallback summary")
+    parser.add_argument("--latency-log", type=Path, default=DEFAULT_LATENCY_LOG)
+    parser.add_argument("--fallback-log", type=Path, default=DEFAULT_FALLBACK_LOG)
+    parser.add_argument("--since", type=datetime.fromisoformat, default=None)
+    parser.add_argument("--until", type=datetime.fromisoformat, default=None)
+    args = parser.parse_args()
+
+    report = build_report(
+        iter_jsonl(args.latency_log, args.since, args.until),
+        iter_jsonl(args.fallback_log, args.since, args.until),
+    )
     print(json.dumps(report, indent=2, ensure_ascii=False))
 
 
@@ -8,10 +8,62 @@ from typing import Any, Dict
 
 import pytest
 
+from agent_registry.snapshot import reset_registry_snapshots
+from app.tracing import reset_tracing
+from llm_policy.breaker import reset_breakers
+from llm_policy.cache import reset_task_cache
+from llm_policy.http_pool import close_http_clients
+from llm_policy.loader import reset_llm_policy_cache
+from llm_policy.scheduler import reset_llm_scheduler
+
 BASE_DIR = Path(__file__).resolve().parents[1]
 SCHEMA_DIR = BASE_DIR / "contracts" / "schemas"
 
 
+@pytest.fixture(autouse=True)
+def _sync_log_sinks(monkeypatch):
+    """Tests read log files right after writing them; skip the background writer."""
+    monkeypatch.setenv("LOG_SINK_MODE", "sync")
+
+
+@pytest.fixture(autouse=True)
+def _fresh_tracing():
+    """TRACE_MODE is cached; tests that enable tracing must not leak it."""
+    reset_tracing()
+    yield
+    reset_tracing()
+
+
+@pytest.fixture(autouse=True)
+def _fresh_registry_snapshots():
+    """Tests patch the v0 loader; never serve a snapshot cached by another test."""
+    reset_registry_snapshots()
+    yield
+    reset_registry_snapshots()
+
+
+@pytest.fixture(autouse=True)
+def _fresh_llm_policy_cache():
+    """Tests rewrite policy files in place; never serve a policy cached by another test."""
+    reset_llm_policy_cache()
+    reset_task_cache()
+    reset_breakers()
+    reset_llm_scheduler()
+    yield
+    reset_llm_policy_cache()
+    reset_task_cache()
+    reset_breakers()
+    reset_llm_scheduler()
+
+
+@pytest.fixture(autouse=True)
+def _fresh_http_clients():
+    """Tests patch ``httpx.Client``; never reuse a pooled client from another test."""
+    close_http_clients()
+    yield
+    close_http_clients()
+
+
 @pytest.fixture()
 def command_schema() -> Dict[str, Any]:
     """Load CommandDTO JSON schema."""
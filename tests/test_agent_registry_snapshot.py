@@ -0,0 +1,120 @@
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+from agent_registry import snapshot as registry_snapshot
+from agent_registry import v0_loader
+
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+REGISTRY_PATH = BASE_DIR / "agent_registry" / "agent-registry-v0.yaml"
+CATALOG_PATH = BASE_DIR / "agent_registry" / "capabilities-v0.yaml"
+
+
+@pytest.fixture
+def sources(tmp_path, monkeypatch):
+    monkeypatch.setenv("AGENT_REGISTRY_RELOAD_INTERVAL_MS", "0")
+    registry_path = tmp_path / "registry.yaml"
+    catalog_path = tmp_path / "capabilities.yaml"
+    shutil.copy(REGISTRY_PATH, registry_path)
+    shutil.copy(CATALOG_PATH, catalog_path)
+    return registry_path, catalog_path
+
+
+def _get(registry_path: Path, catalog_path: Path):
+    return registry_snapshot.get_registry_snapshot(str(registry_path), str(catalog_path))
+
+
+def _bump_mtime(path: Path) -> None:
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_snapshot_is_cached(sources, monkeypatch):
+    first = _get(*sources)
+    monkeypatch.setattr(
+        v0_loader.AgentRegistryV0Loader,
+        "load",
+        staticmethod(lambda *_a, **_kw: pytest.fail("unchanged registry must not be re-parsed")),
+    )
+
+    assert _get(*sources) is first
+    assert first.version.startswith("v0+")
+
+
+def test_touch_without_content_change_keeps_snapshot(sources):
+    registry_path, _catalog_path = sources
+    first = _get(*sources)
+    _bump_mtime(registry_path)
+
+    assert _get(*sources) is first
+
+
+def test_content_change_swaps_snapshot(sources):
+    registry_path, _catalog_path = sources
+    first = _get(*sources)
+    text = registry_path.read_text(encoding="utf-8")
+    registry_path.write_text(text.replace("enabled: false", "enabled: true", 1), encoding="utf-8")
+    _bump_mtime(registry_path)
+
+    second = _get(*sources)
+
+    assert second is not first
+    assert second.version != first.version
+    assert second.registry.agents[0].enabled is True
+    assert first.registry.agents[0].enabled is False
+
+
+def test_broken_reload_keeps_previous_snapshot(sources):
+    registry_path, _catalog_path = sources
+    first = _get(*sources)
+    good = registry_path.read_text(encoding="utf-8")
+    registry_path.write_text("registry_version: \"v0\"\nunexpected: 1\n", encoding="utf-8")
+    _bump_mtime(registry_path)
+
+    assert _get(*sources) is first
+
+    registry_path.write_text(good.replace("enabled: false", "enabled: true", 1), encoding="utf-8")
+    _bump_mtime(registry_path)
+    assert _get(*sources).registry.agents[0].enabled is True
+
+
+def test_load_error_is_not_remembered_forever(sources):
+    registry_path, _catalog_path = sources
+    good = registry_path.read_text(encoding="utf-8")
+    registry_path.write_text("registry_version: \"v0\"\nunexpected: 1\n", encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        _get(*sources)
+
+    registry_path.write_text(good, encoding="utf-8")
+    _bump_mtime(registry_path)
+    assert _get(*sources).registry.registry_version == "v0"
+
+
+def test_capability_catalog_is_cached(sources):
+    _registry_path, catalog_path = sources
+    first = registry_snapshot.get_capability_catalog(str(catalog_path))
+
+    assert registry_snapshot.get_capability_catalog(str(catalog_path)) is first
+    assert "extract_entities.shopping" in first
+
+
+def test_snapshot_lookup_is_built_once_per_snapshot(sources):
+    registry_path, _catalog_path = sources
+    first = _get(*sources)
+
+    assert _get(*sources).lookup is first.lookup
+    assert first.lookup.find_agents("add_shopping_item", "shadow") == [
+        agent
+        for agent in first.registry.agents
+        if agent.enabled and agent.mode == "shadow"
+        and any("add_shopping_item" in cap.allowed_intents for cap in agent.capabilities)
+    ]
+
+    text = registry_path.read_text(encoding="utf-8")
+    registry_path.write_text(text.replace("enabled: false", "enabled: true", 1), encoding="utf-8")
+    _bump_mtime(registry_path)
+    assert _get(*sources).lookup is not first.lookup
@@ -19,6 +19,7 @@ from aggregate_metrics import (
     compute_fallback_rates,
     compute_latency_comparison,
     compute_latency_stats,
+    load_jsonl,
 )
 
 
@@ -141,3 +142,21 @@ def test_report_valid_json() -> None:
     assert "all" in parsed["latency"]
     assert "with_llm" in parsed["latency"]
     assert "without_llm" in parsed["latency"]
+
+
+def test_load_jsonl_reads_rotated_segments_in_window(tmp_path) -> None:
+    """Rotated .gz segments are merged and filtered by the since/until window."""
+    from datetime import datetime
+
+    from app.logging.rotation import rotate_log
+
+    path = tmp_path / "pipeline_latency.jsonl"
+    old = _make_latency_record(total_ms=1.0) | {"timestamp": "2026-01-01T00:00:00+00:00"}
+    new = _make_latency_record(total_ms=2.0) | {"timestamp": "2026-03-01T00:00:00+00:00"}
+    path.write_text(json.dumps(old) + "\n", encoding="utf-8")
+    rotate_log(path)
+    path.write_text(json.dumps(new) + "\n", encoding="utf-8")
+
+    assert [r["total_ms"] for r in load_jsonl(path)] == [1.0, 2.0]
+    assert [r["total_ms"] for r in load_jsonl(path, since=datetime(2026, 2, 1))] == [2.0]
+    assert [r["total_ms"] for r in load_jsonl(path, until=datetime(2026, 2, 1))] == [1.0]
@@ -311,3 +311,90 @@ def test_end_to_end_with_json_output(tmp_path):
     assert "error_breakdown" in loaded
     assert "total_records" in loaded
     assert "matched_records" in loaded
+
+
+def test_reads_rotated_segments_within_window(tmp_path):
+    """Compressed segments are read; --since/--until drops older records and segments."""
+    import gzip
+    from datetime import datetime
+
+    from app.logging.rotation import rotate_log
+
+    log_path = tmp_path / "shadow_router.jsonl"
+    old = _make_record(command_id="cmd-old") | {"timestamp": "2026-01-01T10:00:00+00:00"}
+    log_path.write_text(json.dumps(old) + "\n", encoding="utf-8")
+    segment = rotate_log(log_path)
+    log_path.write_text(json.dumps(_make_record(command_id="cmd-new")) + "\n", encoding="utf-8")
+
+    with gzip.open(segment, "rt", encoding="utf-8") as handle:
+        assert json.loads(handle.readline())["command_id"] == "cmd-old"
+    everything = [r["command_id"] for r, ok in iter_shadow_log(log_path) if ok]
+    window = [r["command_id"] for r, ok in iter_shadow_log(log_path, since=datetime(2026, 2, 1)) if ok]
+
+    assert everything == ["cmd-old", "cmd-new"]
+    assert window == ["cmd-new"]
+
+
+def test_sharded_report_matches_serial(tmp_path, monkeypatch):
+    """--workers splits the log into byte ranges; the merged report is unchanged."""
+    from app.logging import sharding
+    from analyze_shadow_router import collect_report
+
+    monkeypatch.setattr(sharding, "MIN_SHARD_BYTES", 1024)
+    golden = {
+        "cmd-a": GoldenEntry("cmd-a", "add_shopping_item", ["item"]),
+        "cmd-b": GoldenEntry("cmd-b", "create_task", []),
+    }
+    records = [
+        _make_record(
+            command_id=["cmd-a", "cmd-b", "cmd-x"][i % 3],
+            suggested_intent="add_shopping_item" if i % 2 else "create_task",
+            entity_keys=["item"] if i % 4 else [],
+            latency_ms=10 + i,
+            error_type="timeout" if i % 7 == 0 else None,
+        )
+        for i in range(200)
+    ]
+    log_path = tmp_path / "shadow.jsonl"
+    _write_jsonl(log_path, records)
+    with log_path.open("a", encoding="utf-8") as fh:
+        fh.write("{broken\n")
+
+    serial = collect_report(log_path, golden)
+    sharded = collect_report(log_path, golden, workers=3)
+
+    assert len(sharding.plan_shards(log_path, 3)) > 1
+    assert format_report_json(sharded) == format_report_json(serial)
+    assert serial.total_records == 200
+    assert serial.parse_errors == 1
+
+
+def test_compacted_segments_give_the_same_report(tmp_path):
+    """Columnar (.cols) segments are aggregated column-wise with identical results."""
+    from datetime import datetime
+
+    from app.logging.compaction import compact_log
+    from app.logging.rotation import rotate_log
+    from analyze_shadow_router import collect_report
+
+    golden = {"cmd-a": GoldenEntry("cmd-a", "add_shopping_item", ["item"])}
+    records = [
+        _make_record(
+            command_id="cmd-a" if i % 2 else "cmd-x",
+            entity_keys=["item"] if i % 3 else [],
+            latency_ms=5 + i,
+            error_type="timeout" if i % 5 == 0 else None,
+        )
+        for i in range(50)
+    ]
+    log_path = tmp_path / "shadow_router.jsonl"
+    _write_jsonl(log_path, records)
+    rotate_log(log_path)
+    _write_jsonl(log_path, records[:5])
+    before = format_report_json(collect_report(log_path, golden))
+    window = format_report_json(collect_report(log_path, golden, since=datetime(2026, 1, 1)))
+
+    assert compact_log(log_path).compacted
+    assert format_report_json(collect_report(log_path, golden)) == before
+    assert format_report_json(collect_report(log_path, golden, since=datetime(2026, 1, 1))) == window
+    assert format_report_json(collect_report(log_path, golden, since=datetime(2026, 3, 1)))["total_records"] == 0
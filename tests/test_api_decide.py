@@ -5,6 +5,8 @@ from fastapi.testclient import TestClient
 from jsonschema import validate
 
 from app.main import create_app
+from app.models.api_models import DecisionResponse
+from app.routes.decide import DecisionJSONResponse
 
 
 BASE_DIR = Path(__file__).resolve().parents[1]
@@ -37,3 +39,38 @@ def test_decide_rejects_invalid_command(monkeypatch, tmp_path):
     assert response.status_code == 422
     payload = response.json()
     assert "detail" in payload
+
+
+def test_decide_body_matches_pydantic_serialization(monkeypatch, tmp_path):
+    monkeypatch.setenv("DECISION_LOG_PATH", str(tmp_path / "decisions.jsonl"))
+    command = json.loads(FIXTURE_PATH.read_text(encoding="utf-8"))
+    client = TestClient(create_app())
+
+    response = client.post("/v1/decide", json=command)
+    expected = DecisionResponse.model_validate(response.json())
+
+    assert response.headers["content-type"] == "application/json"
+    assert json.loads(response.content) == json.loads(expected.model_dump_json(exclude_none=True))
+    assert list(response.json()) == list(json.loads(expected.model_dump_json(exclude_none=True)))
+
+
+def test_decision_response_drops_top_level_none_only():
+    decision = {
+        "decision_id": "d",
+        "command_id": "c",
+        "status": "clarify",
+        "action": "clarify",
+        "decision_outcome": None,
+        "confidence": 1,
+        "payload": {"question": "Что купить?", "missing_fields": None},
+        "explanation": "e",
+        "trace_id": "t",
+        "schema_version": "2.0.0",
+        "decision_version": "v",
+        "created_at": "2026-01-01T00:00:00+00:00",
+    }
+
+    body = DecisionJSONResponse(decision).body
+
+    expected = DecisionResponse.model_validate(decision).model_dump_json(exclude_none=True)
+    assert body.decode("utf-8") == expected
@@ -1,4 +1,5 @@
 import json
+import time
 from pathlib import Path
 
 import routers.assist.runner as assist_runner
@@ -155,3 +156,90 @@ def test_assist_log_no_raw_text(monkeypatch, tmp_path):
     logs = _read_logs(log_path)
     assert any(entry["step"] == "normalizer" for entry in logs)
     assert all("text" not in entry for entry in logs)
+
+
+def test_assist_hints_run_concurrently_under_one_deadline(monkeypatch, tmp_path):
+    log_path = tmp_path / "assist.jsonl"
+    monkeypatch.setenv("ASSIST_LOG_PATH", str(log_path))
+    monkeypatch.setenv("ASSIST_MODE_ENABLED", "true")
+    monkeypatch.setenv("ASSIST_NORMALIZATION_ENABLED", "true")
+    monkeypatch.setenv("ASSIST_ENTITY_EXTRACTION_ENABLED", "true")
+    monkeypatch.setenv("ASSIST_CLARIFY_ENABLED", "true")
+    monkeypatch.setenv("ASSIST_TIMEOUT_MS", "300")
+
+    def slow(result, delay=0.15):
+        def run(*_args):
+            time.sleep(delay)
+            return result
+
+        return run
+
+    normalization_hint = NormalizationHint(
+        normalized_text="Купи молоко",
+        intent_hint=None,
+        entities_hint=None,
+        confidence=0.9,
+        error_type=None,
+        latency_ms=150,
+    )
+    entity_hint = EntityHints(
+        items=[{"name": "молоко"}],
+        task_hints={},
+        confidence=0.9,
+        error_type=None,
+        latency_ms=150,
+    )
+    stuck_clarify = ClarifyHint(
+        question="Что купить?",
+        missing_fields=None,
+        confidence=None,
+        error_type=None,
+        latency_ms=None,
+    )
+    monkeypatch.setattr(assist_runner, "_run_normalization_hint", slow(normalization_hint))
+    monkeypatch.setattr(assist_runner, "_run_entity_hint", slow(entity_hint))
+    monkeypatch.setattr(assist_runner, "_run_clarify_hint", slow(stuck_clarify, delay=1.0))
+
+    started = time.monotonic()
+    normalized = {"text": "Купи молоко", "intent": "add_shopping_item"}
+    hints = assist_runner._build_assist_hints(_command("Купи молоко"), normalized)
+    elapsed = time.monotonic() - started
+
+    assert elapsed < 0.45
+    assert hints.normalization == normalization_hint
+    assert hints.entities == entity_hint
+    assert hints.clarify.error_type == "timeout"
+
+
+def test_hint_llm_call_stops_at_the_budget(monkeypatch):
+    monkeypatch.setenv("ASSIST_MODE_ENABLED", "true")
+    monkeypatch.setenv("ASSIST_NORMALIZATION_ENABLED", "true")
+    monkeypatch.setenv("ASSIST_ENTITY_EXTRACTION_ENABLED", "false")
+    monkeypatch.setenv("ASSIST_CLARIFY_ENABLED", "false")
+    monkeypatch.setenv("ASSIST_TIMEOUT_MS", "1000")
+    monkeypatch.setenv("LLM_POLICY_ENABLED", "true")
+    run_normalization = assist_runner._run_normalization_hint
+    finished = []
+
+    def stuck_llm_call(**_kwargs):
+        time.sleep(0.5)
+
+    def timed_normalization(text, **kwargs):
+        started = time.monotonic()
+        hint = run_normalization(text, **kwargs)
+        finished.append((time.monotonic() - started, hint))
+        return hint
+
+    monkeypatch.setattr(assist_runner, "run_task_with_policy", stuck_llm_call)
+    monkeypatch.setattr(assist_runner, "_run_normalization_hint", timed_normalization)
+
+    normalized = {"text": "Купи молоко", "intent": "add_shopping_item"}
+    assist_runner.collect_assist_hints(_command("Купи молоко"), normalized, budget_ms=50)
+
+    # The worker itself returns at the budget, not after ASSIST_TIMEOUT_MS.
+    deadline = time.monotonic() + 1
+    while not finished and time.monotonic() < deadline:
+        time.sleep(0.005)
+    ((elapsed, hint),) = finished
+    assert elapsed < 0.3
+    assert hint.error_type == "timeout"
@@ -111,3 +111,43 @@ def test_list_capabilities_empty_catalog():
     registry = _make_registry()
     lookup = CapabilitiesLookup(registry)
     assert lookup.list_capabilities() == []
+
+
+def test_find_agents_keeps_registry_order_and_dedups_capabilities():
+    multi = AgentSpec(
+        agent_id="multi",
+        enabled=True,
+        mode="shadow",
+        capabilities=(
+            AgentCapability(capability_id="cap_a", allowed_intents=("add_shopping_item",)),
+            AgentCapability(capability_id="cap_b", allowed_intents=("add_shopping_item", "create_task")),
+        ),
+        runner=RunnerSpec(kind="python_module", ref="test:run"),
+    )
+    first = _make_agent("first", enabled=True, mode="shadow", intent="add_shopping_item")
+    lookup = CapabilitiesLookup(_make_registry(first, multi))
+
+    assert [a.agent_id for a in lookup.find_agents("add_shopping_item", "shadow")] == ["first", "multi"]
+    assert [a.agent_id for a in lookup.find_agents("create_task", "shadow")] == ["multi"]
+    assert [a.agent_id for a in lookup.agents_for_capability("cap_b")] == ["multi"]
+
+
+def test_find_single_capability_agents():
+    narrow = _make_agent("narrow", enabled=True, mode="assist", intent="add_shopping_item")
+    wildcard = AgentSpec(
+        agent_id="wildcard",
+        enabled=True,
+        mode="assist",
+        capabilities=(AgentCapability(capability_id="test_cap", allowed_intents=()),),
+        runner=RunnerSpec(kind="python_module", ref="test:run"),
+    )
+    disabled = _make_agent("disabled", enabled=False, mode="assist", intent="add_shopping_item")
+    lookup = CapabilitiesLookup(_make_registry(narrow, wildcard, disabled))
+
+    matched = lookup.find_single_capability_agents("test_cap", "assist", "add_shopping_item")
+    assert [a.agent_id for a in matched] == ["narrow", "wildcard"]
+    unknown = lookup.find_single_capability_agents("test_cap", "assist", "unknown_intent")
+    assert [a.agent_id for a in unknown] == ["wildcard"]
+    assert lookup.find_single_capability_agents("test_cap", "assist", None) == []
+    assert lookup.find_single_capability_agents("other_cap", "assist", "add_shopping_item") == []
+    assert lookup.allowed_intents[("narrow", "test_cap")] == frozenset({"add_shopping_item"})
@@ -0,0 +1,135 @@
+"""Differential tests: generated fast-path validators vs jsonschema."""
+
+from __future__ import annotations
+
+import copy
+import json
+import logging
+from pathlib import Path
+from typing import Any, Iterator
+
+import pytest
+from jsonschema import Draft202012Validator, ValidationError, validate
+
+from app.services.decision_service import format_validation_error
+from contracts import registry as contract_registry
+from contracts.codegen import UnsupportedSchemaError, compile_schema
+from graphs.core_graph import process_command, sample_command
+
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+CONTRACT_FIXTURES = BASE_DIR / "skills" / "contract-checker" / "fixtures"
+GRAPH_FIXTURES = BASE_DIR / "skills" / "graph-sanity" / "fixtures" / "commands"
+_REPLACEMENTS = (None, True, 0, 1.5, -1, "", "x", [], {}, ["start_job"], {"unexpected": 1})
+
+
+def _load(path: Path) -> Any:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _mutations(instance: Any, depth: int = 0) -> Iterator[Any]:
+    """Yield copies of instance with one key removed or one value replaced."""
+    if depth > 2:
+        return
+    if isinstance(instance, dict):
+        for key in instance:
+            removed = copy.deepcopy(instance)
+            del removed[key]
+            yield removed
+            for replacement in _REPLACEMENTS:
+                replaced = copy.deepcopy(instance)
+                replaced[key] = replacement
+                yield replaced
+            for nested in _mutations(instance[key], depth + 1):
+                updated = copy.deepcopy(instance)
+                updated[key] = nested
+                yield updated
+        extra = copy.deepcopy(instance)
+        extra["zz_extra"] = "value"
+        yield extra
+    elif isinstance(instance, list) and instance:
+        yield []
+        for nested in _mutations(instance[0], depth + 1):
+            yield [nested] + copy.deepcopy(instance[1:])
+
+
+def _commands() -> list[dict]:
+    commands = [_load(path) for path in sorted(GRAPH_FIXTURES.glob("*.json"))]
+    commands += [_load(path) for path in sorted(CONTRACT_FIXTURES.glob("*command*.json"))]
+    return commands
+
+
+def _decisions() -> list[dict]:
+    decisions = [_load(path) for path in sorted(CONTRACT_FIXTURES.glob("*decision*.json"))]
+    for command in _commands():
+        try:
+            decisions.append(process_command(command))
+        except ValidationError:
+            continue
+    return decisions
+
+
+@pytest.fixture(autouse=True)
+def _quiet_logs(tmp_path, monkeypatch):
+    monkeypatch.setenv("PIPELINE_LATENCY_LOG_PATH", str(tmp_path / "latency.jsonl"))
+    monkeypatch.setenv("FALLBACK_METRICS_LOG_PATH", str(tmp_path / "fallback.jsonl"))
+
+
+@pytest.mark.parametrize("schema_name", [contract_registry.COMMAND_SCHEMA, contract_registry.DECISION_SCHEMA])
+def test_fast_path_agrees_with_jsonschema(schema_name) -> None:
+    fast = contract_registry.get_fast_validator(schema_name)
+    slow = contract_registry.get_validator(schema_name)
+    assert fast is not None
+
+    seeds = _commands() if schema_name == contract_registry.COMMAND_SCHEMA else _decisions()
+    checked = 0
+    for seed in seeds:
+        for instance in [seed, *_mutations(seed)]:
+            assert fast(instance) == slow.is_valid(instance), json.dumps(instance, ensure_ascii=False)
+            checked += 1
+    assert checked > 100
+
+
+def test_validate_error_matches_jsonschema(command_schema) -> None:
+    for instance in _mutations(sample_command(), depth=2):
+        try:
+            validate(instance=instance, schema=command_schema)
+        except ValidationError as expected:
+            with pytest.raises(ValidationError) as actual:
+                contract_registry.validate(contract_registry.COMMAND_SCHEMA, instance)
+            assert format_validation_error(actual.value) == format_validation_error(expected)
+
+
+def test_differential_mode_logs_mismatch(monkeypatch, caplog) -> None:
+    key = (contract_registry.COMMAND_SCHEMA, contract_registry.contracts_version())
+    contract_registry.get_validator(contract_registry.COMMAND_SCHEMA)
+    monkeypatch.setitem(contract_registry._FAST_VALIDATORS, key, lambda _instance: True)
+    monkeypatch.setenv("CONTRACTS_FASTPATH_DIFFERENTIAL", "true")
+
+    with caplog.at_level(logging.WARNING, logger="contracts.registry"):
+        with pytest.raises(ValidationError):
+            contract_registry.validate(contract_registry.COMMAND_SCHEMA, {"command_id": "cmd-1"})
+
+    assert "contract fast path mismatch" in caplog.text
+
+
+def test_unsupported_keyword_is_rejected() -> None:
+    with pytest.raises(UnsupportedSchemaError):
+        compile_schema({"type": "object", "patternProperties": {"^x": {"type": "string"}}})
+
+
+def test_type_semantics_match_jsonschema() -> None:
+    schema = {
+        "type": "object",
+        "properties": {
+            "count": {"type": "integer", "minimum": 0},
+            "ratio": {"type": "number", "maximum": 1},
+            "flag": {"enum": [True, 1, "one"]},
+        },
+    }
+    fast = compile_schema(schema)
+    slow = Draft202012Validator(schema)
+    for value in (0, 1, 1.0, 2.5, -1, True, False, "1", None):
+        for key in ("count", "ratio", "flag"):
+            instance = {key: value}
+            assert fast(instance) == slow.is_valid(instance), instance
@@ -0,0 +1,62 @@
+"""Tests for the compiled contract validator registry."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from jsonschema import ValidationError, validate
+
+from contracts import registry as contract_registry
+from graphs.core_graph import sample_command
+
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+VERSION_PATH = BASE_DIR / "contracts" / "VERSION"
+
+
+def test_validators_are_compiled_once() -> None:
+    first = contract_registry.get_validator(contract_registry.COMMAND_SCHEMA)
+    second = contract_registry.get_validator(contract_registry.COMMAND_SCHEMA)
+    assert first is second
+
+
+def test_version_matches_contracts_version_file() -> None:
+    expected = VERSION_PATH.read_text(encoding="utf-8").strip()
+    assert contract_registry.contracts_version() == expected
+
+
+def test_valid_command_passes() -> None:
+    contract_registry.validate(contract_registry.COMMAND_SCHEMA, sample_command())
+    assert contract_registry.is_valid(contract_registry.COMMAND_SCHEMA, sample_command())
+
+
+def test_error_matches_jsonschema_validate(command_schema) -> None:
+    command = sample_command()
+    del command["text"]
+    command["capabilities"] = ["fly"]
+
+    with pytest.raises(ValidationError) as expected:
+        validate(instance=command, schema=command_schema)
+    with pytest.raises(ValidationError) as actual:
+        contract_registry.validate(contract_registry.COMMAND_SCHEMA, command)
+
+    assert actual.value.message == expected.value.message
+    assert list(actual.value.path) == list(expected.value.path)
+
+
+def test_reset_registry_recompiles(monkeypatch, tmp_path) -> None:
+    version_file = tmp_path / "VERSION"
+    version_file.write_text("9.9.9\n", encoding="utf-8")
+    original = contract_registry.get_validator(contract_registry.DECISION_SCHEMA)
+
+    monkeypatch.setattr(contract_registry, "VERSION_PATH", version_file)
+    contract_registry.reset_registry()
+    try:
+        assert contract_registry.contracts_version() == "9.9.9"
+        recompiled = contract_registry.get_validator(contract_registry.DECISION_SCHEMA)
+        assert recompiled is not original
+        assert recompiled.schema == original.schema
+    finally:
+        monkeypatch.undo()
+        contract_registry.reset_registry()
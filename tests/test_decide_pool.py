@@ -0,0 +1,111 @@
+import asyncio
+import json
+import threading
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.routes.decide as decide_route_module
+from app.main import create_app
+from app.services import decision_pool
+from app.services.decision_pool import DecisionPool, DecisionPoolSaturatedError
+
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+FIXTURE_PATH = BASE_DIR / "skills" / "contract-checker" / "fixtures" / "valid_command_create_task.json"
+
+
+@pytest.fixture(autouse=True)
+def _reset_pool():
+    decision_pool.shutdown_decision_pool()
+    yield
+    decision_pool.shutdown_decision_pool()
+
+
+def _command() -> dict:
+    return json.loads(FIXTURE_PATH.read_text(encoding="utf-8"))
+
+
+def test_pool_rejects_when_saturated():
+    pool = DecisionPool(max_workers=1, queue_depth=1, retry_after_s=3)
+    release = threading.Event()
+
+    async def scenario():
+        running = [asyncio.ensure_future(pool.run(release.wait, 5)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        assert pool.in_flight == 2
+        with pytest.raises(DecisionPoolSaturatedError) as exc_info:
+            await pool.run(release.wait, 5)
+        assert exc_info.value.retry_after_s == 3
+        release.set()
+        assert await asyncio.gather(*running) == [True, True]
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        release.set()
+        pool.shutdown()
+    assert pool.in_flight == 0
+
+
+def test_pool_does_not_block_event_loop():
+    pool = DecisionPool(max_workers=1, queue_depth=0)
+    release = threading.Event()
+
+    async def scenario():
+        blocked = asyncio.ensure_future(pool.run(release.wait, 5))
+        ticks = 0
+        for _ in range(5):
+            await asyncio.sleep(0.01)
+            ticks += 1
+        assert not blocked.done()
+        release.set()
+        await blocked
+        return ticks
+
+    try:
+        assert asyncio.run(scenario()) == 5
+    finally:
+        release.set()
+        pool.shutdown()
+
+
+def test_decide_returns_503_with_retry_after(monkeypatch, tmp_path):
+    monkeypatch.setenv("DECISION_LOG_PATH", str(tmp_path / "decisions.jsonl"))
+    monkeypatch.setenv("DECIDE_RETRY_AFTER_S", "7")
+
+    def saturated(*_args, **_kwargs):
+        raise DecisionPoolSaturatedError(decision_pool.decide_retry_after_s())
+
+    monkeypatch.setattr(decision_pool.DecisionPool, "run", saturated)
+    client = TestClient(create_app())
+
+    response = client.post("/v1/decide", json=_command())
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "7"
+
+
+def test_inline_mode_skips_pool(monkeypatch, tmp_path):
+    monkeypatch.setenv("DECISION_LOG_PATH", str(tmp_path / "decisions.jsonl"))
+    monkeypatch.setenv("DECIDE_EXECUTION_MODE", "inline")
+    monkeypatch.setattr(
+        decide_route_module,
+        "get_decision_pool",
+        lambda: pytest.fail("pool must not be used in inline mode"),
+    )
+    client = TestClient(create_app())
+
+    response = client.post("/v1/decide", json=_command())
+    assert response.status_code == 200
+
+
+def test_pool_settings_from_env(monkeypatch):
+    monkeypatch.setenv("DECIDE_POOL_MAX_WORKERS", "3")
+    monkeypatch.setenv("DECIDE_POOL_QUEUE_DEPTH", "0")
+    monkeypatch.setenv("DECIDE_EXECUTION_MODE", "bogus")
+
+    pool = decision_pool.get_decision_pool()
+    assert pool.max_workers == 3
+    assert pool.queue_depth == 0
+    assert decision_pool.decide_execution_mode() == "pool"
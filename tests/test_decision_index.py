@@ -0,0 +1,246 @@
+import gzip
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from app.logging import columnar, decision_index, rotation
+from app.logging.compaction import compact_log
+from app.logging.decision_index import (
+    find_decisions,
+    get_decision_index,
+    index_path,
+    journal_path,
+    rebuild_decision_index,
+)
+from app.logging.decision_log import append_decision_log
+from app.logging.segments import log_segments
+from app.logging.sink import flush_log_sinks
+from scripts import decision_lookup
+
+
+@pytest.fixture
+def log_path(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    path = tmp_path / "decisions.jsonl"
+    monkeypatch.setenv("DECISION_LOG_PATH", str(path))
+    monkeypatch.setattr(rotation, "GZIP_MEMBER_BYTES", 512)
+    monkeypatch.setattr(decision_index, "_INDEXES", {})
+    return path
+
+
+def _write(count: int, start: int = 0) -> None:
+    for index in range(start, start + count):
+        append_decision_log(
+            {
+                "trace_id": f"trace-{index}",
+                "command_id": f"cmd-{index}",
+                "action": "clarify",
+                "payload": {"question": "x" * (index % 7)},
+            }
+        )
+    flush_log_sinks()  # waits for background rotations too
+
+
+def test_lookup_in_active_file_uses_journal(log_path: Path) -> None:
+    _write(50)
+
+    (record,) = find_decisions(log_path, trace_id="trace-17")
+    assert record["command_id"] == "cmd-17"
+    assert find_decisions(log_path, command_id="cmd-3")[0]["trace_id"] == "trace-3"
+    assert find_decisions(log_path, trace_id="trace-17", command_id="cmd-18") == []
+    assert find_decisions(log_path, trace_id="trace-missing") == []
+    assert len(journal_path(log_path).read_text(encoding="utf-8").splitlines()) == 100
+    with pytest.raises(ValueError):
+        find_decisions(log_path)
+
+
+def test_journal_is_read_once_per_process(log_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    _write(20)
+    saved = journal_path(log_path).read_text(encoding="utf-8")
+    journal_path(log_path).write_text("", encoding="utf-8")
+
+    assert find_decisions(log_path, trace_id="trace-7")[0]["command_id"] == "cmd-7"
+
+    # A new process loads the journal from disk once.
+    monkeypatch.setattr(decision_index, "_INDEXES", {})
+    journal_path(log_path).write_text(saved, encoding="utf-8")
+    assert find_decisions(log_path, trace_id="trace-12")[0]["command_id"] == "cmd-12"
+    journal_path(log_path).unlink()
+    assert find_decisions(log_path, command_id="cmd-3")[0]["trace_id"] == "trace-3"
+
+
+def test_journal_appends_through_one_handle(log_path: Path) -> None:
+    _write(3)
+    index = get_decision_index(log_path)
+    handle = index._journal_handle
+
+    _write(3, start=3)
+
+    assert handle is not None and index._journal_handle is handle
+    assert len(journal_path(log_path).read_text(encoding="utf-8").splitlines()) == 12
+    index.rebuild()
+    assert index._journal_handle is None
+    _write(1, start=6)
+    assert find_decisions(log_path, trace_id="trace-6")[0]["command_id"] == "cmd-6"
+    assert len(journal_path(log_path).read_text(encoding="utf-8").splitlines()) == 2
+    index.close()
+
+
+def test_journal_folds_off_the_writer_thread(log_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(decision_index, "JOURNAL_FOLD_ENTRIES", 20)
+    merge = decision_index._merge_into_index
+    merged_on: list[str] = []
+
+    def recording_merge(*args, **kwargs):
+        merged_on.append(threading.current_thread().name)
+        return merge(*args, **kwargs)
+
+    monkeypatch.setattr(decision_index, "_merge_into_index", recording_merge)
+    _write(60)
+    index = get_decision_index(log_path)
+    deadline = time.monotonic() + 5
+    while index._fold_thread is not None:
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+    assert merged_on and set(merged_on) == {"decision-index-fold"}
+    assert index_path(log_path).exists()
+    assert len(journal_path(log_path).read_text(encoding="utf-8").splitlines()) == index._journal_entries < 120
+    for number in (0, 25, 59):
+        (record,) = find_decisions(log_path, trace_id=f"trace-{number}")
+        assert record["command_id"] == f"cmd-{number}"
+
+
+def test_index_survives_gzip_rotation(log_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("LOG_ROTATE_MAX_BYTES", "4000")
+
+    _write(120)
+
+    segments = [segment for segment in log_segments(log_path) if segment != log_path]
+    assert segments and all(segment.name.endswith(".gz") for segment in segments)
+    with gzip.open(segments[0], "rt", encoding="utf-8") as handle:
+        assert json.loads(handle.readline())["trace_id"] == "trace-0"
+    assert index_path(log_path).exists()
+    for index in (0, 31, 77, 119):
+        (record,) = find_decisions(log_path, trace_id=f"trace-{index}")
+        assert record["command_id"] == f"cmd-{index}"
+
+
+def test_lookups_while_a_rotated_segment_is_compressed(log_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("LOG_ROTATE_MAX_BYTES", "4000")
+    release = threading.Event()
+    compress = rotation._compress
+
+    def held_compress(segment):
+        assert release.wait(5)
+        return compress(segment)
+
+    monkeypatch.setattr(rotation, "_compress", held_compress)
+    for index in range(40):
+        append_decision_log({"trace_id": f"trace-{index}", "command_id": f"cmd-{index}", "action": "clarify"})
+    (closed, _active) = log_segments(log_path)
+    assert closed.name.endswith(".jsonl")
+
+    # The renamed segment is served from memory; the new active file from the journal.
+    for index in (0, 39):
+        (record,) = find_decisions(log_path, trace_id=f"trace-{index}")
+        assert record["command_id"] == f"cmd-{index}"
+    release.set()
+    flush_log_sinks()
+
+    assert log_segments(log_path)[0].name.endswith(".gz")
+    assert get_decision_index(log_path)._closing == {}
+    for index in (0, 39):
+        (record,) = find_decisions(log_path, trace_id=f"trace-{index}")
+        assert record["command_id"] == f"cmd-{index}"
+
+
+def test_index_follows_compaction(log_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("LOG_ROTATE_MAX_BYTES", "4000")
+    _write(80)
+
+    result = compact_log(log_path)
+
+    assert result.compacted
+    assert not any(segment.name.endswith(".gz") for segment in log_segments(log_path))
+    (record,) = find_decisions(log_path, command_id="cmd-5")
+    assert record["trace_id"] == "trace-5"
+    (record,) = find_decisions(log_path, trace_id="trace-79")
+    assert record["command_id"] == "cmd-79"
+
+
+def test_columnar_lookup_decodes_one_row_group(log_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("LOG_ROTATE_MAX_BYTES", "4000")
+    monkeypatch.setattr(columnar, "ROW_GROUP_ROWS", 4)
+    _write(80)
+    compact_log(log_path)
+    decoded: list[int] = []
+    decode_column = columnar._decode_column
+
+    def counting_decode(meta, raw, rows, byteorder):
+        decoded.append(rows)
+        return decode_column(meta, raw, rows, byteorder)
+
+    monkeypatch.setattr(columnar, "_decode_column", counting_decode)
+
+    (record,) = find_decisions(log_path, trace_id="trace-6")
+
+    assert record["command_id"] == "cmd-6"
+    assert decoded and set(decoded) == {4}
+    assert len(decoded) == len(columnar.row_groups(columnar.read_header(log_segments(log_path)[0]))[0]["columns"])
+
+
+def test_rebuild_from_segments(log_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("LOG_ROTATE_MAX_BYTES", "4000")
+    _write(90)
+    index_path(log_path).unlink()
+    journal_path(log_path).unlink()
+    assert find_decisions(log_path, trace_id="trace-40") == []
+
+    assert rebuild_decision_index(log_path) == 180
+
+    (record,) = find_decisions(log_path, trace_id="trace-40")
+    assert record["command_id"] == "cmd-40"
+    _write(5, start=90)
+    assert find_decisions(log_path, trace_id="trace-94")[0]["command_id"] == "cmd-94"
+
+
+def test_stale_entries_are_not_returned(log_path: Path) -> None:
+    _write(10)
+    log_path.write_text(json.dumps({"trace_id": "trace-other", "command_id": "cmd-other"}) + "\n", encoding="utf-8")
+
+    assert find_decisions(log_path, trace_id="trace-3") == []
+
+
+def test_disabled_index_writes_nothing(log_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("DECISION_LOG_INDEX_ENABLED", "false")
+    _write(3)
+
+    assert not journal_path(log_path).exists()
+    assert not index_path(log_path).exists()
+
+
+def test_cli_and_debug_route(log_path: Path, monkeypatch: pytest.MonkeyPatch, capsys) -> None:
+    _write(5)
+
+    assert decision_lookup.main(["--log", str(log_path), "--trace-id", "trace-2"]) == 0
+    assert json.loads(capsys.readouterr().out)["command_id"] == "cmd-2"
+    assert decision_lookup.main(["--log", str(log_path), "--command-id", "cmd-9", "--rebuild"]) == 1
+
+    from app.main import create_app
+
+    client = TestClient(create_app())
+    assert client.get("/debug/decisions", params={"trace_id": "trace-2"}).status_code == 404
+    monkeypatch.setenv("DEBUG_ROUTES_ENABLED", "true")
+    response = client.get("/debug/decisions", params={"command_id": "cmd-4"})
+    assert response.status_code == 200
+    assert [record["trace_id"] for record in response.json()["decisions"]] == ["trace-4"]
+    assert client.get("/debug/decisions").status_code == 400
@@ -66,8 +66,7 @@ def test_sends_correct_request_yandex() -> None:
     with patch("llm_policy.http_caller.httpx.Client") as mock_client_cls:
         mock_client = MagicMock()
         mock_client.post.return_value = _mock_success_response()
-        mock_client_cls.return_value.__enter__ = MagicMock(return_value=mock_client)
-        mock_client_cls.return_value.__exit__ = MagicMock(return_value=False)
+        mock_client_cls.return_value = mock_client
 
         caller(spec, "test prompt")
 
@@ -92,8 +91,7 @@ def test_sends_correct_request_openai_compatible() -> None:
     with patch("llm_policy.http_caller.httpx.Client") as mock_client_cls:
         mock_client = MagicMock()
         mock_client.post.return_value = _mock_success_response()
-        mock_client_cls.return_value.__enter__ = MagicMock(return_value=mock_client)
-        mock_client_cls.return_value.__exit__ = MagicMock(return_value=False)
+        mock_client_cls.return_value = mock_client
 
         caller(spec, "test prompt")
 
@@ -119,8 +117,7 @@ def test_sends_cloudru_request_to_chat_completions() -> None:
     with patch("llm_policy.http_caller.httpx.Client") as mock_client_cls:
         mock_client = MagicMock()
         mock_client.post.return_value = _mock_success_response()
-        mock_client_cls.return_value.__enter__ = MagicMock(return_value=mock_client)
-        mock_client_cls.return_value.__exit__ = MagicMock(return_value=False)
+        mock_client_cls.return_value = mock_client
 
         caller(spec, "test prompt")
 
@@ -144,8 +141,7 @@ def test_returns_response_text() -> None:
     with patch("llm_policy.http_caller.httpx.Client") as mock_client_cls:
         mock_client = MagicMock()
         mock_client.post.return_value = _mock_success_response("extracted text")
-        mock_client_cls.return_value.__enter__ = MagicMock(return_value=mock_client)
-        mock_client_cls.return_value.__exit__ = MagicMock(return_value=False)
+        mock_client_cls.return_value = mock_client
 
         result = caller(spec, "test prompt")
         assert result == "extracted text"
@@ -160,8 +156,7 @@ def test_timeout_raises_timeout_error() -> None:
     with patch("llm_policy.http_caller.httpx.Client") as mock_client_cls:
         mock_client = MagicMock()
         mock_client.post.side_effect = _httpx.TimeoutException("timed out")
-        mock_client_cls.return_value.__enter__ = MagicMock(return_value=mock_client)
-        mock_client_cls.return_value.__exit__ = MagicMock(return_value=False)
+        mock_client_cls.return_value = mock_client
 
         with pytest.raises(TimeoutError):
             caller(spec, "test prompt")
@@ -176,8 +171,7 @@ def test_connection_failure_raises_unavailable() -> None:
     with patch("llm_policy.http_caller.httpx.Client") as mock_client_cls:
         mock_client = MagicMock()
         mock_client.post.side_effect = _httpx.ConnectError("connection refused")
-        mock_client_cls.return_value.__enter__ = MagicMock(return_value=mock_client)
-        mock_client_cls.return_value.__exit__ = MagicMock(return_value=False)
+        mock_client_cls.return_value = mock_client
 
         with pytest.raises(LlmUnavailableError):
             caller(spec, "test prompt")
@@ -197,8 +191,7 @@ def test_http_error_raises_unavailable() -> None:
         mock_response.raise_for_status.side_effect = _httpx.HTTPStatusError(
             "500", request=MagicMock(), response=mock_response
         )
-        mock_client_cls.return_value.__enter__ = MagicMock(return_value=mock_client)
-        mock_client_cls.return_value.__exit__ = MagicMock(return_value=False)
+        mock_client_cls.return_value = mock_client
 
         with pytest.raises(LlmUnavailableError):
             caller(spec, "test prompt")
@@ -214,8 +207,7 @@ def test_no_api_key_in_logs(caplog: pytest.LogCaptureFixture) -> None:
         with patch("llm_policy.http_caller.httpx.Client") as mock_client_cls:
             mock_client = MagicMock()
             mock_client.post.return_value = _mock_success_response()
-            mock_client_cls.return_value.__enter__ = MagicMock(return_value=mock_client)
-            mock_client_cls.return_value.__exit__ = MagicMock(return_value=False)
+            mock_client_cls.return_value = mock_client
 
             caller(spec, "test prompt")
 
@@ -231,13 +223,13 @@ def test_respects_callspec_parameters() -> None:
     with patch("llm_policy.http_caller.httpx.Client") as mock_client_cls:
         mock_client = MagicMock()
         mock_client.post.return_value = _mock_success_response()
-        mock_client_cls.return_value.__enter__ = MagicMock(return_value=mock_client)
-        mock_client_cls.return_value.__exit__ = MagicMock(return_value=False)
+        mock_client_cls.return_value = mock_client
 
         caller(spec, "test prompt")
 
         # Verify timeout passed to Client constructor
-        mock_client_cls.assert_called_once_with(timeout=5.0)
+        mock_client_cls.assert_called_once()
+        assert mock_client_cls.call_args.kwargs["timeout"] == 5.0
 
         # Verify body parameters
         body = mock_client.post.call_args[1]["json"]
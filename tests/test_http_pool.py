@@ -0,0 +1,125 @@
+import asyncio
+import gc
+import threading
+import time
+import weakref
+
+import httpx
+import pytest
+
+from llm_policy import http_pool
+from llm_policy.http_pool import close_http_clients, get_http_client, http_pool_stats
+
+
+class FakeClient:
+    instances: list["FakeClient"] = []
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.closed = False
+        self.delay_s = 0.0
+        FakeClient.instances.append(self)
+
+    def post(self, url, **kwargs):
+        time.sleep(self.delay_s)
+        return httpx.Response(200, json={"url": url})
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture(autouse=True)
+def fake_httpx(monkeypatch):
+    FakeClient.instances = []
+    monkeypatch.setattr(http_pool.httpx, "Client", FakeClient)
+    return FakeClient
+
+
+def test_client_is_shared_per_origin_and_timeout():
+    first = get_http_client("https://llm.example.com/v1/chat/completions", 30.0)
+
+    assert get_http_client("https://llm.example.com/v1/other", 30) is first
+    assert get_http_client("https://llm.example.com/v1/chat/completions", 5.0) is not first
+    assert get_http_client("https://other.example.com/v1/chat/completions", 30.0) is not first
+    assert len(FakeClient.instances) == 3
+
+
+def test_client_uses_configured_limits(monkeypatch):
+    monkeypatch.setenv("LLM_HTTP_MAX_CONNECTIONS", "4")
+    monkeypatch.setenv("LLM_HTTP_MAX_KEEPALIVE", "2")
+    monkeypatch.setenv("LLM_HTTP_KEEPALIVE_EXPIRY_S", "15")
+
+    get_http_client("https://llm.example.com", 10.0)
+
+    kwargs = FakeClient.instances[0].kwargs
+    assert kwargs["timeout"] == 10.0
+    assert kwargs["limits"].max_connections == 4
+    assert kwargs["limits"].max_keepalive_connections == 2
+    assert kwargs["limits"].keepalive_expiry == 15.0
+
+
+def test_http2_falls_back_without_h2(monkeypatch):
+    monkeypatch.setenv("LLM_HTTP2_ENABLED", "true")
+    monkeypatch.setitem(__import__("sys").modules, "h2", None)
+
+    client = get_http_client("https://llm.example.com", 10.0)
+
+    assert client.http2 is False
+    assert FakeClient.instances[0].kwargs["http2"] is False
+
+
+def test_pool_wait_is_measured_and_bounded(monkeypatch):
+    monkeypatch.setenv("LLM_HTTP_MAX_CONNECTIONS", "1")
+    monkeypatch.setenv("LLM_HTTP_POOL_TIMEOUT_MS", "50")
+    client = get_http_client("https://llm.example.com", 10.0)
+    FakeClient.instances[0].delay_s = 0.2
+
+    holder = threading.Thread(target=client.post, args=("https://llm.example.com/a",))
+    holder.start()
+    time.sleep(0.02)
+    with pytest.raises(httpx.PoolTimeout):
+        client.post("https://llm.example.com/b")
+    holder.join()
+
+    FakeClient.instances[0].delay_s = 0.0
+    client.post("https://llm.example.com/c")
+
+    stats = http_pool_stats()["https://llm.example.com timeout=10"]
+    assert stats["requests"] == 2
+    assert stats["pool_timeouts"] == 1
+
+
+def test_close_http_clients_closes_and_forgets():
+    first = get_http_client("https://llm.example.com", 10.0)
+
+    close_http_clients()
+
+    assert FakeClient.instances[0].closed is True
+    assert get_http_client("https://llm.example.com", 10.0) is not first
+
+
+def test_async_clients_are_closed_and_dropped_with_their_loop(monkeypatch):
+    closed = []
+
+    class FakeAsyncClient:
+        def __init__(self, **kwargs):
+            pass
+
+        async def aclose(self):
+            closed.append(self)
+
+    monkeypatch.setattr(http_pool.httpx, "AsyncClient", FakeAsyncClient)
+    loops = []
+
+    async def borrow():
+        loops.append(weakref.ref(asyncio.get_running_loop()))
+        client = http_pool.get_async_http_client("https://llm.example.com", 2.0)
+        assert http_pool.get_async_http_client("https://llm.example.com", 2.0) is client
+
+    asyncio.run(borrow())
+    asyncio.run(borrow())
+    gc.collect()
+
+    assert len(closed) == 2
+    assert len(http_pool._ASYNC_CLIENTS) == 0 and len(http_pool._LOOP_WATCHERS) == 0
+    assert [ref() for ref in loops] == [None, None]
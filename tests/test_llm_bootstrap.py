@@ -11,15 +11,18 @@ if str(BASE_DIR) not in sys.path:
     sys.path.insert(0, str(BASE_DIR))
 
 from llm_policy.bootstrap import bootstrap_llm_caller
-from llm_policy.runtime import get_llm_caller, set_llm_caller
+from llm_policy.http_caller import AsyncHttpLlmCaller
+from llm_policy.runtime import get_async_llm_caller, get_llm_caller, set_async_llm_caller, set_llm_caller
 
 
 @pytest.fixture(autouse=True)
 def _reset_caller():
     """Reset global caller state before and after each test."""
     set_llm_caller(None)
+    set_async_llm_caller(None)
     yield
     set_llm_caller(None)
+    set_async_llm_caller(None)
 
 
 def test_bootstrap_registers_caller_with_all_vars(monkeypatch) -> None:
@@ -31,6 +34,7 @@ def test_bootstrap_registers_caller_with_all_vars(monkeypatch) -> None:
     caller = get_llm_caller()
     assert caller is not None, "Caller should be registered"
     assert callable(caller), "Caller should be callable"
+    assert isinstance(get_async_llm_caller(), AsyncHttpLlmCaller)
 
 
 def test_bootstrap_registers_caller_for_cloudru_env(monkeypatch) -> None:
@@ -0,0 +1,163 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from app.metrics import render_metrics
+from app.routes import metrics as _metrics_route  # noqa: F401  (registers the collectors)
+from llm_policy import breaker as breaker_module
+from llm_policy.breaker import CLOSED, HALF_OPEN, OPEN, breaker_stats, get_breaker
+from llm_policy.errors import LlmUnavailableError
+from llm_policy.loader import LlmPolicyLoader
+from llm_policy.runtime import run_task_with_policy
+
+SCHEMA = {
+    "type": "object",
+    "properties": {"item_name": {"type": "string"}},
+    "required": ["item_name"],
+    "additionalProperties": False,
+}
+OK = json.dumps({"item_name": "молоко"})
+
+
+class ScriptedCaller:
+    def __init__(self, outcome) -> None:
+        self.outcome = outcome
+        self.timeouts: list[int | None] = []
+
+    def __call__(self, spec, prompt: str) -> str:
+        self.timeouts.append(spec.timeout_ms)
+        if isinstance(self.outcome, Exception):
+            raise self.outcome
+        return self.outcome
+
+
+@pytest.fixture(autouse=True)
+def breaker_enabled(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Both are opt-in.
+    monkeypatch.setenv("LLM_BREAKER_ENABLED", "true")
+    monkeypatch.setenv("LLM_ADAPTIVE_TIMEOUT_ENABLED", "true")
+
+
+@pytest.fixture
+def policy():
+    return LlmPolicyLoader.load(enabled=True, allow_placeholders=True)
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    now = [1000.0]
+    monkeypatch.setattr(breaker_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def _run(policy, caller):
+    return run_task_with_policy(
+        task_id="shopping_extraction",
+        prompt="Купи молоко",
+        schema=SCHEMA,
+        profile="cheap",
+        policy=policy,
+        caller=caller,
+        policy_enabled=True,
+    )
+
+
+def _cheap_breaker(policy):
+    return get_breaker(policy.call_specs[("shopping_extraction", "cheap")], "cheap")
+
+
+def test_breaker_opens_fails_fast_and_recovers(policy, clock, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("LLM_BREAKER_MIN_CALLS", "4")
+    monkeypatch.setenv("LLM_BREAKER_OPEN_MS", "10000")
+    failing = ScriptedCaller(TimeoutError("slow"))
+
+    for _ in range(4):
+        assert _run(policy, failing).error_type == "timeout"
+    assert _cheap_breaker(policy).state == OPEN
+
+    result = _run(policy, failing)
+    assert result.error_type == "llm_unavailable"
+    assert result.attempts == 0
+    assert len(failing.timeouts) == 4
+
+    clock[0] += 11
+    healthy = ScriptedCaller(OK)
+    assert _run(policy, healthy).status == "ok"
+    assert _cheap_breaker(policy).state == CLOSED
+
+    stats = breaker_stats()[("yandex_ai_studio", "gpt-oss-20b", "cheap")]
+    assert stats["opened"] == 1
+    assert stats["rejected"] == 1
+
+
+def test_failed_probe_reopens(policy, clock, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("LLM_BREAKER_MIN_CALLS", "2")
+    breaker = _cheap_breaker(policy)
+    for _ in range(2):
+        breaker.record(error_type="llm_unavailable", latency_ms=None)
+    assert breaker.state == OPEN
+
+    clock[0] += 31
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()  # one probe at a time
+    breaker.record(error_type="timeout", latency_ms=None)
+
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+
+def test_bad_json_does_not_trip_breaker(policy, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("LLM_BREAKER_MIN_CALLS", "2")
+
+    for _ in range(3):
+        assert _run(policy, ScriptedCaller("not json")).error_type == "invalid_json"
+
+    assert _cheap_breaker(policy).state == CLOSED
+
+
+def test_disabled_breaker_never_rejects(policy, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("LLM_BREAKER_ENABLED", "false")
+    monkeypatch.setenv("LLM_BREAKER_MIN_CALLS", "2")
+    failing = ScriptedCaller(LlmUnavailableError("down"))
+
+    for _ in range(5):
+        assert _run(policy, failing).error_type == "llm_unavailable"
+
+    assert len(failing.timeouts) == 5
+
+
+def test_adaptive_timeout_follows_latency_quantile(policy) -> None:
+    breaker = _cheap_breaker(policy)
+    caller = ScriptedCaller(OK)
+
+    _run(policy, caller)
+    for _ in range(30):
+        breaker.record(error_type=None, latency_ms=300.0)
+    _run(policy, caller)
+    for _ in range(200):
+        breaker.record(error_type=None, latency_ms=1800.0)
+    _run(policy, caller)
+
+    # configured 2000 ms; p99 300 ms x2 -> 750 ms; p99 1800 ms x2 -> capped at 2000 ms
+    assert caller.timeouts == [2000, 750, 2000]
+    assert 'llm_adaptive_timeout_ms{provider="yandex_ai_studio",model="gpt-oss-20b",profile="cheap"} 2000' in (
+        render_metrics()
+    )
+
+
+def test_circuit_metrics_exported(policy, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("LLM_BREAKER_MIN_CALLS", "1")
+    _run(policy, ScriptedCaller(LlmUnavailableError("down")))
+    _run(policy, ScriptedCaller(OK))
+
+    text = render_metrics()
+    labels = '{provider="yandex_ai_studio",model="gpt-oss-20b",profile="cheap"}'
+    assert f"llm_circuit_state{labels} 2" in text
+    assert f"llm_circuit_rejected_total{labels} 1" in text
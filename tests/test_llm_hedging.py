@@ -0,0 +1,166 @@
+import asyncio
+import json
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from llm_policy.loader import LlmPolicyLoader
+from llm_policy.runtime import run_task_with_policy, run_task_with_policy_async
+
+SCHEMA = {
+    "type": "object",
+    "properties": {"item_name": {"type": "string"}},
+    "required": ["item_name"],
+    "additionalProperties": False,
+}
+HEDGE_BLOCK = """    hedge:
+      profile: "reliable"
+      after_quantile: 0.9
+      delay_ms: {delay_ms}
+"""
+
+
+def _policy_with_hedge(tmp_path: Path, delay_ms: int = 20):
+    source = (BASE_DIR / "llm_policy" / "llm-policy.yaml").read_text(encoding="utf-8")
+    marker = '    description: "Извлечение наименования товара из пользовательского текста"\n'
+    assert marker in source
+    path = tmp_path / "llm-policy.yaml"
+    path.write_text(source.replace(marker, marker + HEDGE_BLOCK.format(delay_ms=delay_ms)), encoding="utf-8")
+    return LlmPolicyLoader.load(enabled=True, path_override=str(path), allow_placeholders=True)
+
+
+class ModelCaller:
+    """Answers per model; ``cheap_gate`` holds the cheap model until released."""
+
+    def __init__(self, cheap: str, reliable: str) -> None:
+        self.answers = {"gpt-oss-20b": cheap, "gpt-oss-120b": reliable}
+        self.cheap_gate = threading.Event()
+        self.calls: list[str] = []
+
+    def __call__(self, spec, prompt: str) -> str:
+        self.calls.append(spec.model)
+        if spec.model == "gpt-oss-20b":
+            self.cheap_gate.wait(5)
+        return self.answers[spec.model]
+
+
+def _run(policy, caller):
+    return run_task_with_policy(
+        task_id="shopping_extraction",
+        prompt="Купи молоко",
+        schema=SCHEMA,
+        profile="cheap",
+        trace_id="trace-hedge",
+        policy=policy,
+        caller=caller,
+        policy_enabled=True,
+    )
+
+
+def test_policy_loads_hedge_settings(tmp_path: Path) -> None:
+    policy = _policy_with_hedge(tmp_path, delay_ms=150)
+    hedge = policy.hedging["shopping_extraction"]
+
+    assert (hedge.profile, hedge.after_quantile, hedge.delay_ms) == ("reliable", 0.9, 150)
+    assert policy.version != LlmPolicyLoader.load(enabled=True, allow_placeholders=True).version
+
+
+def test_invalid_hedge_profile_is_rejected(tmp_path: Path) -> None:
+    source = (BASE_DIR / "llm_policy" / "llm-policy.yaml").read_text(encoding="utf-8")
+    marker = '    description: "Извлечение сущностей для assist-режима"\n'
+    path = tmp_path / "llm-policy.yaml"
+    path.write_text(source.replace(marker, marker + '    hedge:\n      profile: "partial_trust"\n'), encoding="utf-8")
+
+    with pytest.raises(ValueError, match="no routing"):
+        LlmPolicyLoader.load(enabled=True, path_override=str(path), allow_placeholders=True)
+
+
+def test_slow_primary_loses_to_hedge(tmp_path: Path, caplog: pytest.LogCaptureFixture) -> None:
+    policy = _policy_with_hedge(tmp_path)
+    caller = ModelCaller(json.dumps({"item_name": "cheap"}), json.dumps({"item_name": "reliable"}))
+    caplog.set_level("INFO", logger="llm_policy")
+
+    result = _run(policy, caller)
+    caller.cheap_gate.set()
+
+    assert result.status == "ok"
+    assert result.data == {"item_name": "reliable"}
+    assert (result.hedged, result.hedge_won, result.escalated) == (True, True, True)
+    assert result.profile == "reliable"
+    assert result.attempts == 2
+    assert "'hedge': True" in caplog.text
+    assert "'outcome': 'hedge_won'" in caplog.text
+
+
+def test_fast_primary_does_not_fire_hedge(tmp_path: Path) -> None:
+    policy = _policy_with_hedge(tmp_path, delay_ms=2000)
+    caller = ModelCaller(json.dumps({"item_name": "cheap"}), json.dumps({"item_name": "reliable"}))
+    caller.cheap_gate.set()
+
+    result = _run(policy, caller)
+
+    assert result.data == {"item_name": "cheap"}
+    assert not result.hedged and not result.hedge_won
+    assert caller.calls == ["gpt-oss-20b"]
+
+
+def test_invalid_hedge_answer_waits_for_primary(tmp_path: Path) -> None:
+    policy = _policy_with_hedge(tmp_path)
+    caller = ModelCaller(json.dumps({"item_name": "cheap"}), "not json")
+    threading.Timer(0.2, caller.cheap_gate.set).start()
+
+    result = _run(policy, caller)
+
+    assert result.data == {"item_name": "cheap"}
+    assert result.hedged and not result.hedge_won
+    assert result.profile == "cheap"
+
+
+def test_async_hedge_cancels_loser(tmp_path: Path) -> None:
+    policy = _policy_with_hedge(tmp_path)
+    cancelled = []
+
+    async def caller(spec, prompt):
+        if spec.model == "gpt-oss-20b":
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(spec.model)
+                raise
+        return json.dumps({"item_name": spec.model})
+
+    async def scenario():
+        result = await run_task_with_policy_async(
+            task_id="shopping_extraction",
+            prompt="Купи молоко",
+            schema=SCHEMA,
+            profile="cheap",
+            policy=policy,
+            caller=caller,
+            policy_enabled=True,
+        )
+        await asyncio.sleep(0)
+        return result
+
+    result = asyncio.run(scenario())
+
+    assert result.hedge_won and result.data == {"item_name": "gpt-oss-120b"}
+    assert cancelled == ["gpt-oss-20b"]
+
+
+def test_hedging_kill_switch(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("LLM_HEDGING_ENABLED", "false")
+    policy = _policy_with_hedge(tmp_path)
+    caller = ModelCaller(json.dumps({"item_name": "cheap"}), json.dumps({"item_name": "reliable"}))
+    threading.Timer(0.1, caller.cheap_gate.set).start()
+
+    result = _run(policy, caller)
+
+    assert result.data == {"item_name": "cheap"}
+    assert not result.hedged
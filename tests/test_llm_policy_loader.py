@@ -1,4 +1,5 @@
 import json
+import os
 import sys
 from pathlib import Path
 
@@ -145,3 +146,61 @@ def test_disabled_policy_does_not_read_file(monkeypatch: pytest.MonkeyPatch) ->
     monkeypatch.setattr(Path, "read_text", _boom)
 
     assert LlmPolicyLoader.load(enabled=False) is None
+
+
+def _bump_mtime(path: Path) -> None:
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_load_cached_reuses_policy_until_content_changes(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    from llm_policy.loader import LlmPolicyLoader
+
+    monkeypatch.setenv("LLM_POLICY_RELOAD_INTERVAL_MS", "0")
+    payload = _load_policy_payload()
+    policy_path = _write_policy(tmp_path / "policy.yaml", payload)
+
+    first = LlmPolicyLoader.load_cached(enabled=True, path_override=str(policy_path), allow_placeholders=True)
+    assert LlmPolicyLoader.load_cached(enabled=True, path_override=str(policy_path), allow_placeholders=True) is first
+
+    _bump_mtime(policy_path)
+    assert LlmPolicyLoader.load_cached(enabled=True, path_override=str(policy_path), allow_placeholders=True) is first
+
+    payload["routing"]["shopping_extraction"]["cheap"]["model"] = "other-model"
+    _write_policy(policy_path, payload)
+    _bump_mtime(policy_path)
+    second = LlmPolicyLoader.load_cached(enabled=True, path_override=str(policy_path), allow_placeholders=True)
+
+    assert second is not first
+    assert second.call_specs[("shopping_extraction", "cheap")].model == "other-model"
+
+
+def test_load_cached_keys_on_allow_placeholders(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    from llm_policy.loader import LlmPolicyLoader
+
+    payload = _load_policy_payload()
+    payload["routing"]["shopping_extraction"]["cheap"]["model"] = "${MODEL_ID}"
+    policy_path = _write_policy(tmp_path / "policy.yaml", payload)
+
+    assert LlmPolicyLoader.load_cached(enabled=True, path_override=str(policy_path), allow_placeholders=True)
+    with pytest.raises(ValueError, match="placeholders are not allowed"):
+        LlmPolicyLoader.load_cached(enabled=True, path_override=str(policy_path), allow_placeholders=False)
+
+
+def test_load_cached_skips_reads_within_reload_interval(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    from llm_policy.loader import LlmPolicyLoader, reset_llm_policy_cache
+
+    monkeypatch.setenv("LLM_POLICY_RELOAD_INTERVAL_MS", "60000")
+    policy_path = _write_policy(tmp_path / "policy.yaml", _load_policy_payload())
+    first = LlmPolicyLoader.load_cached(enabled=True, path_override=str(policy_path), allow_placeholders=True)
+
+    def _boom(*_args: object, **_kwargs: object) -> str:
+        raise AssertionError("unexpected file read")
+
+    with monkeypatch.context() as patched:
+        patched.setattr(Path, "read_text", _boom)
+        patched.setattr(Path, "stat", _boom)
+        assert LlmPolicyLoader.load_cached(enabled=True, path_override=str(policy_path), allow_placeholders=True) is first
+
+    reset_llm_policy_cache()
+    assert LlmPolicyLoader.load_cached(enabled=True, path_override=str(policy_path), allow_placeholders=True) is not first
@@ -114,3 +114,13 @@ def test_unavailable_returns_error_without_escalation(monkeypatch: pytest.Monkey
     assert result.error_type == "llm_unavailable"
     assert result.escalated is False
     assert result.attempts == 1
+
+
+def test_resolve_call_spec_missing_routes() -> None:
+    policy = LlmPolicyLoader.load(enabled=True, allow_placeholders=True)
+    assert policy is not None
+
+    with pytest.raises(ValueError, match="no routing for task unknown_task"):
+        resolve_call_spec(policy, "unknown_task", "cheap")
+    with pytest.raises(ValueError, match="profile missing_profile"):
+        resolve_call_spec(policy, "shopping_extraction", "missing_profile")
@@ -0,0 +1,171 @@
+import asyncio
+import json
+import threading
+import time
+
+import httpx
+import pytest
+
+from llm_policy import http_pool
+from llm_policy.errors import LlmUnavailableError
+from llm_policy.http_caller import AsyncHttpLlmCaller
+from llm_policy.loader import LlmPolicyLoader
+from llm_policy.models import CallSpec
+from llm_policy.runtime import run_task_with_policy, run_task_with_policy_async
+
+SCHEMA = {
+    "type": "object",
+    "properties": {"item_name": {"type": "string"}},
+    "required": ["item_name"],
+    "additionalProperties": False,
+}
+
+OK = json.dumps({"item_name": "молоко"}, ensure_ascii=False)
+
+
+class StubCaller:
+    def __init__(self, responses: list[object]) -> None:
+        self._responses = list(responses)
+        self.calls: list[str] = []
+
+    def __call__(self, spec, prompt: str) -> str:
+        self.calls.append(spec.model)
+        response = self._responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return str(response)
+
+
+class AsyncStubCaller(StubCaller):
+    async def __call__(self, spec, prompt: str) -> str:  # type: ignore[override]
+        return StubCaller.__call__(self, spec, prompt)
+
+
+@pytest.fixture
+def policy():
+    loaded = LlmPolicyLoader.load(enabled=True, allow_placeholders=True)
+    assert loaded is not None
+    return loaded
+
+
+@pytest.mark.parametrize(
+    "responses",
+    [
+        [OK],
+        ["not json", OK],
+        ["not json", "still broken", OK],
+        ["{}", "{}", "{}", "{}"],
+        [TimeoutError("timeout")],
+        [LlmUnavailableError("down")],
+        [RuntimeError("boom")],
+        ["not json", TimeoutError("timeout")],
+    ],
+)
+def test_async_matches_sync_semantics(policy, responses):
+    kwargs = dict(task_id="shopping_extraction", prompt="prompt", schema=SCHEMA, profile="cheap", policy=policy)
+    sync_caller = StubCaller(responses)
+    async_caller = AsyncStubCaller(responses)
+
+    expected = run_task_with_policy(caller=sync_caller, policy_enabled=True, **kwargs)
+    actual = asyncio.run(run_task_with_policy_async(caller=async_caller, policy_enabled=True, **kwargs))
+
+    assert actual == expected
+    assert async_caller.calls == sync_caller.calls
+
+
+def test_async_disabled_and_missing_caller(policy):
+    disabled = asyncio.run(
+        run_task_with_policy_async(task_id="shopping_extraction", prompt="p", schema=SCHEMA, policy_enabled=False)
+    )
+    missing = asyncio.run(
+        run_task_with_policy_async(
+            task_id="shopping_extraction", prompt="p", schema=SCHEMA, policy=policy, policy_enabled=True
+        )
+    )
+
+    assert disabled.error_type == "policy_disabled"
+    assert missing.error_type == "llm_unavailable"
+
+
+def test_many_in_flight_calls_need_no_threads(policy):
+    class SlowCaller:
+        async def __call__(self, spec, prompt):
+            await asyncio.sleep(0.1)
+            return OK
+
+    async def run_all():
+        threads_before = threading.active_count()
+        results = await asyncio.gather(
+            *(
+                run_task_with_policy_async(
+                    task_id="shopping_extraction",
+                    prompt="p",
+                    schema=SCHEMA,
+                    policy=policy,
+                    caller=SlowCaller(),
+                    policy_enabled=True,
+                )
+                for _ in range(300)
+            )
+        )
+        return results, threading.active_count() - threads_before
+
+    started = time.monotonic()
+    results, extra_threads = asyncio.run(run_all())
+
+    assert all(result.status == "ok" for result in results)
+    assert extra_threads == 0
+    assert time.monotonic() - started < 1.0
+
+
+def test_async_http_caller_uses_pooled_async_client(monkeypatch):
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json={"choices": [{"message": {"content": OK}}]})
+
+    real_async_client = httpx.AsyncClient
+    monkeypatch.setattr(
+        http_pool.httpx,
+        "AsyncClient",
+        lambda **kwargs: real_async_client(transport=httpx.MockTransport(handler), timeout=kwargs["timeout"]),
+    )
+    spec = CallSpec(
+        provider="yandex_ai_studio",
+        model="gpt-oss-20b",
+        temperature=0.2,
+        max_tokens=64,
+        timeout_ms=2000,
+        base_url="https://llm.example.com",
+        project="folder",
+    )
+    caller = AsyncHttpLlmCaller(api_key="test-key")
+
+    async def call_twice():
+        first = await caller(spec, "prompt")
+        client = http_pool.get_async_http_client("https://llm.example.com", 2.0)
+        second = await caller(spec, "prompt")
+        assert http_pool.get_async_http_client("https://llm.example.com", 2.0) is client
+        await http_pool.aclose_async_http_clients()
+        return first, second
+
+    assert asyncio.run(call_twice()) == (OK, OK)
+    assert str(requests[0].url) == "https://llm.example.com/chat/completions"
+    assert requests[0].headers["OpenAI-Project"] == "folder"
+
+
+def test_async_http_caller_maps_errors(monkeypatch):
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.ReadTimeout("slow", request=request)
+
+    real_async_client = httpx.AsyncClient
+    monkeypatch.setattr(
+        http_pool.httpx,
+        "AsyncClient",
+        lambda **kwargs: real_async_client(transport=httpx.MockTransport(handler)),
+    )
+    spec = CallSpec("openai_compatible", "m", None, None, 1000, "https://llm.example.com", None)
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(AsyncHttpLlmCaller(api_key="k")(spec, "prompt"))
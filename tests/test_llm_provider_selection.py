@@ -19,3 +19,41 @@ def test_provider_yandex(monkeypatch):
     client = get_llm_client()
     assert isinstance(client, YandexAIStudioClient)
     assert config.get_llm_base_url().startswith("https://")
+
+
+def test_yandex_client_reuses_its_http_client(monkeypatch):
+    import agent_runner.yandex_client as yandex_client
+
+    created = []
+
+    class FakeResponse:
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {"choices": [{"message": {"content": '{"items": []}'}}]}
+
+    class FakeClient:
+        def __init__(self, **kwargs):
+            created.append(kwargs)
+
+        def post(self, url, **_kwargs):
+            return FakeResponse()
+
+    monkeypatch.setattr(yandex_client.httpx, "Client", FakeClient)
+    monkeypatch.setattr(yandex_client, "_CLIENTS", {})
+    client = YandexAIStudioClient(
+        api_key="test",
+        project="folder",
+        model="gpt://folder/model",
+        base_url="https://llm.example.com/v1",
+        timeout_s=5.0,
+        temperature=0.1,
+        max_output_tokens=None,
+    )
+    payload = {"system_prompt": "s", "user_prompt": "u", "schema": {"type": "object"}}
+
+    client.extract(payload)
+    client.extract(payload)
+
+    assert created == [{"timeout": 5.0}]
@@ -0,0 +1,254 @@
+import asyncio
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from app.metrics import render_metrics
+from llm_policy.breaker import breaker_stats
+from llm_policy.config import get_llm_provider_rate_limits, get_llm_scheduler_shed_queue
+from llm_policy.errors import LlmShedError
+from llm_policy.loader import LlmPolicyLoader
+from llm_policy import runtime
+from llm_policy.runtime import run_task_with_policy
+from llm_policy.scheduler import (
+    LlmScheduler,
+    current_llm_priority,
+    get_llm_scheduler,
+    llm_priority,
+    with_llm_priority,
+)
+
+SCHEMA = {
+    "type": "object",
+    "properties": {"item_name": {"type": "string"}},
+    "required": ["item_name"],
+    "additionalProperties": False,
+}
+
+
+@pytest.fixture(autouse=True)
+def scheduler_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    # The scheduler is opt-in; these tests also expect shadow calls to be shed at once.
+    monkeypatch.setenv("LLM_SCHEDULER_ENABLED", "true")
+    monkeypatch.setenv("LLM_SCHEDULER_SHED_QUEUE", "0")
+
+
+def _until(predicate, timeout_s: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout_s
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.005)
+
+
+def _sample(line_prefix: str) -> float:
+    for line in render_metrics().splitlines():
+        if line.startswith(line_prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+def _hold(scheduler: LlmScheduler, release: threading.Event, admitted: list, name: str, priority: str = "user"):
+    with llm_priority(priority):
+        with scheduler.slot("yandex_ai_studio"):
+            admitted.append(name)
+            assert release.wait(5)
+
+
+def test_freed_slot_goes_to_user_before_earlier_shadow(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("LLM_SCHEDULER_SHED_QUEUE", "1")
+    scheduler = LlmScheduler(max_concurrency=1, rate_limits={})
+    release = threading.Event()
+    admitted: list[str] = []
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        pool.submit(_hold, scheduler, release, admitted, "first")
+        _until(lambda: admitted == ["first"])
+        shadow = pool.submit(_hold, scheduler, release, admitted, "shadow", "shadow")
+        _until(lambda: scheduler.stats()["queued"]["shadow"] == 1)
+        user = pool.submit(_hold, scheduler, release, admitted, "user")
+        _until(lambda: scheduler.stats()["queued"]["user"] == 1)
+        release.set()
+        shadow.result(5)
+        user.result(5)
+
+    assert admitted == ["first", "user", "shadow"]
+    assert scheduler.stats()["in_flight"] == {"user": 0, "shadow": 0, "analysis": 0}
+
+
+def test_saturated_scheduler_sheds_shadow_and_times_out_user(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("LLM_SCHEDULER_MAX_WAIT_MS", "30")
+    scheduler = LlmScheduler(max_concurrency=1, rate_limits={})
+    release = threading.Event()
+    admitted: list[str] = []
+    shed = 'llm_scheduler_shed_total{priority="%s",reason="%s"}'
+    waits = 'llm_scheduler_wait_ms_count{priority="user"}'
+    before = [_sample(shed % ("shadow", "saturated")), _sample(shed % ("user", "queue_timeout")), _sample(waits)]
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        holder = pool.submit(_hold, scheduler, release, admitted, "first")
+        _until(lambda: admitted == ["first"])
+        with llm_priority("shadow"), pytest.raises(LlmShedError):
+            with scheduler.slot("yandex_ai_studio"):
+                pass
+        with pytest.raises(LlmShedError):
+            with scheduler.slot("yandex_ai_studio"):
+                pass
+        release.set()
+        holder.result(5)
+
+    assert scheduler.stats()["queued"]["user"] == 0
+    after = [_sample(shed % ("shadow", "saturated")), _sample(shed % ("user", "queue_timeout")), _sample(waits)]
+    # both user calls record their wait: 0 for the holder, ~30 ms for the shed one
+    assert [a - b for a, b in zip(after, before)] == [1, 1, 2]
+
+
+def test_provider_rate_limit_sheds_shadow_and_delays_user() -> None:
+    shed = 'llm_scheduler_shed_total{priority="shadow",reason="rate_limited"}'
+    before = _sample(shed)
+    scheduler = LlmScheduler(max_concurrency=4, rate_limits={"yandex_ai_studio": 20.0})
+    for _ in range(20):
+        with scheduler.slot("yandex_ai_studio"):
+            pass
+    with llm_priority("shadow"), pytest.raises(LlmShedError):
+        with scheduler.slot("yandex_ai_studio"):
+            pass
+    with scheduler.slot("openai_compatible"):
+        pass  # other providers have their own (here: no) limit
+
+    started = time.monotonic()
+    with scheduler.slot("yandex_ai_studio"):
+        pass
+    assert time.monotonic() - started >= 0.03
+    assert _sample(shed) == before + 1
+
+
+def test_async_waiter_is_woken_by_release() -> None:
+    scheduler = LlmScheduler(max_concurrency=1, rate_limits={})
+    order: list[str] = []
+
+    async def call(name: str, hold_s: float) -> None:
+        async with scheduler.slot_async("yandex_ai_studio"):
+            order.append(name)
+            await asyncio.sleep(hold_s)
+
+    async def main() -> None:
+        first = asyncio.ensure_future(call("first", 0.02))
+        await asyncio.sleep(0)
+        await asyncio.gather(first, call("second", 0))
+
+    asyncio.run(main())
+
+    assert order == ["first", "second"]
+    assert scheduler.stats()["in_flight"]["user"] == 0
+
+
+def test_shed_task_call_reports_llm_shed_without_tripping_breaker(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("LLM_SCHEDULER_MAX_CONCURRENCY", "1")
+    policy = LlmPolicyLoader.load(enabled=True, allow_placeholders=True)
+    scheduler = get_llm_scheduler()
+    release = threading.Event()
+    admitted: list[str] = []
+    calls: list[str] = []
+
+    def caller(spec, prompt: str) -> str:
+        calls.append(spec.model)
+        return json.dumps({"item_name": "молоко"})
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        holder = pool.submit(_hold, scheduler, release, admitted, "first")
+        _until(lambda: admitted == ["first"])
+        with llm_priority("shadow"):
+            result = run_task_with_policy(
+                task_id="shopping_extraction",
+                prompt="Купи молоко",
+                schema=SCHEMA,
+                profile="cheap",
+                policy=policy,
+                caller=caller,
+                policy_enabled=True,
+            )
+        release.set()
+        holder.result(5)
+
+    assert (result.status, result.error_type, result.attempts) == ("error", "llm_shed", 0)
+    assert calls == []
+    assert all(stats["state"] == "closed" for stats in breaker_stats().values())
+
+
+def test_user_call_does_not_coalesce_onto_shed_shadow_leader(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("LLM_SINGLE_FLIGHT_ENABLED", "true")
+    monkeypatch.setenv("LLM_SCHEDULER_MAX_CONCURRENCY", "1")
+    monkeypatch.setenv("LLM_SCHEDULER_SHED_QUEUE", "1")
+    monkeypatch.setenv("LLM_SCHEDULER_MAX_WAIT_MS", "50")
+    policy = LlmPolicyLoader.load(enabled=True, allow_placeholders=True)
+    scheduler = get_llm_scheduler()
+    release = threading.Event()
+    admitted: list[str] = []
+
+    def caller(spec, prompt: str) -> str:
+        return json.dumps({"item_name": "молоко"})
+
+    def run(priority: str):
+        with llm_priority(priority):
+            return run_task_with_policy(
+                task_id="shopping_extraction",
+                prompt="Купи молоко",
+                schema=SCHEMA,
+                profile="cheap",
+                policy=policy,
+                caller=caller,
+                policy_enabled=True,
+            )
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        holder = pool.submit(_hold, scheduler, release, admitted, "first")
+        _until(lambda: admitted == ["first"])
+        shadow = pool.submit(run, "shadow")
+        _until(lambda: scheduler.stats()["queued"]["shadow"] == 1)
+        monkeypatch.setenv("LLM_SCHEDULER_MAX_WAIT_MS", "5000")  # read per waiter
+        user = pool.submit(run, "user")
+        _until(lambda: scheduler.stats()["queued"]["user"] == 1)
+        assert runtime._IN_FLIGHT.waiting() == 0
+        shadow_result = shadow.result(5)
+        release.set()
+        user_result = user.result(5)
+        holder.result(5)
+
+    assert (shadow_result.status, shadow_result.error_type) == ("error", "llm_shed")
+    assert (user_result.status, user_result.coalesced) == ("ok", False)
+    assert user_result.data == {"item_name": "молоко"}
+
+
+def test_priority_is_carried_into_executor_threads() -> None:
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        with llm_priority("shadow"):
+            bound = pool.submit(with_llm_priority(current_llm_priority)).result(5)
+            unbound = pool.submit(current_llm_priority).result(5)
+
+    assert (bound, unbound) == ("shadow", "user")
+    with pytest.raises(ValueError):
+        with llm_priority("urgent"):
+            pass
+
+
+def test_scheduler_config(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("LLM_PROVIDER_RATE_LIMITS", "yandex_ai_studio=20, openai_compatible=2.5,bad=x,zero=0,junk")
+    assert get_llm_provider_rate_limits() == {"yandex_ai_studio": 20.0, "openai_compatible": 2.5}
+
+    scheduler = get_llm_scheduler()
+    assert scheduler is get_llm_scheduler()
+    monkeypatch.setenv("LLM_SCHEDULER_MAX_CONCURRENCY", "2")
+    assert get_llm_scheduler().max_concurrency == 2
+    monkeypatch.setenv("LLM_SCHEDULER_ENABLED", "false")
+    assert get_llm_scheduler() is None
+    monkeypatch.delenv("LLM_SCHEDULER_ENABLED")
+    monkeypatch.delenv("LLM_SCHEDULER_SHED_QUEUE")
+    assert get_llm_scheduler() is None  # opt-in
+    assert get_llm_scheduler_shed_queue() == 16
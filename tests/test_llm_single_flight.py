@@ -0,0 +1,191 @@
+import asyncio
+import json
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from pathlib import Path
+
+import pytest
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from llm_policy import runtime
+from llm_policy.loader import LlmPolicyLoader
+from llm_policy.runtime import run_task_with_policy, run_task_with_policy_async
+from llm_policy.single_flight import SingleFlight
+
+SCHEMA = {
+    "type": "object",
+    "properties": {"item_name": {"type": "string"}},
+    "required": ["item_name"],
+    "additionalProperties": False,
+}
+
+
+class GatedCaller:
+    """Blocks every call until ``release`` is set."""
+
+    def __init__(self) -> None:
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, spec, prompt: str) -> str:
+        with self._lock:
+            self.calls += 1
+        self.started.set()
+        assert self.release.wait(5)
+        return json.dumps({"item_name": "молоко"})
+
+
+@pytest.fixture(autouse=True)
+def single_flight_enabled(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("LLM_SINGLE_FLIGHT_ENABLED", "true")  # opt-in
+
+
+@pytest.fixture
+def policy():
+    return LlmPolicyLoader.load(enabled=True, allow_placeholders=True)
+
+
+def _run(policy, caller, prompt: str = "Купи молоко"):
+    return run_task_with_policy(
+        task_id="shopping_extraction",
+        prompt=prompt,
+        schema=SCHEMA,
+        profile="cheap",
+        policy=policy,
+        caller=caller,
+        policy_enabled=True,
+    )
+
+
+def _until(predicate) -> None:
+    for _ in range(2500):
+        if predicate():
+            return
+        threading.Event().wait(0.002)
+    raise AssertionError("condition not reached")
+
+
+def test_concurrent_identical_calls_share_one_upstream_call(policy) -> None:
+    caller = GatedCaller()
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(_run, policy, caller) for _ in range(4)]
+        assert caller.started.wait(5)
+        _until(lambda: runtime._IN_FLIGHT.waiting() == 3)
+        caller.release.set()
+        results = [future.result(5) for future in futures]
+
+    assert caller.calls == 1
+    assert [result.status for result in results] == ["ok"] * 4
+    assert sum(result.coalesced for result in results) == 3
+    data = [result.data for result in results]
+    assert all(item == {"item_name": "молоко"} for item in data)
+    assert len({id(item) for item in data}) == 4
+    assert runtime._IN_FLIGHT.in_flight() == 0
+
+
+def test_different_prompts_are_not_coalesced(policy) -> None:
+    caller = GatedCaller()
+    caller.release.set()
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = list(executor.map(lambda prompt: _run(policy, caller, prompt), ["Купи молоко", "Купи хлеб"]))
+
+    assert caller.calls == 2
+    assert not any(result.coalesced for result in results)
+
+
+def test_waiter_timeout_does_not_cancel_shared_call(policy) -> None:
+    caller = GatedCaller()
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(_run, policy, caller)
+        assert caller.started.wait(5)
+        waiter = executor.submit(_run, policy, caller)
+        _until(lambda: runtime._IN_FLIGHT.waiting() == 1)
+        with pytest.raises(FutureTimeoutError):
+            waiter.result(timeout=0.05)
+        caller.release.set()
+        assert leader.result(5).status == "ok"
+        assert waiter.result(5).coalesced
+
+    assert caller.calls == 1
+
+
+def test_disabled_single_flight_calls_upstream_each_time(policy, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("LLM_SINGLE_FLIGHT_ENABLED", "false")
+    caller = GatedCaller()
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [executor.submit(_run, policy, caller) for _ in range(2)]
+        _until(lambda: caller.calls == 2)
+        caller.release.set()
+        results = [future.result(5) for future in futures]
+
+    assert caller.calls == 2
+    assert not any(result.coalesced for result in results)
+
+
+def test_leader_error_reaches_waiters() -> None:
+    flight: SingleFlight[int] = SingleFlight()
+    gate = threading.Event()
+
+    def boom() -> int:
+        assert gate.wait(5)
+        raise RuntimeError("upstream")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(flight.run, "key", boom)
+        _until(lambda: flight.in_flight() == 1)
+        waiter = executor.submit(flight.run, "key", lambda: 1)
+        _until(lambda: flight.waiting() == 1)
+        gate.set()
+        with pytest.raises(RuntimeError):
+            leader.result(5)
+        with pytest.raises(RuntimeError):
+            waiter.result(5)
+
+
+def test_async_waiters_share_call_and_can_give_up(policy) -> None:
+    calls = []
+
+    async def scenario():
+        gate = asyncio.Event()
+
+        async def caller(spec, prompt):
+            calls.append(prompt)
+            await gate.wait()
+            return json.dumps({"item_name": "молоко"})
+
+        def run():
+            return run_task_with_policy_async(
+                task_id="shopping_extraction",
+                prompt="Купи молоко",
+                schema=SCHEMA,
+                profile="cheap",
+                policy=policy,
+                caller=caller,
+                policy_enabled=True,
+            )
+
+        leader = asyncio.ensure_future(run())
+        await asyncio.sleep(0)
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(run(), timeout=0.01)
+        follower = asyncio.ensure_future(run())
+        await asyncio.sleep(0)
+        gate.set()
+        return await leader, await follower
+
+    leader_result, follower_result = asyncio.run(scenario())
+
+    assert len(calls) == 1
+    assert leader_result.status == "ok" and not leader_result.coalesced
+    assert follower_result.coalesced and follower_result.data == {"item_name": "молоко"}
@@ -0,0 +1,176 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from app.metrics import render_metrics
+from llm_policy import cache as task_cache
+from llm_policy.cache import normalize_prompt, reset_task_cache, set_prompt_normalizer
+from llm_policy.loader import LlmPolicyLoader
+from llm_policy.runtime import run_task_with_policy, run_task_with_policy_async
+
+SCHEMA = {
+    "type": "object",
+    "properties": {"item_name": {"type": "string"}},
+    "required": ["item_name"],
+    "additionalProperties": False,
+}
+
+
+class CountingCaller:
+    def __init__(self, response: str) -> None:
+        self.response = response
+        self.prompts: list[str] = []
+
+    def __call__(self, spec, prompt: str) -> str:
+        self.prompts.append(prompt)
+        return self.response
+
+
+@pytest.fixture
+def policy():
+    return LlmPolicyLoader.load(enabled=True, allow_placeholders=True)
+
+
+@pytest.fixture(autouse=True)
+def _cache_enabled(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("LLM_TASK_CACHE_ENABLED", "true")
+
+
+def _run(policy, caller, prompt: str = "Купи молоко", schema=SCHEMA):
+    return run_task_with_policy(
+        task_id="shopping_extraction",
+        prompt=prompt,
+        schema=schema,
+        profile="cheap",
+        policy=policy,
+        caller=caller,
+        policy_enabled=True,
+    )
+
+
+def test_repeated_prompt_is_served_from_cache(policy) -> None:
+    caller = CountingCaller(json.dumps({"item_name": "молоко"}))
+
+    first = _run(policy, caller)
+    second = _run(policy, caller, prompt="  купи молоко!  ")
+    second.data["item_name"] = "mutated"
+    third = _run(policy, caller)
+
+    assert len(caller.prompts) == 1
+    assert first.cached is False and first.attempts == 1
+    assert second.cached is True and second.attempts == 0
+    assert third.data == {"item_name": "молоко"}
+    metrics = render_metrics()
+    assert 'llm_task_cache_total{task_id="shopping_extraction",outcome="hit_memory"} 2' in metrics
+    assert 'llm_task_cache_total{task_id="shopping_extraction",outcome="store"} 1' in metrics
+
+
+def test_key_covers_schema_profile_and_policy(policy) -> None:
+    caller = CountingCaller(json.dumps({"item_name": "молоко"}))
+    other_schema = {**SCHEMA, "description": "v2"}
+
+    _run(policy, caller)
+    _run(policy, caller, schema=other_schema)
+    run_task_with_policy(
+        task_id="shopping_extraction",
+        prompt="Купи молоко",
+        schema=SCHEMA,
+        profile="reliable",
+        policy=policy,
+        caller=caller,
+        policy_enabled=True,
+    )
+    changed = LlmPolicyLoader.load(enabled=True, allow_placeholders=True)
+    object.__setattr__(changed, "version", "other")
+    _run(changed, caller)
+
+    assert len(caller.prompts) == 4
+
+
+def test_failures_are_not_cached(policy) -> None:
+    caller = CountingCaller("not json")
+
+    assert _run(policy, caller).status == "error"
+    assert _run(policy, caller).status == "error"
+
+    assert len(caller.prompts) == 8  # two profiles x (call + repair), twice
+
+
+def test_disabled_cache_is_bypassed(policy, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("LLM_TASK_CACHE_ENABLED", "false")
+    caller = CountingCaller(json.dumps({"item_name": "молоко"}))
+
+    _run(policy, caller)
+    _run(policy, caller)
+
+    assert len(caller.prompts) == 2
+
+
+def test_ttl_and_lru_eviction(policy, monkeypatch: pytest.MonkeyPatch) -> None:
+    clock = [1000.0]
+    monkeypatch.setattr(task_cache.time, "time", lambda: clock[0])
+    monkeypatch.setenv("LLM_TASK_CACHE_TTL_S", "60")
+    monkeypatch.setenv("LLM_TASK_CACHE_MAX_ENTRIES", "2")
+    caller = CountingCaller(json.dumps({"item_name": "x"}))
+
+    for prompt in ("a", "b", "c", "a"):
+        _run(policy, caller, prompt=prompt)
+    assert caller.prompts == ["a", "b", "c", "a"]  # "a" was evicted by "c"
+
+    clock[0] += 61
+    _run(policy, caller, prompt="c")
+    assert caller.prompts[-1] == "c"
+
+
+def test_disk_tier_survives_reset(policy, monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.setenv("LLM_TASK_CACHE_DIR", str(tmp_path / "cache"))
+    caller = CountingCaller(json.dumps({"item_name": "хлеб"}))
+
+    _run(policy, caller, prompt="купи хлеб")
+    reset_task_cache()
+    result = _run(policy, caller, prompt="купи хлеб")
+
+    assert len(caller.prompts) == 1
+    assert result.cached and result.data == {"item_name": "хлеб"}
+    assert 'outcome="hit_disk"} 1' in render_metrics()
+
+
+def test_custom_normalizer(policy) -> None:
+    set_prompt_normalizer(lambda prompt: prompt)
+    caller = CountingCaller(json.dumps({"item_name": "молоко"}))
+
+    _run(policy, caller, prompt="Купи молоко")
+    _run(policy, caller, prompt="купи молоко")
+
+    assert len(caller.prompts) == 2
+    assert normalize_prompt("  Купи,   МОЛОКО!\n") == "купи молоко"
+
+
+def test_async_runner_shares_cache(policy) -> None:
+    import asyncio
+
+    caller = CountingCaller(json.dumps({"item_name": "молоко"}))
+
+    async def async_caller(spec, prompt):
+        raise AssertionError("should be served from cache")
+
+    _run(policy, caller)
+    result = asyncio.run(
+        run_task_with_policy_async(
+            task_id="shopping_extraction",
+            prompt="Купи молоко",
+            schema=SCHEMA,
+            profile="cheap",
+            policy=policy,
+            caller=async_caller,
+            policy_enabled=True,
+        )
+    )
+
+    assert result.cached and result.status == "ok"
@@ -0,0 +1,91 @@
+import json
+import random
+
+from app.logging.aggregation import DistinctCounter, QuantileSketch, iter_jsonl_records
+
+
+def _exact_percentile(values, q):
+    ordered = sorted(values)
+    return ordered[int((len(ordered) - 1) * q)]
+
+
+def test_quantile_sketch_is_exact_below_limit():
+    values = [float(v) for v in range(1, 101)]
+    random.Random(1).shuffle(values)
+    sketch = QuantileSketch()
+    for value in values:
+        sketch.add(value)
+
+    assert sketch.exact
+    assert sketch.quantile(0.5) == _exact_percentile(values, 0.5)
+    assert sketch.quantile(0.95) == _exact_percentile(values, 0.95)
+    assert sketch.quantile(0.5, interpolate=True) == 50.5
+    assert QuantileSketch().quantile(0.5) is None
+
+
+def test_quantile_sketch_relative_error_after_folding():
+    rng = random.Random(7)
+    values = [rng.lognormvariate(4, 1) for _ in range(20_000)]
+    sketch = QuantileSketch(exact_limit=100)
+    for value in values:
+        sketch.add(value)
+
+    assert not sketch.exact
+    assert len(sketch._buckets) <= sketch.max_buckets
+    for q in (0.5, 0.9, 0.99):
+        expected = _exact_percentile(values, q)
+        assert abs(sketch.quantile(q) - expected) / expected <= 0.02
+
+
+def test_quantile_sketch_merge_and_round_trip():
+    left, right, combined = QuantileSketch(exact_limit=50), QuantileSketch(exact_limit=50), QuantileSketch(exact_limit=50)
+    for value in range(1, 200):
+        (left if value % 2 else right).add(value)
+        combined.add(value)
+
+    restored = QuantileSketch.from_dict(json.loads(json.dumps(right.to_dict())))
+    left.merge(restored)
+
+    assert left.count == combined.count == 199
+    assert left.sum == combined.sum
+    assert (left.min, left.max) == (1.0, 199.0)
+    assert left.quantile(0.95) == combined.quantile(0.95)
+
+
+def test_distinct_counter_exact_then_estimated():
+    counter = DistinctCounter(exact_limit=10)
+    for index in range(5):
+        counter.add(f"cmd-{index}")
+        counter.add(f"cmd-{index}")
+    assert len(counter) == 5
+
+    for index in range(50_000):
+        counter.add(f"cmd-{index}")
+    assert abs(len(counter) - 50_000) / 50_000 <= 0.03
+
+    other = DistinctCounter.from_dict(json.loads(json.dumps(DistinctCounter(exact_limit=10).to_dict())))
+    for index in range(40_000, 60_000):
+        other.add(f"cmd-{index}")
+    counter.merge(other)
+    assert abs(len(counter) - 60_000) / 60_000 <= 0.03
+
+
+def test_iter_jsonl_records_flags_bad_lines(tmp_path):
+    path = tmp_path / "log.jsonl"
+    path.write_text('{"a": 1}\n\nnot-json\n{"a": 2}\n', encoding="utf-8")
+
+    assert list(iter_jsonl_records(path)) == [({"a": 1}, True), ({}, False), ({"a": 2}, True)]
+
+
+def test_add_many_matches_add():
+    rng = random.Random(3)
+    values = [rng.uniform(0, 1000) for _ in range(6000)]
+    one, batch = QuantileSketch(), QuantileSketch()
+    for value in values:
+        one.add(value)
+    batch.add_many(values[:100])
+    batch.add_many(values[100:])
+
+    assert batch.count == one.count and batch.max == one.max
+    for q in (0.5, 0.95, 0.99):
+        assert batch.quantile(q) == one.quantile(q)
@@ -0,0 +1,109 @@
+import json
+
+from app.logging.columnar import (
+    LOG_SCHEMAS,
+    iter_records,
+    read_columns,
+    read_header,
+    read_row,
+    row_groups,
+    write_table,
+)
+from app.logging.compaction import compact_log
+from app.logging.rotation import rotate_log
+from app.logging.segments import iter_log_lines, iter_segment_records, log_segments, read_manifest
+
+
+def _shadow(index: int, **overrides) -> dict:
+    record = {
+        "timestamp": f"2026-02-01T10:00:{index % 60:02d}+00:00",
+        "trace_id": f"trace-{index}",
+        "command_id": f"cmd-{index}",
+        "status": "ok" if index % 3 else "error",
+        "latency_ms": 10 + index,
+        "error_type": None if index % 3 else "timeout",
+        "suggested_intent": "add_shopping_item",
+        "entities_summary": {"keys": ["item"], "counts": {"item": 1}},
+        "confidence": 0.5 if index % 2 else 1,
+    }
+    record.update(overrides)
+    return record
+
+
+def test_round_trip_is_lossless(tmp_path):
+    records = [_shadow(index) for index in range(20)]
+    records.append(_shadow(20, latency_ms="slow", timestamp="2026-02-01T10:00:00", unknown={"x": [1, 2]}))
+    records.append({"command_id": "cmd-sparse"})
+    path = tmp_path / "shadow_router.20260201T000000Z.cols"
+
+    header = write_table(path, records, LOG_SCHEMAS["shadow_router"])
+
+    assert list(iter_records(path)) == records
+    assert header["rows"] == 22
+    assert header["first_ts"] == "2026-02-01T10:00:00+00:00"
+    assert read_header(path)["schema"] == "shadow_router"
+    rebuilt = list(iter_records(path))
+    assert isinstance(rebuilt[1]["confidence"], float) and isinstance(rebuilt[2]["confidence"], int)
+
+
+def test_projection_and_dictionary_encoding(tmp_path):
+    path = tmp_path / "shadow_router.20260201T000000Z.cols"
+    records = [_shadow(index) for index in range(30)] + [_shadow(30, latency_ms="slow")]
+    write_table(path, records, LOG_SCHEMAS["shadow_router"])
+
+    columns = read_columns(path, ["error_type", "latency_ms", "missing"])
+
+    assert columns["error_type"][:3] == ["timeout", None, None]
+    assert columns["latency_ms"][-1] == "slow"
+    assert columns["missing"] == [None] * 31
+    metas = {meta["name"]: meta for meta in read_header(path)["columns"]}
+    assert metas["error_type"]["distinct"] == 1
+    assert metas["suggested_intent"]["distinct"] == 1
+    assert list(iter_records(path, ["status"]))[0] == {"status": "error"}
+
+
+def test_row_groups_read_back_and_single_rows(tmp_path):
+    path = tmp_path / "shadow_router.20260201T000000Z.cols"
+    records = [_shadow(index) for index in range(10)] + [_shadow(10, latency_ms="slow")]
+
+    header = write_table(path, records, LOG_SCHEMAS["shadow_router"], row_group_rows=4)
+
+    assert [group["rows"] for group in row_groups(header)] == [4, 4, 3]
+    assert {meta["name"]: meta["distinct"] for meta in header["columns"]}["status"] == 2
+    assert list(iter_records(path)) == records
+    assert read_columns(path, ["latency_ms"])["latency_ms"][-1] == "slow"
+    assert read_row(path, 1, 2) == records[6]
+    assert read_row(path, 2, 2) == records[10]
+    assert read_row(path, 2, 3) is None and read_row(path, 3, 0) is None
+
+
+def test_compaction_replaces_closed_segments(tmp_path):
+    path = tmp_path / "shadow_router.jsonl"
+    records = [_shadow(index) for index in range(10)]
+    path.write_text("".join(json.dumps(record) + "\n" for record in records), encoding="utf-8")
+    segment = rotate_log(path)
+    path.write_text(json.dumps(_shadow(99)) + "\n", encoding="utf-8")
+
+    result = compact_log(path)
+
+    assert [target.suffix for target in result.compacted] == [".cols"]
+    assert not segment.exists()
+    assert log_segments(path) == [result.compacted[0], path]
+    entry = read_manifest(tmp_path)["segments"][0]
+    assert entry["file"] == result.compacted[0].name
+    assert entry["format"] == "columnar" and entry["records"] == 10
+    assert [json.loads(line) for line in iter_log_lines(path)] == records + [_shadow(99)]
+    assert [record for record, _ok in iter_segment_records(result.compacted[0])] == records
+    assert compact_log(path).compacted == []
+
+
+def test_compaction_keeps_segments_with_unparsable_lines(tmp_path):
+    path = tmp_path / "assist.jsonl"
+    path.write_text('{"step": "entities"}\nnot-json\n', encoding="utf-8")
+    segment = rotate_log(path)
+
+    result = compact_log(path)
+
+    assert result.compacted == []
+    assert result.skipped == [segment]
+    assert segment.exists()
@@ -0,0 +1,142 @@
+import gzip
+import json
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+
+from app.logging import rotation
+from app.logging.segments import iter_log_lines, log_segments, read_manifest
+from app.logging.sink import JsonlSinkWriter
+
+
+def _record(ts: datetime, index: int) -> str:
+    return json.dumps({"timestamp": ts.isoformat(), "i": index}) + "\n"
+
+
+def test_size_rotation_compresses_and_records_manifest(tmp_path, monkeypatch):
+    monkeypatch.setenv("LOG_ROTATE_MAX_BYTES", "200")
+    path = tmp_path / "assist.jsonl"
+    base = datetime(2026, 2, 1, 10, 0, tzinfo=timezone.utc)
+    writer = JsonlSinkWriter()
+    for index in range(10):
+        writer.write(path, _record(base + timedelta(minutes=index), index))
+    writer.shutdown()
+
+    segments = read_manifest(tmp_path)["segments"]
+    assert segments
+    assert all(entry["log"] == "assist.jsonl" and entry["compression"] == "gzip" for entry in segments)
+    assert sum(entry["records"] for entry in segments) + len(path.read_text().splitlines()) == 10
+    first = segments[0]
+    assert first["first_ts"] == base.isoformat()
+    with gzip.open(tmp_path / first["file"], "rt", encoding="utf-8") as handle:
+        assert len(handle.readlines()) == first["records"]
+
+    indices = [json.loads(line)["i"] for line in iter_log_lines(path)]
+    assert indices == list(range(10))
+
+
+def test_decision_log_segment_records_created_at_range(tmp_path):
+    path = tmp_path / "decisions.jsonl"
+    base = datetime(2026, 2, 1, 10, 0, tzinfo=timezone.utc)
+    path.write_text(
+        "".join(
+            json.dumps({"decision_id": f"d-{index}", "created_at": (base + timedelta(minutes=index)).isoformat()})
+            + "\n"
+            for index in range(3)
+        ),
+        encoding="utf-8",
+    )
+
+    segment = rotation.rotate_log(path)
+
+    (entry,) = read_manifest(tmp_path)["segments"]
+    assert entry["file"] == segment.name and entry["records"] == 3
+    assert entry["first_ts"] == base.isoformat()
+    assert entry["last_ts"] == (base + timedelta(minutes=2)).isoformat()
+
+
+def test_sink_compresses_segments_off_its_io_lock(tmp_path, monkeypatch):
+    monkeypatch.setenv("LOG_ROTATE_MAX_BYTES", "200")
+    path = tmp_path / "assist.jsonl"
+    base = datetime(2026, 2, 1, 10, 0, tzinfo=timezone.utc)
+    writer = JsonlSinkWriter()
+    release = threading.Event()
+    compress = rotation._compress
+    threads = []
+
+    def held_compress(segment):
+        threads.append(threading.current_thread().name)
+        assert release.wait(5)
+        return compress(segment)
+
+    monkeypatch.setattr(rotation, "_compress", held_compress)
+    # Every write returns while the first segment is still waiting to be compressed.
+    for index in range(10):
+        writer.write(path, _record(base + timedelta(minutes=index), index))
+    assert read_manifest(tmp_path)["segments"] == []
+    release.set()
+    assert writer.flush()
+    writer.shutdown()
+
+    segments = read_manifest(tmp_path)["segments"]
+    assert segments and len(segments) == len(threads)
+    assert all(name.startswith("log-rotation") for name in threads)
+    assert [json.loads(line)["i"] for line in iter_log_lines(path)] == list(range(10))
+
+
+def test_hourly_rotation_uses_file_mtime(tmp_path, monkeypatch):
+    monkeypatch.setenv("LOG_ROTATE_INTERVAL", "hour")
+    monkeypatch.setenv("LOG_ROTATE_COMPRESSION", "none")
+    path = tmp_path / "decisions.jsonl"
+    path.write_text('{"i": 0}\n', encoding="utf-8")
+    two_hours_ago = (datetime.now(timezone.utc) - timedelta(hours=2)).timestamp()
+    os.utime(path, (two_hours_ago, two_hours_ago))
+
+    writer = JsonlSinkWriter()
+    writer.write(path, '{"i": 1}\n')
+    writer.write(path, '{"i": 2}\n')
+    writer.shutdown()
+
+    (segment,) = log_segments(path)[:-1]
+    assert segment.name.endswith(".jsonl")
+    assert segment.read_text(encoding="utf-8") == '{"i": 0}\n'
+    assert path.read_text(encoding="utf-8") == '{"i": 1}\n{"i": 2}\n'
+
+
+def test_zstd_falls_back_to_gzip_without_module(tmp_path, monkeypatch):
+    monkeypatch.setenv("LOG_ROTATE_COMPRESSION", "zstd")
+    monkeypatch.setattr(rotation, "_effective_compression", lambda: "gzip")
+    path = tmp_path / "a.jsonl"
+    path.write_text("{}\n", encoding="utf-8")
+
+    segment = rotation.rotate_log(path)
+
+    assert segment is not None and segment.name.endswith(".jsonl.gz")
+    assert not path.exists()
+
+
+def test_window_skips_segments_outside_range(tmp_path):
+    path = tmp_path / "shadow_router.jsonl"
+    early = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    late = datetime(2026, 3, 1, tzinfo=timezone.utc)
+    for ts in (early, late):
+        path.write_text(_record(ts, 0), encoding="utf-8")
+        rotation.rotate_log(path)
+    path.write_text(_record(late, 1), encoding="utf-8")
+
+    window = log_segments(path, since=datetime(2026, 2, 1))
+    everything = log_segments(path)
+
+    assert len(everything) == 3
+    assert len(window) == 2
+    assert window[-1] == path
+
+
+def test_unlisted_segments_are_still_read(tmp_path):
+    path = tmp_path / "agent_run.jsonl"
+    orphan = tmp_path / "agent_run.20260101T000000Z.jsonl.gz"
+    with gzip.open(orphan, "wt", encoding="utf-8") as handle:
+        handle.write('{"i": 0}\n')
+    (tmp_path / "agent_run.backup.jsonl").write_text('{"i": 9}\n', encoding="utf-8")
+
+    assert log_segments(path, since=datetime(2027, 1, 1)) == [orphan]
@@ -0,0 +1,118 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from app.logging import sampling
+from app.logging.sampling import log_sampling_stats, sampling_key, should_log, stable_fraction
+from app.logging.shadow_router_log import append_shadow_router_log
+from scripts.analyze_shadow_router import compute_metrics
+
+
+@pytest.fixture(autouse=True)
+def _fresh_samplers():
+    sampling.reset_log_sampling()
+    yield
+    sampling.reset_log_sampling()
+
+
+def _records(count: int, **fields) -> list[dict]:
+    return [{"command_id": f"cmd-{index}", "status": "ok", **fields} for index in range(count)]
+
+
+def test_default_policy_keeps_everything_unchanged() -> None:
+    record = {"command_id": "cmd-1", "status": "ok"}
+
+    assert should_log("shadow_router", record)
+    assert record == {"command_id": "cmd-1", "status": "ok"}
+    assert log_sampling_stats()["shadow_router"]["kept"] == 1
+
+
+def test_rate_is_deterministic_and_shared_across_sinks(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("SHADOW_ROUTER_LOG_SAMPLE_RATE", "0.25")
+    monkeypatch.setenv("ASSIST_LOG_SAMPLE_RATE", "0.25")
+
+    router = [should_log("shadow_router", record) for record in _records(2000)]
+    with sampling_key("cmd-7"):
+        assist_once = should_log("assist", {"step": "normalizer", "status": "ok"})
+    again = [should_log("shadow_router", record) for record in _records(2000)]
+
+    assert router == again
+    assert assist_once == router[7]
+    assert 0.2 < sum(router) / len(router) < 0.3
+    assert router == [stable_fraction(f"cmd-{index}") < 0.25 for index in range(2000)]
+    stats = log_sampling_stats()["shadow_router"]
+    assert stats["kept"] + stats["sampled_out"] == 4000
+
+
+def test_sampled_records_carry_weight(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("SHADOW_ROUTER_LOG_SAMPLE_RATE", "0.5")
+
+    kept = [record for record in _records(400) if should_log("shadow_router", record)]
+
+    assert {record["sample_weight"] for record in kept} == {2.0}
+    assert sum(record["sample_weight"] for record in kept) == pytest.approx(400, rel=0.15)
+
+
+def test_errors_and_timeouts_are_always_kept(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("SHADOW_AGENT_DIFF_LOG_SAMPLE_RATE", "0")
+
+    error = {"command_id": "cmd-1", "status": "error", "reason_code": "agent_failed"}
+    timeout = {"command_id": "cmd-2", "status": "rejected", "reason_code": "timeout"}
+    failed_runner = {"trace_id": "cmd-3", "ok": False, "error_type": "http_error"}
+    ok = {"command_id": "cmd-4", "status": "ok"}
+
+    assert should_log("shadow_agent_diff", error)
+    assert should_log("shadow_agent_diff", timeout)
+    assert should_log("shadow_agent_diff", failed_runner)
+    assert not should_log("shadow_agent_diff", ok)
+    assert error["sample_weight"] == 1.0
+    assert log_sampling_stats()["shadow_agent_diff"] == {
+        "kept": 0,
+        "forced": 3,
+        "sampled_out": 1,
+        "rate_limited": 0,
+    }
+
+
+def test_token_bucket_caps_and_reweights(monkeypatch: pytest.MonkeyPatch) -> None:
+    clock = [1000.0]
+    monkeypatch.setattr(sampling.time, "monotonic", lambda: clock[0])
+    monkeypatch.setenv("LLM_RUNNER_LOG_MAX_PER_S", "2")
+
+    first_second = [should_log("llm_runner", {"trace_id": f"t-{index}", "ok": True}) for index in range(10)]
+    clock[0] += 1.0
+    refill = {"trace_id": "t-late", "ok": True}
+    admitted = should_log("llm_runner", refill)
+    error = {"trace_id": "t-err", "ok": False}
+
+    assert first_second == [True, True] + [False] * 8  # one second of burst
+    assert admitted
+    assert refill["sample_weight"] == 9.0
+    assert should_log("llm_runner", error)
+    assert log_sampling_stats()["llm_runner"] == {"kept": 3, "forced": 1, "sampled_out": 0, "rate_limited": 8}
+
+
+def test_shadow_router_sink_and_analyzer_reweight(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    path = tmp_path / "shadow_router.jsonl"
+    monkeypatch.setenv("SHADOW_ROUTER_LOG_PATH", str(path))
+    monkeypatch.setenv("SHADOW_ROUTER_LOG_SAMPLE_RATE", "0.1")
+
+    for index in range(1000):
+        append_shadow_router_log({"command_id": f"cmd-{index}", "status": "ok", "latency_ms": 10, "error_type": None})
+    for index in range(5):
+        append_shadow_router_log(
+            {"command_id": f"err-{index}", "status": "error", "latency_ms": 10, "error_type": "timeout_exceeded"}
+        )
+
+    records = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    report = compute_metrics(records, {})
+
+    assert len(records) < 200
+    assert report.error_breakdown == {"timeout_exceeded": 5}
+    assert report.estimated_total_records == pytest.approx(1005, rel=0.2)
@@ -0,0 +1,51 @@
+import gzip
+import json
+
+from app.logging import sharding
+from app.logging.sharding import Shard, iter_lines, iter_shard_lines, map_shards, plan_shards
+
+
+def _write_lines(path, count):
+    lines = [json.dumps({"n": index, "text": "молоко" * (index % 5)}, ensure_ascii=False) + "\n" for index in range(count)]
+    path.write_text("".join(lines), encoding="utf-8")
+    return lines
+
+
+def test_byte_ranges_cover_every_line_once(tmp_path):
+    path = tmp_path / "log.jsonl"
+    lines = _write_lines(path, 500)
+    size = path.stat().st_size
+
+    for step in (1, 7, 64, 1000, size):
+        shards = [Shard(path, start, min(start + step, size)) for start in range(0, size, step)]
+        assert list(iter_lines(shards)) == lines
+
+
+def test_plan_shards_splits_plain_files_and_keeps_compressed_whole(tmp_path):
+    path = tmp_path / "log.jsonl"
+    lines = _write_lines(path, 300)
+    segment = tmp_path / "log.20260201T000000Z.jsonl.gz"
+    with gzip.open(segment, "wt", encoding="utf-8") as handle:
+        handle.write('{"old": true}\n')
+
+    shards = plan_shards(path, workers=4, min_shard_bytes=256)
+
+    assert shards[0] == Shard(segment)
+    assert len(shards) > 2
+    assert list(iter_lines(shards)) == ['{"old": true}\n'] + lines
+    assert plan_shards(path, workers=1) == [Shard(segment), Shard(path)]
+
+
+def _count_lines(shard):
+    return sum(1 for _ in iter_shard_lines(shard))
+
+
+def test_map_shards_in_process_pool(tmp_path, monkeypatch):
+    monkeypatch.setattr(sharding, "MIN_SHARD_BYTES", 512)
+    path = tmp_path / "log.jsonl"
+    _write_lines(path, 400)
+
+    shards = plan_shards(path, workers=2)
+
+    assert len(shards) > 1
+    assert sum(map_shards(_count_lines, shards, workers=2)) == 400
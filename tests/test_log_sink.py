@@ -0,0 +1,120 @@
+import json
+import threading
+
+import pytest
+
+from app.logging import sink as sink_module
+from app.logging.assist_log import append_assist_log
+from app.logging.sink import JsonlSinkWriter
+
+
+def _lines(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+@pytest.fixture
+def buffered(monkeypatch):
+    monkeypatch.setenv("LOG_SINK_MODE", "buffered")
+    writer = JsonlSinkWriter()
+    yield writer
+    writer.shutdown()
+
+
+def test_buffered_writer_batches_and_flushes(buffered, tmp_path):
+    first = tmp_path / "nested" / "a.jsonl"
+    second = tmp_path / "b.jsonl"
+    for index in range(50):
+        buffered.write(first if index % 2 else second, json.dumps({"i": index}) + "\n")
+
+    assert buffered.flush() is True
+
+    assert [row["i"] for row in _lines(first)] == list(range(1, 50, 2))
+    assert [row["i"] for row in _lines(second)] == list(range(0, 50, 2))
+    assert buffered.stats()[str(first)]["written"] == 25
+
+
+def test_shutdown_drains_queue(buffered, tmp_path, monkeypatch):
+    monkeypatch.setenv("LOG_SINK_FLUSH_INTERVAL_MS", "10000")
+    path = tmp_path / "a.jsonl"
+    buffered.write(path, "{}\n")
+
+    buffered.shutdown()
+
+    assert path.read_text(encoding="utf-8") == "{}\n"
+
+
+def test_full_queue_drops_and_counts(buffered, tmp_path, monkeypatch):
+    monkeypatch.setenv("LOG_SINK_QUEUE_SIZE", "1")
+    path = tmp_path / "a.jsonl"
+    gate = threading.Event()
+    original = buffered._write_batch
+
+    def blocked_write(batch):
+        gate.wait(5)
+        original(batch)
+
+    monkeypatch.setattr(buffered, "_write_batch", blocked_write)
+    monkeypatch.setenv("LOG_SINK_FLUSH_INTERVAL_MS", "0")
+    for _ in range(20):
+        buffered.write(path, "{}\n")
+    gate.set()
+    buffered.flush()
+
+    stats = buffered.stats()[str(path)]
+    assert stats["dropped"] > 0
+    assert stats["written"] + stats["dropped"] == 20
+    assert len(path.read_text(encoding="utf-8").splitlines()) == stats["written"]
+
+
+def test_block_policy_never_drops(buffered, tmp_path, monkeypatch):
+    monkeypatch.setenv("LOG_SINK_QUEUE_SIZE", "1")
+    monkeypatch.setenv("LOG_SINK_FULL_POLICY", "block")
+    path = tmp_path / "a.jsonl"
+
+    for _ in range(200):
+        buffered.write(path, "{}\n")
+    buffered.flush()
+
+    assert buffered.stats()[str(path)] == {"written": 200, "dropped": 0, "errors": 0}
+
+
+def test_reopens_deleted_file(tmp_path):
+    writer = JsonlSinkWriter()
+    path = tmp_path / "a.jsonl"
+    writer.write(path, "1\n")
+    path.unlink()
+    writer.write(path, "2\n")
+    writer.shutdown()
+
+    assert path.read_text(encoding="utf-8") == "2\n"
+
+
+def test_fsync_batch_policy(buffered, tmp_path, monkeypatch):
+    monkeypatch.setenv("LOG_SINK_FSYNC", "batch")
+    calls = []
+    monkeypatch.setattr(sink_module.os, "fsync", lambda fd: calls.append(fd))
+    buffered.write(tmp_path / "a.jsonl", "{}\n")
+    buffered.flush()
+
+    assert calls
+
+
+def test_open_handles_are_bounded(tmp_path, monkeypatch):
+    monkeypatch.setenv("LOG_SINK_MAX_OPEN_FILES", "2")
+    writer = JsonlSinkWriter()
+    for index in range(5):
+        writer.write(tmp_path / f"{index}.jsonl", "{}\n")
+
+    assert len(writer._handles._handles) == 2
+    writer.shutdown()
+
+
+def test_app_sinks_use_shared_writer(tmp_path, monkeypatch):
+    path = tmp_path / "assist.jsonl"
+    monkeypatch.setenv("ASSIST_LOG_PATH", str(path))
+    monkeypatch.setenv("LOG_SINK_MODE", "buffered")
+
+    append_assist_log({"step": "normalizer"})
+    assert sink_module.flush_log_sinks() is True
+
+    assert _lines(path)[0]["step"] == "normalizer"
@@ -0,0 +1,123 @@
+import json
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import create_app
+from app.metrics import MetricsRegistry
+
+FIXTURE_PATH = (
+    Path(__file__).resolve().parents[1] / "skills" / "contract-checker" / "fixtures" / "valid_command_create_task.json"
+)
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    latency = registry.histogram("stage_ms", "Stage latency", ("stage",), buckets=(1, 10, 100))
+    for value in (0.5, 1, 5, 50, 500):
+        latency.labels("validate").observe(value)
+
+    text = registry.render()
+
+    assert "# TYPE stage_ms histogram" in text
+    assert 'stage_ms_bucket{stage="validate",le="1"} 2' in text
+    assert 'stage_ms_bucket{stage="validate",le="10"} 3' in text
+    assert 'stage_ms_bucket{stage="validate",le="100"} 4' in text
+    assert 'stage_ms_bucket{stage="validate",le="+Inf"} 5' in text
+    assert 'stage_ms_sum{stage="validate"} 556.5' in text
+    assert 'stage_ms_count{stage="validate"} 5' in text
+
+
+def test_counter_is_exact_across_threads():
+    registry = MetricsRegistry()
+    runs = registry.counter("runs_total", "Runs", ("agent_id",))
+
+    def work():
+        child = runs.labels("agent-x")
+        for _ in range(10000):
+            child.inc()
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert runs.labels("agent-x").value == 80000
+    assert 'runs_total{agent_id="agent-x"} 80000' in registry.render()
+
+
+def test_labels_are_validated_and_escaped():
+    registry = MetricsRegistry()
+    runs = registry.counter("runs_total", "Runs", ("agent_id",))
+    runs.labels('a"b\\c').inc()
+
+    with pytest.raises(ValueError):
+        runs.labels("a", "b")
+    with pytest.raises(ValueError):
+        registry.histogram("runs_total", "Runs", ("agent_id",))
+    assert 'runs_total{agent_id="a\\"b\\\\c"} 1' in registry.render()
+
+
+def test_reset_zeroes_held_children():
+    registry = MetricsRegistry()
+    child = registry.histogram("x_ms", "x", ("k",)).labels("a")
+    child.observe(3)
+
+    registry.reset()
+    child.observe(7)
+
+    assert child.snapshot()[1:] == (7.0, 1)
+
+
+def test_observe_is_cheap():
+    child = MetricsRegistry().histogram("x_ms", "x", ("k",)).labels("a")
+    started = time.perf_counter()
+    for _ in range(100000):
+        child.observe(3.2)
+    per_sample_us = (time.perf_counter() - started) / 100000 * 1e6
+
+    assert per_sample_us < 5  # ~0.4us locally; generous bound for slow CI
+
+
+def test_metrics_route_exposes_pipeline_and_sink_metrics(monkeypatch, tmp_path):
+    monkeypatch.setenv("DECISION_LOG_PATH", str(tmp_path / "decisions.jsonl"))
+    monkeypatch.setenv("PIPELINE_LATENCY_LOG_PATH", str(tmp_path / "latency.jsonl"))
+    client = TestClient(create_app())
+    command = json.loads(FIXTURE_PATH.read_text(encoding="utf-8"))
+    assert client.post("/v1/decide", json=command).status_code == 200
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert 'pipeline_stage_ms_count{stage="validate_command"}' in body
+    assert 'router_decisions_total{strategy="v1",action="start_job"}' in body
+    assert f'log_sink_records_total{{path="{tmp_path / "latency.jsonl"}",outcome="written"}}' in body
+    assert "# TYPE llm_http_pool_requests_total counter" in body
+
+
+def test_llm_task_results_are_counted():
+    from llm_policy.loader import LlmPolicyLoader
+    from llm_policy.runtime import LLM_TASKS, run_task_with_policy
+
+    policy = LlmPolicyLoader.load(enabled=True, allow_placeholders=True)
+    schema = {"type": "object", "properties": {"item_name": {"type": "string"}}, "required": ["item_name"]}
+    before = LLM_TASKS.labels("shopping_extraction", "cheap", "ok").value
+
+    result = run_task_with_policy(
+        task_id="shopping_extraction",
+        prompt="p",
+        schema=schema,
+        profile="cheap",
+        policy=policy,
+        caller=lambda spec, prompt: '{"item_name": "milk"}',
+        policy_enabled=True,
+    )
+
+    assert result.status == "ok"
+    assert LLM_TASKS.labels("shopping_extraction", "cheap", "ok").value == before + 1
@@ -0,0 +1,288 @@
+import asyncio
+import itertools
+import json
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+import graphs.core_graph as core_graph
+import routers.assist.runner as assist_runner
+import routers.v2 as v2_module
+import routers.v2_async as v2_async_module
+from routers.assist.types import NormalizationHint
+from routers.factory import get_router
+from routers.partial_trust_types import LLMDecisionCandidate
+from routers.v2 import RouterV2Pipeline
+from routers.v2_async import AsyncRouterV2Pipeline
+
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+COMMANDS_DIR = BASE_DIR / "skills" / "graph-sanity" / "fixtures" / "commands"
+
+
+def _command(text: str = "Купи молоко"):
+    return {
+        "command_id": "cmd-async-1",
+        "user_id": "user-1",
+        "timestamp": "2026-01-12T10:00:00Z",
+        "text": text,
+        "capabilities": ["start_job", "propose_add_shopping_item", "clarify"],
+        "context": {
+            "household": {
+                "members": [{"user_id": "user-1", "display_name": "Анна"}],
+                "shopping_lists": [{"list_id": "list-1", "name": "Основной"}],
+            }
+        },
+    }
+
+
+def _candidate():
+    return LLMDecisionCandidate(
+        intent="add_shopping_item",
+        job_type="add_shopping_item",
+        proposed_actions=[
+            {"action": "propose_add_shopping_item", "payload": {"item": {"name": "бананы"}}},
+        ],
+        clarify_question=None,
+        clarify_missing_fields=None,
+        confidence=0.9,
+        model_meta={"profile": "partial_trust", "task_id": "partial_trust_shopping"},
+        latency_ms=12,
+        error_type=None,
+    )
+
+
+def _read_log(path: Path):
+    return json.loads(path.read_text(encoding="utf-8").strip().splitlines()[-1])
+
+
+@pytest.fixture
+def partial_trust_env(monkeypatch, tmp_path):
+    log_path = tmp_path / "risk.jsonl"
+    monkeypatch.setenv("PARTIAL_TRUST_ENABLED", "true")
+    monkeypatch.setenv("PARTIAL_TRUST_INTENT", "add_shopping_item")
+    monkeypatch.setenv("PARTIAL_TRUST_SAMPLE_RATE", "1")
+    monkeypatch.setenv("PARTIAL_TRUST_TIMEOUT_MS", "300")
+    monkeypatch.setenv("PARTIAL_TRUST_RISK_LOG_PATH", str(log_path))
+    monkeypatch.setattr(v2_module, "policy_route_available", lambda *_a, **_kw: True)
+    monkeypatch.setattr(v2_async_module, "policy_route_available", lambda *_a, **_kw: True)
+    return log_path
+
+
+def test_select_v2_async(monkeypatch):
+    monkeypatch.setenv("DECISION_ROUTER_STRATEGY", "v2_async")
+    assert isinstance(get_router(), AsyncRouterV2Pipeline)
+
+
+def test_matches_v2_when_llm_stages_disabled(monkeypatch):
+    for name in ("ASSIST_MODE_ENABLED", "PARTIAL_TRUST_ENABLED", "SHADOW_ROUTER_ENABLED", "LLM_POLICY_ENABLED"):
+        monkeypatch.setenv(name, "false")
+
+    class _FixedDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime(2026, 1, 12, 10, 0, tzinfo=tz)
+
+    monkeypatch.setattr(core_graph, "datetime", _FixedDatetime)
+
+    def run(router, command):
+        counter = itertools.count()
+        monkeypatch.setattr(core_graph, "uuid4", lambda: uuid.UUID(int=next(counter)))
+        return json.dumps(router.decide(command), ensure_ascii=False, sort_keys=True)
+
+    commands = [json.loads(path.read_text(encoding="utf-8")) for path in sorted(COMMANDS_DIR.glob("*.json"))]
+    assert commands
+    for command in commands:
+        assert run(AsyncRouterV2Pipeline(), command) == run(RouterV2Pipeline(), command)
+
+
+def test_assist_and_partial_trust_run_concurrently(monkeypatch, partial_trust_env, tmp_path):
+    monkeypatch.setenv("ASSIST_MODE_ENABLED", "true")
+    monkeypatch.setenv("ASSIST_NORMALIZATION_ENABLED", "true")
+    monkeypatch.setenv("ASSIST_TIMEOUT_MS", "300")
+    monkeypatch.setenv("ASSIST_LOG_PATH", str(tmp_path / "assist.jsonl"))
+
+    def slow_normalization(text, **_kwargs):
+        time.sleep(0.2)
+        return NormalizationHint(
+            normalized_text=text,
+            intent_hint=None,
+            entities_hint=None,
+            confidence=None,
+            error_type=None,
+            latency_ms=200,
+        )
+
+    def slow_candidate(*_args, **_kwargs):
+        time.sleep(0.2)
+        return _candidate(), None
+
+    monkeypatch.setattr(assist_runner, "_run_normalization_hint", slow_normalization)
+    monkeypatch.setattr(v2_async_module, "generate_llm_candidate_with_meta", slow_candidate)
+
+    started = time.monotonic()
+    decision = AsyncRouterV2Pipeline().decide(_command())
+    elapsed = time.monotonic() - started
+
+    assert elapsed < 0.35
+    assert decision["payload"]["proposed_actions"][0]["payload"]["item"]["name"] == "бананы"
+    assert _read_log(partial_trust_env)["status"] == "accepted_llm"
+
+
+def test_deadline_cancels_slow_candidate(monkeypatch, partial_trust_env):
+    monkeypatch.setenv("ROUTER_V2_ASYNC_DEADLINE_MS", "50")
+
+    def stuck_candidate(*_args, **_kwargs):
+        time.sleep(0.5)
+        return _candidate(), None
+
+    monkeypatch.setattr(v2_async_module, "generate_llm_candidate_with_meta", stuck_candidate)
+
+    started = time.monotonic()
+    decision = AsyncRouterV2Pipeline().decide(_command())
+    elapsed = time.monotonic() - started
+
+    assert elapsed < 0.3
+    assert decision["payload"]["proposed_actions"][0]["payload"]["item"]["name"] == "молоко"
+    logged = _read_log(partial_trust_env)
+    assert logged["status"] == "fallback_deterministic"
+    assert logged["reason_code"] == "timeout"
+    assert logged["trace_id"] == decision["trace_id"]
+
+
+def test_loop_stays_responsive_during_a_non_prefetched_candidate(monkeypatch, partial_trust_env):
+    calls = []
+
+    def slow_candidate(*_args, **kwargs):
+        calls.append(kwargs["timeout_ms"])
+        time.sleep(0.2)
+        return _candidate(), None
+
+    monkeypatch.setattr(AsyncRouterV2Pipeline, "_should_prefetch_candidate", staticmethod(lambda *_a: False))
+    monkeypatch.setattr(v2_async_module, "generate_llm_candidate_with_meta", slow_candidate)
+
+    async def main():
+        ticks = 0
+        done = asyncio.Event()
+
+        async def ticker():
+            nonlocal ticks
+            while not done.is_set():
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        decision = await AsyncRouterV2Pipeline().decide_async(_command())
+        done.set()
+        await task
+        return decision, ticks
+
+    decision, ticks = asyncio.run(main())
+
+    assert len(calls) == 1 and 0 < calls[0] <= 300
+    assert ticks >= 10  # the loop kept running while the candidate call blocked a worker
+    assert decision["payload"]["proposed_actions"][0]["payload"]["item"]["name"] == "бананы"
+
+
+def test_candidate_error_is_logged(monkeypatch, partial_trust_env):
+    def broken_candidate(*_args, **_kwargs):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(v2_async_module, "generate_llm_candidate_with_meta", broken_candidate)
+
+    decision = AsyncRouterV2Pipeline().decide(_command())
+
+    assert decision["action"] == "start_job"
+    logged = _read_log(partial_trust_env)
+    assert logged["status"] == "error"
+    assert logged["reason_code"] == "RuntimeError"
+
+
+def test_deadline_defaults_to_slowest_stage(monkeypatch):
+    monkeypatch.delenv("ROUTER_V2_ASYNC_DEADLINE_MS", raising=False)
+    monkeypatch.setenv("ASSIST_MODE_ENABLED", "true")
+    monkeypatch.setenv("ASSIST_NORMALIZATION_ENABLED", "true")
+    monkeypatch.setenv("ASSIST_TIMEOUT_MS", "200")
+    monkeypatch.setenv("PARTIAL_TRUST_ENABLED", "true")
+    monkeypatch.setenv("PARTIAL_TRUST_TIMEOUT_MS", "350")
+
+    assert v2_async_module.request_deadline_ms() == 350
+
+
+def test_stage_workers_return_at_the_request_deadline(monkeypatch, tmp_path):
+    monkeypatch.setenv("ROUTER_V2_ASYNC_DEADLINE_MS", "50")
+    monkeypatch.setenv("ASSIST_MODE_ENABLED", "true")
+    monkeypatch.setenv("ASSIST_NORMALIZATION_ENABLED", "true")
+    monkeypatch.setenv("ASSIST_TIMEOUT_MS", "1000")
+    monkeypatch.setenv("ASSIST_LOG_PATH", str(tmp_path / "assist.jsonl"))
+    collect = v2_async_module.collect_assist_hints
+    returned_after: list[float] = []
+
+    def slow_normalization(text, **_kwargs):
+        time.sleep(0.5)
+        return None
+
+    def timed_collect(*args, **kwargs):
+        started = time.monotonic()
+        try:
+            return collect(*args, **kwargs)
+        finally:
+            returned_after.append(time.monotonic() - started)
+
+    monkeypatch.setattr(assist_runner, "_run_normalization_hint", slow_normalization)
+    monkeypatch.setattr(v2_async_module, "collect_assist_hints", timed_collect)
+
+    AsyncRouterV2Pipeline().decide(_command())
+
+    # The worker holding the router-v2-async pool slot is freed at the deadline,
+    # not after ASSIST_TIMEOUT_MS.
+    deadline = time.monotonic() + 1
+    while not returned_after and time.monotonic() < deadline:
+        time.sleep(0.005)
+    assert returned_after and returned_after[0] < 0.3
+
+
+def test_sync_decide_reuses_one_helper_loop(monkeypatch):
+    for name in ("ASSIST_MODE_ENABLED", "PARTIAL_TRUST_ENABLED", "SHADOW_ROUTER_ENABLED", "LLM_POLICY_ENABLED"):
+        monkeypatch.setenv(name, "false")
+    loops = []
+    decide_async = AsyncRouterV2Pipeline.decide_async
+
+    async def recording(self, command):
+        loops.append(asyncio.get_running_loop())
+        return await decide_async(self, command)
+
+    monkeypatch.setattr(AsyncRouterV2Pipeline, "decide_async", recording)
+
+    async def from_inside_a_loop():
+        return AsyncRouterV2Pipeline().decide(_command())
+
+    first = AsyncRouterV2Pipeline().decide(_command())
+    second = asyncio.run(from_inside_a_loop())
+
+    assert first["action"] == second["action"] == "start_job"
+    assert len(loops) == 2 and loops[0] is loops[1]
+
+
+def test_decide_route_awaits_async_pipeline(monkeypatch, tmp_path):
+    from fastapi.testclient import TestClient
+
+    from app.main import create_app
+
+    monkeypatch.setenv("DECISION_ROUTER_STRATEGY", "v2_async")
+    monkeypatch.setenv("DECISION_LOG_PATH", str(tmp_path / "decisions.jsonl"))
+
+    def no_helper_loop(_coro):
+        _coro.close()
+        raise AssertionError("/decide must await decide_async")
+
+    monkeypatch.setattr(v2_async_module, "_run_sync", no_helper_loop)
+    client = TestClient(create_app())
+    for mode in ("inline", "pool"):
+        monkeypatch.setenv("DECIDE_EXECUTION_MODE", mode)
+        response = client.post("/v1/decide", json=_command())
+        assert response.status_code == 200
+        assert response.json()["action"] == "start_job"
@@ -0,0 +1,44 @@
+import json
+
+import pytest
+
+from app import serialization
+
+
+@pytest.fixture(autouse=True)
+def _reset_backend():
+    serialization.json_backend.cache_clear()
+    yield
+    serialization.json_backend.cache_clear()
+
+
+@pytest.mark.parametrize("backend", ["auto", "stdlib"])
+def test_backends_produce_identical_compact_utf8(monkeypatch, backend):
+    monkeypatch.setenv("JSON_BACKEND", backend)
+    record = {"text": "молоко", "n": 1, "f": 0.5, "nested": {"list": [1, None, True]}}
+
+    encoded = serialization.dumps(record)
+
+    assert encoded == json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+    assert serialization.dumps_bytes(record) == encoded.encode("utf-8")
+    assert serialization.loads(encoded) == record
+
+
+def test_stdlib_forced(monkeypatch):
+    monkeypatch.setenv("JSON_BACKEND", "stdlib")
+
+    assert serialization.json_backend() == "stdlib"
+
+
+def test_values_orjson_rejects_fall_back_to_stdlib():
+    huge = 2**70
+
+    assert serialization.dumps({"n": huge}) == f'{{"n":{huge}}}'
+    assert serialization.dumps({1: "a"}) == '{"1":"a"}'
+
+
+def test_unserializable_values_still_raise(monkeypatch):
+    monkeypatch.setenv("JSON_BACKEND", "stdlib")
+
+    with pytest.raises(TypeError):
+        serialization.dumps({"value": object()})
@@ -0,0 +1,181 @@
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from app import tracing
+from app.services.decision_service import decide
+from llm_policy.loader import LlmPolicyLoader
+from llm_policy.runtime import run_task_with_policy
+
+SCHEMA = {
+    "type": "object",
+    "properties": {"item_name": {"type": "string"}},
+    "required": ["item_name"],
+    "additionalProperties": False,
+}
+
+
+def _enable(monkeypatch: pytest.MonkeyPatch, tmp_path: Path, mode: str = "jsonl") -> Path:
+    path = tmp_path / "traces.jsonl"
+    monkeypatch.setenv("TRACE_MODE", mode)
+    monkeypatch.setenv("TRACE_PATH", str(path))
+    tracing.reset_tracing()
+    return path
+
+
+def _read(path: Path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_off_mode_is_noop(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    path = tmp_path / "traces.jsonl"
+    monkeypatch.setenv("TRACE_PATH", str(path))
+    monkeypatch.delenv("TRACE_MODE", raising=False)
+
+    def work():
+        return 1
+
+    with tracing.span("root") as root:
+        root.set_attribute("key", "value")
+        tracing.record_span("child", 5.0)
+        assert tracing.current_trace_id() is None
+
+    assert root is tracing.NOOP_SPAN
+    assert tracing.propagate(work) is work
+    assert not path.exists()
+
+
+def test_nested_spans_share_trace_and_parent(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    path = _enable(monkeypatch, tmp_path)
+
+    with tracing.span("root", trace_id="trace-abc", command_id="cmd-1") as root:
+        with tracing.span("child") as child:
+            tracing.record_span("leaf", 2.5, error_type="timeout", profile="cheap")
+        assert tracing.current_trace_id() == "trace-abc"
+    assert tracing.current_span() is None
+
+    records = {record["name"]: record for record in _read(path)}
+    assert [record["name"] for record in _read(path)] == ["leaf", "child", "root"]
+    assert {record["trace_id"] for record in records.values()} == {"trace-abc"}
+    assert records["root"]["parent_span_id"] is None
+    assert records["child"]["parent_span_id"] == root.span_id
+    assert records["leaf"]["parent_span_id"] == child.span_id
+    assert records["leaf"]["status"] == "error"
+    assert records["leaf"]["error_type"] == "timeout"
+    assert records["leaf"]["duration_ms"] == pytest.approx(2.5, abs=0.01)
+    assert records["root"]["attributes"] == {"command_id": "cmd-1"}
+
+
+def test_exception_marks_span_failed(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    path = _enable(monkeypatch, tmp_path)
+
+    with pytest.raises(ValueError):
+        with tracing.span("root"):
+            raise ValueError("boom")
+
+    (record,) = _read(path)
+    assert record["status"] == "error"
+    assert record["error_type"] == "ValueError"
+
+
+def test_propagate_carries_parent_into_executor_threads(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    path = _enable(monkeypatch, tmp_path)
+
+    def work(step: str) -> str:
+        with tracing.span(f"worker.{step}"):
+            return tracing.current_trace_id()
+
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix="trace-test") as executor:
+        with tracing.span("root") as root:
+            futures = [executor.submit(tracing.propagate(work), step) for step in ("a", "b")]
+            trace_ids = [future.result() for future in futures]
+        unpropagated = executor.submit(work, "c").result()
+
+    assert trace_ids == [root.trace_id, root.trace_id]
+    assert unpropagated != root.trace_id
+    records = {record["name"]: record for record in _read(path)}
+    for step in ("a", "b"):
+        assert records[f"worker.{step}"]["parent_span_id"] == root.span_id
+        assert records[f"worker.{step}"]["thread"].startswith("trace-test")
+    assert records["worker.c"]["parent_span_id"] is None
+
+
+def test_otlp_export_shape(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    path = _enable(monkeypatch, tmp_path, mode="otlp")
+    hex_id = "0123456789abcdef0123456789abcdef"
+
+    with tracing.span("root", trace_id=f"trace-{hex_id}", attempts=2, ok=True, ratio=0.5):
+        tracing.record_span("child", 1.0, error_type="invalid_json")
+
+    child_line, root_line = _read(path)
+    root_span = root_line["resourceSpans"][0]["scopeSpans"][0]["spans"][0]
+    child_span = child_line["resourceSpans"][0]["scopeSpans"][0]["spans"][0]
+    assert root_span["traceId"] == hex_id
+    assert child_span["traceId"] == hex_id
+    assert child_span["parentSpanId"] == root_span["spanId"]
+    assert root_span["parentSpanId"] == ""
+    assert child_span["status"] == {"code": 2, "message": "invalid_json"}
+    assert int(root_span["endTimeUnixNano"]) >= int(root_span["startTimeUnixNano"])
+    attributes = {item["key"]: item["value"] for item in root_span["attributes"]}
+    assert attributes["attempts"] == {"intValue": "2"}
+    assert attributes["ok"] == {"boolValue": True}
+    assert attributes["ratio"] == {"doubleValue": 0.5}
+    assert attributes["trace.id"] == {"stringValue": f"trace-{hex_id}"}
+
+
+def test_otlp_trace_id_hashes_foreign_ids() -> None:
+    hashed = tracing._otlp_trace_id("shadow-not-hex")
+    assert len(hashed) == 32
+    assert hashed == tracing._otlp_trace_id("shadow-not-hex")
+
+
+def test_decision_trace_covers_router_and_core_graph(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, valid_command_shopping
+) -> None:
+    path = _enable(monkeypatch, tmp_path)
+    monkeypatch.setenv("DECISION_ROUTER_STRATEGY", "v1")
+    monkeypatch.setenv("DECISION_LOG_PATH", str(tmp_path / "decisions.jsonl"))
+
+    decision = decide(valid_command_shopping)
+
+    records = {record["name"]: record for record in _read(path)}
+    assert {"decision", "router.decide", "core_graph.process_command"} <= set(records)
+    assert {record["trace_id"] for record in records.values()} == {decision["trace_id"]}
+    assert records["router.decide"]["parent_span_id"] == records["decision"]["span_id"]
+    assert records["core_graph.process_command"]["attributes"]["intent"] == "add_shopping_item"
+    assert "validate_command_ms" in records["core_graph.process_command"]["attributes"]
+
+
+def test_llm_task_span_nests_attempts(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    path = _enable(monkeypatch, tmp_path)
+    policy = LlmPolicyLoader.load(enabled=True, allow_placeholders=True)
+    responses = iter(["not json", "still broken", json.dumps({"item_name": "молоко"})])
+
+    result = run_task_with_policy(
+        task_id="shopping_extraction",
+        prompt="Купи молоко",
+        schema=SCHEMA,
+        profile="cheap",
+        trace_id="trace-llm",
+        policy=policy,
+        caller=lambda spec, prompt: next(responses),
+        policy_enabled=True,
+    )
+
+    assert result.status == "ok"
+    records = _read(path)
+    task = records[-1]
+    attempts = [record for record in records if record["name"] == "llm.attempt"]
+    assert task["name"] == "llm.task"
+    assert task["trace_id"] == "trace-llm"
+    assert task["attributes"]["escalated"] is True
+    assert len(attempts) == result.attempts
+    assert {record["parent_span_id"] for record in attempts} == {task["span_id"]}
+    assert [record["status"] for record in attempts][-1] == "ok"